@@ -0,0 +1,166 @@
+"""
+Heuristic routing agreement benchmark.
+
+Replays the routing decisions logged from the language model
+(`HEURISTIC_LOG_PATH`) through the local heuristics of the task router and
+the subtask classifier, and reports, for every confidence threshold, how
+many decisions the heuristics would take (the model calls saved) and how
+often they agree with the model.
+
+The keyword rules are evaluated on every logged decision. With
+scikit-learn installed and enough decisions logged, a learned pipeline is
+also trained on a deterministic 80% of the decisions and evaluated, behind
+the rules, on the remaining 20%. `--save-dir` trains the pipelines on all
+decisions and writes them where `HEURISTIC_MODEL_DIR` expects them.
+
+Log decisions with `HEURISTIC_ROUTING=false`: while the fast path is on, the
+questions it answers never reach the model and are missing from the log.
+
+Usage:
+    cd agent_service
+    python benchmarks/heuristic_agreement.py logs/routing.jsonl \\
+        --thresholds 0.7 0.8 0.85 0.9 \\
+        --save-dir models/heuristic
+"""
+
+import sys
+import json
+import zlib
+import argparse
+from pathlib import Path
+from collections import Counter
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from agents.models.heuristic import (
+    HeuristicClassifier,
+    subtask_classification_classifier,
+    task_routing_classifier,
+    train_heuristic_model,
+)
+
+
+def evaluate(
+    classifier: HeuristicClassifier, entries: List[Dict[str, Any]], threshold: float
+) -> Dict[str, Any]:
+    """
+    Compare the confident heuristic decisions with the logged ones.
+
+    Args:
+        classifier: Heuristic classifier under test.
+        entries: Logged decisions of the language model.
+        threshold: Minimum confidence of a heuristic decision.
+
+    Returns:
+        Dict[str, Any]: Decisions taken and agreeing, overall and by source,
+        and the confusion counts of the disagreements.
+    """
+    taken = Counter()
+    agreed = Counter()
+    confusion = Counter()
+    for entry in entries:
+        prediction = classifier.classify(entry["inputs"])
+        if prediction.label is None or prediction.confidence < threshold:
+            continue
+        taken[prediction.source] += 1
+        if prediction.label == entry["label"]:
+            agreed[prediction.source] += 1
+        else:
+            confusion[(entry["label"], prediction.label)] += 1
+
+    return {
+        "total": len(entries),
+        "taken": sum(taken.values()),
+        "agreed": sum(agreed.values()),
+        "sources": {source: (taken[source], agreed[source]) for source in taken},
+        "confusion": confusion,
+    }
+
+
+def report(name: str, threshold: float, result: Dict[str, Any]) -> None:
+    """
+    Print the coverage and agreement of one evaluation.
+
+    Args:
+        name: Name of the evaluation.
+        threshold: Confidence threshold of the evaluation.
+        result: Result of `evaluate`.
+    """
+    total, taken, agreed = result["total"], result["taken"], result["agreed"]
+    sources = " ".join(
+        f"{source}={agreed_}/{taken_}"
+        for source, (taken_, agreed_) in sorted(result["sources"].items())
+    )
+    print(
+        f"{name:<34} threshold={threshold:.2f} "
+        f"coverage={taken / total if total else 0.0:6.1%} ({taken}/{total}) "
+        f"agreement={agreed / taken if taken else 0.0:6.1%} {sources}"
+    )
+    for (expected, predicted), count in result["confusion"].most_common(3):
+        print(f"{'':<34} model={expected} heuristic={predicted}: {count}")
+
+
+def main(args: argparse.Namespace) -> None:
+    """
+    Run the benchmark and print its results.
+
+    Args:
+        args: Command line arguments.
+    """
+    with open(args.log) as file:
+        log = [json.loads(line) for line in file if line.strip()]
+
+    for classifier in (task_routing_classifier, subtask_classification_classifier):
+        entries = [
+            entry
+            for entry in log
+            if entry["classifier"] == classifier.name
+            and entry["label"] in classifier.labels
+        ]
+        if not entries:
+            print(f"{classifier.name}: no logged decisions\n")
+            continue
+
+        # Keyword rules alone, on every logged decision
+        classifier.use_model(None)
+        for threshold in args.thresholds:
+            result = evaluate(classifier, entries, threshold)
+            report(f"{classifier.name} rules", threshold, result)
+
+        # Rules and a pipeline trained on the other decisions, on a holdout
+        labels = {entry["label"] for entry in entries}
+        if len(entries) >= args.min_entries and len(labels) > 1:
+            training, holdout = [], []
+            for entry in entries:
+                question = entry["inputs"]["question"] or ""
+                split = holdout if zlib.crc32(question.encode()) % 5 == 0 else training
+                split.append(entry)
+            if holdout and len({entry["label"] for entry in training}) > 1:
+                classifier.use_model(train_heuristic_model(training))
+                for threshold in args.thresholds:
+                    report(
+                        f"{classifier.name} rules+model",
+                        threshold,
+                        evaluate(classifier, holdout, threshold),
+                    )
+
+            # Train on every decision for use by the service
+            if args.save_dir is not None:
+                import joblib
+
+                path = Path(args.save_dir) / f"{classifier.name}.joblib"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                joblib.dump(train_heuristic_model(entries), path)
+                print(f"saved {path}")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("log")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.85])
+    parser.add_argument("--min-entries", type=int, default=50)
+    parser.add_argument("--save-dir", default=None)
+
+    main(parser.parse_args())
@@ -0,0 +1,279 @@
+"""
+Offline graph benchmark.
+
+Drives the agent graphs with recorded model responses instead of the
+Anthropic API, so graph overhead, agent state copies, and code execution
+throughput can be measured deterministically on a machine without network
+access.
+
+Record the responses once, by running the service or any benchmark with
+`REPLAY_MODE=record`; every model call is appended to `REPLAY_PATH`. This
+benchmark then forces `REPLAY_MODE=replay` and streams answers through
+`AgentService.stream`, exactly as the `/agent/stream` route does, in
+`--sessions` concurrent sessions of `--turns` questions each. Timing of the
+replayed model calls is controlled by the replay settings:
+
+    REPLAY_TIME_SCALE=1    recorded latency and token cadence
+    REPLAY_TIME_SCALE=0    no model time, so the stream time is graph,
+                           memory, and code execution overhead only
+    REPLAY_JITTER=0.3      log-normal latency noise, for tail latencies
+
+Memory is still loaded and saved, so the database and Redis must be
+reachable as configured for the service itself; both can run locally.
+
+Usage:
+    cd agent_service
+    REPLAY_TIME_SCALE=0 python benchmarks/offline_graph.py \\
+        --storage-uri local://data/sales.csv \\
+        --dataset-summary "Sales per store and day, 12 columns" \\
+        --sessions 8 --turns 6 \\
+        "What are the strongest predictors of sales?" \\
+        "Plot the monthly sales per store"
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from uuid import UUID, uuid4
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# Never call the API; the key is required by the settings but unused
+os.environ["REPLAY_MODE"] = "replay"
+os.environ.setdefault("ANTHROPIC_API_KEY", "offline")
+
+from core.db import db_manager
+from cache.memory import memory_cache_manager
+from agents.state import AgentState
+from agents.models.replay import replay_store
+from agents.nodes.memory.retrieval import MemoryRetrievalNode
+from services.agent import agent_service
+from services.execution import execution_service
+from services.summarization import summarization_service
+
+
+async def measure(
+    question: str, session_id: UUID, args: argparse.Namespace
+) -> Dict[str, float]:
+    """
+    Stream one answer and time it.
+
+    Args:
+        question: Question to answer.
+        session_id: Session the question is asked in.
+        args: Command line arguments.
+
+    Returns:
+        Dict[str, float]: Seconds to the first text chunk and to the end of
+        the stream, and the number of streamed events.
+    """
+    db = db_manager.session_factory()
+    first_token = None
+    events = 0
+    started = time.perf_counter()
+    try:
+        async for event in agent_service.stream(
+            question=question,
+            db=db,
+            user_id=args.user_id,
+            file_name=args.file_name,
+            session_id=session_id,
+            storage_uri=args.storage_uri,
+            dataset_summary=args.dataset_summary,
+        ):
+            events += 1
+            payload = json.loads(event.removeprefix("data: "))
+            if first_token is None and payload["type"] == "text" and payload["data"]:
+                first_token = time.perf_counter() - started
+    finally:
+        db.close()
+
+    total = time.perf_counter() - started
+    return {
+        "ttft": total if first_token is None else first_token,
+        "total": total,
+        "events": events,
+    }
+
+
+def measure_state_copies(
+    session_id: UUID, args: argparse.Namespace
+) -> Dict[str, float]:
+    """
+    Time the agent state copies LangGraph makes around every node.
+
+    The state of a finished session, including its stored variables, is
+    rebuilt from its fields, as LangGraph does before every node, and
+    shallow-copied.
+
+    Args:
+        session_id: Session whose memory populates the state.
+        args: Command line arguments.
+
+    Returns:
+        Dict[str, float]: Microseconds per validation and per copy.
+    """
+    db = db_manager.session_factory()
+    try:
+        state = AgentState(
+            question=args.questions[0],
+            db=db,
+            user_id=args.user_id,
+            session_id=session_id,
+            file_name=args.file_name,
+            storage_uri=args.storage_uri,
+            dataset_summary=args.dataset_summary,
+        )
+        MemoryRetrievalNode.get_variables(state)
+        fields = dict(state)
+
+        started = time.perf_counter()
+        for _ in range(args.copies):
+            AgentState.model_validate(fields)
+        validation = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(args.copies):
+            state.model_copy()
+        copy = time.perf_counter() - started
+    finally:
+        db.close()
+
+    return {
+        "validate_us": validation / args.copies * 1e6,
+        "copy_us": copy / args.copies * 1e6,
+    }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Return a percentile of the values, by the nearest rank.
+
+    Args:
+        values: Measured values.
+        fraction: Percentile as a fraction, e.g. 0.95.
+
+    Returns:
+        float: The percentile.
+    """
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def report(samples: List[Dict[str, float]], wall_time: float) -> None:
+    """
+    Print latency and throughput statistics of the streams.
+
+    Args:
+        samples: Timings of every stream.
+        wall_time: Seconds the streams took altogether.
+    """
+    for metric in ("ttft", "total"):
+        values = [sample[metric] for sample in samples]
+        print(
+            f"{metric:<6} "
+            f"median={statistics.median(values) * 1000:.1f}ms "
+            f"p95={percentile(values, 0.95) * 1000:.1f}ms "
+            f"mean={statistics.mean(values) * 1000:.1f}ms "
+            f"max={max(values) * 1000:.1f}ms"
+        )
+    events = sum(sample["events"] for sample in samples)
+    print(
+        f"throughput streams={len(samples) / wall_time:.2f}/s "
+        f"events={events / wall_time:.1f}/s"
+    )
+
+
+def delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the growth of the numeric counters between two snapshots.
+
+    Args:
+        before: Counters before the run.
+        after: Counters after the run.
+
+    Returns:
+        Dict[str, Any]: Difference of every numeric counter.
+    """
+    return {
+        key: value - before.get(key, 0)
+        for key, value in after.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    """
+    Run the benchmark and print its results.
+
+    Args:
+        args: Command line arguments.
+    """
+    samples: List[Dict[str, float]] = []
+    sessions = [uuid4() for _ in range(args.sessions)]
+
+    async def converse(session_id: UUID) -> None:
+        # Turns of one session follow each other, as with a real client
+        for turn in range(args.turns):
+            question = args.questions[turn % len(args.questions)]
+            samples.append(await measure(question, session_id, args))
+
+    memory_cache_manager.connect_client()
+    summarization_service.start()
+    try:
+        # Warm up connections, kernels, and imports
+        await measure(args.questions[0], uuid4(), args)
+
+        replay = replay_store.metrics()
+        execution = execution_service.metrics()["profiles"]["total"]
+
+        started = time.perf_counter()
+        await asyncio.gather(*(converse(session_id) for session_id in sessions))
+        wall_time = time.perf_counter() - started
+
+        replay = delta(replay, replay_store.metrics())
+        execution = delta(execution, execution_service.metrics()["profiles"]["total"])
+        copies = measure_state_copies(sessions[0], args)
+    finally:
+        summarization_service.shutdown()
+        memory_cache_manager.close_client()
+
+    print(
+        f"\n{len(samples)} streams in {args.sessions} concurrent sessions, "
+        f"{wall_time:.2f}s\n"
+    )
+    report(samples, wall_time)
+    print(
+        f"model      calls={replay['hits'] + replay['fallbacks']} "
+        f"exact={replay['hits']} fallback={replay['fallbacks']} "
+        f"missing={replay['misses']}"
+    )
+    print(
+        f"execution  runs={execution['executions']} cached={execution['cached']} "
+        f"throughput={execution['executions'] / wall_time:.2f}/s "
+        f"wall={execution['wall_time']:.2f}s cpu={execution['cpu_time']:.2f}s"
+    )
+    print(
+        f"state      validate={copies['validate_us']:.1f}us "
+        f"copy={copies['copy_us']:.1f}us"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--storage-uri", required=True)
+    parser.add_argument("--dataset-summary", required=True)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--file-name", default="benchmark.csv")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--copies", type=int, default=1000)
+    parser.add_argument("questions", nargs="+")
+
+    asyncio.run(main(parser.parse_args()))
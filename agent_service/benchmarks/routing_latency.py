@@ -0,0 +1,172 @@
+"""
+Routing latency benchmark.
+
+Compares the time to first token of the default routing chain (agent mode
+classification, task routing, task decomposition, and subtask
+classification) against fused routing, which takes the same decisions in a
+single model call.
+
+Both orchestrators are built in-process and driven through
+`AgentService.stream`, exactly as the `/agent/stream` route does. Every run
+uses a fresh session, so memory from earlier runs does not leak into the
+routing decisions, and the two pipelines alternate, so drifting model
+latency affects both alike.
+
+The benchmark calls the live model, and needs the database and Redis
+configured as for the service itself.
+
+Usage:
+    cd agent_service
+    python benchmarks/routing_latency.py \\
+        --storage-uri s3://bucket/data.csv \\
+        --dataset-summary "Sales per store and day, 12 columns" \\
+        --runs 5 \\
+        "What are the strongest predictors of sales?" \\
+        "Plot the monthly sales per store"
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from uuid import uuid4
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from core.db import db_manager
+from cache.memory import memory_cache_manager
+from agents.state import AgentState
+from agents.graphs.orchestrator import AgentsOrchestratorGraphBuilder
+from agents.nodes.agent_model_classification import (
+    AgentModeClassificationNodeRegistry,
+)
+from agents.nodes.fused_routing import FusedRoutingNodeRegistry
+from services.agent import AgentService
+from services.summarization import summarization_service
+
+
+async def measure(
+    service: AgentService, question: str, args: argparse.Namespace
+) -> Dict[str, float]:
+    """
+    Stream one answer and time it.
+
+    Args:
+        service: Agent service driving the orchestrator under test.
+        question: Question to answer.
+        args: Command line arguments.
+
+    Returns:
+        Dict[str, float]: Seconds to the first text chunk and to the end of
+        the stream.
+    """
+    db = db_manager.session_factory()
+    first_token = None
+    started = time.perf_counter()
+    try:
+        async for event in service.stream(
+            question=question,
+            db=db,
+            user_id=args.user_id,
+            file_name=args.file_name,
+            session_id=uuid4(),
+            storage_uri=args.storage_uri,
+            dataset_summary=args.dataset_summary,
+        ):
+            payload = json.loads(event.removeprefix("data: "))
+            if first_token is None and payload["type"] == "text" and payload["data"]:
+                first_token = time.perf_counter() - started
+    finally:
+        db.close()
+
+    total = time.perf_counter() - started
+    return {"ttft": total if first_token is None else first_token, "total": total}
+
+
+def report(name: str, samples: List[Dict[str, float]]) -> None:
+    """
+    Print the latency statistics of one routing pipeline.
+
+    Args:
+        name: Name of the pipeline.
+        samples: Timings of every run.
+    """
+    for metric in ("ttft", "total"):
+        values = [sample[metric] for sample in samples]
+        print(
+            f"{name:<8} {metric:<6} "
+            f"median={statistics.median(values):.2f}s "
+            f"mean={statistics.mean(values):.2f}s "
+            f"min={min(values):.2f}s max={max(values):.2f}s"
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    """
+    Run the benchmark and print the comparison.
+
+    Args:
+        args: Command line arguments.
+    """
+    services = {
+        "chained": AgentService(
+            agents_orchestrator=AgentsOrchestratorGraphBuilder(
+                state=AgentState,
+                agent_mode_classification_node=AgentModeClassificationNodeRegistry.UNIFIED,
+            ).build()
+        ),
+        "fused": AgentService(
+            agents_orchestrator=AgentsOrchestratorGraphBuilder(
+                state=AgentState,
+                agent_mode_classification_node=AgentModeClassificationNodeRegistry.UNIFIED,
+                fused_routing_node=FusedRoutingNodeRegistry.UNIFIED,
+            ).build()
+        ),
+    }
+    samples: Dict[str, List[Dict[str, float]]] = {name: [] for name in services}
+
+    memory_cache_manager.connect_client()
+    summarization_service.start()
+    try:
+        # Warm up connections and prompt caches of both pipelines
+        for service in services.values():
+            await measure(service, args.questions[0], args)
+
+        for run in range(args.runs):
+            # Alternate the order, so both pipelines see the same conditions
+            order = list(services) if run % 2 == 0 else list(reversed(services))
+            for question in args.questions:
+                for name in order:
+                    sample = await measure(services[name], question, args)
+                    samples[name].append(sample)
+                    print(
+                        f"run={run} {name:<8} ttft={sample['ttft']:.2f}s "
+                        f"total={sample['total']:.2f}s"
+                    )
+    finally:
+        summarization_service.shutdown()
+        memory_cache_manager.close_client()
+
+    print()
+    for name, values in samples.items():
+        report(name, values)
+
+    chained = statistics.median(sample["ttft"] for sample in samples["chained"])
+    fused = statistics.median(sample["ttft"] for sample in samples["fused"])
+    print(f"\nMedian time to first token saved by fused routing: {chained - fused:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--storage-uri", required=True)
+    parser.add_argument("--dataset-summary", required=True)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--file-name", default="benchmark.csv")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("questions", nargs="+")
+
+    asyncio.run(main(parser.parse_args()))
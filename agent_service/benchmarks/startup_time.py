@@ -0,0 +1,146 @@
+"""
+Startup time benchmark.
+
+Measures how long a fresh worker process takes to become ready to serve,
+against how long it takes to build everything the first agent request needs.
+
+Every run starts a new interpreter, as a respawned worker does, and times:
+
+    import    importing the API routers, as `main.py` does before serving;
+              no node is built and no graph compiled at this point
+    warm_up   building the orchestrator and compiling the agent graphs it
+              routes to, as the startup warm-up does
+    eager     import and warm-up together: the time to readiness of a
+              worker building every graph before serving, as
+              `AGENT_WARMUP=blocking` does
+
+With `--modules`, the slowest modules of one import are listed from
+`python -X importtime`, to find what the ready time is still spent on.
+
+The benchmark calls no model and connects to no database or Redis, but
+needs the service configured as for the service itself.
+
+Usage:
+    cd agent_service
+    python benchmarks/startup_time.py --runs 10 --modules 15
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Program timing one worker startup in a fresh interpreter
+STARTUP = """
+import sys, json, time
+sys.path.insert(0, {src!r})
+started = time.perf_counter()
+import api.v1.router
+imported = time.perf_counter()
+from services.agent import agent_service
+agent_service.warm_up()
+warm = time.perf_counter()
+print(json.dumps({{"import": imported - started, "warm_up": warm - imported}}))
+"""
+
+
+def measure() -> Dict[str, float]:
+    """
+    Time the startup of one fresh worker process.
+
+    Returns:
+        Dict[str, float]: Seconds to import the service, to warm it up, and
+        both together.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP.format(src=str(SRC))],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "AGENT_WARMUP": "off"},
+    ).stdout
+    sample = json.loads(output.strip().splitlines()[-1])
+    sample["eager"] = sample["import"] + sample["warm_up"]
+    return sample
+
+
+def slowest_modules(count: int) -> List[Tuple[float, str]]:
+    """
+    Import the service once with `-X importtime` and return its slowest modules.
+
+    Args:
+        count: Number of modules to return.
+
+    Returns:
+        List[Tuple[float, str]]: Cumulative import seconds and module name,
+        slowest first.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.v1.router"],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=SRC,
+    ).stderr
+
+    modules = []
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        modules.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def main(args: argparse.Namespace) -> None:
+    """
+    Run the benchmark and print the comparison.
+
+    Args:
+        args: Command line arguments.
+    """
+    # Populate the bytecode caches, so the runs do not time compilation
+    measure()
+
+    samples = []
+    for run in range(args.runs):
+        sample = measure()
+        samples.append(sample)
+        print(
+            f"run={run} import={sample['import']:.2f}s "
+            f"warm_up={sample['warm_up']:.2f}s eager={sample['eager']:.2f}s"
+        )
+
+    print()
+    for metric in ("import", "warm_up", "eager"):
+        values = [sample[metric] for sample in samples]
+        print(
+            f"{metric:<8} median={statistics.median(values):.2f}s "
+            f"mean={statistics.mean(values):.2f}s "
+            f"min={min(values):.2f}s max={max(values):.2f}s"
+        )
+
+    ready = statistics.median(sample["import"] for sample in samples)
+    eager = statistics.median(sample["eager"] for sample in samples)
+    print(f"\nLazy worker ready in {ready / eager:.0%} of the eager startup time")
+
+    if args.modules:
+        print("\nSlowest modules of the import:")
+        for seconds, name in slowest_modules(args.modules):
+            print(f"{seconds:8.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modules", type=int, default=0)
+
+    main(parser.parse_args())
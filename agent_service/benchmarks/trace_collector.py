@@ -0,0 +1,212 @@
+"""
+Trace collector stand-in.
+
+Receives the turn traces the service posts as OTLP/HTTP JSON when
+`TRACING_OTLP_ENDPOINT` points at it, and prints the span tree of every
+turn as it arrives:
+
+    turn ok 8412.3ms ttft=1320.4ms calls=7 tokens=18234/912
+      agent_mode_classifier ok 402.1ms calls=1 tokens=1843/3
+        claude-3-5-haiku-20241022 ok 398.7ms ttft=301.2ms tokens=1843/3
+      technical_agent ok 7990.4ms calls=6 tokens=16391/909 executor=1.2s
+        ...
+
+On exit (Ctrl+C), the duration of every node across the received turns is
+summarized, slowest first. The same summary is printed for a trace file
+written by the service with `--file`, without starting a server.
+
+The collector accepts any OTLP/HTTP JSON export, so it also stands in for a
+real collector when checking the export of other services.
+
+Usage:
+    cd agent_service
+    TRACING_ENABLED=true TRACING_OTLP_ENDPOINT=http://localhost:4318 python main.py
+    python benchmarks/trace_collector.py --port 4318
+    python benchmarks/trace_collector.py --file traces/traces.jsonl
+"""
+
+import json
+import argparse
+import statistics
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+# Durations in milliseconds of every span name, across the received turns
+DURATIONS: Dict[str, List[float]] = defaultdict(list)
+
+
+def otlp_spans(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Convert the spans of an OTLP/HTTP JSON export into trace file spans.
+
+    Args:
+        payload: Body of a `POST /v1/traces` request.
+
+    Returns:
+        List[Dict[str, Any]]: Spans with the fields of the trace file.
+    """
+    spans = []
+    for resource_spans in payload.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                attributes = {
+                    attribute["key"]: next(iter(attribute["value"].values()), None)
+                    for attribute in span.get("attributes", [])
+                }
+                start = int(span["startTimeUnixNano"])
+                end = int(span["endTimeUnixNano"])
+                spans.append(
+                    {
+                        "span_id": span["spanId"],
+                        "parent_id": span.get("parentSpanId") or None,
+                        "name": span["name"],
+                        "kind": attributes.pop("agent.kind", "node"),
+                        "status": span.get("status", {}).get("message", ""),
+                        "duration_ms": (end - start) / 1e6,
+                        "attributes": attributes,
+                    }
+                )
+    return spans
+
+
+def describe(span: Dict[str, Any]) -> str:
+    """
+    Describe a span on one line.
+
+    Args:
+        span: Span with the fields of the trace file.
+
+    Returns:
+        str: Name, status, duration, and the timing and token attributes.
+    """
+    attributes = span["attributes"]
+    parts = [span["name"], span["status"], f"{span['duration_ms']:.1f}ms"]
+    if attributes.get("ttft_ms") is not None:
+        parts.append(f"ttft={float(attributes['ttft_ms']):.1f}ms")
+    if span["kind"] != "llm" and attributes.get("model_calls"):
+        parts.append(f"calls={attributes['model_calls']}")
+    if attributes.get("input_tokens") or attributes.get("output_tokens"):
+        parts.append(
+            f"tokens={attributes.get('input_tokens', 0)}"
+            f"/{attributes.get('output_tokens', 0)}"
+        )
+    if attributes.get("executor_wall_time"):
+        parts.append(f"executor={float(attributes['executor_wall_time']):.1f}s")
+    return " ".join(str(part) for part in parts)
+
+
+def record(spans: List[Dict[str, Any]], verbose: bool) -> None:
+    """
+    Record the node durations of a turn, and print its span tree.
+
+    Args:
+        spans: Spans of the turn.
+        verbose: Whether to print the span tree.
+    """
+    children = defaultdict(list)
+    for span in spans:
+        children[span["parent_id"]].append(span)
+        if span["kind"] != "llm":
+            DURATIONS[span["name"]].append(span["duration_ms"])
+
+    def show(span: Dict[str, Any], depth: int) -> None:
+        print("  " * depth + describe(span))
+        for child in children[span["span_id"]]:
+            show(child, depth + 1)
+
+    if verbose:
+        ids = {span["span_id"] for span in spans}
+        for root in (span for span in spans if span["parent_id"] not in ids):
+            show(root, 0)
+        print()
+
+
+def summarize() -> None:
+    """
+    Print the duration of every node across the recorded turns, slowest first.
+    """
+    print(f"{'span':<36} {'count':>6} {'median':>10} {'p95':>10} {'total':>10}")
+    for name, values in sorted(
+        DURATIONS.items(), key=lambda item: sum(item[1]), reverse=True
+    ):
+        values = sorted(values)
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        print(
+            f"{name:<36} {len(values):>6} {statistics.median(values):>8.1f}ms "
+            f"{p95:>8.1f}ms {sum(values) / 1000:>9.1f}s"
+        )
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    """
+    Request handler accepting OTLP/HTTP JSON trace exports.
+    """
+
+    def do_POST(self) -> None:
+        """
+        Record the spans of an export and acknowledge it.
+        """
+        if self.path != "/v1/traces":
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except ValueError:
+            self.send_error(400, "Body is not OTLP/HTTP JSON")
+            return
+
+        record(otlp_spans(payload), verbose=not self.server.quiet)
+
+        # Empty ExportTraceServiceResponse
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """
+        Silence the request log, the span trees are printed instead.
+        """
+
+
+def main(args: argparse.Namespace) -> None:
+    """
+    Summarize a trace file, or receive traces until interrupted.
+
+    Args:
+        args: Command line arguments.
+    """
+    if args.file:
+        with open(args.file) as file:
+            for line in file:
+                if line.strip():
+                    record(json.loads(line)["spans"], verbose=not args.quiet)
+        summarize()
+        return
+
+    server = ThreadingHTTPServer((args.host, args.port), CollectorHandler)
+    server.quiet = args.quiet
+    print(f"Receiving traces on http://{args.host}:{args.port}/v1/traces\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    summarize()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--file", default=None)
+    parser.add_argument("--quiet", action="store_true")
+
+    main(parser.parse_args())
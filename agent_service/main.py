@@ -2,11 +2,17 @@
 Main application entry point for the FastAPI agent memory service.
 
 This module initializes the FastAPI application, sets up the database
-tables, manages the memory cache lifecycle, and mounts API routers.
+tables, manages the memory cache and code execution lifecycles, and mounts
+API routers.
 
 Features:
     - Database initialization using SQLAlchemy `Base.metadata.create_all`.
-    - Lifecycle management for the memory cache client.
+    - Lifecycle management for the memory, response cache, and turn
+      checkpoint clients.
+    - Lifecycle management for the code execution backend.
+    - Lifecycle management for the background summarization threads.
+    - Startup warm-up of the agent graphs, built on first use otherwise.
+    - Lifecycle management for the turn trace export thread.
     - Integration of versioned API router (`api_router`).
     - Runs the app using Uvicorn when executed as the main module.
 """
@@ -19,7 +25,13 @@ from fastapi import FastAPI
 from api.v1.router import api_router
 from core.db import db_manager
 
+from cache.checkpoint import checkpoint_saver
 from cache.memory import memory_cache_manager
+from cache.response import response_cache_manager
+from agents.tracing import trace_exporter
+from services.agent import agent_service
+from services.execution import execution_service
+from services.summarization import summarization_service
 from models.base import Base
 
 # Create all database tables if they do not exist
@@ -32,7 +44,9 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for FastAPI app.
 
     Handles setup and teardown for application-level resources, such
-    as connecting and disconnecting the memory cache client.
+    as connecting and disconnecting the memory cache client, starting
+    and stopping the code execution backend and the summarization threads,
+    and warming up the agent graphs.
 
     Args:
         app (FastAPI): The FastAPI application instance.
@@ -43,9 +57,38 @@ async def lifespan(app: FastAPI):
     # Connect the memory cache client when app starts
     memory_cache_manager.connect_client()
 
+    # Connect the Redis tier of the response cache, if enabled
+    response_cache_manager.connect_client()
+
+    # Connect the turn checkpoint store, if enabled
+    checkpoint_saver.connect_client()
+
+    # Start the code execution backend (worker pool, if configured)
+    execution_service.start()
+
+    # Start the background summarization threads
+    summarization_service.start()
+
+    # Start exporting turn traces in the background
+    trace_exporter.start()
+
+    # Build the agent graphs ahead of the first request, as configured
+    agent_service.start()
+
     yield
 
-    # Close the memory cache client when app shuts down
+    # Export the traces of the last turns
+    trace_exporter.shutdown()
+
+    # Write back the pending summaries before the cache clients close
+    summarization_service.shutdown()
+
+    # Stop the code execution backend when app shuts down
+    execution_service.shutdown()
+
+    # Close the cache clients when app shuts down
+    checkpoint_saver.close_client()
+    response_cache_manager.close_client()
     memory_cache_manager.close_client()
 
 
@@ -4,11 +4,17 @@ which construct and configure the execution graph for an AI agent workflow.
 
 Core responsibilities:
     - Build a state-driven workflow graph for task routing, decomposition,
-      subtask classification, action planning, code generation, and response.
+      subtask classification, action planning, code generation, validation,
+      and response.
     - Add nodes corresponding to individual agent operations.
     - Define edges and conditional edges to dictate execution flow.
     - Provide preconfigured agent graph instances for different modes:
         TECHNICAL_MODE and QUICK_ANALYSIS_MODE.
+    - Optionally run independent subtasks concurrently: the pipeline of a
+      single subtask is then compiled as a graph of its own, which the
+      subtask scheduler runs for every subtask.
+    - Optionally classify the first subtask and draft its action plan while
+      the task decomposition is still streaming.
 """
 
 from typing import Any, Type
@@ -64,9 +70,14 @@ from agents.nodes.fallback_handling import (
 )
 from agents.nodes.visualization.display import VisualizationDisplayNode
 from agents.nodes.code.execution import CodeExecutionNode
+from agents.nodes.code.validation import CodeValidationNode
 from agents.nodes.code.debagging import CodeDebuggingNode, CodeDebaggingNodeRegistry
 from agents.nodes.memory.save import MemorySaveNode
 from agents.nodes.conditional_routing import ConditionalRoutingNode
+from agents.nodes.task.scheduling import SubtaskSchedulingNode
+from agents.nodes.task.speculation import SpeculativeDecompositionNode
+from core.config import settings
+from core.lazy import LazyAttribute
 
 
 class AgentGraphBuilder(BaseModel):
@@ -86,6 +97,17 @@ class AgentGraphBuilder(BaseModel):
         visualization_action_planing_node (VisualizationActionPlaningNode): Node for planning visualization actions.
         visualization_code_generation_node (VisualizationCodeGenerationNode): Node for generating visualization code.
         code_debagging_node (CodeDebuggingNode): Node for debugging code.
+        fused_routing (bool): Whether the graph runs after `FusedRoutingNode`,
+            which already decided the task flow, subtasks, and subtask flows.
+            The task router and decomposer are then left out of the graph.
+        parallel_subtasks (bool): Whether the subtasks run through
+            `SubtaskSchedulingNode`, concurrently where they do not depend on
+            each other, instead of one after another in this graph.
+        subtask_graph (bool): Whether only the pipeline of a single subtask is
+            built, from its classification to its answer.
+        speculative_planning (bool): Whether the task decomposer classifies
+            the first subtask and drafts its action plan while the
+            decomposition still streams, through `SpeculativeDecompositionNode`.
         _graph (StateGraph): Private attribute storing the execution graph instance.
     """
 
@@ -105,6 +127,10 @@ class AgentGraphBuilder(BaseModel):
     visualization_code_generation_node: VisualizationCodeGenerationNode
     code_debagging_node: CodeDebuggingNode
     fallback_handling_node: FallbackHandlingNode
+    fused_routing: bool = False
+    parallel_subtasks: bool = False
+    subtask_graph: bool = False
+    speculative_planning: bool = False
 
     _graph: StateGraph = PrivateAttr()
 
@@ -122,43 +148,95 @@ class AgentGraphBuilder(BaseModel):
         Add all agent workflow nodes to the state graph.
 
         This includes routing, decomposition, classification, action planning,
-        code generation, execution, debugging, reporting, visualization, and memory nodes.
+        code generation, validation, execution, debugging, reporting, visualization, and memory nodes.
+        Every node is registered through its `ainvoke` variant, so model calls,
+        code executions, and memory I/O do not hold a thread while they wait.
         """
-        self._graph.add_node("task_router", self.task_routing_node.invoke)
-        self._graph.add_node("task_decomposer", self.task_decomposition_node.invoke)
-        self._graph.add_node(
-            "task_decomposition_summarizer",
-            self.task_decomposition_summarization_node.invoke,
-        )
+        if not self.subtask_graph:
+            if not self.fused_routing:
+                self._graph.add_node("task_router", self.task_routing_node.ainvoke)
+                self._graph.add_node(
+                    "task_decomposer", self._decomposition_node().ainvoke
+                )
+            self._graph.add_node(
+                "task_decomposition_summarizer",
+                self.task_decomposition_summarization_node.ainvoke,
+            )
+            self._graph.add_node(
+                "context_advisor", self.context_advising_node.ainvoke
+            )
+            self._graph.add_node("memory_saver", MemorySaveNode.ainvoke)
+
+            # Subtasks run in subtask graphs of their own
+            if self.parallel_subtasks:
+                self._graph.add_node(
+                    "subtask_scheduler",
+                    SubtaskSchedulingNode(
+                        graph=self._build_subtask_graph(),
+                        max_concurrency=settings.agent.AGENT_MAX_PARALLEL_SUBTASKS,
+                    ).ainvoke,
+                )
+                return
+
         self._graph.add_node(
-            "subtask_classifier", self.subtask_classification_node.invoke
+            "subtask_classifier", self.subtask_classification_node.ainvoke
         )
-        self._graph.add_node("context_advisor", self.context_advising_node.invoke)
 
         self._graph.add_node(
-            "analysis_action_planner", self.analysis_action_planing_node.invoke
+            "analysis_action_planner", self.analysis_action_planing_node.ainvoke
         )
         self._graph.add_node(
             "visualization_action_planner",
-            self.visualization_action_planing_node.invoke,
+            self.visualization_action_planing_node.ainvoke,
         )
 
         self._graph.add_node(
-            "analysis_code_generator", self.analysis_code_generation_node.invoke
+            "analysis_code_generator", self.analysis_code_generation_node.ainvoke
         )
         self._graph.add_node(
             "visualization_code_generator",
-            self.visualization_code_generation_node.invoke,
+            self.visualization_code_generation_node.ainvoke,
         )
-        self._graph.add_node("code_executor", CodeExecutionNode.invoke)
-        self._graph.add_node("code_debugger", self.code_debagging_node.invoke)
+        self._graph.add_node("code_validator", CodeValidationNode.ainvoke)
+        self._graph.add_node("code_executor", CodeExecutionNode.ainvoke)
+        self._graph.add_node("code_debugger", self.code_debagging_node.ainvoke)
         self._graph.add_node(
-            "analysis_report_generator", self.analysis_report_generation_node.invoke
+            "analysis_report_generator", self.analysis_report_generation_node.ainvoke
+        )
+        self._graph.add_node("visualization_display", VisualizationDisplayNode.ainvoke)
+        self._graph.add_node("direct_responder", self.direct_responding_node.ainvoke)
+        self._graph.add_node("fallback_handler", self.fallback_handling_node.ainvoke)
+
+    def _decomposition_node(self):
+        """
+        Return the node decomposing the task.
+
+        Returns:
+            Any: The task decomposition node, wrapped to start on the first
+            subtask while it streams when speculative planning is enabled.
+        """
+        if not self.speculative_planning:
+            return self.task_decomposition_node
+        return SpeculativeDecompositionNode(
+            decomposition_node=self.task_decomposition_node,
+            classification_node=self.subtask_classification_node,
+            planning_nodes={
+                "ANALYSIS": self.analysis_action_planing_node,
+                "VISUALIZATION": self.visualization_action_planing_node,
+            },
         )
-        self._graph.add_node("visualization_display", VisualizationDisplayNode.invoke)
-        self._graph.add_node("direct_responder", self.direct_responding_node.invoke)
-        self._graph.add_node("fallback_handler", self.fallback_handling_node.invoke)
-        self._graph.add_node("memory_saver", MemorySaveNode.invoke)
+
+    def _build_subtask_graph(self):
+        """
+        Build the graph running a single subtask with the nodes of this graph.
+
+        Returns:
+            StateGraph: The compiled subtask graph.
+        """
+        nodes = {name: getattr(self, name) for name in type(self).model_fields}
+        return type(self)(
+            **{**nodes, "parallel_subtasks": False, "subtask_graph": True}
+        ).build()
 
     def _add_edges(self):
         """
@@ -166,19 +244,50 @@ class AgentGraphBuilder(BaseModel):
 
         These edges are unconditional connections between nodes.
         """
-        self._graph.add_edge(START, "task_router")
-        self._graph.add_edge("context_advisor", "memory_saver")
-        self._graph.add_edge("task_decomposer", "task_decomposition_summarizer")
-        self._graph.add_edge("task_decomposition_summarizer", "subtask_classifier")
+        if self.subtask_graph:
+            self._graph.add_edge(START, "subtask_classifier")
+        else:
+            if not self.fused_routing:
+                self._graph.add_edge(START, "task_router")
+                self._graph.add_edge(
+                    "task_decomposer", "task_decomposition_summarizer"
+                )
+            self._graph.add_edge("context_advisor", "memory_saver")
+            self._graph.add_edge("memory_saver", END)
+            if self.parallel_subtasks:
+                self._graph.add_edge(
+                    "task_decomposition_summarizer", "subtask_scheduler"
+                )
+                self._graph.add_edge("subtask_scheduler", "memory_saver")
+                return
+            self._graph.add_edge("task_decomposition_summarizer", "subtask_classifier")
+
         self._graph.add_edge("analysis_action_planner", "analysis_code_generator")
         self._graph.add_edge(
             "visualization_action_planner", "visualization_code_generator"
         )
-        self._graph.add_edge("analysis_code_generator", "code_executor")
-        self._graph.add_edge("visualization_code_generator", "code_executor")
-        self._graph.add_edge("code_debugger", "code_executor")
-        self._graph.add_edge("fallback_handler", "memory_saver")
-        self._graph.add_edge("memory_saver", END)
+        self._graph.add_edge("analysis_code_generator", "code_validator")
+        self._graph.add_edge("visualization_code_generator", "code_validator")
+        self._graph.add_edge("code_debugger", "code_validator")
+        self._graph.add_edge("fallback_handler", self._finish())
+
+    def _next_subtask(self) -> str:
+        """
+        Return the node following a subtask when subtasks remain.
+
+        Returns:
+            str: The end of a subtask graph, "subtask_classifier" otherwise.
+        """
+        return END if self.subtask_graph else "subtask_classifier"
+
+    def _finish(self) -> str:
+        """
+        Return the node following the last subtask.
+
+        Returns:
+            str: The end of a subtask graph, "memory_saver" otherwise.
+        """
+        return END if self.subtask_graph else "memory_saver"
 
     def _add_conditional_edges(self):
         """
@@ -186,14 +295,32 @@ class AgentGraphBuilder(BaseModel):
 
         Conditional edges allow the workflow to branch depending on the agent state.
         """
-        self._graph.add_conditional_edges(
-            "task_router",
-            ConditionalRoutingNode.routing_from_task_router,
-            {
-                "task_decomposer": "task_decomposer",
-                "context_advisor": "context_advisor",
-            },
-        )
+        if self.subtask_graph:
+            # A subtask graph starts from the subtask classifier
+            ...
+        elif self.fused_routing:
+            # Subtasks are already decomposed, so present them right away
+            self._graph.add_conditional_edges(
+                START,
+                ConditionalRoutingNode.routing_from_task_router,
+                {
+                    "task_decomposer": "task_decomposition_summarizer",
+                    "context_advisor": "context_advisor",
+                },
+            )
+        else:
+            self._graph.add_conditional_edges(
+                "task_router",
+                ConditionalRoutingNode.routing_from_task_router,
+                {
+                    "task_decomposer": "task_decomposer",
+                    "context_advisor": "context_advisor",
+                },
+            )
+        # Subtasks are routed within the subtask graph
+        if self.parallel_subtasks:
+            return
+
         self._graph.add_conditional_edges(
             "subtask_classifier",
             ConditionalRoutingNode.routing_from_subtask_classifier,
@@ -203,6 +330,15 @@ class AgentGraphBuilder(BaseModel):
                 "direct_responder": "direct_responder",
             },
         )
+        self._graph.add_conditional_edges(
+            "code_validator",
+            ConditionalRoutingNode.routing_from_code_validator,
+            {
+                "code_executor": "code_executor",
+                "code_debugger": "code_debugger",
+                "fallback_handler": "fallback_handler",
+            },
+        )
         self._graph.add_conditional_edges(
             "code_executor",
             ConditionalRoutingNode.routing_from_code_executor,
@@ -217,24 +353,24 @@ class AgentGraphBuilder(BaseModel):
             "analysis_report_generator",
             ConditionalRoutingNode.routing_from_analysis_report_generator,
             {
-                "subtask_classifier": "subtask_classifier",
-                "memory_saver": "memory_saver",
+                "subtask_classifier": self._next_subtask(),
+                "memory_saver": self._finish(),
             },
         )
         self._graph.add_conditional_edges(
             "visualization_display",
             ConditionalRoutingNode.routing_from_visualization_display,
             {
-                "subtask_classifier": "subtask_classifier",
-                "memory_saver": "memory_saver",
+                "subtask_classifier": self._next_subtask(),
+                "memory_saver": self._finish(),
             },
         )
         self._graph.add_conditional_edges(
             "direct_responder",
             ConditionalRoutingNode.routing_from_direct_responder,
             {
-                "subtask_classifier": "subtask_classifier",
-                "memory_saver": "memory_saver",
+                "subtask_classifier": self._next_subtask(),
+                "memory_saver": self._finish(),
             },
         )
 
@@ -250,6 +386,10 @@ class AgentGraphBuilder(BaseModel):
         self._add_edges()
         self._add_conditional_edges()
 
+        # The subtask graph runs several times within the scheduler node, which
+        # is checkpointed as a whole; the mode graphs checkpoint as subgraphs
+        if self.subtask_graph:
+            return self._graph.compile(checkpointer=False)
         return self._graph.compile()
 
 
@@ -257,49 +397,107 @@ class AgentGraphRegistry:
     """
     Registry of preconfigured `AgentGraphBuilder` instances for different modes.
 
+    Every graph, and the nodes it runs, is built and compiled on first access.
+
     Attributes:
         TECHNICAL_MODE (AgentGraphBuilder): Fully detailed technical workflow.
         QUICK_ANALYSIS_MODE (AgentGraphBuilder): Optimized workflow for fast analysis.
+        FUSED_TECHNICAL_MODE (AgentGraphBuilder): Technical workflow for fused routing.
+        FUSED_QUICK_ANALYSIS_MODE (AgentGraphBuilder): Quick analysis workflow for
+            fused routing.
     """
 
     # TECHNICAL_MODE configuration:
     # Fully-featured agent workflow for in-depth, technical execution.
     # Includes all nodes optimized for detailed task decomposition, analysis,
     # visualization, code generation, debugging, and context-aware advisory.
-    TECHNICAL_MODE: Any = AgentGraphBuilder(
-        state=AgentState,
-        task_routing_node=TaskRoutingNodeRegistry.UNIFIED,
-        task_decomposition_node=TaskDecompositionNodeRegistry.TECHNICAL_MODE,
-        task_decomposition_summarization_node=TaskDecompositionSummarizationNodeRegistry.TECHNICAL_MODE,
-        subtask_classification_node=SubtaskClassificationNodeRegistry.UNIFIED,
-        direct_responding_node=DirectRespondingNodeRegistry.TECHNICAL_MODE,
-        context_advising_node=ContextAdvisingNodeRegistry.TECHNICAL_MODE,
-        analysis_action_planing_node=AnalysisActionPlaningNodeRegistry.TECHNICAL_MODE,
-        analysis_code_generation_node=AnalysisCodeGenerationNodeRegistry.TECHNICAL_MODE,
-        analysis_report_generation_node=AnalysisReportGenerationNodeRegistry.TECHNICAL_MODE,
-        visualization_action_planing_node=VisualizationActionPlaningNodeRegistry.TECHNICAL_MODE,
-        visualization_code_generation_node=VisualizationCodeGenerationNodeRegistry.TECHNICAL_MODE,
-        code_debagging_node=CodeDebaggingNodeRegistry.UNIFIED,
-        fallback_handling_node=FallbackHandlingNodeRegistry.UNIFIED,
-    ).build()
+    TECHNICAL_MODE: Any = LazyAttribute(
+        lambda: AgentGraphBuilder(
+            state=AgentState,
+            task_routing_node=TaskRoutingNodeRegistry.UNIFIED,
+            task_decomposition_node=TaskDecompositionNodeRegistry.TECHNICAL_MODE,
+            task_decomposition_summarization_node=TaskDecompositionSummarizationNodeRegistry.TECHNICAL_MODE,
+            subtask_classification_node=SubtaskClassificationNodeRegistry.UNIFIED,
+            direct_responding_node=DirectRespondingNodeRegistry.TECHNICAL_MODE,
+            context_advising_node=ContextAdvisingNodeRegistry.TECHNICAL_MODE,
+            analysis_action_planing_node=AnalysisActionPlaningNodeRegistry.TECHNICAL_MODE,
+            analysis_code_generation_node=AnalysisCodeGenerationNodeRegistry.TECHNICAL_MODE,
+            analysis_report_generation_node=AnalysisReportGenerationNodeRegistry.TECHNICAL_MODE,
+            visualization_action_planing_node=VisualizationActionPlaningNodeRegistry.TECHNICAL_MODE,
+            visualization_code_generation_node=VisualizationCodeGenerationNodeRegistry.TECHNICAL_MODE,
+            code_debagging_node=CodeDebaggingNodeRegistry.UNIFIED,
+            fallback_handling_node=FallbackHandlingNodeRegistry.UNIFIED,
+            parallel_subtasks=settings.agent.AGENT_PARALLEL_SUBTASKS,
+            speculative_planning=settings.agent.AGENT_SPECULATIVE_PLANNING,
+        ).build()
+    )
 
     # QUICK_ANALYSIS_MODE configuration:
     # Lightweight agent workflow optimized for fast analysis and quick results.
     # Uses simpler, faster execution paths, with fewer steps in decomposition
     # and code generation, while still supporting basic reporting and visualization.
-    QUICK_ANALYSIS_MODE: Any = AgentGraphBuilder(
-        state=AgentState,
-        task_routing_node=TaskRoutingNodeRegistry.UNIFIED,
-        task_decomposition_node=TaskDecompositionNodeRegistry.QUICK_ANALYSIS_MODE,
-        task_decomposition_summarization_node=TaskDecompositionSummarizationNodeRegistry.QUICK_ANALYSIS_MODE,
-        subtask_classification_node=SubtaskClassificationNodeRegistry.UNIFIED,
-        direct_responding_node=DirectRespondingNodeRegistry.QUICK_ANALYSIS_MODE,
-        context_advising_node=ContextAdvisingNodeRegistry.QUICK_ANALYSIS_MODE,
-        analysis_action_planing_node=AnalysisActionPlaningNodeRegistry.QUICK_ANALYSIS_MODE,
-        analysis_code_generation_node=AnalysisCodeGenerationNodeRegistry.QUICK_ANALYSIS_MODE,
-        analysis_report_generation_node=AnalysisReportGenerationNodeRegistry.QUICK_ANALYSIS_MODE,
-        visualization_action_planing_node=VisualizationActionPlaningNodeRegistry.QUICK_VISUALIZATION_MODE,
-        visualization_code_generation_node=VisualizationCodeGenerationNodeRegistry.QUICK_VISUALIZATION_MODE,
-        code_debagging_node=CodeDebaggingNodeRegistry.UNIFIED,
-        fallback_handling_node=FallbackHandlingNodeRegistry.UNIFIED,
-    ).build()
+    QUICK_ANALYSIS_MODE: Any = LazyAttribute(
+        lambda: AgentGraphBuilder(
+            state=AgentState,
+            task_routing_node=TaskRoutingNodeRegistry.UNIFIED,
+            task_decomposition_node=TaskDecompositionNodeRegistry.QUICK_ANALYSIS_MODE,
+            task_decomposition_summarization_node=TaskDecompositionSummarizationNodeRegistry.QUICK_ANALYSIS_MODE,
+            subtask_classification_node=SubtaskClassificationNodeRegistry.UNIFIED,
+            direct_responding_node=DirectRespondingNodeRegistry.QUICK_ANALYSIS_MODE,
+            context_advising_node=ContextAdvisingNodeRegistry.QUICK_ANALYSIS_MODE,
+            analysis_action_planing_node=AnalysisActionPlaningNodeRegistry.QUICK_ANALYSIS_MODE,
+            analysis_code_generation_node=AnalysisCodeGenerationNodeRegistry.QUICK_ANALYSIS_MODE,
+            analysis_report_generation_node=AnalysisReportGenerationNodeRegistry.QUICK_ANALYSIS_MODE,
+            visualization_action_planing_node=VisualizationActionPlaningNodeRegistry.QUICK_VISUALIZATION_MODE,
+            visualization_code_generation_node=VisualizationCodeGenerationNodeRegistry.QUICK_VISUALIZATION_MODE,
+            code_debagging_node=CodeDebaggingNodeRegistry.UNIFIED,
+            fallback_handling_node=FallbackHandlingNodeRegistry.UNIFIED,
+            parallel_subtasks=settings.agent.AGENT_PARALLEL_SUBTASKS,
+            speculative_planning=settings.agent.AGENT_SPECULATIVE_PLANNING,
+        ).build()
+    )
+
+    # FUSED_TECHNICAL_MODE / FUSED_QUICK_ANALYSIS_MODE configuration:
+    # The same workflows, run after `FusedRoutingNode`: they start from the
+    # task flow and subtasks it decided, without routing or decomposition.
+    FUSED_TECHNICAL_MODE: Any = LazyAttribute(
+        lambda: AgentGraphBuilder(
+            state=AgentState,
+            task_routing_node=TaskRoutingNodeRegistry.UNIFIED,
+            task_decomposition_node=TaskDecompositionNodeRegistry.TECHNICAL_MODE,
+            task_decomposition_summarization_node=TaskDecompositionSummarizationNodeRegistry.TECHNICAL_MODE,
+            subtask_classification_node=SubtaskClassificationNodeRegistry.UNIFIED,
+            direct_responding_node=DirectRespondingNodeRegistry.TECHNICAL_MODE,
+            context_advising_node=ContextAdvisingNodeRegistry.TECHNICAL_MODE,
+            analysis_action_planing_node=AnalysisActionPlaningNodeRegistry.TECHNICAL_MODE,
+            analysis_code_generation_node=AnalysisCodeGenerationNodeRegistry.TECHNICAL_MODE,
+            analysis_report_generation_node=AnalysisReportGenerationNodeRegistry.TECHNICAL_MODE,
+            visualization_action_planing_node=VisualizationActionPlaningNodeRegistry.TECHNICAL_MODE,
+            visualization_code_generation_node=VisualizationCodeGenerationNodeRegistry.TECHNICAL_MODE,
+            code_debagging_node=CodeDebaggingNodeRegistry.UNIFIED,
+            fallback_handling_node=FallbackHandlingNodeRegistry.UNIFIED,
+            fused_routing=True,
+            parallel_subtasks=settings.agent.AGENT_PARALLEL_SUBTASKS,
+        ).build()
+    )
+
+    FUSED_QUICK_ANALYSIS_MODE: Any = LazyAttribute(
+        lambda: AgentGraphBuilder(
+            state=AgentState,
+            task_routing_node=TaskRoutingNodeRegistry.UNIFIED,
+            task_decomposition_node=TaskDecompositionNodeRegistry.QUICK_ANALYSIS_MODE,
+            task_decomposition_summarization_node=TaskDecompositionSummarizationNodeRegistry.QUICK_ANALYSIS_MODE,
+            subtask_classification_node=SubtaskClassificationNodeRegistry.UNIFIED,
+            direct_responding_node=DirectRespondingNodeRegistry.QUICK_ANALYSIS_MODE,
+            context_advising_node=ContextAdvisingNodeRegistry.QUICK_ANALYSIS_MODE,
+            analysis_action_planing_node=AnalysisActionPlaningNodeRegistry.QUICK_ANALYSIS_MODE,
+            analysis_code_generation_node=AnalysisCodeGenerationNodeRegistry.QUICK_ANALYSIS_MODE,
+            analysis_report_generation_node=AnalysisReportGenerationNodeRegistry.QUICK_ANALYSIS_MODE,
+            visualization_action_planing_node=VisualizationActionPlaningNodeRegistry.QUICK_VISUALIZATION_MODE,
+            visualization_code_generation_node=VisualizationCodeGenerationNodeRegistry.QUICK_VISUALIZATION_MODE,
+            code_debagging_node=CodeDebaggingNodeRegistry.UNIFIED,
+            fallback_handling_node=FallbackHandlingNodeRegistry.UNIFIED,
+            fused_routing=True,
+            parallel_subtasks=settings.agent.AGENT_PARALLEL_SUBTASKS,
+        ).build()
+    )
@@ -10,7 +10,10 @@ to specialized agents depending on the user’s needs.
 Key Components:
     - AgentsOrchestratorGraphBuilder: Core builder class responsible for creating the
       agent orchestration graph.
-    - agents_orchestrator: A pre-built instance of the orchestrator graph, ready for use.
+    - AgentsOrchestratorRegistry: Registry of the orchestrator graph, built on first
+      access.
+    - warm_up_orchestrator: Builds the orchestrator graph and compiles the agent
+      graphs it routes to, ahead of the first request.
 
 Responsibilities:
     - Initialize a stateful graph with Pydantic-based state management.
@@ -18,20 +21,31 @@ Responsibilities:
     - Define static edges (deterministic execution flow).
     - Define conditional edges (dynamic routing based on agent mode classification).
     - Compile and return a fully executable workflow graph.
+
+The agent graphs are compiled on demand: the orchestrator nodes look their
+graph up in `AgentGraphRegistry` when first called, so a mode nobody routes
+to is never compiled.
 """
 
-from typing import Any, Type
+import asyncio
+from typing import Any, Dict, Optional, Type
 
 from pydantic import BaseModel, ConfigDict, PrivateAttr
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 
 from agents.state import AgentState
 from agents.nodes.agent_model_classification import (
     AgentModeClassificationNodeRegistry,
     AgentModeClassificationNode,
 )
+from agents.nodes.fused_routing import FusedRoutingNodeRegistry, FusedRoutingNode
 from agents.nodes.conditional_routing import ConditionalRoutingNode
 from agents.graphs.builder import AgentGraphRegistry
+from cache.checkpoint import checkpoint_saver
+from core.config import settings
+from core.lazy import LazyAttribute, resolved
 
 
 class AgentsOrchestratorGraphBuilder(BaseModel):
@@ -44,10 +58,18 @@ class AgentsOrchestratorGraphBuilder(BaseModel):
         - Agent execution nodes (technical, quick analysis, etc.).
         - Conditional routing logic that directs workflow dynamically.
 
+    With a `fused_routing_node`, the classification node is replaced by a
+    single call deciding the mode, task flow, subtasks, and subtask flows,
+    and the agents skip routing and decomposition.
+
     Attributes:
         state: The agent state class to be tracked in the workflow.
         agent_mode_classification_node: The node
             responsible for classifying user input into a specific agent mode.
+        fused_routing_node: Optional node taking all routing decisions in one
+            call, used instead of the classification node.
+        checkpointer: Optional checkpoint saver the state is saved to after
+            every node, shared by the agent graphs it routes to.
         _graph: The underlying execution graph (initialized post-init).
     """
 
@@ -55,6 +77,8 @@ class AgentsOrchestratorGraphBuilder(BaseModel):
 
     state: Type[BaseModel]
     agent_mode_classification_node: AgentModeClassificationNode
+    fused_routing_node: Optional[FusedRoutingNode] = None
+    checkpointer: Optional[BaseCheckpointSaver] = None
 
     _graph: StateGraph = PrivateAttr()
 
@@ -67,22 +91,86 @@ class AgentsOrchestratorGraphBuilder(BaseModel):
         """
         self._graph = StateGraph(self.state)
 
+    def _router(self) -> str:
+        """
+        Return the name of the node routing between the agent modes.
+
+        Returns:
+            str: "fused_router" with fused routing, "agent_mode_classifier" otherwise.
+        """
+        if self.fused_routing_node is not None:
+            return "fused_router"
+        return "agent_mode_classifier"
+
+    @staticmethod
+    def agent_graphs(fused_routing: bool) -> Dict[str, str]:
+        """
+        Return the agent graphs the orchestrator routes to.
+
+        Args:
+            fused_routing: Whether the orchestrator uses fused routing.
+
+        Returns:
+            Dict[str, str]: Name of the `AgentGraphRegistry` graph, by node.
+        """
+        if fused_routing:
+            return {
+                "technical_agent": "FUSED_TECHNICAL_MODE",
+                "quick_analysis_agent": "FUSED_QUICK_ANALYSIS_MODE",
+            }
+        return {
+            "technical_agent": "TECHNICAL_MODE",
+            "quick_analysis_agent": "QUICK_ANALYSIS_MODE",
+        }
+
+    @staticmethod
+    def _agent_node(name: str) -> RunnableLambda:
+        """
+        Return a node running an agent graph, compiled on its first call.
+
+        Args:
+            name: Name of the graph in `AgentGraphRegistry`.
+
+        Returns:
+            RunnableLambda: Node invoking the graph with the node's config, so
+            its events stream through the orchestrator and it checkpoints
+            into the orchestrator's checkpointer, as a subgraph.
+        """
+
+        def invoke(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+            return getattr(AgentGraphRegistry, name).invoke(dict(state), config)
+
+        async def ainvoke(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+            # Compile the graph off the event loop if this is its first call
+            if not resolved(AgentGraphRegistry, name):
+                await asyncio.to_thread(getattr, AgentGraphRegistry, name)
+            return await getattr(AgentGraphRegistry, name).ainvoke(
+                dict(state), config
+            )
+
+        return RunnableLambda(invoke, afunc=ainvoke, name=name)
+
     def _add_nodes(self):
         """
         Add classification and execution nodes to the graph.
 
         Nodes include:
-            - agent_mode_classifier: Determines which agent mode should run.
+            - agent_mode_classifier: Determines which agent mode should run,
+              or fused_router when fused routing is used.
             - technical_agent: Handles deeply technical analysis tasks.
             - quick_analysis_agent: Handles lightweight, quick analysis tasks.
         """
-        self._graph.add_node(
-            "agent_mode_classifier", self.agent_mode_classification_node.invoke
-        )
-        self._graph.add_node("technical_agent", AgentGraphRegistry.TECHNICAL_MODE)
-        self._graph.add_node(
-            "quick_analysis_agent", AgentGraphRegistry.QUICK_ANALYSIS_MODE
-        )
+        if self.fused_routing_node is not None:
+            self._graph.add_node("fused_router", self.fused_routing_node.ainvoke)
+        else:
+            self._graph.add_node(
+                "agent_mode_classifier", self.agent_mode_classification_node.ainvoke
+            )
+
+        # Agent graphs are compiled when first routed to
+        graphs = self.agent_graphs(self.fused_routing_node is not None)
+        for node, name in graphs.items():
+            self._graph.add_node(node, self._agent_node(name))
 
     def _add_edges(self):
         """
@@ -91,7 +179,7 @@ class AgentsOrchestratorGraphBuilder(BaseModel):
         These edges are unconditional and ensure the workflow progresses linearly
         through classification into execution, followed by termination.
         """
-        self._graph.add_edge(START, "agent_mode_classifier")
+        self._graph.add_edge(START, self._router())
         self._graph.add_edge("technical_agent", END)
         self._graph.add_edge("quick_analysis_agent", END)
 
@@ -104,7 +192,7 @@ class AgentsOrchestratorGraphBuilder(BaseModel):
         the technical agent or the quick analysis agent.
         """
         self._graph.add_conditional_edges(
-            "agent_mode_classifier",
+            self._router(),
             ConditionalRoutingNode.routing_from_agent_mode_classifier,
             {
                 "technical_agent": "technical_agent",
@@ -124,11 +212,49 @@ class AgentsOrchestratorGraphBuilder(BaseModel):
         self._add_edges()
         self._add_conditional_edges()
 
-        return self._graph.compile()
+        return self._graph.compile(checkpointer=self.checkpointer)
 
 
-# Compiled instance of the orchestrator graph, ready for execution.
-agents_orchestrator = AgentsOrchestratorGraphBuilder(
-    state=AgentState,
-    agent_mode_classification_node=AgentModeClassificationNodeRegistry.UNIFIED,
-).build()
+class AgentsOrchestratorRegistry:
+    """
+    Registry of the orchestrator graph.
+
+    The graph is built on first access, so importing the service does not
+    build any node or compile any graph.
+
+    Attributes:
+        DEFAULT: Orchestrator graph routing with agent mode classification,
+            or with fused routing when `AGENT_FUSED_ROUTING` is set, and
+            checkpointing every node when `CHECKPOINT_ENABLED` is set.
+    """
+
+    DEFAULT: Any = LazyAttribute(
+        lambda: AgentsOrchestratorGraphBuilder(
+            state=AgentState,
+            agent_mode_classification_node=AgentModeClassificationNodeRegistry.UNIFIED,
+            fused_routing_node=(
+                FusedRoutingNodeRegistry.UNIFIED
+                if settings.agent.AGENT_FUSED_ROUTING
+                else None
+            ),
+            checkpointer=(
+                checkpoint_saver if settings.checkpoint.CHECKPOINT_ENABLED else None
+            ),
+        ).build()
+    )
+
+
+def warm_up_orchestrator() -> Any:
+    """
+    Build the default orchestrator graph and compile the agent graphs it routes to.
+
+    Returns:
+        Any: The compiled orchestrator graph.
+    """
+    orchestrator = AgentsOrchestratorRegistry.DEFAULT
+    graphs = AgentsOrchestratorGraphBuilder.agent_graphs(
+        settings.agent.AGENT_FUSED_ROUTING
+    )
+    for name in graphs.values():
+        getattr(AgentGraphRegistry, name)
+    return orchestrator
@@ -10,13 +10,19 @@ Responsibilities:
     - Centralize Anthropic model creation with consistent configuration.
     - Provide reusable low-, medium-, and high-temperature models.
     - Expose special-purpose models optimized for summarization and code generation.
+    - Report token usage, including prompt cache reads and writes, for
+      streamed responses as well.
+    - Record responses, or replay recorded ones instead of calling the
+      API, as configured by `REPLAY_MODE`.
 """
 
 from typing import Optional
 
 from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models import BaseChatModel
 
 from core.config import settings
+from agents.models.replay import create_replay_model, replay_recorder
 
 
 def create_anthropic_model(
@@ -24,15 +30,30 @@ def create_anthropic_model(
     temperature: float,
     max_tokens: int = 8000,
     streaming: Optional[bool] = False,
-    stream_usage: Optional[bool] = False,
+    stream_usage: Optional[bool] = True,
     top_k: Optional[int] = None,
     top_p: Optional[float] = None,
-) -> ChatAnthropic:
+) -> BaseChatModel:
     """
     Factory for Anthropic chat models with sensible defaults.
+
+    Usage is streamed by default, so prompt cache accounting also covers
+    streaming models; cache breakpoints are placed by the node chains.
+    In replay mode a model replaying recorded responses is returned instead.
     """
+    # Answer from recorded responses, without network access
+    if settings.replay.REPLAY_MODE == "replay":
+        return create_replay_model(
+            temperature=temperature,
+            max_tokens=max_tokens,
+            streaming=streaming,
+            stream_usage=stream_usage,
+            top_k=top_k,
+            top_p=top_p,
+        )
+
     return ChatAnthropic(
-        model_name="claude-sonnet-4-20250514",
+        model_name=settings.model_tiers.MODEL_TIER_MODELS["large"],
         anthropic_api_key=settings.anthropic_model.ANTHROPIC_API_KEY,
         temperature=temperature,
         max_tokens=max_tokens,
@@ -40,6 +61,9 @@ def create_anthropic_model(
         stream_usage=stream_usage,
         top_k=top_k,
         top_p=top_p,
+        callbacks=(
+            [replay_recorder] if settings.replay.REPLAY_MODE == "record" else None
+        ),
     )
 
 
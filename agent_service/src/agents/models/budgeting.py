@@ -0,0 +1,416 @@
+"""
+Prompt budgeting module.
+
+This module keeps the prompts of the nodes within per-node token budgets.
+The summaries, the variable names, and the analysis reports passed to the
+prompts grow with the age of a session, and so does the latency of every
+model call reading them. Before a node's prompt is formatted, every input is
+counted, and every input with a budget is trimmed to it, dropping its least
+relevant lines first.
+
+Relevance is decided deterministically, so the same inputs always produce
+the same prompt and keep hitting the prompt and response caches: a line (or
+variable name) ranks higher the more words it shares with the question, the
+subtask, the action plan, or the error being fixed, and ties keep the earlier
+lines, which hold the headings and overviews of the summaries. Kept lines stay
+in their original order, and every gap is marked, so the model knows that
+context was left out. Inputs of the system prompts, such as the dataset
+summary, are only counted: cutting them would drop columns from the code
+generation prompts, and they stay the same for a whole session anyway, so
+the cacheable prompt prefix is read from the cache.
+
+Token counts are estimated from the length of the text, since the Anthropic
+tokenizer is only available through the API; the exact input tokens of every
+call are reported by the prompt cache accounting.
+
+Classes:
+    PromptBudget: Token budgets of the inputs of a node's prompt.
+    PromptBudgetRegistry: Preconfigured budgets for the kinds of nodes.
+    PromptBudgetStats: Aggregates the tokens every input contributed, by node.
+
+Functions:
+    estimate_tokens: Estimate the number of tokens of a text.
+    with_prompt_budget: Apply a budget to the inputs of a chain.
+
+Instances:
+    prompt_budget_stats: Process-wide prompt budget statistics.
+"""
+
+import re
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, List, Optional, Set, Tuple
+
+from langchain_core.runnables import Runnable, RunnableLambda
+
+from core.config import settings
+
+
+# Average characters per token of the Anthropic models on English and code
+CHARS_PER_TOKEN = 3.5
+
+# Inputs describing what the current call is about
+FOCUS_FIELDS = (
+    "question",
+    "custom_data",
+    "subtask",
+    "subtasks",
+    "analysis_action_plan",
+    "visualization_action_plan",
+    "error_message",
+)
+
+# Inputs of the cacheable system prompts, counted but never trimmed
+PREFIX_FIELDS = ("dataset_summary", "dependencies")
+
+# Inputs listing variable names, trimmed name by name instead of as text
+NAME_FIELDS = ("variables",)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text.
+
+    Args:
+        text: Text to count.
+
+    Returns:
+        int: Estimated number of tokens.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _words(text: str) -> Set[str]:
+    """
+    Return the distinct lowercase words of a text, ignoring short ones.
+
+    Args:
+        text: Text to split.
+
+    Returns:
+        Set[str]: Words of at least three characters.
+    """
+    return {word for word in re.findall(r"[a-z0-9_]{3,}", text.lower())}
+
+
+@dataclass
+class PromptBudget:
+    """
+    Token budgets of the inputs of a node's prompt.
+
+    Attributes:
+        fields: Maximum tokens of every budgeted input, by input name.
+        total: Maximum tokens of all budgeted inputs together, if any. When
+            exceeded, every budgeted input outside the system prompt is cut
+            by the same proportion.
+    """
+
+    fields: Dict[str, int]
+    total: Optional[int] = None
+
+    def apply(
+        self, inputs: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Dict[str, Tuple[int, int]]]:
+        """
+        Trim the budgeted inputs of a prompt to their budgets.
+
+        Args:
+            inputs: Inputs of the prompt.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Tuple[int, int]]]: The trimmed
+            inputs, and the tokens of every input before and after trimming.
+        """
+        focus = _words(
+            " ".join(str(inputs[name]) for name in FOCUS_FIELDS if inputs.get(name))
+        )
+        scale = settings.prompt_budget.PROMPT_BUDGET_SCALE
+        enforced = settings.prompt_budget.PROMPT_BUDGET_ENABLED
+
+        # Count every input, and trim the budgeted ones to their own budget
+        trimmed = dict(inputs)
+        tokens: Dict[str, Tuple[int, int]] = {}
+        for name, value in inputs.items():
+            if value is None:
+                continue
+            offered = estimate_tokens(self._render(value))
+            budget = None if name in PREFIX_FIELDS else self.fields.get(name)
+            if enforced and budget is not None and offered > budget * scale:
+                trimmed[name] = self._trim(name, value, int(budget * scale), focus)
+            tokens[name] = (offered, estimate_tokens(self._render(trimmed[name])))
+
+        # Cut all budgeted inputs alike when they exceed the total budget
+        budgeted = [
+            name
+            for name in self.fields
+            if name in tokens and name not in PREFIX_FIELDS
+        ]
+        sent = sum(tokens[name][1] for name in budgeted)
+        if enforced and self.total is not None and sent > self.total * scale:
+            ratio = self.total * scale / sent
+            for name in budgeted:
+                offered, kept = tokens[name]
+                trimmed[name] = self._trim(
+                    name, inputs[name], int(kept * ratio), focus
+                )
+                tokens[name] = (
+                    offered,
+                    estimate_tokens(self._render(trimmed[name])),
+                )
+
+        return trimmed, tokens
+
+    @classmethod
+    def _trim(cls, name: str, value: Any, budget: int, focus: Set[str]) -> Any:
+        """
+        Trim an input to a token budget.
+
+        Variable names are kept as a list of names; any other input, such as
+        a list of analysis results, is trimmed as text, one entry per line.
+
+        Args:
+            name: Name of the input.
+            value: Input to trim.
+            budget: Maximum tokens of the input.
+            focus: Words describing the current call.
+
+        Returns:
+            Any: The trimmed input.
+        """
+        listed = isinstance(value, Collection) and not isinstance(value, (str, dict))
+        if listed and name in NAME_FIELDS:
+            return cls._trim_names([str(entry) for entry in value], budget, focus)
+        if listed:
+            return cls._trim_text("\n".join(map(str, value)), budget, focus)
+        return cls._trim_text(cls._render(value), budget, focus)
+
+    @staticmethod
+    def _trim_text(text: str, budget: int, focus: Set[str]) -> str:
+        """
+        Keep the most relevant lines of a text within a token budget.
+
+        Args:
+            text: Text to trim.
+            budget: Maximum tokens of the text.
+            focus: Words describing the current call.
+
+        Returns:
+            str: The kept lines in their original order, with every gap
+            marked by the number of omitted lines.
+        """
+        lines = text.splitlines()
+        ranking = sorted(
+            range(len(lines)),
+            key=lambda index: (-len(_words(lines[index]) & focus), index),
+        )
+
+        # Keep the most relevant lines that fit, reserving room for markers
+        kept: Set[int] = set()
+        used = 0
+        for index in ranking:
+            cost = estimate_tokens(lines[index] + "\n") + 4
+            if used + cost <= budget:
+                kept.add(index)
+                used += cost
+
+        # Without any fitting line, the most relevant one is cut to the budget
+        if not kept and lines:
+            index = ranking[0]
+            cut = max(int(budget * CHARS_PER_TOKEN) - 8, 0)
+            lines[index] = lines[index][:cut] + " [...]"
+            kept.add(index)
+
+        trimmed: List[str] = []
+        omitted = 0
+        for index, line in enumerate(lines):
+            if index in kept:
+                if omitted:
+                    trimmed.append(f"[... {omitted} lines omitted ...]")
+                    omitted = 0
+                trimmed.append(line)
+            else:
+                omitted += 1
+        if omitted:
+            trimmed.append(f"[... {omitted} lines omitted ...]")
+        return "\n".join(trimmed)
+
+    @staticmethod
+    def _trim_names(names: List[str], budget: int, focus: Set[str]) -> List[str]:
+        """
+        Keep the most relevant names within a token budget.
+
+        Names mentioned by the current call rank first, then the most
+        recently defined ones.
+
+        Args:
+            names: Names in definition order.
+            budget: Maximum tokens of the names.
+            focus: Words describing the current call.
+
+        Returns:
+            List[str]: The kept names in definition order, followed by the
+            number of omitted names.
+        """
+        ranking = sorted(
+            range(len(names)),
+            key=lambda index: (names[index].lower() not in focus, -index),
+        )
+
+        kept: Set[int] = set()
+        used = estimate_tokens("[... 0000 more ...]")
+        for index in ranking:
+            cost = estimate_tokens(repr(names[index]) + ", ")
+            if used + cost <= budget:
+                kept.add(index)
+                used += cost
+
+        trimmed = [name for index, name in enumerate(names) if index in kept]
+        if len(kept) < len(names):
+            trimmed.append(f"[... {len(names) - len(kept)} more ...]")
+        return trimmed
+
+    @staticmethod
+    def _render(value: Any) -> str:
+        """
+        Render an input the way the prompt template formats it.
+
+        Args:
+            value: Input to render.
+
+        Returns:
+            str: The rendered input.
+        """
+        return value if isinstance(value, str) else str(value)
+
+
+class PromptBudgetRegistry:
+    """
+    Preconfigured prompt budgets for the kinds of nodes.
+
+    Attributes:
+        ROUTING: Budget of the classification and routing nodes, which only
+            need the gist of the summaries to take their decisions.
+        PLANNING: Budget of the planning, advising, and responding nodes,
+            which reason over the summaries in more detail.
+        CODE: Budget of the code generation and debugging nodes, led by the
+            code written so far and the names of the variables in scope; the
+            dataset description is never trimmed.
+        REPORT: Budget of the report generation nodes, led by the raw
+            analysis results.
+    """
+
+    ROUTING: PromptBudget = PromptBudget(
+        fields={
+            "analysis_summary": 1500,
+            "visualization_summary": 1000,
+            "user_preferences_summary": 500,
+            "pending_context": 500,
+        },
+        total=3000,
+    )
+
+    PLANNING: PromptBudget = PromptBudget(
+        fields={
+            "analysis_summary": 3000,
+            "visualization_summary": 2000,
+            "user_preferences_summary": 500,
+            "pending_context": 1000,
+        },
+        total=5000,
+    )
+
+    CODE: PromptBudget = PromptBudget(
+        fields={
+            "code_summary": 4000,
+            "variables": 600,
+        },
+        total=4000,
+    )
+
+    REPORT: PromptBudget = PromptBudget(
+        fields={
+            "analysis_report": 12000,
+        },
+    )
+
+
+@dataclass
+class PromptBudgetStats:
+    """
+    Aggregates the tokens every prompt input contributed, by node.
+    """
+
+    _nodes: Dict[str, Dict[str, Dict[str, int]]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, node: str, tokens: Dict[str, Tuple[int, int]]) -> None:
+        """
+        Accumulate the input tokens of a prompt formatted by a node.
+
+        Args:
+            node: Name of the node.
+            tokens: Tokens of every input before and after trimming.
+        """
+        with self._lock:
+            inputs = self._nodes.setdefault(node, {})
+            for name, (offered, sent) in tokens.items():
+                totals = inputs.setdefault(
+                    name,
+                    {"calls": 0, "trimmed": 0, "offered_tokens": 0, "sent_tokens": 0},
+                )
+                totals["calls"] += 1
+                totals["trimmed"] += sent < offered
+                totals["offered_tokens"] += offered
+                totals["sent_tokens"] += sent
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return the aggregated input tokens.
+
+        Returns:
+            Dict[str, Any]: Estimated tokens offered and sent, overall and by
+            node and input, and how often every input was trimmed.
+        """
+        with self._lock:
+            nodes = {
+                node: {name: dict(totals) for name, totals in inputs.items()}
+                for node, inputs in self._nodes.items()
+            }
+        totals = [totals for inputs in nodes.values() for totals in inputs.values()]
+        offered = sum(entry["offered_tokens"] for entry in totals)
+        sent = sum(entry["sent_tokens"] for entry in totals)
+        return {
+            "offered_tokens": offered,
+            "sent_tokens": sent,
+            "saved_tokens": offered - sent,
+            "nodes": nodes,
+        }
+
+
+def with_prompt_budget(chain: Runnable, budget: PromptBudget, node: str) -> Runnable:
+    """
+    Trim the inputs of a chain to a prompt budget before invoking it.
+
+    Args:
+        chain: prompt → model chain of a node.
+        budget: Token budgets of the prompt inputs.
+        node: Name the input tokens are recorded under.
+
+    Returns:
+        Runnable: budget → chain.
+    """
+
+    def apply(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        trimmed, tokens = budget.apply(inputs)
+        prompt_budget_stats.record(node, tokens)
+        return trimmed
+
+    async def aapply(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return apply(inputs)
+
+    return RunnableLambda(apply, afunc=aapply) | chain
+
+
+# Process-wide prompt budget statistics
+prompt_budget_stats = PromptBudgetStats()
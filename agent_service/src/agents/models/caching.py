@@ -0,0 +1,298 @@
+"""
+Prompt caching module.
+
+This module marks the static prefix of every prompt as cacheable by the
+Anthropic API and accounts for the cache usage of every node. The system
+message of a prompt holds the long, static instructions from
+`agents/prompts`, plus values that stay fixed for a session such as the
+dataset summary, while the human messages carry the per-call inputs. A cache
+breakpoint is therefore placed at the end of the system message, so
+repeated calls of a node (such as planning once per subtask) read the
+instructions from the cache instead of paying for them again.
+
+Prompts shorter than the minimum cacheable length of the model are sent
+unchanged by the API and show up as cache misses.
+
+Classes:
+    PromptCacheTotals: Accumulated token usage of the calls of one node.
+    PromptCacheStats: Aggregates prompt cache usage by node.
+    PromptCacheCallbackHandler: Callback recording the usage of a chain's model calls.
+
+Functions:
+    message_usage: Extract the token usage reported for a model response.
+    mark_cacheable_prefix: Place a cache breakpoint at the end of the system prompt.
+    amark_cacheable_prefix: Async variant of `mark_cacheable_prefix`.
+    with_prompt_cache: Compose a prompt and a model into a prompt-caching chain.
+
+Instances:
+    prompt_cache_stats: Process-wide prompt cache statistics.
+"""
+
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableLambda
+
+
+@dataclass
+class PromptCacheTotals:
+    """
+    Accumulated token usage of the calls of one node.
+
+    Attributes:
+        calls: Number of model calls.
+        hits: Calls that read their prompt prefix from the cache.
+        misses: Calls that did not read anything from the cache.
+        input_tokens: Total input tokens, including cached ones.
+        cache_read_tokens: Input tokens read from the cache.
+        cache_creation_tokens: Input tokens written to the cache.
+        output_tokens: Total output tokens.
+    """
+
+    calls: int = 0
+    hits: int = 0
+    misses: int = 0
+    input_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    output_tokens: int = 0
+
+    def add(
+        self, input_tokens: int, output_tokens: int, cache_read: int, cache_creation: int
+    ) -> None:
+        """
+        Accumulate the usage of a single model call.
+
+        Args:
+            input_tokens: Input tokens, including cached ones.
+            output_tokens: Output tokens.
+            cache_read: Input tokens read from the cache.
+            cache_creation: Input tokens written to the cache.
+        """
+        self.calls += 1
+        self.hits += cache_read > 0
+        self.misses += cache_read == 0
+        self.input_tokens += input_tokens
+        self.cache_read_tokens += cache_read
+        self.cache_creation_tokens += cache_creation
+        self.output_tokens += output_tokens
+
+
+@dataclass
+class PromptCacheStats:
+    """
+    Aggregates prompt cache usage by node.
+    """
+
+    _nodes: Dict[str, PromptCacheTotals] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(
+        self,
+        node: str,
+        input_tokens: int,
+        output_tokens: int,
+        cache_read: int,
+        cache_creation: int,
+    ) -> None:
+        """
+        Accumulate the usage of a model call made by a node.
+
+        Args:
+            node: Name of the node that made the call.
+            input_tokens: Input tokens, including cached ones.
+            output_tokens: Output tokens.
+            cache_read: Input tokens read from the cache.
+            cache_creation: Input tokens written to the cache.
+        """
+        with self._lock:
+            self._nodes.setdefault(node, PromptCacheTotals()).add(
+                input_tokens, output_tokens, cache_read, cache_creation
+            )
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return the aggregated prompt cache usage.
+
+        Returns:
+            Dict[str, Any]: Overall totals and totals per node, each with
+            the share of calls that hit the cache.
+        """
+        with self._lock:
+            total = PromptCacheTotals()
+            for totals in self._nodes.values():
+                for name, value in asdict(totals).items():
+                    setattr(total, name, getattr(total, name) + value)
+
+            return {
+                "total": self._report(total),
+                "nodes": {
+                    node: self._report(totals) for node, totals in self._nodes.items()
+                },
+            }
+
+    @staticmethod
+    def _report(totals: PromptCacheTotals) -> Dict[str, Any]:
+        """
+        Format totals together with their cache hit rate.
+
+        Args:
+            totals: Accumulated usage.
+
+        Returns:
+            Dict[str, Any]: Totals and hit rate.
+        """
+        return {
+            **asdict(totals),
+            "hit_rate": totals.hits / totals.calls if totals.calls else 0.0,
+        }
+
+
+def message_usage(message: BaseMessage) -> Tuple[int, int, int, int]:
+    """
+    Extract the token usage reported for a model response.
+
+    Args:
+        message: Response message of the model.
+
+    Returns:
+        Tuple[int, int, int, int]: Input tokens (including cached ones),
+        output tokens, cache read tokens, and cache creation tokens.
+    """
+    usage_metadata = getattr(message, "usage_metadata", None)
+    if usage_metadata:
+        details = usage_metadata.get("input_token_details") or {}
+        return (
+            usage_metadata.get("input_tokens", 0),
+            usage_metadata.get("output_tokens", 0),
+            details.get("cache_read") or 0,
+            details.get("cache_creation") or 0,
+        )
+
+    # Raw Anthropic usage reports cached input tokens separately
+    usage = (getattr(message, "response_metadata", None) or {}).get("usage") or {}
+    cache_read = usage.get("cache_read_input_tokens") or 0
+    cache_creation = usage.get("cache_creation_input_tokens") or 0
+    return (
+        (usage.get("input_tokens") or 0) + cache_read + cache_creation,
+        usage.get("output_tokens") or 0,
+        cache_read,
+        cache_creation,
+    )
+
+
+class PromptCacheCallbackHandler(BaseCallbackHandler):
+    """
+    Callback recording the prompt cache usage of a chain's model calls.
+
+    Attributes:
+        node: Name the usage is recorded under.
+        stats: Statistics the usage is recorded into.
+        run_inline: Record usage in the event loop during async runs, instead
+            of handing every callback to an executor thread.
+    """
+
+    run_inline = True
+
+    def __init__(self, node: str, stats: PromptCacheStats):
+        self.node = node
+        self.stats = stats
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        """
+        Record the usage of a completed model call.
+
+        Args:
+            response: Result of the model call.
+        """
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is not None:
+                    self.stats.record(self.node, *message_usage(message))
+
+
+def mark_cacheable_prefix(prompt_value: PromptValue) -> List[BaseMessage]:
+    """
+    Place a cache breakpoint at the end of the system prompt.
+
+    Everything up to and including the last system message (the tool
+    definitions of structured output included) becomes a cacheable prefix.
+
+    Args:
+        prompt_value: Formatted prompt.
+
+    Returns:
+        List[BaseMessage]: Prompt messages, with the content of the last
+        system message turned into blocks carrying `cache_control`.
+    """
+    messages = prompt_value.to_messages()
+    indices = [
+        index
+        for index, message in enumerate(messages)
+        if isinstance(message, SystemMessage)
+    ]
+    if not indices:
+        return messages
+
+    message = messages[indices[-1]]
+    if isinstance(message.content, str):
+        blocks = [{"type": "text", "text": message.content}]
+    else:
+        blocks = [
+            dict(block) if isinstance(block, dict) else {"type": "text", "text": block}
+            for block in message.content
+        ]
+    blocks[-1]["cache_control"] = {"type": "ephemeral"}
+
+    messages[indices[-1]] = SystemMessage(content=blocks)
+    return messages
+
+
+async def amark_cacheable_prefix(prompt_value: PromptValue) -> List[BaseMessage]:
+    """
+    Place a cache breakpoint at the end of the system prompt in async chains.
+
+    Defined so async runs transform the prompt in the event loop instead of
+    an executor thread.
+
+    Args:
+        prompt_value: Formatted prompt.
+
+    Returns:
+        List[BaseMessage]: Prompt messages, as by `mark_cacheable_prefix`.
+    """
+    return mark_cacheable_prefix(prompt_value)
+
+
+def with_prompt_cache(prompt: Runnable, model: Runnable, node: str) -> Runnable:
+    """
+    Compose a prompt and a model into a chain caching the system prompt.
+
+    Args:
+        prompt: Prompt template formatting the chain input.
+        model: Model, possibly with structured output, invoked on the prompt.
+        node: Name the cache usage of the chain is recorded under, also
+            passed to the model calls as `node` metadata.
+
+    Returns:
+        Runnable: prompt → cache breakpoint → model chain.
+    """
+    chain = (
+        prompt
+        | RunnableLambda(mark_cacheable_prefix, afunc=amark_cacheable_prefix)
+        | model
+    )
+    return chain.with_config(
+        callbacks=[PromptCacheCallbackHandler(node, prompt_cache_stats)],
+        metadata={"node": node},
+    )
+
+
+# Process-wide prompt cache statistics
+prompt_cache_stats = PromptCacheStats()
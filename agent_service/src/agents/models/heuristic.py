@@ -0,0 +1,450 @@
+"""
+Heuristic classification module.
+
+This module provides local, CPU-only classifiers that take the decisions of
+the task router and the subtask classifier for obvious questions, so those
+questions skip a model round-trip. "Summarize what we found" is advisory,
+"yes, go ahead" with a pending suggestion is exploratory, and "plot sales vs
+price" is a visualization; the language model is only asked when no
+classifier is confident.
+
+Every classifier combines:
+    - Keyword rules transcribed from the routing prompts, each with a fixed
+      confidence.
+    - Optionally a small scikit-learn pipeline (TF-IDF features of the
+      question and of the context, logistic regression) trained from logged
+      model decisions, consulted when no rule fires.
+
+A decision is only taken when its confidence reaches `HEURISTIC_THRESHOLD`.
+With `HEURISTIC_LOG_PATH` set, every decision taken by the language model is
+logged with its inputs, which is the training and evaluation data of the
+learned pipelines; `benchmarks/heuristic_agreement.py` reports the agreement
+of the heuristics with the logged decisions and trains the pipelines.
+
+Classes:
+    HeuristicPrediction: A decision with its confidence and source.
+    HeuristicClassifier: Rules and optional learned pipeline of one decision.
+
+Functions:
+    task_routing_rules: Keyword rules of the task router.
+    subtask_classification_rules: Keyword rules of the subtask classifier.
+    train_heuristic_model: Fit a learned pipeline on logged decisions.
+
+Instances:
+    task_routing_classifier: Heuristic task router.
+    subtask_classification_classifier: Heuristic subtask classifier.
+"""
+
+import re
+import json
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.config import settings
+
+
+# Requests to summarize are always advisory
+SUMMARY = re.compile(
+    r"\b(summari[sz]e|recap|what have we (done|found|learned))\b", re.IGNORECASE
+)
+
+# Questions seeking guidance are advisory regardless of preferences
+GUIDANCE = re.compile(
+    r"^\s*(how should (i|we)|which (option|approach|method|model|one)\b|"
+    r"what('s| is) (better|best)\b|should (i|we)\b|"
+    r"what do you (recommend|suggest|think)|(can you )?explain\b|why\b|"
+    r"what does\b|what do .+ mean\b|what is the (meaning|difference)\b|"
+    r"what are the (pros|cons|differences)\b)",
+    re.IGNORECASE,
+)
+
+# Short messages accepting the pending suggestion
+CONFIRMATION = re.compile(
+    r"^\s*(yes|yeah|yep|sure|ok(ay)?|go ahead|do it|proceed|sounds good|"
+    r"let'?s do (it|that|this)|please (do|proceed|go ahead|continue)|continue)\b",
+    re.IGNORECASE,
+)
+
+# Requests opening with a visualization verb
+VISUALIZATION_REQUEST = re.compile(
+    r"^\s*(please\s+|can you\s+|could you\s+)?(plot|draw|visuali[sz]e|chart|graph|"
+    r"show (me )?(a |an |the )?(plot|chart|graph|histogram|heat ?map|scatter|"
+    r"box ?plot|bar ?chart|distribution))\b",
+    re.IGNORECASE,
+)
+
+# Any mention of a visual output
+VISUALIZATION = re.compile(
+    r"\b(plot|chart|graph|histogram|scatter|heat ?map|box ?plot|bar ?plot|"
+    r"line ?plot|pie|pair ?plot|visuali[sz]e|visuali[sz]ation|draw)s?\b",
+    re.IGNORECASE,
+)
+
+# Requests opening with a computation verb
+ANALYSIS_REQUEST = re.compile(
+    r"^\s*(please\s+|can you\s+|could you\s+)?(compute|calculate|count|train|fit|"
+    r"build|run|impute|clean|encode|normali[sz]e|standardi[sz]e|aggregate|group|"
+    r"predict|forecast|cluster|test|evaluate|tune|remove|drop|fill|merge)\b",
+    re.IGNORECASE,
+)
+
+# Computation verbs anywhere in a request
+ANALYSIS_VERB = re.compile(
+    r"\b(compute|calculate|train|fit|impute|clean|encode|normali[sz]e|"
+    r"standardi[sz]e|aggregate|predict|forecast|cluster|evaluate|tune)\b",
+    re.IGNORECASE,
+)
+
+# Any mention of a computation
+ANALYSIS = re.compile(
+    r"\b(compute|calculate|count|train|fit|predict|forecast|regression|cluster\w*|"
+    r"impute|encode|normali[sz]e|aggregate|group ?by|t-?test|anova|"
+    r"hypothesis|model|feature\w*|outliers?)\b",
+    re.IGNORECASE,
+)
+
+# Questions about results that may already be in the summaries
+RECALL = re.compile(
+    r"^\s*(what|which|how many|how much|did|was|were)\b", re.IGNORECASE
+)
+
+
+def _confirms_pending(inputs: Dict[str, Any]) -> bool:
+    """
+    Return whether a message is a short confirmation of a pending suggestion.
+
+    Args:
+        inputs: Inputs of the classification.
+
+    Returns:
+        bool: Whether a suggestion is pending and the message accepts it.
+    """
+    question = inputs.get("question") or ""
+    return bool(
+        inputs.get("pending_context")
+        and CONFIRMATION.search(question)
+        and len(question.split()) <= 12
+    )
+
+
+def task_routing_rules(inputs: Dict[str, Any]) -> Optional[Tuple[str, float]]:
+    """
+    Keyword rules of the task router.
+
+    Args:
+        inputs: Inputs of the task routing prompt.
+
+    Returns:
+        Optional[Tuple[str, float]]: Task flow and confidence, if a rule fires.
+    """
+    question = inputs.get("question") or ""
+
+    # The routing prompt sends summaries and guidance questions to advisory
+    if SUMMARY.search(question) and not ANALYSIS_REQUEST.search(question):
+        return "ADVISORY", 0.95
+    if GUIDANCE.search(question):
+        return "ADVISORY", 0.9
+
+    # Accepting the pending suggestion continues with it
+    if _confirms_pending(inputs):
+        return "EXPLORATORY", 0.9
+
+    return None
+
+
+def subtask_classification_rules(
+    inputs: Dict[str, Any],
+) -> Optional[Tuple[str, float]]:
+    """
+    Keyword rules of the subtask classifier.
+
+    Args:
+        inputs: Inputs of the subtask classification prompt.
+
+    Returns:
+        Optional[Tuple[str, float]]: Subtask flow and confidence, if a rule
+        fires.
+    """
+    question = inputs.get("question") or ""
+
+    # A confirmation follows the action type of the pending suggestion
+    if _confirms_pending(inputs):
+        pending = inputs["pending_context"]
+        visual, computes = VISUALIZATION.search(pending), ANALYSIS.search(pending)
+        if visual and not computes:
+            return "VISUALIZATION", 0.9
+        if computes and not visual:
+            return "ANALYSIS", 0.9
+        return None
+
+    # Explicit requests for a plot, or for a computation, and nothing else
+    if VISUALIZATION_REQUEST.search(question) and not ANALYSIS_VERB.search(question):
+        return "VISUALIZATION", 0.92
+    if ANALYSIS_REQUEST.search(question) and not VISUALIZATION.search(question):
+        return "ANALYSIS", 0.9
+    if RECALL.search(question):
+        return None
+    if VISUALIZATION.search(question) and not ANALYSIS.search(question):
+        return "VISUALIZATION", 0.88
+
+    return None
+
+
+def _features(inputs: Dict[str, Any]) -> str:
+    """
+    Build the text the learned pipelines classify.
+
+    The question is followed by marker words for the context the prompts
+    condition on: a pending suggestion and its action type, and the
+    collaboration style preferred by the user.
+
+    Args:
+        inputs: Inputs of the classification.
+
+    Returns:
+        str: Question and context markers.
+    """
+    markers = []
+    pending = inputs.get("pending_context") or ""
+    if pending:
+        markers.append("__pending__")
+        if VISUALIZATION.search(pending):
+            markers.append("__pending_visualization__")
+        if ANALYSIS.search(pending):
+            markers.append("__pending_analysis__")
+
+    preferences = (inputs.get("user_preferences_summary") or "").lower()
+    if "exploratory" in preferences or "immediate" in preferences:
+        markers.append("__prefers_exploratory__")
+    if "advisory" in preferences:
+        markers.append("__prefers_advisory__")
+
+    return " ".join([inputs.get("question") or "", *markers])
+
+
+@dataclass
+class HeuristicPrediction:
+    """
+    A decision with its confidence and source.
+
+    Attributes:
+        label: The decision, or None when no classifier is confident enough.
+        confidence: Confidence of the decision.
+        source: `rules`, `model`, or `none`.
+    """
+
+    label: Optional[str]
+    confidence: float
+    source: str
+
+
+@dataclass
+class HeuristicClassifier:
+    """
+    Rules and optional learned pipeline of one routing decision.
+
+    Attributes:
+        name: Name of the decision, used in the decision log.
+        labels: Valid decisions.
+        rules: Keyword rules returning a decision and its confidence.
+        inputs: Inputs of the decision kept in the decision log.
+        model_path: Joblib file of the learned pipeline, if any.
+        _model: Loaded learned pipeline.
+        _loaded: Whether loading the pipeline was attempted.
+        _counters: Decisions taken by the rules, by the pipeline, and left to
+            the language model, and decisions logged.
+    """
+
+    name: str
+    labels: Tuple[str, ...]
+    rules: Callable[[Dict[str, Any]], Optional[Tuple[str, float]]]
+    inputs: Tuple[str, ...] = (
+        "question",
+        "pending_context",
+        "user_preferences_summary",
+    )
+    model_path: Optional[str] = None
+    _model: Any = field(default=None, init=False)
+    _loaded: bool = field(default=False, init=False)
+    _counters: Dict[str, int] = field(
+        default_factory=lambda: {"rules": 0, "model": 0, "abstained": 0, "logged": 0},
+        init=False,
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def classify(self, inputs: Dict[str, Any]) -> HeuristicPrediction:
+        """
+        Classify a question with the rules, then with the learned pipeline.
+
+        Args:
+            inputs: Inputs of the classification prompt.
+
+        Returns:
+            HeuristicPrediction: The most confident decision, whatever its
+            confidence, or no decision when neither applies.
+        """
+        ruled = self.rules(inputs)
+        if ruled is not None:
+            return HeuristicPrediction(ruled[0], ruled[1], "rules")
+
+        model = self._load()
+        if model is not None:
+            probabilities = model.predict_proba([_features(inputs)])[0]
+            best = max(range(len(probabilities)), key=probabilities.__getitem__)
+            return HeuristicPrediction(
+                str(model.classes_[best]), float(probabilities[best]), "model"
+            )
+
+        return HeuristicPrediction(None, 0.0, "none")
+
+    def use_model(self, model: Any) -> None:
+        """
+        Use a fitted pipeline instead of the configured file.
+
+        Args:
+            model: Fitted pipeline with `predict_proba` and `classes_`, or
+                None to use the rules alone.
+        """
+        with self._lock:
+            self._model = model
+            self._loaded = True
+
+    def predict(self, inputs: Dict[str, Any], count: bool = True) -> Optional[str]:
+        """
+        Return the decision for a question if the heuristics are confident.
+
+        Args:
+            inputs: Inputs of the classification prompt.
+            count: Whether to count the decision in the metrics; False for a
+                decision taken ahead of the node, which counts it again.
+
+        Returns:
+            Optional[str]: The decision, or None to ask the language model.
+        """
+        if not settings.heuristic_routing.HEURISTIC_ROUTING:
+            return None
+
+        prediction = self.classify(inputs)
+        confident = (
+            prediction.label in self.labels
+            and prediction.confidence >= settings.heuristic_routing.HEURISTIC_THRESHOLD
+        )
+        if count:
+            with self._lock:
+                self._counters[prediction.source if confident else "abstained"] += 1
+        return prediction.label if confident else None
+
+    def record(self, inputs: Dict[str, Any], label: str) -> None:
+        """
+        Log a decision taken by the language model, if logging is configured.
+
+        Args:
+            inputs: Inputs of the classification prompt.
+            label: Decision of the language model.
+        """
+        path = settings.heuristic_routing.HEURISTIC_LOG_PATH
+        if not path:
+            return
+
+        entry = {
+            "classifier": self.name,
+            "inputs": {name: inputs.get(name) for name in self.inputs},
+            "label": label.strip(),
+        }
+        with self._lock:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a") as file:
+                file.write(json.dumps(entry) + "\n")
+            self._counters["logged"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return the decision counters.
+
+        Returns:
+            Dict[str, Any]: Decisions taken by the rules and by the learned
+            pipeline, decisions left to the language model, the share taken
+            locally, and decisions logged.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+        decided = counters["rules"] + counters["model"]
+        total = decided + counters["abstained"]
+        return {**counters, "fast_path_rate": decided / total if total else 0.0}
+
+    def _load(self) -> Any:
+        """
+        Load the learned pipeline, once.
+
+        Returns:
+            Any: The pipeline, or None if none is configured.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                if self.model_path is not None and Path(self.model_path).exists():
+                    # Imported on demand, so the rules alone stay lightweight
+                    import joblib
+
+                    self._model = joblib.load(self.model_path)
+            return self._model
+
+
+def train_heuristic_model(entries: List[Dict[str, Any]]) -> Any:
+    """
+    Fit a learned pipeline on logged decisions of one classifier.
+
+    Args:
+        entries: Logged decisions, with their inputs and labels.
+
+    Returns:
+        Any: A fitted scikit-learn pipeline with `predict_proba`.
+    """
+    # Imported on demand, so the rules alone stay lightweight
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+
+    model = make_pipeline(
+        TfidfVectorizer(ngram_range=(1, 2), min_df=1, sublinear_tf=True),
+        LogisticRegression(max_iter=1000, class_weight="balanced"),
+    )
+    model.fit(
+        [_features(entry["inputs"]) for entry in entries],
+        [entry["label"] for entry in entries],
+    )
+    return model
+
+
+def _model_path(name: str) -> Optional[str]:
+    """
+    Return the joblib file of a classifier's learned pipeline.
+
+    Args:
+        name: Name of the classifier.
+
+    Returns:
+        Optional[str]: `<HEURISTIC_MODEL_DIR>/<name>.joblib`, if a directory
+        is configured.
+    """
+    directory = settings.heuristic_routing.HEURISTIC_MODEL_DIR
+    return str(Path(directory) / f"{name}.joblib") if directory else None
+
+
+# Heuristic task router
+task_routing_classifier = HeuristicClassifier(
+    name="task_routing",
+    labels=("ADVISORY", "EXPLORATORY"),
+    rules=task_routing_rules,
+    model_path=_model_path("task_routing"),
+)
+
+# Heuristic subtask classifier
+subtask_classification_classifier = HeuristicClassifier(
+    name="subtask_classification",
+    labels=("ANALYSIS", "VISUALIZATION", "DIRECT_RESPONSE"),
+    rules=subtask_classification_rules,
+    model_path=_model_path("subtask_classification"),
+)
@@ -0,0 +1,577 @@
+"""
+Replay model module.
+
+This module provides a drop-in replacement for the Anthropic models that
+replays recorded responses instead of calling the API, so the agent graphs
+can be benchmarked and load-tested offline and deterministically.
+
+Responses are recorded from live runs (`REPLAY_MODE=record`) into a JSON
+lines file, one response per model call, keyed by the node that made the
+call and a hash of the exact messages it sent. Alongside the content, tool
+calls, and token usage, every record keeps the time to the first token, the
+total duration, and the number of streamed chunks of the live call. In
+replay mode (`REPLAY_MODE=replay`) the same calls are answered from the
+file, with the recorded timing scaled by `REPLAY_TIME_SCALE` and optionally
+perturbed by log-normal noise (`REPLAY_JITTER`), and streamed word by word
+at the recorded cadence.
+
+A call whose messages were never recorded, for example because a summary
+differs from the recorded run, is answered with the next recorded response
+of the same node, so a recording of a few conversations drives arbitrarily
+many replayed ones.
+
+Classes:
+    ReplayStore: Recorded responses, keyed by node and message hash.
+    ReplayRecorder: Callback recording the responses of live model calls.
+    ReplayChatModel: Chat model answering from a `ReplayStore`.
+
+Functions:
+    replay_key: Build the key of a model call.
+    create_replay_model: Replay counterpart of `create_anthropic_model`.
+
+Instances:
+    replay_store: Store at `REPLAY_PATH`.
+    replay_recorder: Recorder writing into `replay_store`.
+"""
+
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from uuid import UUID
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import PrivateAttr
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    BaseCallbackHandler,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import (
+    ChatGeneration,
+    ChatGenerationChunk,
+    ChatResult,
+    LLMResult,
+)
+from langchain_core.runnables import ensure_config
+
+from core.config import settings
+
+
+def replay_key(node: str, messages: List[BaseMessage]) -> str:
+    """
+    Build the key of a model call.
+
+    Args:
+        node: Name of the node making the call.
+        messages: Messages sent to the model.
+
+    Returns:
+        str: Hash of the node and the type and content of every message.
+    """
+    return hashlib.sha256(
+        json.dumps(
+            [node, [[message.type, message.content] for message in messages]],
+            sort_keys=True,
+            default=str,
+        ).encode()
+    ).hexdigest()
+
+
+@dataclass
+class ReplayStore:
+    """
+    Recorded model responses, keyed by node and message hash.
+
+    Attributes:
+        path: JSON lines file holding one recorded response per line.
+        _records: Recorded responses by key.
+        _nodes: Recorded responses by node, for calls without a recording.
+        _cursors: Next fallback response of every node.
+        _loaded: Whether the file has been read.
+    """
+
+    path: Path
+    _records: Dict[str, Dict[str, Any]] = field(default_factory=dict, init=False)
+    _nodes: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict, init=False)
+    _cursors: Dict[str, int] = field(default_factory=dict, init=False)
+    _loaded: bool = field(default=False, init=False)
+    _recorded: int = field(default=0, init=False)
+    _hits: int = field(default=0, init=False)
+    _fallbacks: int = field(default=0, init=False)
+    _misses: int = field(default=0, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def lookup(self, node: str, key: str) -> Dict[str, Any]:
+        """
+        Return the recorded response of a model call.
+
+        Args:
+            node: Name of the node making the call.
+            key: Key of the call.
+
+        Raises:
+            LookupError: If nothing was recorded for the node.
+
+        Returns:
+            Dict[str, Any]: The response recorded for the key, or else the
+            next recorded response of the node.
+        """
+        with self._lock:
+            self._load()
+
+            record = self._records.get(key)
+            if record is not None:
+                self._hits += 1
+                return record
+
+            records = self._nodes.get(node)
+            if not records:
+                self._misses += 1
+                raise LookupError(f"No recorded response for node {node!r}")
+
+            # Cycle through the responses of the node
+            cursor = self._cursors.get(node, 0)
+            self._cursors[node] = cursor + 1
+            self._fallbacks += 1
+            return records[cursor % len(records)]
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        Record a response.
+
+        Args:
+            record: Response with its node, key, and timing.
+        """
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as file:
+                file.write(json.dumps(record, default=str) + "\n")
+            self._recorded += 1
+            if self._loaded:
+                self._add(record)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return recording and lookup counters.
+
+        Returns:
+            Dict[str, Any]: Recorded responses, exact hits, node fallbacks,
+            and misses.
+        """
+        with self._lock:
+            return {
+                "recorded": self._recorded,
+                "hits": self._hits,
+                "fallbacks": self._fallbacks,
+                "misses": self._misses,
+            }
+
+    def _load(self) -> None:
+        """
+        Read the recorded responses, once.
+
+        Must be called with `_lock` held.
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path.exists():
+            return
+        with self.path.open() as file:
+            for line in file:
+                if line.strip():
+                    self._add(json.loads(line))
+
+    def _add(self, record: Dict[str, Any]) -> None:
+        """
+        Index a recorded response.
+
+        Must be called with `_lock` held.
+
+        Args:
+            record: Response with its node and key.
+        """
+        self._records[record["key"]] = record
+        self._nodes.setdefault(record["node"], []).append(record)
+
+
+class ReplayRecorder(BaseCallbackHandler):
+    """
+    Callback recording the responses and timing of live model calls.
+
+    Attributes:
+        store: Store the responses are recorded into.
+        run_inline: Record in the event loop during async runs.
+        _calls: Node, key, start time, first token time, and chunk count of
+            the calls in flight.
+    """
+
+    run_inline = True
+
+    def __init__(self, store: ReplayStore):
+        self.store = store
+        self._calls: Dict[UUID, Dict[str, Any]] = {}
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[BaseMessage]],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Remember the node and key of a starting call.
+
+        Args:
+            serialized: Serialized model.
+            messages: Messages sent to the model.
+            run_id: Identifier of the call.
+            metadata: Metadata of the call, holding the node name.
+        """
+        node = (metadata or {}).get("node", "unknown")
+        self._calls[run_id] = {
+            "node": node,
+            "key": replay_key(node, messages[0]),
+            "started": time.perf_counter(),
+            "first_token": None,
+            "chunks": 0,
+        }
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        """
+        Count a streamed chunk of a call.
+
+        Args:
+            token: Text of the chunk.
+            run_id: Identifier of the call.
+        """
+        call = self._calls.get(run_id)
+        if call is not None:
+            if call["first_token"] is None:
+                call["first_token"] = time.perf_counter()
+            call["chunks"] += 1
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        """
+        Record the response of a completed call.
+
+        Args:
+            response: Result of the call.
+            run_id: Identifier of the call.
+        """
+        call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+
+        message = getattr(response.generations[0][0], "message", None)
+        if message is None:
+            return
+
+        ended = time.perf_counter()
+        first_token = call["first_token"] or ended
+        self.store.append(
+            {
+                "node": call["node"],
+                "key": call["key"],
+                "content": message.content,
+                "tool_calls": getattr(message, "tool_calls", []),
+                "usage_metadata": getattr(message, "usage_metadata", None),
+                "latency": first_token - call["started"],
+                "duration": ended - call["started"],
+                "chunks": call["chunks"],
+            }
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """
+        Forget a failed call.
+
+        Args:
+            error: Error raised by the call.
+            run_id: Identifier of the call.
+        """
+        self._calls.pop(run_id, None)
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Chat model answering from recorded responses.
+
+    The sampling parameters of the replaced model are kept, so response
+    cache keys and prompt cache accounting match those of live runs.
+
+    Attributes:
+        store: Store the responses are replayed from.
+        model: Name of the replaced model.
+        temperature: Temperature of the replaced model.
+        max_tokens: Maximum output tokens of the replaced model.
+        streaming: Whether the replaced model streams by default.
+        top_k: Top-k sampling of the replaced model.
+        top_p: Top-p sampling of the replaced model.
+        time_scale: Factor applied to the recorded timing. Zero replays
+            without any delay.
+        jitter: Sigma of the log-normal noise multiplying the recorded
+            timing of every call. Zero replays the recorded timing exactly.
+        seed: Seed of the noise, so replays are reproducible.
+        _random: Random generator of the noise.
+    """
+
+    store: Any
+    model: str = "replay"
+    temperature: float = 0.0
+    max_tokens: int = 8000
+    streaming: bool = False
+    top_k: Optional[int] = None
+    top_p: Optional[float] = None
+    time_scale: float = 1.0
+    jitter: float = 0.0
+    seed: int = 0
+
+    _random: random.Random = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        """
+        Seed the random generator of the noise.
+
+        Args:
+            __context (Any): Initialization context (unused but required by Pydantic).
+        """
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        """
+        Return the type of the model.
+        """
+        return "replay"
+
+    def bind_tools(self, tools: List[Any], **kwargs: Any) -> Any:
+        """
+        Accept tools for structured output; the recorded tool calls are replayed.
+
+        Args:
+            tools: Tools the model may call.
+            **kwargs: Tool choice and other binding arguments.
+
+        Returns:
+            Runnable: The model bound to the tools.
+        """
+        return self.bind(tools=tools, **kwargs)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """
+        Replay the recorded response of a call after its recorded duration.
+        """
+        record = self._record(messages, run_manager)
+        latency, interval = self._timing(record)
+        time.sleep(latency + interval * (len(self._chunks(record)) - 1))
+        return ChatResult(generations=[ChatGeneration(message=self._message(record))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """
+        Asynchronously replay the recorded response of a call after its
+        recorded duration.
+        """
+        record = self._record(messages, run_manager)
+        latency, interval = self._timing(record)
+        await asyncio.sleep(latency + interval * (len(self._chunks(record)) - 1))
+        return ChatResult(generations=[ChatGeneration(message=self._message(record))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """
+        Stream the recorded response of a call at the recorded cadence.
+        """
+        record = self._record(messages, run_manager)
+        latency, interval = self._timing(record)
+        time.sleep(latency)
+        for index, chunk in enumerate(self._chunks(record)):
+            if index:
+                time.sleep(interval)
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager and isinstance(chunk.content, str):
+                run_manager.on_llm_new_token(chunk.content, chunk=generation)
+            yield generation
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """
+        Asynchronously stream the recorded response of a call at the recorded
+        cadence.
+        """
+        record = self._record(messages, run_manager)
+        latency, interval = self._timing(record)
+        await asyncio.sleep(latency)
+        for index, chunk in enumerate(self._chunks(record)):
+            if index:
+                await asyncio.sleep(interval)
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager and isinstance(chunk.content, str):
+                await run_manager.on_llm_new_token(chunk.content, chunk=generation)
+            yield generation
+
+    def _record(self, messages: List[BaseMessage], run_manager: Any) -> Dict[str, Any]:
+        """
+        Look up the recorded response of a call.
+
+        The node name is read from the metadata of the call, set by the node
+        chains, falling back to the metadata of the running chain when the
+        call is streamed without a run manager.
+
+        Args:
+            messages: Messages sent to the model.
+            run_manager: Run manager of the call, if any.
+
+        Returns:
+            Dict[str, Any]: The recorded response.
+        """
+        if run_manager is not None:
+            metadata = run_manager.metadata
+        else:
+            metadata = ensure_config().get("metadata", {})
+        node = metadata.get("node", "unknown")
+        return self.store.lookup(node, replay_key(node, messages))
+
+    def _timing(self, record: Dict[str, Any]) -> Tuple[float, float]:
+        """
+        Return the scaled, optionally perturbed, timing of a response.
+
+        Args:
+            record: The recorded response.
+
+        Returns:
+            Tuple[float, float]: Seconds to the first chunk, and seconds
+            between two chunks.
+        """
+        scale = self.time_scale
+        if self.jitter > 0:
+            scale *= self._random.lognormvariate(0.0, self.jitter)
+
+        latency = record.get("latency", 0.0) * scale
+        streamed = max(record.get("duration", 0.0) * scale - latency, 0.0)
+        return latency, streamed / max(len(self._chunks(record)) - 1, 1)
+
+    @staticmethod
+    def _chunks(record: Dict[str, Any]) -> List[AIMessageChunk]:
+        """
+        Split a recorded response into streamed chunks.
+
+        Text is split into words, so it streams like a live response; tool
+        calls and token usage arrive with the last chunk.
+
+        Args:
+            record: The recorded response.
+
+        Returns:
+            List[AIMessageChunk]: Chunks adding up to the response.
+        """
+        content = record.get("content", "")
+        if isinstance(content, str):
+            chunks = [
+                AIMessageChunk(content=text)
+                for text in re.findall(r"\S+\s*|\s+", content)
+            ]
+        else:
+            chunks = [AIMessageChunk(content=content)]
+
+        tool_call_chunks = [
+            {
+                "name": tool_call["name"],
+                "args": json.dumps(tool_call["args"]),
+                "id": tool_call.get("id"),
+                "index": index,
+            }
+            for index, tool_call in enumerate(record.get("tool_calls") or [])
+        ]
+        last = AIMessageChunk(
+            content="",
+            tool_call_chunks=tool_call_chunks,
+            usage_metadata=record.get("usage_metadata"),
+        )
+        if tool_call_chunks or last.usage_metadata or not chunks:
+            chunks.append(last)
+        return chunks
+
+    @staticmethod
+    def _message(record: Dict[str, Any]) -> AIMessage:
+        """
+        Build the message of a recorded response.
+
+        Args:
+            record: The recorded response.
+
+        Returns:
+            AIMessage: The response with its tool calls and token usage.
+        """
+        return AIMessage(
+            content=record.get("content", ""),
+            tool_calls=record.get("tool_calls") or [],
+            usage_metadata=record.get("usage_metadata"),
+        )
+
+
+def create_replay_model(
+    *,
+    temperature: float,
+    max_tokens: int = 8000,
+    streaming: Optional[bool] = False,
+    stream_usage: Optional[bool] = True,
+    top_k: Optional[int] = None,
+    top_p: Optional[float] = None,
+) -> ReplayChatModel:
+    """
+    Replay counterpart of `create_anthropic_model`, taking the same arguments.
+
+    Token usage is replayed as recorded, so `stream_usage` has no effect.
+    """
+    return ReplayChatModel(
+        store=replay_store,
+        model=settings.model_tiers.MODEL_TIER_MODELS["large"],
+        temperature=temperature,
+        max_tokens=max_tokens,
+        streaming=bool(streaming),
+        top_k=top_k,
+        top_p=top_p,
+        time_scale=settings.replay.REPLAY_TIME_SCALE,
+        jitter=settings.replay.REPLAY_JITTER,
+        seed=settings.replay.REPLAY_SEED,
+    )
+
+
+# Recorded responses shared by the recorder and the replay models
+replay_store = ReplayStore(path=Path(settings.replay.REPLAY_PATH))
+
+# Recorder attached to the live models in record mode
+replay_recorder = ReplayRecorder(replay_store)
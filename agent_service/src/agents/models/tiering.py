@@ -0,0 +1,271 @@
+"""
+Model tiering module.
+
+This module lets every node run on a model tier of its own. The shared
+models of `agents/models/anthropic_.py` are the large tier; nodes mapped to
+another tier in `MODEL_TIER_NODES`, typically the one-word classifiers, the
+routers, and the summarizers, call a smaller and faster model with the same
+sampling parameters instead.
+
+A node on a smaller tier escalates to its large model when the smaller one
+fails or its output does not validate: a classifier answering outside of its
+labels, a structured output that did not parse, or an empty response. Calls
+whose tokens are streamed to the client never escalate, since the client
+would receive the answers of both tiers. Every
+call records the tier that served it, and whether it was escalated.
+
+Tiers are mapped by node name, the class name of the graph nodes and the
+names of the summarization chains, so routing can be tiered down without
+touching the code generators, which need the large tier and its output
+limit.
+
+Classes:
+    OutputValidationError: Output of a smaller tier that fails validation.
+    ModelTierStats: Aggregates the calls served by every tier, by node.
+
+Functions:
+    tier_of: Return the tier a node is mapped to.
+    tier_model: Return the variant of a model for a tier.
+    tiered_chain: Build a prompt → model chain on the tier of a node.
+
+Instances:
+    model_tier_stats: Process-wide model tier statistics.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+from core.config import settings
+from agents.models.caching import with_prompt_cache
+
+# Tier of the shared models every other tier escalates to
+LARGE_TIER = "large"
+
+# Variants of the shared models, by model identity and tier
+_tier_models: Dict[Tuple[int, str], Runnable] = {}
+_tier_models_lock = threading.Lock()
+
+
+class OutputValidationError(ValueError):
+    """
+    Output of a smaller tier that fails validation, escalated to the large tier.
+    """
+
+
+@dataclass
+class ModelTierStats:
+    """
+    Aggregates the calls served by every tier, by node.
+    """
+
+    _nodes: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, node: str, tier: str, escalated: bool) -> None:
+        """
+        Count a call served by a tier.
+
+        Args:
+            node: Name of the node.
+            tier: Tier that served the call.
+            escalated: Whether a smaller tier failed first.
+        """
+        with self._lock:
+            counters = self._nodes.setdefault(node, {"escalations": 0})
+            counters[tier] = counters.get(tier, 0) + 1
+            counters["escalations"] += escalated
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return the calls served by every tier.
+
+        Returns:
+            Dict[str, Any]: Calls per tier and escalations, overall and per
+            node, and the tier every tiered node is mapped to.
+        """
+        with self._lock:
+            nodes = {node: dict(counters) for node, counters in self._nodes.items()}
+        total: Dict[str, int] = {}
+        for counters in nodes.values():
+            for name, count in counters.items():
+                total[name] = total.get(name, 0) + count
+        return {
+            "total": total,
+            "nodes": nodes,
+            "tiers": dict(settings.model_tiers.MODEL_TIER_NODES),
+        }
+
+
+def tier_of(node: str) -> str:
+    """
+    Return the tier a node is mapped to.
+
+    Args:
+        node: Name of the node.
+
+    Returns:
+        str: The configured tier, or the default tier.
+    """
+    return settings.model_tiers.MODEL_TIER_NODES.get(
+        node, settings.model_tiers.MODEL_TIER_DEFAULT
+    )
+
+
+def tier_model(model: Runnable, tier: str) -> Runnable:
+    """
+    Return the variant of a shared model for a tier.
+
+    The variant keeps the sampling parameters, token limit, and callbacks of
+    the model and only swaps the model name. Variants are created once per
+    model and tier, so they share their API clients across calls.
+
+    Args:
+        model: Shared model of the large tier.
+        tier: Tier of the variant.
+
+    Returns:
+        Runnable: The model itself for the large tier, or its variant.
+    """
+    if tier == LARGE_TIER:
+        return model
+
+    key = (id(model), tier)
+    with _tier_models_lock:
+        if key not in _tier_models:
+            _tier_models[key] = model.model_copy(
+                update={"model": settings.model_tiers.MODEL_TIER_MODELS[tier]}
+            )
+        return _tier_models[key]
+
+
+def _validate(
+    output: Any,
+    structured_output: Optional[Type[BaseModel]],
+    valid_outputs: Optional[Tuple[str, ...]],
+) -> Any:
+    """
+    Check the output of a smaller tier.
+
+    Args:
+        output: Output of the chain.
+        structured_output: Schema of a structured output, if any.
+        valid_outputs: Valid text outputs, if restricted.
+
+    Raises:
+        OutputValidationError: If the output does not validate.
+
+    Returns:
+        Any: The same output, with the surrounding whitespace of a label
+        stripped.
+    """
+    if structured_output is not None:
+        valid = isinstance(output, structured_output)
+    elif isinstance(output, BaseMessage) and isinstance(output.content, str):
+        if valid_outputs:
+            # Surrounding whitespace does not make a label invalid
+            output = output.model_copy(update={"content": output.content.strip()})
+            valid = output.content in valid_outputs
+        else:
+            valid = bool(output.content.strip())
+    else:
+        valid = output is not None
+    if not valid:
+        raise OutputValidationError(f"Invalid output: {output!r:.200}")
+    return output
+
+
+def _served(node: str, tier: str, escalated: bool = False) -> Runnable:
+    """
+    Return a pass-through step recording the tier that served a call.
+
+    Args:
+        node: Name of the node.
+        tier: Tier serving the call.
+        escalated: Whether a smaller tier failed first.
+
+    Returns:
+        Runnable: Identity step recording the call.
+    """
+
+    def record(output: Any) -> Any:
+        model_tier_stats.record(node, tier, escalated)
+        return output
+
+    async def arecord(output: Any) -> Any:
+        return record(output)
+
+    return RunnableLambda(record, afunc=arecord)
+
+
+def tiered_chain(
+    prompt: Runnable,
+    model: Runnable,
+    node: str,
+    structured_output: Optional[Type[BaseModel]] = None,
+    valid_outputs: Optional[Tuple[str, ...]] = None,
+) -> Runnable:
+    """
+    Build a prompt-caching prompt → model chain on the tier of a node.
+
+    Args:
+        prompt: Prompt template formatting the chain input.
+        model: Shared model of the large tier.
+        node: Name of the node, selecting its tier.
+        structured_output: Schema the output is parsed into, if any.
+        valid_outputs: Valid text outputs, checked before accepting the
+            output of a smaller tier.
+
+    Returns:
+        Runnable: Chain on the large tier, or on a smaller tier escalating
+        to the large one when its output fails validation, unless the call
+        is streamed.
+    """
+
+    def build(tier: str) -> Runnable:
+        tiered = tier_model(model, tier)
+        if structured_output is not None:
+            tiered = tiered.with_structured_output(structured_output)
+        return with_prompt_cache(prompt, tiered, node).with_config(
+            metadata={"tier": tier}
+        )
+
+    tier = tier_of(node)
+    if tier == LARGE_TIER:
+        return build(LARGE_TIER) | _served(node, LARGE_TIER)
+
+    chain = (
+        build(tier)
+        | RunnableLambda(
+            lambda output: _validate(output, structured_output, valid_outputs)
+        )
+        | _served(node, tier)
+    )
+    if not settings.model_tiers.MODEL_TIER_ESCALATION:
+        return chain
+    escalating = chain.with_fallbacks(
+        [build(LARGE_TIER) | _served(node, LARGE_TIER, escalated=True)]
+    )
+
+    # The tokens of a streamed call reach the client as they are generated,
+    # so escalating would stream the answers of both tiers: only calls made
+    # with streaming disabled escalate, streamed ones keep the smaller tier
+    streamed = build(tier) | _served(node, tier)
+
+    def route(inputs: Any, config: RunnableConfig) -> Runnable:
+        return (
+            streamed if config.get("metadata", {}).get("stream", True) else escalating
+        )
+
+    async def aroute(inputs: Any, config: RunnableConfig) -> Runnable:
+        return route(inputs, config)
+
+    return RunnableLambda(route, afunc=aroute, name=node)
+
+
+# Process-wide model tier statistics
+model_tier_stats = ModelTierStats()
@@ -25,8 +25,12 @@ from agents.nodes.base import BaseNode
 from agents.state import AgentState
 from agents.prompts.agent_mode_classification import AgentModeClassificationPrompt
 from agents.models.anthropic_ import low_temp_model
+from agents.models.budgeting import PromptBudgetRegistry
+from cache.response import response_cache_manager
 from agents.nodes.memory.retrieval import MemoryRetrievalNode
 from agents.nodes.summarization import SummarizationNode
+from services.summarization import summarization_service
+from core.lazy import LazyAttribute
 
 
 class AgentModeClassificationNode(BaseNode):
@@ -42,8 +46,54 @@ class AgentModeClassificationNode(BaseNode):
         - Query memory for the latest user preference summary.
         - Invoke the orchestration model with question + preferences.
         - Update `state.agent_mode` with the chosen operational mode.
+        - Submit the user preference summary before inferring the mode, so
+          both model calls run at once.
     """
 
+    @staticmethod
+    def _input(state: AgentState) -> dict:
+        """
+        Build the input of the mode classification chain, then submit the
+        user preference summary of the question.
+
+        Args:
+            state (AgentState): The current agent state.
+
+        Returns:
+            dict: Input of the mode classification chain.
+        """
+        # Read the summaries before the current question is summarized into them
+        inputs = {
+            "question": state.question,
+            "user_preferences_summary": state.user_preferences_summary,
+        }
+
+        # Summarize user preferences in the background while inferring the mode
+        SummarizationNode.user_preferences_summarization(
+            state, state.question, state.user_preferences_summary
+        )
+
+        return inputs
+
+    @staticmethod
+    def _apply(state: AgentState, agent_mode: str) -> AgentState:
+        """
+        Store the inferred mode in the agent state.
+
+        Args:
+            state (AgentState): The current agent state.
+            agent_mode (str): Mode inferred by the model.
+
+        Returns:
+            AgentState: The updated state.
+        """
+        state.agent_mode = agent_mode
+
+        print("MODE:", state.agent_mode)
+        print("USER PREFERENCES:", state.user_preferences_summary, "\n\n")
+
+        return state
+
     @override
     def invoke(self, state: AgentState):
         """
@@ -75,21 +125,41 @@ class AgentModeClassificationNode(BaseNode):
         MemoryRetrievalNode.get_user_preferences_summary(state)
 
         # Invoke model and update stat
-        state.agent_mode = self._chain.invoke(
-            {
-                "question": state.question,
-                "user_preferences_summary": state.user_preferences_summary,
-            },
-            config={"metadata": {"stream": False}},
+        agent_mode = self._chain.invoke(
+            self._input(state), config={"metadata": {"stream": False}}
         ).content
-        
-        # Summarize user preferences
-        SummarizationNode.user_preferences_summarization(state, state.question, state.user_preferences_summary)
+        return self._apply(state, agent_mode)
 
-        print("MODE:", state.agent_mode)
-        print("USER PREFERENCES:", state.user_preferences_summary, "\n\n")
+    @override
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously determine the agent’s mode.
 
-        return state
+        The user preference summary is submitted to the background first,
+        so it is computed while the mode is inferred.
+
+        Args:
+            state (AgentState): The current agent state, containing the
+                                user’s question and storage for orchestration
+                                results.
+
+        Returns:
+            AgentState: The state with `agent_mode` updated.
+        """
+
+        print("* AgentModeClassificationNode -> ")
+
+        # Retrieve preferences from memory
+        await MemoryRetrievalNode.aget_user_preferences_summary(state)
+
+        # Invoke model and update stat
+        agent_mode = (
+            await self._chain.ainvoke(
+                await summarization_service.acall(self._input, state),
+                config={"metadata": {"stream": False}},
+            )
+        ).content
+        return self._apply(state, agent_mode)
 
 
 class AgentModeClassificationNodeRegistry:
@@ -106,6 +176,12 @@ class AgentModeClassificationNodeRegistry:
                                           mode inference.
     """
 
-    UNIFIED: AgentModeClassificationNode = AgentModeClassificationNode(
-        model=low_temp_model, prompt=AgentModeClassificationPrompt.UNIFIED
+    UNIFIED: AgentModeClassificationNode = LazyAttribute(
+        lambda: AgentModeClassificationNode(
+            model=low_temp_model,
+            prompt=AgentModeClassificationPrompt.UNIFIED,
+            valid_outputs=("TECHNICAL", "QUICK"),
+            response_cache=response_cache_manager,
+            prompt_budget=PromptBudgetRegistry.ROUTING,
+        )
     )
@@ -7,17 +7,22 @@ Core responsibilities:
     - Use a language model to propose a structured analysis action plan.
     - Incorporate the current analysis summary and the first subtask
       as input context.
+    - Reuse the plan drafted while the task was still being decomposed.
     - Provide preconfigured node instances for different agent modes
       (technical vs. quick analysis).
 """
 
-from typing import override
+from typing import Any, Dict, override
 
 from agents.nodes.base import BaseNode
 from agents.state import AgentState
 from agents.prompts.analysis.action_planing import AnalysisActionPlaningPrompt
 from agents.models.anthropic_ import medium_temp_model
+from agents.models.budgeting import PromptBudgetRegistry
 from agents.nodes.memory.retrieval import MemoryRetrievalNode
+from agents.nodes.task.speculation import astream_text, speculation_store
+from services.summarization import summarization_service
+from core.lazy import LazyAttribute
 
 
 class AnalysisActionPlaningNode(BaseNode):
@@ -32,6 +37,41 @@ class AnalysisActionPlaningNode(BaseNode):
                         prompt, and output handling logic.
     """
 
+    @staticmethod
+    def _input(state: AgentState) -> Dict[str, Any]:
+        """
+        Build the input of the planning chain.
+
+        Args:
+            state: The current agent state, with the summary resolved.
+
+        Returns:
+            Dict[str, Any]: The first subtask and prior analysis summary.
+        """
+        return {
+            "subtask": state.subtasks[0],
+            "analysis_summary": state.analysis_summary,
+        }
+
+    @staticmethod
+    def _apply(state: AgentState, plan: str) -> AgentState:
+        """
+        Store the analysis action plan and record it in memory.
+
+        Args:
+            state: The current agent state.
+            plan: The analysis action plan.
+
+        Returns:
+            AgentState: The updated state.
+        """
+        state.analysis_action_plan = plan
+
+        # Record analysis plan in memory for conversation history
+        MemoryRetrievalNode.add_answer(state, state.analysis_action_plan)
+
+        return state
+
     @override
     def invoke(self, state: AgentState):
         """
@@ -48,17 +88,74 @@ class AnalysisActionPlaningNode(BaseNode):
         """
 
         print("* AnalysisActionPlaningNode -> ")
+
+        # Wait for the summary of the previous subtasks, if still running
+        summarization_service.resolve(state, "analysis_summary")
+
         print("ANALYSIS SUMMARY:", state.analysis_summary, "\n\n")
 
         # Use the first subtask and prior analysis summary to guide action planning
-        state.analysis_action_plan = self._chain.invoke(
-            {"subtask": state.subtasks[0], "analysis_summary": state.analysis_summary}
-        ).content
+        plan = self._chain.invoke(self._input(state)).content
+        return self._apply(state, plan)
 
-        # Record analysis plan in memory for conversation history
-        MemoryRetrievalNode.add_answer(state, state.analysis_action_plan)
+    @override
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously run the analysis action planning process on the current
+        agent state.
 
-        return state
+        Args:
+            state: The current state of the agent, which includes:
+                - subtasks: A list of subtasks derived from decomposition.
+                - analysis_summary: A summary of prior analytical steps.
+
+        Returns:
+            AgentState: The updated state object with the `analysis_action_plan`
+            attribute populated based on the generated plan.
+        """
+
+        print("* AnalysisActionPlaningNode -> ")
+
+        inputs = await self.ainputs(state)
+
+        print("ANALYSIS SUMMARY:", state.analysis_summary, "\n\n")
+
+        # Use the plan drafted while the task was still being decomposed, if
+        # any; it was not streamed, so it is sent in one piece
+        plan = await speculation_store.aclaim(self, state, inputs)
+        if plan is not None:
+            await astream_text(plan)
+        else:
+            plan = await self.aplan(inputs)
+        return self._apply(state, plan)
+
+    async def ainputs(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Wait for the summary the planning reads and return its inputs.
+
+        Args:
+            state: The current agent state.
+
+        Returns:
+            Dict[str, Any]: The first subtask and prior analysis summary.
+        """
+        # Wait for the summary of the previous subtasks, if still running
+        await summarization_service.aresolve(state, "analysis_summary")
+
+        return self._input(state)
+
+    async def aplan(self, inputs: Dict[str, Any]) -> str:
+        """
+        Plan an analysis subtask with the language model.
+
+        Args:
+            inputs: The first subtask and prior analysis summary.
+
+        Returns:
+            str: The analysis action plan.
+        """
+        # Use the first subtask and prior analysis summary to guide action planning
+        return (await self._chain.ainvoke(inputs)).content
 
 
 class AnalysisActionPlaningNodeRegistry:
@@ -78,11 +175,19 @@ class AnalysisActionPlaningNodeRegistry:
     """
 
     # Node for detailed technical action planning
-    TECHNICAL_MODE: AnalysisActionPlaningNode = AnalysisActionPlaningNode(
-        model=medium_temp_model, prompt=AnalysisActionPlaningPrompt.TECHNICAL_MODEL
+    TECHNICAL_MODE: AnalysisActionPlaningNode = LazyAttribute(
+        lambda: AnalysisActionPlaningNode(
+            model=medium_temp_model,
+            prompt=AnalysisActionPlaningPrompt.TECHNICAL_MODEL,
+            prompt_budget=PromptBudgetRegistry.PLANNING,
+        )
     )
 
     # Node for quick and lightweight action planning
-    QUICK_ANALYSIS_MODE: AnalysisActionPlaningNode = AnalysisActionPlaningNode(
-        model=medium_temp_model, prompt=AnalysisActionPlaningPrompt.QUICK_ANALYSIS_MODE
+    QUICK_ANALYSIS_MODE: AnalysisActionPlaningNode = LazyAttribute(
+        lambda: AnalysisActionPlaningNode(
+            model=medium_temp_model,
+            prompt=AnalysisActionPlaningPrompt.QUICK_ANALYSIS_MODE,
+            prompt_budget=PromptBudgetRegistry.PLANNING,
+        )
     )
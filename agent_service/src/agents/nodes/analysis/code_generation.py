@@ -18,7 +18,9 @@ from agents.nodes.base import BaseNode
 from agents.state import AgentState
 from agents.prompts.analysis.code_generation import AnalysisCodeGenerationPrompt
 from agents.models.anthropic_ import code_generation_model
+from agents.models.budgeting import PromptBudgetRegistry
 from agents.nodes.memory.retrieval import MemoryRetrievalNode
+from core.lazy import LazyAttribute
 
 
 class AnalysisCodeGenerationNode(BaseNode):
@@ -37,6 +39,45 @@ class AnalysisCodeGenerationNode(BaseNode):
 
     ...
 
+    @staticmethod
+    def _input(state: AgentState) -> dict:
+        """
+        Build the input of the code generation chain.
+
+        Args:
+            state: The current agent state, with the memory context retrieved.
+
+        Returns:
+            dict: The session context and the action plan.
+        """
+        return {
+            "dependencies": state.dependencies,
+            "dataset_summary": state.dataset_summary,
+            "code_summary": state.code_summary,
+            "variables": state.variables.keys(),
+            "analysis_action_plan": state.analysis_action_plan,
+            "custom_data": state.question,
+        }
+
+    @staticmethod
+    def _apply(state: AgentState, code: str) -> AgentState:
+        """
+        Store the generated code and record it in memory.
+
+        Args:
+            state: The current agent state.
+            code: The generated code.
+
+        Returns:
+            AgentState: The updated state.
+        """
+        state.code = code
+
+        # Record the generated code in memory for tracking
+        MemoryRetrievalNode.add_answer(state, state.code)
+
+        return state
+
     @override
     def invoke(self, state: AgentState):
         """
@@ -62,21 +103,36 @@ class AnalysisCodeGenerationNode(BaseNode):
         MemoryRetrievalNode.get_variables(state)
 
         # Generate new analysis code based on dependencies, dataset, variables, and plan
-        state.code = self._chain.invoke(
-            {
-                "dependencies": state.dependencies,
-                "dataset_summary": state.dataset_summary,
-                "code_summary": state.code_summary,
-                "variables": state.variables.keys(),
-                "analysis_action_plan": state.analysis_action_plan,
-                "custom_data": state.question,
-            }
-        ).content
+        code = self._chain.invoke(self._input(state)).content
+        return self._apply(state, code)
 
-        # Record the generated code in memory for tracking
-        MemoryRetrievalNode.add_answer(state, state.code)
+    @override
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously generate analysis code for the current subtask and
+        update memory.
 
-        return state
+        Args:
+            state: The current state of the agent, which includes:
+                - dependencies: List of required library imports or dependencies.
+                - dataset_summary: Summary of the dataset.
+                - code_summary: Summary of previously generated code.
+                - variables: Variables and their descriptions.
+                - analysis_action_plan: Planned steps for analysis.
+
+        Returns:
+            AgentState: The state with the generated code in `state.code`.
+        """
+
+        print("* AnalysisCodeGenerationModel -> ")
+
+        # Retrieve previous code summaries and variables from memory
+        await MemoryRetrievalNode.aget_code_summary(state)
+        await MemoryRetrievalNode.aget_variables(state)
+
+        # Generate new analysis code based on dependencies, dataset, variables, and plan
+        code = (await self._chain.ainvoke(self._input(state))).content
+        return self._apply(state, code)
 
 
 class AnalysisCodeGenerationNodeRegistry:
@@ -95,12 +151,19 @@ class AnalysisCodeGenerationNodeRegistry:
     """
 
     # Node for detailed technical code generation
-    TECHNICAL_MODE: AnalysisCodeGenerationNode = AnalysisCodeGenerationNode(
-        model=code_generation_model, prompt=AnalysisCodeGenerationPrompt.TECHNICAL_MODE
+    TECHNICAL_MODE: AnalysisCodeGenerationNode = LazyAttribute(
+        lambda: AnalysisCodeGenerationNode(
+            model=code_generation_model,
+            prompt=AnalysisCodeGenerationPrompt.TECHNICAL_MODE,
+            prompt_budget=PromptBudgetRegistry.CODE,
+        )
     )
 
     # Node for quick and lightweight code generation
-    QUICK_ANALYSIS_MODE: AnalysisCodeGenerationNode = AnalysisCodeGenerationNode(
-        model=code_generation_model,
-        prompt=AnalysisCodeGenerationPrompt.QUICK_ANALYSIS_MODE,
+    QUICK_ANALYSIS_MODE: AnalysisCodeGenerationNode = LazyAttribute(
+        lambda: AnalysisCodeGenerationNode(
+            model=code_generation_model,
+            prompt=AnalysisCodeGenerationPrompt.QUICK_ANALYSIS_MODE,
+            prompt_budget=PromptBudgetRegistry.CODE,
+        )
     )
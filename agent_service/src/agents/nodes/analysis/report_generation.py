@@ -19,8 +19,11 @@ from agents.nodes.base import BaseNode
 from agents.state import AgentState
 from agents.prompts.analysis.report_generation import AnalysisReportGenerationPrompt
 from agents.models.anthropic_ import high_temp_model
+from agents.models.budgeting import PromptBudgetRegistry
 from agents.nodes.summarization import SummarizationNode
+from services.summarization import summarization_service
 from agents.nodes.memory.retrieval import MemoryRetrievalNode
+from core.lazy import LazyAttribute
 
 
 class AnalysisReportGenerationNode(BaseNode):
@@ -62,6 +65,51 @@ class AnalysisReportGenerationNode(BaseNode):
 
         return "\n".join(lines)
 
+    @classmethod
+    def _input(cls, state: AgentState) -> dict:
+        """
+        Build the input of the report generation chain.
+
+        Args:
+            state: The current agent state.
+
+        Returns:
+            dict: The question, the formatted raw report, and the action plan.
+        """
+        # Format raw analysis report for clarity
+        analysis_report = cls._parse_analysis_report(state.analysis_report)
+
+        return {
+            "question": state.question,
+            "analysis_report": analysis_report,
+            "analysis_action_plan": state.analysis_action_plan,
+        }
+
+    @staticmethod
+    def _apply(state: AgentState, generated_report: str) -> AgentState:
+        """
+        Summarize and record the generated report and complete the subtask.
+
+        Args:
+            state: The current agent state.
+            generated_report: The generated report.
+
+        Returns:
+            AgentState: The updated state.
+        """
+        # Update agent's analysis summary
+        SummarizationNode.analysis_summarization(
+            state, generated_report, state.analysis_summary
+        )
+
+        # Record the generated report in memory for conversation history
+        MemoryRetrievalNode.add_answer(state, generated_report)
+
+        # Remove the completed subtask from the queue
+        state.subtasks.popleft()
+
+        return state
+
     @override
     def invoke(self, state: AgentState):
         """
@@ -80,30 +128,33 @@ class AnalysisReportGenerationNode(BaseNode):
 
         print("* AnalysisReportGenerationNode -> ")
 
-        # Format raw analysis report for clarity
-        analysis_report = self._parse_analysis_report(state.analysis_report)
-
         # Generate a polished report using the model chain
-        generated_report = self._chain.invoke(
-            {
-                "question": state.question,
-                "analysis_report": analysis_report,
-                "analysis_action_plan": state.analysis_action_plan,
-            }
-        ).content
+        generated_report = self._chain.invoke(self._input(state)).content
+        return self._apply(state, generated_report)
 
-        # Update agent's analysis summary
-        SummarizationNode.analysis_summarization(
-            state, generated_report, state.analysis_summary
-        )
+    @override
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously generate a human-readable analysis report and update the
+        agent state.
 
-        # Record the generated report in memory for conversation history
-        MemoryRetrievalNode.add_answer(state, generated_report)
+        Args:
+            state: The current state of the agent, which includes:
+                - question: The user’s original query.
+                - analysis_report: Raw analysis report steps.
+                - analysis_action_plan: Planned analysis steps.
+                - analysis_summary: Existing summary of analysis.
 
-        # Remove the completed subtask from the queue
-        state.subtasks.popleft()
+        Returns:
+            AgentState: The state with the summary submitted, the report
+            recorded, and the completed subtask removed.
+        """
 
-        return state
+        print("* AnalysisReportGenerationNode -> ")
+
+        # Generate a polished report using the model chain
+        generated_report = (await self._chain.ainvoke(self._input(state))).content
+        return await summarization_service.acall(self._apply, state, generated_report)
 
 
 class AnalysisReportGenerationNodeRegistry:
@@ -120,11 +171,19 @@ class AnalysisReportGenerationNodeRegistry:
     """
 
     # Node for detailed technical analysis report generation
-    TECHNICAL_MODE: AnalysisReportGenerationNode = AnalysisReportGenerationNode(
-        model=high_temp_model, prompt=AnalysisReportGenerationPrompt.TECHNICAL_MODE
+    TECHNICAL_MODE: AnalysisReportGenerationNode = LazyAttribute(
+        lambda: AnalysisReportGenerationNode(
+            model=high_temp_model,
+            prompt=AnalysisReportGenerationPrompt.TECHNICAL_MODE,
+            prompt_budget=PromptBudgetRegistry.REPORT,
+        )
     )
 
     # Node for quick and lightweight analysis report generation
-    QUICK_ANALYSIS_MODE: AnalysisReportGenerationNode = AnalysisReportGenerationNode(
-        model=high_temp_model, prompt=AnalysisReportGenerationPrompt.QUICK_ANALYSIS_MODE
+    QUICK_ANALYSIS_MODE: AnalysisReportGenerationNode = LazyAttribute(
+        lambda: AnalysisReportGenerationNode(
+            model=high_temp_model,
+            prompt=AnalysisReportGenerationPrompt.QUICK_ANALYSIS_MODE,
+            prompt_budget=PromptBudgetRegistry.REPORT,
+        )
     )
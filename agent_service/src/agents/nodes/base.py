@@ -9,14 +9,24 @@ optionally enforcing structured output via Pydantic models.
 Responsibilities:
     - Combine prompts and models into executable chains.
     - Support structured or unstructured model outputs.
+    - Mark the static system prompt as cacheable and account for the
+      prompt cache usage of every node.
+    - Run every node on its configured model tier, escalating to the large
+      model when the output of a smaller one does not validate.
+    - Optionally trim the prompt inputs of a node to its token budget.
+    - Optionally serve the responses of deterministic nodes from a
+      response cache.
     - Provide a consistent base class for agent graph nodes.
 
+The node registries declare their nodes as `LazyAttribute`s, so the chains
+of a node are only built when a graph using it is compiled.
+
 This design enforces modularity and reusability when constructing AI-driven
 agent workflows, enabling consistent interaction with memory and execution logic.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Any, Type
+from typing import Optional, Any, Tuple, Type
 
 
 from pydantic import BaseModel, PrivateAttr, ConfigDict
@@ -24,6 +34,9 @@ from langchain_core.runnables import Runnable
 from langchain.prompts import ChatPromptTemplate
 
 from agents.state import AgentState
+from agents.models.tiering import tier_model, tier_of, tiered_chain
+from agents.models.budgeting import PromptBudget, with_prompt_budget
+from cache.response import ResponseCacheManager
 
 
 class BaseNode(ABC, BaseModel):
@@ -39,13 +52,21 @@ class BaseNode(ABC, BaseModel):
     the prompt with the model, with or without structured output.
 
     Subclasses must implement the `invoke` method to define
-    how the node processes an `AgentState`.
+    how the node processes an `AgentState`, and its `ainvoke`
+    counterpart awaiting the chain, which the agent graphs register
+    so model calls do not hold a thread while they wait.
 
     Attributes:
         model: The underlying model to execute.
         prompt: Prompt used to format input.
         structured_output: Optional Pydantic model
             for enforcing structured output validation.
+        valid_outputs: Optional valid text outputs of the node, which the
+            output of a smaller model tier must match to be accepted.
+        response_cache: Optional cache the text responses of the node are
+            served from, for nodes whose output depends only on their prompt.
+        prompt_budget: Optional token budgets the prompt inputs of the node
+            are trimmed to.
         _chain: Private composed execution chain.
     """
 
@@ -54,6 +75,9 @@ class BaseNode(ABC, BaseModel):
     model: Runnable
     prompt: ChatPromptTemplate
     structured_output: Optional[Type[BaseModel]] = None
+    valid_outputs: Optional[Tuple[str, ...]] = None
+    response_cache: Optional[ResponseCacheManager] = None
+    prompt_budget: Optional[PromptBudget] = None
 
     _chain: Runnable = PrivateAttr()
 
@@ -63,16 +87,35 @@ class BaseNode(ABC, BaseModel):
 
         If `structured_output` is provided, the chain enforces structured
         model responses via a Pydantic schema. Otherwise, a standard
-        prompt → model chain is used.
+        prompt → model chain is used. In both cases the system prompt is
+        sent as a cacheable prefix, the model runs on the tier configured
+        for the node, and cache usage and the serving tier are recorded
+        under the node class name, as are the tokens of the prompt inputs
+        when a prompt budget is set.
 
         Args:
             __context (Any): Initialization context (unused but required by Pydantic).
         """
-        if self.structured_output is None:
-            self._chain = self.prompt | self.model
-        else:
-            self._chain = self.prompt | self.model.with_structured_output(
-                self.structured_output
+        self._chain = tiered_chain(
+            self.prompt,
+            self.model,
+            type(self).__name__,
+            self.structured_output,
+            self.valid_outputs,
+        )
+
+        if self.prompt_budget is not None:
+            self._chain = with_prompt_budget(
+                self._chain, self.prompt_budget, type(self).__name__
+            )
+
+        # Responses are cached per tier, under the model first serving them
+        if self.response_cache is not None:
+            self._chain = self.response_cache.wrap(
+                self._chain,
+                type(self).__name__,
+                tier_model(self.model, tier_of(type(self).__name__)),
+                self.prompt,
             )
 
     @abstractmethod
@@ -90,3 +133,19 @@ class BaseNode(ABC, BaseModel):
             Any: The result of executing the node (implementation-specific).
         """
         ...
+
+    @abstractmethod
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously execute the node's logic on the given state.
+
+        Subclasses must implement this method with the same behavior as
+        `invoke`, awaiting the chain instead of blocking on it.
+
+        Args:
+            state (AgentState): The current agent execution state.
+
+        Returns:
+            Any: The result of executing the node (implementation-specific).
+        """
+        ...
@@ -16,7 +16,10 @@ from agents.nodes.base import BaseNode
 from agents.state import AgentState
 from agents.prompts.code_debagging import CodeDebuggingPrompt
 from agents.models.anthropic_ import code_debugging_model
+from agents.models.budgeting import PromptBudgetRegistry
 from agents.nodes.memory.retrieval import MemoryRetrievalNode
+from services.summarization import summarization_service
+from core.lazy import LazyAttribute
 
 
 class CodeDebuggingNode(BaseNode):
@@ -33,6 +36,49 @@ class CodeDebuggingNode(BaseNode):
                         prompt, and output handling logic.
     """
 
+    @staticmethod
+    def _input(state: AgentState) -> dict:
+        """
+        Build the input of the debugging chain.
+
+        Args:
+            state: The current agent state, with the code summary resolved.
+
+        Returns:
+            dict: The subtask, the failing code, its error, and the session context.
+        """
+        return {
+            "question": state.subtasks[0],
+            "dependencies": state.dependencies,
+            "dataset_summary": state.dataset_summary,
+            "code": state.code,
+            "error_message": state.error_message,
+            "code_summary": state.code_summary,
+            "variables": state.variables.keys(),
+        }
+
+    @staticmethod
+    def _apply(state: AgentState, code: str) -> AgentState:
+        """
+        Store the corrected code, count the attempt, and record the code.
+
+        Args:
+            state: The current agent state.
+            code: The corrected code.
+
+        Returns:
+            AgentState: The updated state.
+        """
+        state.code = code
+
+        # Increment the debugging attempt counter
+        state.current_debugging_attempt = state.current_debugging_attempt + 1
+
+        # Record the updated code in memory for tracking
+        MemoryRetrievalNode.add_answer(state, state.code)
+
+        return state
+
     @override
     def invoke(self, state: AgentState):
         """
@@ -53,26 +99,40 @@ class CodeDebuggingNode(BaseNode):
 
         print("* CodeDebaggingNode -> ")
 
+        # Wait for the summary of the previously executed code, if still running
+        summarization_service.resolve(state, "code_summary")
+
         # Generate corrected code based on current code, error message, and context
-        state.code = self._chain.invoke(
-            {
-                "question": state.subtasks[0],
-                "dependencies": state.dependencies,
-                "dataset_summary": state.dataset_summary,
-                "code": state.code,
-                "error_message": state.error_message,
-                "code_summary": state.code_summary,
-                "variables": state.variables.keys(),
-            }
-        ).content
+        code = self._chain.invoke(self._input(state)).content
+        return self._apply(state, code)
 
-        # Increment the debugging attempt counter
-        state.current_debugging_attempt = state.current_debugging_attempt + 1
+    @override
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously perform code debugging on the current agent state and
+        update memory.
 
-        # Record the updated code in memory for tracking
-        MemoryRetrievalNode.add_answer(state, state.code)
+        Args:
+            state: The current state of the agent, which includes:
+                - question: The user’s original query or description of the task.
+                - code: The current code snippet to be debugged.
+                - error_message: Error message received from code execution.
+                - code_summary: Summary of previously generated code.
+                - variables: Variables and their descriptions.
 
-        return state
+        Returns:
+            AgentState: The state with the corrected code and the debugging
+            attempt counter incremented.
+        """
+
+        print("* CodeDebaggingNode -> ")
+
+        # Wait for the summary of the previously executed code, if still running
+        await summarization_service.aresolve(state, "code_summary")
+
+        # Generate corrected code based on current code, error message, and context
+        code = (await self._chain.ainvoke(self._input(state))).content
+        return self._apply(state, code)
 
 
 class CodeDebaggingNodeRegistry:
@@ -86,6 +146,10 @@ class CodeDebaggingNodeRegistry:
     """
 
     # Preconfigured node for unified code debuggings
-    UNIFIED: CodeDebuggingNode = CodeDebuggingNode(
-        model=code_debugging_model, prompt=CodeDebuggingPrompt.UNIFIED
+    UNIFIED: CodeDebuggingNode = LazyAttribute(
+        lambda: CodeDebuggingNode(
+            model=code_debugging_model,
+            prompt=CodeDebuggingPrompt.UNIFIED,
+            prompt_budget=PromptBudgetRegistry.CODE,
+        )
     )
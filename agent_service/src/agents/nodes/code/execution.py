@@ -1,20 +1,22 @@
 """
 This module defines the `CodeExecutionNode` class, responsible for executing Python
-code snippets within the AI agent system. It handles dependency imports, execution
-in a controlled context, variable extraction, error handling, and updating the
-agent state with results. It also integrates with the `SummarizationNode` to
-summarize executed code.
+code snippets within the AI agent system. It handles execution inside a warm,
+per-session kernel (in-process or in a worker pool), variable extraction, error
+handling, and updating the agent state with results. It also integrates with the
+`SummarizationNode` to summarize executed code.
 """
 
 import re
-import pickle
-import importlib
-from types import ModuleType
-from typing import Optional, List, Any
+from dataclasses import asdict
+from typing import Any, Dict, Optional
 
+from langchain.schema.runnable import RunnableLambda
 
 from agents.state import AgentState
 from agents.nodes.summarization import SummarizationNode
+from execution.base import ExecutionRequest, ExecutionResult, OutputChunk
+from services.execution import execution_service
+from services.summarization import summarization_service
 
 
 class CodeExecutionNode:
@@ -23,69 +25,127 @@ class CodeExecutionNode:
 
     Responsibilities:
         - Extract code from text (triple-backtick Python code blocks).
-        - Import dependencies dynamically.
-        - Execute code in a combined global and local context.
+        - Execute code in the warm kernel bound to the session and file
+          through the execution service, within the wall-clock and memory
+          budget of the agent mode.
         - Track variables that are pickle-serializable for later retrieval.
+        - Publish stdout, stderr, and progress output as graph events while
+          the code runs.
+        - Publish the resource usage of every execution as a profile event.
         - Update agent state with execution results, errors, and summaries.
+        - Await the execution in `ainvoke`, so the event loop keeps serving
+          other streams while the code runs.
     """
 
     @staticmethod
-    def _import_dependencies(dependencies: List[str]):
+    def _extract_code(message: str) -> Optional[str]:
         """
-        Dynamically import required Python packages.
+        Extract Python code from a triple-backtick code block in a message.
 
         Args:
-            dependencies: List of package/module names to import.
+            message: Text containing Python code wrapped in ```python ... ```.
 
         Returns:
-            dict: Mapping of package names to imported module objects.
+            Optional[str]: Extracted code if present; otherwise, None.
         """
-        imported_modules = {}
-        for package_name in dependencies:
-            try:
-                module = importlib.import_module(package_name)
-                imported_modules[package_name] = module
-            except Exception:
-                # Ignore import errors for missing packages
-                ...
-        return imported_modules
+        pattern = r"```python\s([\s\S]*?)```"
+        match = re.search(pattern, message.strip(), re.DOTALL)
+
+        if not match:
+            return None
+
+        text = match.group(1).strip()
+        return text
+
+    # Publish what they receive as graph events, tagged by the metadata of the call
+    output_model = RunnableLambda(asdict)
+    profile_model = RunnableLambda(lambda profile: profile)
 
     @staticmethod
-    def _is_pickle_serializable(obj: Any) -> bool:
+    def _profile(state: AgentState, result: ExecutionResult) -> Dict[str, Any]:
         """
-        Check if an object can be serialized with pickle.
+        Build the payload of the profile event of an execution.
 
         Args:
-            obj (Any): Object to test for pickle serialization.
+            state: The current agent state.
+            result: Outcome of the execution, carrying a profile.
 
         Returns:
-            bool: True if object can be pickled, False otherwise.
+            Dict[str, Any]: Resource usage of the execution and its subtask flow.
         """
-        try:
-            pickle.dumps(obj)
-            return True
-        except Exception:
-            return False
+        return {"subtask_flow": state.subtask_flow, **asdict(result.profile)}
 
     @staticmethod
-    def _extract_code(message: str) -> Optional[str]:
+    def _request(state: AgentState, code: Optional[str]) -> ExecutionRequest:
         """
-        Extract Python code from a triple-backtick code block in a message.
+        Build the execution request of the code, bounded by the budget of the agent mode.
 
         Args:
-            message: Text containing Python code wrapped in ```python ... ```.
+            state: The current agent state.
+            code: Code to execute.
 
         Returns:
-            Optional[str]: Extracted code if present; otherwise, None.
+            ExecutionRequest: Request for the warm kernel bound to the session and
+            file, or to the namespace of a subtask running in parallel.
         """
-        pattern = r"```python\s([\s\S]*?)```"
-        match = re.search(pattern, message.strip(), re.DOTALL)
+        budget = execution_service.budget(state.agent_mode)
+        return ExecutionRequest(
+            session_id=state.session_id,
+            file_name=state.file_name,
+            code=code,
+            dependencies=state.dependencies,
+            variables=state.variables,
+            snapshot=state.variable_snapshot,
+            generation=state.kernel_generation,
+            time_limit=budget.time_limit,
+            memory_limit=budget.memory_limit,
+            label=state.subtask_flow,
+            namespace=state.kernel_namespace,
+        )
 
-        if not match:
-            return None
+    @staticmethod
+    def _apply(
+        state: AgentState, code: Optional[str], result: ExecutionResult
+    ) -> AgentState:
+        """
+        Update the agent state with the outcome of an execution, shared by
+        `invoke` and `ainvoke` once the stream of the execution ended.
 
-        text = match.group(1).strip()
-        return text
+        Args:
+            state: The current agent state.
+            code: Executed code.
+            result: Outcome of the execution.
+
+        Returns:
+            AgentState: Updated state with executed variables, error messages, and summaries.
+        """
+        state.kernel_generation = result.generation
+
+        # Capture execution errors reported by the backend
+        if result.error is not None:
+            state.error_message = result.error
+            return state
+
+        # Take over the variables of the kernel and their pickled snapshot
+        state.variables = result.variables
+        state.variable_snapshot = result.snapshot
+
+        # Summarize executed code
+        SummarizationNode.code_summarization(
+            state, code, state.code_summary, state.variables
+        )
+
+        # Update subtask-specific outputs
+        if state.subtask_flow == "ANALYSIS":
+            state.analysis_report = state.variables.get("analysis_report")
+        elif state.subtask_flow == "VISUALIZATION":
+            state.visualization = state.variables.get("image")
+
+        # Clear previous error messages and reset debagging attemps counter
+        state.error_message = None
+        state.current_debugging_attempt = 0
+
+        return state
 
     @classmethod
     def invoke(cls, state: AgentState) -> AgentState:
@@ -98,6 +158,7 @@ class CodeExecutionNode:
                 - dependencies: Required Python packages.
                 - variables: Existing variables to include in execution.
                 - subtask_flow: Current subtask flow ("ANALYSIS" or "VISUALIZATION").
+                - agent_mode: Agent mode selecting the execution budget.
                 - code_summary: Previous code summaries.
 
         Returns:
@@ -109,46 +170,66 @@ class CodeExecutionNode:
         # Extract the Python code block from the state
         code = cls._extract_code(state.code)
 
-        # Prepare execution contexts
-        global_context = cls._import_dependencies(
-            state.dependencies
-        )  # Imported modules
+        try:
+            # Execute the code in the warm kernel bound to this session and file
+            for result in execution_service.stream(cls._request(state, code)):
+                # Forward output while the code runs; the final message is the result
+                if isinstance(result, OutputChunk):
+                    cls.output_model.invoke(
+                        result, config={"metadata": {"output": True}}
+                    )
+
+            # Emit the execution profile for clients that asked for it
+            if result.profile is not None:
+                cls.profile_model.invoke(
+                    cls._profile(state, result), config={"metadata": {"profile": True}}
+                )
+
+            cls._apply(state, code, result)
 
-        local_context = state.variables.copy()  # Existing variables
-        global_context.update(local_context)  # Merge contexts
+        except Exception as e:
+            # Capture any execution errors
+            state.error_message = f"{e}"
+
+        return state
+
+    @classmethod
+    async def ainvoke(cls, state: AgentState) -> AgentState:
+        """
+        Asynchronously execute the code from the agent state and update
+        variables, errors, and summaries.
+
+        Args:
+            state: The current state of the agent, as for `invoke`.
+
+        Returns:
+            AgentState: Updated state with executed variables, error messages, and summaries.
+        """
+
+        print("* CodeExecutionNode -> ")
+
+        # Extract the Python code block from the state
+        code = cls._extract_code(state.code)
 
         try:
-            # Execute the code in combined context
-            exec(code, global_context)
-
-            # Extract only pickle-serializable variables, ignoring modules and dependencies
-            variables = {
-                k: v
-                for k, v in global_context.items()
-                if k not in state.dependencies and not isinstance(v, ModuleType)
-                if cls._is_pickle_serializable(v)
-            }
-
-            state.variables = variables
-
-            # Summarize executed code
-            SummarizationNode.code_summarization(
-                state, code, state.code_summary, state.variables
-            )
-
-            # Update subtask-specific outputs
-            if state.subtask_flow == "ANALYSIS":
-                state.analysis_report = state.variables.get("analysis_report")
-            elif state.subtask_flow == "VISUALIZATION":
-                state.visualization = state.variables.get("image")
-
-            # Clear previous error messages and reset debagging attemps counter
-            state.error_message = None
-            state.current_debugging_attempt = 0
+            # Execute the code in the warm kernel bound to this session and file
+            async for result in execution_service.astream(cls._request(state, code)):
+                # Forward output while the code runs; the final message is the result
+                if isinstance(result, OutputChunk):
+                    await cls.output_model.ainvoke(
+                        result, config={"metadata": {"output": True}}
+                    )
+
+            # Emit the execution profile for clients that asked for it
+            if result.profile is not None:
+                await cls.profile_model.ainvoke(
+                    cls._profile(state, result), config={"metadata": {"profile": True}}
+                )
+
+            await summarization_service.acall(cls._apply, state, code, result)
 
         except Exception as e:
             # Capture any execution errors
             state.error_message = f"{e}"
 
-        finally:
-            return state
+        return state
@@ -0,0 +1,69 @@
+"""
+This module defines the `CodeValidationNode` class, responsible for statically
+validating generated Python code before it is executed. Syntax errors, undefined
+names, and missing DataFrame columns are reported as error messages right away,
+so they reach the debugging node without paying for an execution.
+"""
+
+from agents.state import AgentState
+from agents.nodes.code.execution import CodeExecutionNode
+from execution.validation import code_validator
+
+
+class CodeValidationNode:
+    """
+    Validates generated code against the session namespace and updates agent state.
+
+    Responsibilities:
+        - Extract code from text (triple-backtick Python code blocks).
+        - Compile the code and resolve the names it reads against the session
+          variables, dependency modules, and builtins.
+        - Check DataFrame columns read by the code against the live frames.
+        - Store the problems found as the error message for debugging.
+    """
+
+    @classmethod
+    def invoke(cls, state: AgentState) -> AgentState:
+        """
+        Validate the code from the agent state.
+
+        Args:
+            state: The current state of the agent, containing:
+                - code: Code snippet to validate.
+                - dependencies: Allowed Python packages.
+                - variables: Session variables the code will run with.
+
+        Returns:
+            AgentState: Updated state, with `error_message` set if the code
+                would fail and cleared otherwise.
+        """
+
+        print("* CodeValidationNode -> ")
+
+        # Extract the Python code block from the state
+        code = CodeExecutionNode._extract_code(state.code)
+
+        # Report every statically detectable failure at once
+        issues = code_validator.validate(code, state.variables, state.dependencies)
+        state.error_message = (
+            "\n".join(str(issue) for issue in issues) if issues else None
+        )
+
+        return state
+
+    @classmethod
+    async def ainvoke(cls, state: AgentState) -> AgentState:
+        """
+        Validate the code from the agent state in async graphs.
+
+        Validation is a short, CPU-bound check without I/O, so it runs
+        directly in the event loop.
+
+        Args:
+            state: The current state of the agent, as for `invoke`.
+
+        Returns:
+            AgentState: Updated state, with `error_message` set if the code
+                would fail and cleared otherwise.
+        """
+        return cls.invoke(state)
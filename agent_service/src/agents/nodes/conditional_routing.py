@@ -7,7 +7,7 @@ and debugging attempts.
 The routing functions encapsulate conditional branching for:
 - High-level task routing (advisory vs. solution flows).
 - Subtask classification (analysis vs. visualization).
-- Code execution success/failure with retry logic.
+- Static code validation and code execution success/failure with retry logic.
 - Report generation and visualization handling.
 - Direct responses and memory saving.
 
@@ -77,6 +77,26 @@ class ConditionalRoutingNode:
             return "visualization_action_planner"
         return "direct_responder"
 
+    @staticmethod
+    def routing_from_code_validator(state: AgentState):
+        """
+        Route after static code validation. Valid code is executed; code with
+        detectable errors goes straight to debugging without being run.
+
+        Args:
+            state (AgentState): The current agent state containing validation errors
+                                and debugging attempt counters.
+
+        Returns:
+            str: The identifier of the next node ("code_executor", "code_debugger",
+                 or "fallback_handler").
+        """
+        if state.error_message is None:
+            return "code_executor"
+        if state.current_debugging_attempt <= state.max_debugging_attempts:
+            return "code_debugger"
+        return "fallback_handler"
+
     @staticmethod
     def routing_from_code_executor(state: AgentState):
         """
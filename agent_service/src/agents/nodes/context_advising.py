@@ -5,7 +5,8 @@ system based on the current analysis and visualization summaries.
 
 Core responsibilities:
     - Use a language model to generate context-aware advice for the user’s question.
-    - Update the agent’s analysis summary with the generated advice.
+    - Update the agent’s analysis summary and pending context with the
+      generated advice in the background.
     - Record the generated advice in memory for future reference.
     - Provide preconfigured node instances for different agent modes
       (technical vs. quick analysis).
@@ -17,8 +18,11 @@ from agents.nodes.base import BaseNode
 from agents.state import AgentState
 from agents.prompts.context_advising import ContextAdvisingPrompt
 from agents.models.anthropic_ import high_temp_model
+from agents.models.budgeting import PromptBudgetRegistry
 from agents.nodes.summarization import SummarizationNode
+from services.summarization import summarization_service
 from agents.nodes.memory.retrieval import MemoryRetrievalNode
+from core.lazy import LazyAttribute
 
 
 class ContextAdvisingNode(BaseNode):
@@ -34,33 +38,36 @@ class ContextAdvisingNode(BaseNode):
                         prompt, and output handling logic.
     """
 
-    @override
-    def invoke(self, state: AgentState):
+    @staticmethod
+    def _input(state: AgentState) -> dict:
         """
-        Generate context-aware advice and update the agent state.
+        Build the input of the advising chain.
 
         Args:
-            state: The current state of the agent, which includes:
-                - question: The user’s original query.
-                - analysis_summary: Current analysis summary.
-                - visualization_summary: Current visualization summary.
+            state: The current agent state.
 
         Returns:
-            AgentState: The updated state with the generated advice included
-                        in the analysis summary and recorded in memory.
+            dict: The user question and prior summaries.
         """
-        print("* ContextAdvisingNode -> ")
+        return {
+            "question": state.question,
+            "analysis_summary": state.analysis_summary,
+            "visualization_summary": state.visualization_summary,
+            "pending_context": state.pending_context,
+        }
+
+    @staticmethod
+    def _apply(state: AgentState, context_advise: str) -> AgentState:
+        """
+        Summarize the generated advice and record it in memory.
 
-        # Generate contextual advice using the model chain
-        context_advise = self._chain.invoke(
-            {
-                "question": state.question,
-                "analysis_summary": state.analysis_summary,
-                "visualization_summary": state.visualization_summary,
-                "pending_context": state.pending_context,
-            }
-        ).content
+        Args:
+            state: The current agent state.
+            context_advise: The generated advice.
 
+        Returns:
+            AgentState: The updated state.
+        """
         # Update the analysis summary with the generated advice
         SummarizationNode.analysis_summarization(
             state, context_advise, state.analysis_summary
@@ -76,6 +83,48 @@ class ContextAdvisingNode(BaseNode):
 
         return state
 
+    @override
+    def invoke(self, state: AgentState):
+        """
+        Generate context-aware advice and update the agent state.
+
+        Args:
+            state: The current state of the agent, which includes:
+                - question: The user’s original query.
+                - analysis_summary: Current analysis summary.
+                - visualization_summary: Current visualization summary.
+
+        Returns:
+            AgentState: The updated state with the generated advice included
+                        in the analysis summary and recorded in memory.
+        """
+        print("* ContextAdvisingNode -> ")
+
+        # Generate contextual advice using the model chain
+        context_advise = self._chain.invoke(self._input(state)).content
+        return self._apply(state, context_advise)
+
+    @override
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously generate context-aware advice and update the agent state.
+
+        Args:
+            state: The current state of the agent, which includes:
+                - question: The user’s original query.
+                - analysis_summary: Current analysis summary.
+                - visualization_summary: Current visualization summary.
+
+        Returns:
+            AgentState: The updated state with the generated advice included
+                        in the analysis summary and recorded in memory.
+        """
+        print("* ContextAdvisingNode -> ")
+
+        # Generate contextual advice using the model chain
+        context_advise = (await self._chain.ainvoke(self._input(state))).content
+        return await summarization_service.acall(self._apply, state, context_advise)
+
 
 class ContextAdvisingNodeRegistry:
     """
@@ -91,11 +140,19 @@ class ContextAdvisingNodeRegistry:
     """
 
     # Node for detailed technical context advice
-    TECHNICAL_MODE: ContextAdvisingNode = ContextAdvisingNode(
-        model=high_temp_model, prompt=ContextAdvisingPrompt.TECHNICAL_MODE
+    TECHNICAL_MODE: ContextAdvisingNode = LazyAttribute(
+        lambda: ContextAdvisingNode(
+            model=high_temp_model,
+            prompt=ContextAdvisingPrompt.TECHNICAL_MODE,
+            prompt_budget=PromptBudgetRegistry.PLANNING,
+        )
     )
 
     # Node for quick beginner friendly context advice
-    QUICK_ANALYSIS_MODE: ContextAdvisingNode = ContextAdvisingNode(
-        model=high_temp_model, prompt=ContextAdvisingPrompt.QUICK_ANALYSIS_MODE
+    QUICK_ANALYSIS_MODE: ContextAdvisingNode = LazyAttribute(
+        lambda: ContextAdvisingNode(
+            model=high_temp_model,
+            prompt=ContextAdvisingPrompt.QUICK_ANALYSIS_MODE,
+            prompt_budget=PromptBudgetRegistry.PLANNING,
+        )
     )
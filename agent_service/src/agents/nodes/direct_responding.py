@@ -17,7 +17,10 @@ from agents.nodes.base import BaseNode
 from agents.state import AgentState
 from agents.prompts.direct_responding import DirectRespondingPrompt
 from agents.models.anthropic_ import medium_temp_model
+from agents.models.budgeting import PromptBudgetRegistry
 from agents.nodes.memory.retrieval import MemoryRetrievalNode
+from services.summarization import summarization_service
+from core.lazy import LazyAttribute
 
 
 class DirectRespondingNode(BaseNode):
@@ -33,6 +36,43 @@ class DirectRespondingNode(BaseNode):
                         prompt, and output handling logic.
     """
 
+    @staticmethod
+    def _input(state: AgentState) -> dict:
+        """
+        Build the input of the responding chain.
+
+        Args:
+            state: The current agent state, with the summaries resolved.
+
+        Returns:
+            dict: The first subtask and prior summaries.
+        """
+        return {
+            "subtask": state.subtasks[0],
+            "analysis_summary": state.analysis_summary,
+            "visualization_summary": state.visualization_summary,
+        }
+
+    @staticmethod
+    def _apply(state: AgentState, response: str) -> AgentState:
+        """
+        Record the response and complete the subtask.
+
+        Args:
+            state: The current agent state.
+            response: The generated response.
+
+        Returns:
+            AgentState: The updated state.
+        """
+        # Record response in memory for conversation history
+        MemoryRetrievalNode.add_answer(state, response)
+
+        # Remove the completed subtask from the queue
+        state.subtasks.popleft()
+
+        return state
+
     @override
     def invoke(self, state: AgentState):
         """
@@ -50,22 +90,39 @@ class DirectRespondingNode(BaseNode):
 
         print("* DirectRespondingNode -> ")
 
+        # Wait for the summaries of the previous subtasks, if still running
+        summarization_service.resolve(state, "analysis_summary")
+        summarization_service.resolve(state, "visualization_summary")
+
         # Generate a response for the first subtask using the model chain
-        response = self._chain.invoke(
-            {
-                "subtask": state.subtasks[0],
-                "analysis_summary": state.analysis_summary,
-                "visualization_summary": state.visualization_summary,
-            }
-        ).content
+        response = self._chain.invoke(self._input(state)).content
+        return self._apply(state, response)
 
-        # Record response in memory for conversation history
-        MemoryRetrievalNode.add_answer(state, response)
+    @override
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously generate a direct response for the current subtask and
+        update memory.
 
-        # Remove the completed subtask from the queue
-        state.subtasks.popleft()
+        Args:
+            state: The current state of the agent, which includes:
+                - subtasks: A list of subtasks derived from decomposition.
+                - analysis_summary: Summary of prior analytical steps.
+                - visualization_summary: Summary of prior visualization steps.
 
-        return state
+        Returns:
+            AgentState: The updated state with the completed subtask removed.
+        """
+
+        print("* DirectRespondingNode -> ")
+
+        # Wait for the summaries of the previous subtasks, if still running
+        await summarization_service.aresolve(state, "analysis_summary")
+        await summarization_service.aresolve(state, "visualization_summary")
+
+        # Generate a response for the first subtask using the model chain
+        response = (await self._chain.ainvoke(self._input(state))).content
+        return self._apply(state, response)
 
 
 class DirectRespondingNodeRegistry:
@@ -82,11 +139,19 @@ class DirectRespondingNodeRegistry:
     """
 
     # Node for detailed technical direct responding
-    TECHNICAL_MODE: DirectRespondingNode = DirectRespondingNode(
-        model=medium_temp_model, prompt=DirectRespondingPrompt.TECHNICAL_MODE
+    TECHNICAL_MODE: DirectRespondingNode = LazyAttribute(
+        lambda: DirectRespondingNode(
+            model=medium_temp_model,
+            prompt=DirectRespondingPrompt.TECHNICAL_MODE,
+            prompt_budget=PromptBudgetRegistry.PLANNING,
+        )
     )
 
     # Node for quick and lightweight direct responding
-    QUICK_ANALYSIS_MODE: DirectRespondingNode = DirectRespondingNode(
-        model=medium_temp_model, prompt=DirectRespondingPrompt.QUICK_ANALYSIS_MODE
+    QUICK_ANALYSIS_MODE: DirectRespondingNode = LazyAttribute(
+        lambda: DirectRespondingNode(
+            model=medium_temp_model,
+            prompt=DirectRespondingPrompt.QUICK_ANALYSIS_MODE,
+            prompt_budget=PromptBudgetRegistry.PLANNING,
+        )
     )
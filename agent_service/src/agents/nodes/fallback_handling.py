@@ -22,6 +22,8 @@ from agents.prompts.fallback_handling import FallbackHandlingPrompt
 from agents.models.anthropic_ import high_temp_model
 from agents.nodes.memory.retrieval import MemoryRetrievalNode
 from agents.nodes.summarization import SummarizationNode
+from services.summarization import summarization_service
+from core.lazy import LazyAttribute
 
 
 class FallbackHandlingNode(BaseNode):
@@ -36,6 +38,28 @@ class FallbackHandlingNode(BaseNode):
         _chain: The execution chain integrating the model, prompt, and output logic.
     """
 
+    @staticmethod
+    def _apply(state: AgentState, fallback: str) -> AgentState:
+        """
+        Summarize the pending context and record the fallback answer.
+
+        Args:
+            state: The current agent state.
+            fallback: The generated fallback answer.
+
+        Returns:
+            AgentState: The updated agent state.
+        """
+        # Summarize the pending context based on the generated fallback
+        SummarizationNode.pending_context_summarization(
+            state, state.question, fallback, state.pending_context
+        )
+
+        # Store the fallback answer in memory for conversation history
+        MemoryRetrievalNode.add_answer(state, fallback)
+
+        return state
+
     @override
     def invoke(self, state: AgentState):
         """
@@ -56,16 +80,29 @@ class FallbackHandlingNode(BaseNode):
 
         # Generate a fallback answer for the first subtask
         fallback = self._chain.invoke({"question": state.subtasks[0]}).content
+        return self._apply(state, fallback)
 
-        # Summarize the pending context based on the generated fallback
-        SummarizationNode.pending_context_summarization(
-            state, state.question, fallback, state.pending_context
-        )
+    @override
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously handle the current subtask by generating a fallback
+        response, updating context, and storing it in memory.
 
-        # Store the fallback answer in memory for conversation history
-        MemoryRetrievalNode.add_answer(state, fallback)
+        Args:
+            state: The current agent state, which includes:
+                - subtasks: Queue of subtasks derived from decomposition.
+                - question: The original user question.
+                - pending_context: Any pending context awaiting confirmation or execution.
 
-        return state
+        Returns:
+            AgentState: The updated agent state with pending context summarized
+                        and fallback answer added to memory.
+        """
+        ...
+
+        # Generate a fallback answer for the first subtask
+        fallback = (await self._chain.ainvoke({"question": state.subtasks[0]})).content
+        return await summarization_service.acall(self._apply, state, fallback)
 
 
 class FallbackHandlingNodeRegistry:
@@ -80,6 +117,8 @@ class FallbackHandlingNodeRegistry:
     """
 
     # Node configured for high-temperature fallback handling
-    UNIFIED: FallbackHandlingNode = FallbackHandlingNode(
-        model=high_temp_model, prompt=FallbackHandlingPrompt.UNIFIED
+    UNIFIED: FallbackHandlingNode = LazyAttribute(
+        lambda: FallbackHandlingNode(
+            model=high_temp_model, prompt=FallbackHandlingPrompt.UNIFIED
+        )
     )
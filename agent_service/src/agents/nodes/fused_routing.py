@@ -0,0 +1,171 @@
+"""
+This module defines the `FusedRoutingNode` and its registry, which take every
+routing decision about a user question in a single structured model call.
+
+By default a question passes through the agent mode classifier, the task
+router, the task decomposer, and the subtask classifier: four sequential
+round-trips before the first user-visible token. The fused node decides the
+agent mode, the task flow, the subtasks, and the flow of every subtask at
+once, and the agent graphs built for fused routing skip the steps it has
+already taken.
+
+Classes:
+    FusedRoutingNode: Decides mode, task flow, subtasks, and subtask flows.
+    FusedRoutingNodeRegistry: Provides preconfigured fused routing nodes.
+"""
+
+from collections import deque
+from typing import override
+
+from agents.nodes.base import BaseNode
+from agents.state import AgentState
+from agents.prompts.fused_routing import FusedRoutingPrompt
+from agents.models.anthropic_ import low_temp_model
+from agents.models.budgeting import PromptBudgetRegistry
+from agents.structured_outputs.routing import FusedRoutingOutput
+from agents.nodes.memory.retrieval import MemoryRetrievalNode
+from agents.nodes.summarization import SummarizationNode
+from services.summarization import summarization_service
+from core.lazy import LazyAttribute
+
+
+class FusedRoutingNode(BaseNode):
+    """
+    Node taking all routing decisions about a question in one model call.
+
+    Responsibilities:
+        - Retrieve the analysis, visualization, user preference, and pending
+          context summaries from memory.
+        - Submit the user preference summary, as the mode classifier does.
+        - Invoke the model once for the agent mode, task flow, subtasks, and
+          subtask flows.
+        - Record the user's question for conversation history.
+    """
+
+    @staticmethod
+    def _input(state: AgentState) -> dict:
+        """
+        Build the input of the routing chain from the retrieved summaries,
+        then submit the user preference summary of the question.
+
+        Args:
+            state (AgentState): The current agent state.
+
+        Returns:
+            dict: Input of the routing chain.
+        """
+        # Read the summaries before the current question is summarized into them
+        inputs = {
+            "question": state.question,
+            "analysis_summary": state.analysis_summary,
+            "visualization_summary": state.visualization_summary,
+            "user_preferences_summary": state.user_preferences_summary,
+            "pending_context": state.pending_context,
+        }
+
+        # Summarize user preferences in the background while routing
+        SummarizationNode.user_preferences_summarization(
+            state, state.question, state.user_preferences_summary
+        )
+
+        return inputs
+
+    @staticmethod
+    def _apply(state: AgentState, routing: FusedRoutingOutput) -> AgentState:
+        """
+        Store the routing decisions in the agent state.
+
+        Args:
+            state (AgentState): The current agent state.
+            routing (FusedRoutingOutput): Decisions of the model.
+
+        Returns:
+            AgentState: The updated state.
+        """
+        state.agent_mode = routing.agent_mode
+        state.task_flow = routing.task_flow
+
+        # An exploratory question always has at least one subtask
+        subtasks = routing.subtasks
+        if state.task_flow == "EXPLORATORY" and not subtasks:
+            state.task_flow = "ADVISORY"
+        state.subtasks = deque(subtask.subtask for subtask in subtasks)
+        state.subtask_flows = deque(subtask.subtask_flow for subtask in subtasks)
+
+        # Record the user's question in memory for conversation history
+        MemoryRetrievalNode.add_question(state, state.question)
+
+        return state
+
+    @override
+    def invoke(self, state: AgentState) -> AgentState:
+        """
+        Take all routing decisions about the user's question.
+
+        Args:
+            state (AgentState): Current state of the agent including question,
+                                summaries, and other relevant context.
+
+        Returns:
+            AgentState: Updated agent state with the agent mode, task flow,
+            subtasks, and subtask flows.
+        """
+        print("* FusedRoutingNode -> ")
+
+        # Retrieve latest summaries from memory for context
+        MemoryRetrievalNode.get_analysis_summary(state)
+        MemoryRetrievalNode.get_visualization_summary(state)
+        MemoryRetrievalNode.get_user_preferences_summary(state)
+        MemoryRetrievalNode.get_pending_context(state)
+
+        routing = self._chain.invoke(
+            self._input(state), config={"metadata": {"stream": False}}
+        )
+        return self._apply(state, routing)
+
+    @override
+    async def ainvoke(self, state: AgentState) -> AgentState:
+        """
+        Asynchronously take all routing decisions about the user's question.
+
+        Args:
+            state (AgentState): Current state of the agent including question,
+                                summaries, and other relevant context.
+
+        Returns:
+            AgentState: Updated agent state with the agent mode, task flow,
+            subtasks, and subtask flows.
+        """
+        print("* FusedRoutingNode -> ")
+
+        # Retrieve latest summaries from memory for context
+        await MemoryRetrievalNode.aget_analysis_summary(state)
+        await MemoryRetrievalNode.aget_visualization_summary(state)
+        await MemoryRetrievalNode.aget_user_preferences_summary(state)
+        await MemoryRetrievalNode.aget_pending_context(state)
+
+        routing = await self._chain.ainvoke(
+            await summarization_service.acall(self._input, state),
+            config={"metadata": {"stream": False}},
+        )
+        return self._apply(state, routing)
+
+
+class FusedRoutingNodeRegistry:
+    """
+    Registry for accessing preconfigured fused routing nodes.
+
+    Attributes:
+        UNIFIED (FusedRoutingNode): Fused routing node using the unified prompt
+                                    and the low-temperature model for stable
+                                    decisions.
+    """
+
+    UNIFIED: FusedRoutingNode = LazyAttribute(
+        lambda: FusedRoutingNode(
+            model=low_temp_model,
+            prompt=FusedRoutingPrompt.UNIFIED,
+            structured_output=FusedRoutingOutput,
+            prompt_budget=PromptBudgetRegistry.ROUTING,
+        )
+    )
@@ -8,8 +8,11 @@ methods to safely interact with the `AgentState` and memory service,
 allowing for consistent and modular state updates.
 
 Responsibilities:
-    - Retrieve analysis, visualization, code, and user preference summaries.
+    - Retrieve analysis, visualization, code, and user preference summaries,
+      waiting for the ones still being summarized in the background.
     - Retrieve stored variables associated with an agent session.
+    - Provide async variants of the retrievals for async nodes, which wait for
+      summaries and load memory without blocking the event loop.
     - Provide utility methods for updating conversation state (questions and answers).
     - Encapsulate all memory interaction logic in a single reusable component.
 
@@ -19,9 +22,12 @@ ensuring clean separation between memory access and other node logic.
 
 import pickle
 import json
+import asyncio
 
 from agents.state import AgentState
+from execution.snapshot import load_variables
 from services.memory import memory_service
+from services.summarization import summarization_service
 
 
 class MemoryRetrievalNode:
@@ -35,6 +41,10 @@ class MemoryRetrievalNode:
 
     All methods are static since memory retrieval does not depend on
     instance-specific state.
+
+    The `aget_*` variants await background summaries and run the blocking
+    Redis and database reads in a thread, so async nodes keep the event loop
+    free for other streams.
     """
 
     @staticmethod
@@ -45,6 +55,10 @@ class MemoryRetrievalNode:
         Args:
             state (AgentState): The current agent execution state.
         """
+        # Wait for the summary if it is still being computed
+        if summarization_service.resolve(state, "analysis_summary"):
+            return
+
         if state.analysis_report is None:
             state.analysis_summary = pickle.loads(
                 memory_service.get_memory(
@@ -64,6 +78,10 @@ class MemoryRetrievalNode:
         Args:
             state (AgentState): The current agent execution state.
         """
+        # Wait for the summary if it is still being computed
+        if summarization_service.resolve(state, "visualization_summary"):
+            return
+
         if state.visualization_summary is None:
             state.visualization_summary = pickle.loads(
                 memory_service.get_memory(
@@ -83,6 +101,10 @@ class MemoryRetrievalNode:
         Args:
             state (AgentState): The current agent execution state.
         """
+        # Wait for the summary if it is still being computed
+        if summarization_service.resolve(state, "code_summary"):
+            return
+
         if state.code_summary is None:
             state.code_summary = pickle.loads(
                 memory_service.get_memory(
@@ -102,6 +124,10 @@ class MemoryRetrievalNode:
         Args:
             state (AgentState): The current agent execution state.
         """
+        # Wait for the summary if it is still being computed
+        if summarization_service.resolve(state, "user_preferences_summary"):
+            return
+
         if state.user_preferences_summary is None:
             state.user_preferences_summary = pickle.loads(
                 memory_service.get_memory(
@@ -116,13 +142,13 @@ class MemoryRetrievalNode:
     @staticmethod
     def get_variables(state: AgentState):
         """
-        Load and attach stored variables to the agent state.
+        Load and attach stored variables and their pickled payloads to the agent state.
 
         Args:
             state (AgentState): The current agent execution state.
         """
         if state.variables is None:
-            state.variables = pickle.loads(
+            state.variables, state.variable_snapshot = load_variables(
                 memory_service.get_memory(
                     db=state.db,
                     user_id=state.user_id,
@@ -140,6 +166,10 @@ class MemoryRetrievalNode:
         Args:
             state (AgentState): The current agent execution state.
         """
+        # Wait for the summary if it is still being computed
+        if summarization_service.resolve(state, "pending_context"):
+            return
+
         if state.pending_context is None:
             state.pending_context = pickle.loads(
                 memory_service.get_memory(
@@ -151,6 +181,87 @@ class MemoryRetrievalNode:
                 ).pending_context
             )
 
+    @staticmethod
+    async def aget_analysis_summary(state: AgentState):
+        """
+        Asynchronously load and attach the user's analysis summary to the agent state.
+
+        Args:
+            state (AgentState): The current agent execution state.
+        """
+        # Wait for the summary if it is still being computed
+        if await summarization_service.aresolve(state, "analysis_summary"):
+            return
+
+        await asyncio.to_thread(MemoryRetrievalNode.get_analysis_summary, state)
+
+    @staticmethod
+    async def aget_visualization_summary(state: AgentState):
+        """
+        Asynchronously load and attach the user's visualization summary to the agent state.
+
+        Args:
+            state (AgentState): The current agent execution state.
+        """
+        # Wait for the summary if it is still being computed
+        if await summarization_service.aresolve(state, "visualization_summary"):
+            return
+
+        await asyncio.to_thread(MemoryRetrievalNode.get_visualization_summary, state)
+
+    @staticmethod
+    async def aget_code_summary(state: AgentState):
+        """
+        Asynchronously load and attach the user's code summary to the agent state.
+
+        Args:
+            state (AgentState): The current agent execution state.
+        """
+        # Wait for the summary if it is still being computed
+        if await summarization_service.aresolve(state, "code_summary"):
+            return
+
+        await asyncio.to_thread(MemoryRetrievalNode.get_code_summary, state)
+
+    @staticmethod
+    async def aget_user_preferences_summary(state: AgentState):
+        """
+        Asynchronously load and attach the user's preferences summary to the agent state.
+
+        Args:
+            state (AgentState): The current agent execution state.
+        """
+        # Wait for the summary if it is still being computed
+        if await summarization_service.aresolve(state, "user_preferences_summary"):
+            return
+
+        await asyncio.to_thread(MemoryRetrievalNode.get_user_preferences_summary, state)
+
+    @staticmethod
+    async def aget_pending_context(state: AgentState):
+        """
+        Asynchronously load and attach the stored pending context to the agent state.
+
+        Args:
+            state (AgentState): The current agent execution state.
+        """
+        # Wait for the summary if it is still being computed
+        if await summarization_service.aresolve(state, "pending_context"):
+            return
+
+        await asyncio.to_thread(MemoryRetrievalNode.get_pending_context, state)
+
+    @staticmethod
+    async def aget_variables(state: AgentState):
+        """
+        Asynchronously load and attach stored variables and their pickled
+        payloads to the agent state.
+
+        Args:
+            state (AgentState): The current agent execution state.
+        """
+        await asyncio.to_thread(MemoryRetrievalNode.get_variables, state)
+
     @staticmethod
     def add_question(state: AgentState, question: str):
         """
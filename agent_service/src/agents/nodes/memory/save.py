@@ -3,10 +3,15 @@ This module defines the `MemorySaveNode` class, which is responsible for
 persisting the AI agent’s state into a memory service. It handles saving
 analysis summaries, visualization summaries, code summaries, variables, and
 conversation history for future retrieval and continuity across sessions.
+Summaries still being computed in the background are left to their jobs,
+so saving never waits for them.
 """
 
 import pickle
+import asyncio
+
 from agents.state import AgentState
+from execution.snapshot import dump_variables
 from services.memory import memory_service
 
 
@@ -18,7 +23,8 @@ class MemorySaveNode:
         - Retrieve existing conversation memory from storage.
         - Merge new conversation entries with existing conversation history.
         - Update the memory cache with current analysis, visualization, code,
-          variables, and conversation data.
+          variables, and conversation data, except for the summaries that
+          background jobs write back.
     """
 
     @staticmethod
@@ -37,6 +43,8 @@ class MemorySaveNode:
                 - visualization_summary: Current summary of visualizations.
                 - code_summary: Summary of generated code.
                 - variables: Variables generated or updated in the session.
+                - variable_snapshot: Pickled payloads of the variables.
+                - summary_jobs: Summaries computed in the background this turn.
                 - new_conversation: Newly generated conversation entries.
 
         Returns:
@@ -54,6 +62,16 @@ class MemorySaveNode:
             storage_uri=state.storage_uri,
         )
 
+        # Summaries computed in the background are written back by their jobs
+        jobs = state.summary_jobs
+
+        # Fall back to the last question when there is no pending context
+        pending_context = None
+        if "pending_context" not in jobs:
+            pending_context = pickle.dumps(
+                state.pending_context or f"Last Question\n: {state.question}"
+            )
+
         # Update the memory cache with current summaries, variables, and conversation
         memory_service.update_memory_cache(
             db=state.db,
@@ -62,23 +80,43 @@ class MemorySaveNode:
             file_name=state.file_name,
             storage_uri=state.storage_uri,
             analysis_summary=(
-                pickle.dumps(state.analysis_summary) if state.analysis_summary else None
+                pickle.dumps(state.analysis_summary)
+                if state.analysis_summary and "analysis_summary" not in jobs
+                else None
             ),
             visualization_summary=(
                 pickle.dumps(state.visualization_summary)
-                if state.visualization_summary
+                if state.visualization_summary and "visualization_summary" not in jobs
                 else None
             ),
             code_summary=(
-                pickle.dumps(state.code_summary) if state.code_summary else None
+                pickle.dumps(state.code_summary)
+                if state.code_summary and "code_summary" not in jobs
+                else None
             ),
-            pending_context=(
-                pickle.dumps(state.pending_context)
-                if state.pending_context
-                else pickle.dumps(f"Last Question\n: {state.question}")
+            pending_context=pending_context,
+            variables=(
+                dump_variables(state.variables, state.variable_snapshot)
+                if state.variables
+                else None
             ),
-            variables=pickle.dumps(state.variables) if state.variables else None,
             conversation=pickle.dumps(conversation + state.new_conversation),
         )
 
         return state
+
+    @staticmethod
+    async def ainvoke(state: AgentState) -> AgentState:
+        """
+        Asynchronously save the current agent state and conversation history.
+
+        The blocking Redis and database writes run in a thread, so the event
+        loop keeps serving other streams.
+
+        Args:
+            state: The current state of the agent, as for `invoke`.
+
+        Returns:
+            AgentState: The updated state after saving memory.
+        """
+        return await asyncio.to_thread(MemorySaveNode.invoke, state)
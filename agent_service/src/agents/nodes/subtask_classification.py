@@ -5,15 +5,24 @@ classes, which are responsible for classifying subtasks within the AI agent syst
 Core responsibilities:
     - Use a language model to classify subtasks based on the user's question and prior context.
     - Incorporate analysis and visualization summaries to inform classification.
+    - Reuse the subtask flows decided by fused routing without a model call.
+    - Classify obvious questions with local heuristics without a model call.
+    - Reuse the flow classified while the task was still being decomposed.
     - Provide preconfigured node instances for standardized usage.
 """
 
-from typing import override
+from typing import Any, Dict, override
 
 from agents.nodes.base import BaseNode
 from agents.state import AgentState
 from agents.prompts.subtask_classification import SubtaskClassificationPrompt
 from agents.models.anthropic_ import low_temp_model
+from agents.models.budgeting import PromptBudgetRegistry
+from agents.models.heuristic import subtask_classification_classifier
+from agents.nodes.task.speculation import speculation_store
+from cache.response import response_cache_manager
+from services.summarization import summarization_service
+from core.lazy import LazyAttribute
 
 
 class SubtaskClassificationNode(BaseNode):
@@ -28,6 +37,24 @@ class SubtaskClassificationNode(BaseNode):
         _chain (Chain): The execution chain combining the model, prompt, and output parser.
     """
 
+    @staticmethod
+    def _input(state: AgentState) -> Dict[str, Any]:
+        """
+        Build the input of the classification chain.
+
+        Args:
+            state: The current agent state, with the summaries resolved.
+
+        Returns:
+            Dict[str, Any]: The question and prior summaries.
+        """
+        return {
+            "question": state.question,
+            "analysis_summary": state.analysis_summary,
+            "visualization_summary": state.visualization_summary,
+            "pending_context": state.pending_context,
+        }
+
     @override
     def invoke(self, state: AgentState):
         """
@@ -41,23 +68,106 @@ class SubtaskClassificationNode(BaseNode):
 
         Returns:
             AgentState: The updated state object with the `subtask_flow` attribute populated
-            based on the classification results.
+            based on the classification results, or on the flows decided by
+            fused routing.
         """
         print("* SubtaskClassificatoinNode -> ")
 
+        # Use the flow decided upfront by fused routing, if any
+        if state.subtask_flows:
+            state.subtask_flow = state.subtask_flows.popleft()
+            return state
+
+        # Wait for the summaries of the previous subtasks, if still running
+        summarization_service.resolve(state, "analysis_summary")
+        summarization_service.resolve(state, "visualization_summary")
+        summarization_service.resolve(state, "pending_context")
+
+        inputs = self._input(state)
+
+        # Classify obvious questions locally, without a model call
+        subtask_flow = subtask_classification_classifier.predict(inputs)
+
         # Invoke the chain with the question and prior summaries as context
-        state.subtask_flow = self._chain.invoke(
-            {
-                "question": state.question,
-                "analysis_summary": state.analysis_summary,
-                "visualization_summary": state.visualization_summary,
-                "pending_context": state.pending_context,
-            },
-            config={"metadata": {"stream": False}},
-        ).content
+        if subtask_flow is None:
+            subtask_flow = self._chain.invoke(
+                inputs, config={"metadata": {"stream": False}}
+            ).content
+            subtask_classification_classifier.record(inputs, subtask_flow)
+        state.subtask_flow = subtask_flow
 
         return state
 
+    @override
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously run the subtask classification process on the current agent state.
+
+        Args:
+            state: The current state of the agent, which includes:
+                - question: The user’s original query.
+                - analysis_summary: Summary of prior analytical steps.
+                - visualization_summary: Summary of prior visualization steps.
+
+        Returns:
+            AgentState: The updated state object with the `subtask_flow` attribute populated
+            based on the classification results, or on the flows decided by
+            fused routing.
+        """
+        print("* SubtaskClassificatoinNode -> ")
+
+        # Use the flow decided upfront by fused routing, if any
+        if state.subtask_flows:
+            state.subtask_flow = state.subtask_flows.popleft()
+            return state
+
+        inputs = await self.ainputs(state)
+
+        # Classify obvious questions locally, without a model call
+        subtask_flow = subtask_classification_classifier.predict(inputs)
+
+        if subtask_flow is None:
+            # Use the flow classified while the task was still being decomposed
+            subtask_flow = await speculation_store.aclaim(self, state, inputs)
+            if subtask_flow is None:
+                subtask_flow = await self.aclassify(inputs)
+            subtask_classification_classifier.record(inputs, subtask_flow)
+        state.subtask_flow = subtask_flow
+
+        return state
+
+    async def ainputs(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Wait for the summaries the classification reads and return its inputs.
+
+        Args:
+            state: The current agent state.
+
+        Returns:
+            Dict[str, Any]: The question and prior summaries.
+        """
+        # Wait for the summaries of the previous subtasks, if still running
+        await summarization_service.aresolve(state, "analysis_summary")
+        await summarization_service.aresolve(state, "visualization_summary")
+        await summarization_service.aresolve(state, "pending_context")
+
+        return self._input(state)
+
+    async def aclassify(self, inputs: Dict[str, Any]) -> str:
+        """
+        Classify a subtask with the language model.
+
+        Args:
+            inputs: The question and prior summaries.
+
+        Returns:
+            str: The subtask flow.
+        """
+        # Invoke the chain with the question and prior summaries as context
+        return (
+            await self._chain.ainvoke(inputs, config={"metadata": {"stream": False}})
+        ).content
+
 
 class SubtaskClassificationNodeRegistry:
     """
@@ -70,6 +180,12 @@ class SubtaskClassificationNodeRegistry:
     """
 
     # Preconfigured node for unified classification of subtasks
-    UNIFIED: SubtaskClassificationNode = SubtaskClassificationNode(
-        model=low_temp_model, prompt=SubtaskClassificationPrompt.UNIFIED
+    UNIFIED: SubtaskClassificationNode = LazyAttribute(
+        lambda: SubtaskClassificationNode(
+            model=low_temp_model,
+            prompt=SubtaskClassificationPrompt.UNIFIED,
+            valid_outputs=("ANALYSIS", "VISUALIZATION", "DIRECT_RESPONSE"),
+            response_cache=response_cache_manager,
+            prompt_budget=PromptBudgetRegistry.ROUTING,
+        )
     )
@@ -4,17 +4,22 @@ Summarization Node Module.
 This module defines the `SummarizationNode` class, which provides
 static helper methods to perform summarization of different agent
 content types (analysis reports, visualization plans, code, and
-user preferences) using a low-temperature Anthropic model.
+user preferences) using a low-temperature Anthropic model, on the model
+tier configured for every summary.
 
-The node updates the `AgentState` with the generated summaries,
-ensuring a consistent interface for all summarization operations.
+Summaries are submitted to the `summarization_service`, which computes
+them in the background and writes them back to memory, so they stay off
+the critical path of the turn. Nodes that read a summary resolve it
+through `MemoryRetrievalNode` first.
 """
 
 from typing import Dict
 
 from agents.models.anthropic_ import low_temp_model
+from agents.models.tiering import tiered_chain
 from agents.state import AgentState
 from agents.prompts.summarization import SummarizationPrompt
+from services.summarization import summarization_service
 
 
 class SummarizationNode:
@@ -23,8 +28,8 @@ class SummarizationNode:
 
     `SummarizationNode` provides static methods that take agent data
     (analysis reports, visualization plans, code, user preferences)
-    and produce condensed summaries, which are stored in the
-    `AgentState`.
+    and submit the summarization of it, whose result is stored in the
+    `AgentState` once resolved and in memory once computed.
 
     All methods are static since summarization does not depend on
     instance-specific state and can operate solely on the inputs
@@ -36,7 +41,7 @@ class SummarizationNode:
         state: AgentState, analysis_report: str, analysis_summary: str
     ):
         """
-        Summarize the agent's analysis report and update the agent state.
+        Summarize the agent's analysis report in the background.
 
         Args:
             state: The current agent execution state.
@@ -44,21 +49,29 @@ class SummarizationNode:
             analysis_summary: Previous or partial summary for context.
 
         Updates:
-            state.analysis_summary: The newly generated analysis summary.
+            state.analysis_summary: The newly generated analysis summary,
+                once resolved.
         """
         print("* AnalysisSummarizationNode -> ")
-        chain = SummarizationPrompt.ANALYSIS | low_temp_model
-        state.analysis_summary = chain.invoke(
-            {"analysis_report": analysis_report, "analysis_summary": analysis_summary},
-            config={"metadata": {"stream": False}},
-        ).content
+        chain = tiered_chain(
+            SummarizationPrompt.ANALYSIS, low_temp_model, "AnalysisSummarizationNode"
+        )
+        summarization_service.submit(
+            state,
+            "analysis_summary",
+            lambda summary: chain.invoke(
+                {"analysis_report": analysis_report, "analysis_summary": summary},
+                config={"metadata": {"stream": False}},
+            ).content,
+            analysis_summary,
+        )
 
     @staticmethod
     def visualization_summarization(
         state: AgentState, visualization_plan: str, visualization_summary: str
     ):
         """
-        Summarize the agent's visualization plan and update the agent state.
+        Summarize the agent's visualization plan in the background.
 
         Args:
             state: The current agent execution state.
@@ -66,24 +79,34 @@ class SummarizationNode:
             visualization_summary: Previous or partial summary for context.
 
         Updates:
-            state.visualization_summary: The newly generated visualization summary.
+            state.visualization_summary: The newly generated visualization
+                summary, once resolved.
         """
         print("* VisualizationSummarizationNode -> ")
-        chain = SummarizationPrompt.VISUALIZATION | low_temp_model
-        state.visualization_summary = chain.invoke(
-            {
-                "visualization_plan": visualization_plan,
-                "visualization_summary": visualization_summary,
-            },
-            config={"metadata": {"stream": False}},
-        ).content
+        chain = tiered_chain(
+            SummarizationPrompt.VISUALIZATION,
+            low_temp_model,
+            "VisualizationSummarizationNode",
+        )
+        summarization_service.submit(
+            state,
+            "visualization_summary",
+            lambda summary: chain.invoke(
+                {
+                    "visualization_plan": visualization_plan,
+                    "visualization_summary": summary,
+                },
+                config={"metadata": {"stream": False}},
+            ).content,
+            visualization_summary,
+        )
 
     @staticmethod
     def code_summarization(
         state: AgentState, code: str, code_summary: str, variables: Dict
     ):
         """
-        Summarize the agent's code and related variables, updating the agent state.
+        Summarize the agent's code and related variables in the background.
 
         Args:
             state: The current agent execution state.
@@ -92,21 +115,30 @@ class SummarizationNode:
             variables (Dict): Current variable states that may influence the summary.
 
         Updates:
-            state.code_summary: The newly generated code summary.
+            state.code_summary: The newly generated code summary, once resolved.
         """
         print("* CodeSummarizationNode -> ")
-        chain = SummarizationPrompt.CODE | low_temp_model
-        state.code_summary = chain.invoke(
-            {"code": code, "code_summary": code_summary, "variables": variables.keys()},
-            config={"metadata": {"stream": False}},
-        ).content
+        chain = tiered_chain(
+            SummarizationPrompt.CODE, low_temp_model, "CodeSummarizationNode"
+        )
+        # Only the names are summarized; copy them, the variables keep changing
+        names = list(variables.keys())
+        summarization_service.submit(
+            state,
+            "code_summary",
+            lambda summary: chain.invoke(
+                {"code": code, "code_summary": summary, "variables": names},
+                config={"metadata": {"stream": False}},
+            ).content,
+            code_summary,
+        )
 
     @staticmethod
     def user_preferences_summarization(
         state: AgentState, question: str, user_preferences_summary: str
     ):
         """
-        Summarize user preferences based on a question, updating the agent state.
+        Summarize user preferences based on a question in the background.
 
         Args:
             state: The current agent execution state.
@@ -114,24 +146,34 @@ class SummarizationNode:
             user_preferences_summary: Previous or partial user preference summary.
 
         Updates:
-            state.user_preferences_summary: The newly generated user preferences summary.
+            state.user_preferences_summary: The newly generated user preferences
+                summary, once resolved.
         """
         print("* UserPreferencesSummarizationNode -> ")
-        chain = SummarizationPrompt.USER_PREFERENCES | low_temp_model
-        state.user_preferences_summary = chain.invoke(
-            {
-                "question": question,
-                "user_preferences_summary": user_preferences_summary,
-            },
-            config={"metadata": {"stream": False}},
-        ).content
+        chain = tiered_chain(
+            SummarizationPrompt.USER_PREFERENCES,
+            low_temp_model,
+            "UserPreferencesSummarizationNode",
+        )
+        summarization_service.submit(
+            state,
+            "user_preferences_summary",
+            lambda summary: chain.invoke(
+                {
+                    "question": question,
+                    "user_preferences_summary": summary,
+                },
+                config={"metadata": {"stream": False}},
+            ).content,
+            user_preferences_summary,
+        )
 
     @staticmethod
     def pending_context_summarization(
         state: AgentState, question: str, context: str, pending_context: str
     ):
         """
-        Summarize the pending context based on the current question and agent state.
+        Summarize the pending context based on the current question in the background.
 
         Args:
             state: The current agent execution state.
@@ -140,15 +182,25 @@ class SummarizationNode:
             pending_context: Previous pending context awaiting confirmation or execution.
 
         Updates:
-            state.pending_context: The newly generated, condensed pending context summary.
+            state.pending_context: The newly generated, condensed pending context
+                summary, once resolved.
         """
         print("* PendingContextSummarizationNode -> ")
-        chain = SummarizationPrompt.PENDING_CONTEXT | low_temp_model
-        state.pending_context = chain.invoke(
-            {
-                "question": state.question,
-                "context": context,
-                "pending_context": state.pending_context,
-            },
-            config={"metadata": {"stream": False}},
-        ).content
+        chain = tiered_chain(
+            SummarizationPrompt.PENDING_CONTEXT,
+            low_temp_model,
+            "PendingContextSummarizationNode",
+        )
+        summarization_service.submit(
+            state,
+            "pending_context",
+            lambda summary: chain.invoke(
+                {
+                    "question": question,
+                    "context": context,
+                    "pending_context": summary,
+                },
+                config={"metadata": {"stream": False}},
+            ).content,
+            pending_context,
+        )
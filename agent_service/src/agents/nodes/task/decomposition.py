@@ -6,16 +6,22 @@ subtasks within the AI agent system.
 Core responsibilities:
     - Use a language model to perform task decomposition.
     - Incorporate analysis and visualization context into decomposition.
+    - Report every subtask as soon as it is complete in the streamed output.
     - Provide specialized node instances for different agent modes (technical vs. quick analysis).
 """
 
-from typing import override
+from typing import Callable, Optional, override
+
+from langchain_core.runnables.config import ensure_config, merge_configs
 
 from agents.nodes.base import BaseNode
 from agents.state import AgentState
 from agents.prompts.task.decomposition import TaskDecompositionPrompt
 from agents.models.anthropic_ import medium_temp_model
+from agents.models.budgeting import PromptBudgetRegistry
 from agents.structured_outputs.task.decomposition import TaskDecompositionOutput
+from agents.nodes.task.speculation import SubtaskStreamParser
+from core.lazy import LazyAttribute
 
 
 class TaskDecompositionNode(BaseNode):
@@ -30,6 +36,41 @@ class TaskDecompositionNode(BaseNode):
         _chain (Chain): The execution chain that wraps the model, prompt, and output parser.
     """
 
+    @staticmethod
+    def _input(state: AgentState) -> dict:
+        """
+        Build the input of the decomposition chain.
+
+        Args:
+            state: The current agent state.
+
+        Returns:
+            dict: The user question and prior summaries.
+        """
+        return {
+            "question": state.question,
+            "analysis_summary": state.analysis_summary,
+            "visualization_summary": state.visualization_summary,
+            "pending_context": state.pending_context,
+        }
+
+    @staticmethod
+    def _apply(state: AgentState, decomposition: TaskDecompositionOutput) -> AgentState:
+        """
+        Store the decomposed subtasks in the agent state.
+
+        Args:
+            state: The current agent state.
+            decomposition: Structured output of the decomposition.
+
+        Returns:
+            AgentState: The updated state.
+        """
+        state.subtasks = decomposition.subtasks
+        state.subtask_dependencies = decomposition.dependencies
+
+        return state
+
     @override
     def invoke(self, state: AgentState):
         """
@@ -42,24 +83,55 @@ class TaskDecompositionNode(BaseNode):
                 - visualization_summary (str): Summary of prior visualization steps.
 
         Returns:
-            AgentState: The updated state object with the `subtasks` attribute populated
-            based on the structured output from the decomposition process.
+            AgentState: The updated state object with the `subtasks` and
+            `subtask_dependencies` attributes populated based on the structured
+            output from the decomposition process.
         """
 
         print("* TaskDecompositionNode -> ")
 
         # Invoke the chain with the user question and prior summaries as context
-        state.subtasks = self._chain.invoke(
-            {
-                "question": state.question,
-                "analysis_summary": state.analysis_summary,
-                "visualization_summary": state.visualization_summary,
-                "pending_context": state.pending_context,
-            },
-            config={"metadata": {"stream": False}},
-        ).subtasks
+        decomposition = self._chain.invoke(
+            self._input(state), config={"metadata": {"stream": False}}
+        )
+        return self._apply(state, decomposition)
 
-        return state
+    @override
+    async def ainvoke(
+        self,
+        state: AgentState,
+        on_subtask: Optional[Callable[[int, str], None]] = None,
+    ):
+        """
+        Asynchronously run the task decomposition process on the current agent state.
+
+        Args:
+            state: The current state of the agent, which includes:
+                - question: The user’s original query.
+                - analysis_summary: Summary of prior analytical steps.
+                - visualization_summary (str): Summary of prior visualization steps.
+            on_subtask: Called with the index and text of every subtask as soon
+                as the model finished writing it, before the decomposition ends.
+
+        Returns:
+            AgentState: The updated state object with the `subtasks` and
+            `subtask_dependencies` attributes populated based on the structured
+            output from the decomposition process.
+        """
+
+        print("* TaskDecompositionNode -> ")
+
+        # Parse the decomposition while it streams, alongside the turn callbacks
+        config = {"metadata": {"stream": False}}
+        if on_subtask is not None:
+            config = merge_configs(
+                ensure_config(),
+                {**config, "callbacks": [SubtaskStreamParser(on_subtask)]},
+            )
+
+        # Invoke the chain with the user question and prior summaries as context
+        decomposition = await self._chain.ainvoke(self._input(state), config=config)
+        return self._apply(state, decomposition)
 
 
 class TaskDecompositionNodeRegistry:
@@ -77,15 +149,21 @@ class TaskDecompositionNodeRegistry:
     """
 
     # Node for detailed technical task decomposition
-    TECHNICAL_MODE: TaskDecompositionNode = TaskDecompositionNode(
-        model=medium_temp_model,
-        prompt=TaskDecompositionPrompt.TECHNICAL_MODE,
-        structured_output=TaskDecompositionOutput,
+    TECHNICAL_MODE: TaskDecompositionNode = LazyAttribute(
+        lambda: TaskDecompositionNode(
+            model=medium_temp_model,
+            prompt=TaskDecompositionPrompt.TECHNICAL_MODE,
+            structured_output=TaskDecompositionOutput,
+            prompt_budget=PromptBudgetRegistry.ROUTING,
+        )
     )
 
     # Node for quick and lightweight task decomposition
-    QUICK_ANALYSIS_MODE: TaskDecompositionNode = TaskDecompositionNode(
-        model=medium_temp_model,
-        prompt=TaskDecompositionPrompt.QUICK_ANALYSIS_MODE,
-        structured_output=TaskDecompositionOutput,
+    QUICK_ANALYSIS_MODE: TaskDecompositionNode = LazyAttribute(
+        lambda: TaskDecompositionNode(
+            model=medium_temp_model,
+            prompt=TaskDecompositionPrompt.QUICK_ANALYSIS_MODE,
+            structured_output=TaskDecompositionOutput,
+            prompt_budget=PromptBudgetRegistry.ROUTING,
+        )
     )
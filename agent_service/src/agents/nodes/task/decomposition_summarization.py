@@ -26,6 +26,7 @@ from agents.prompts.task.decomposition_summarization import (
     TaskDecompositionSummarizationPrompt,
 )
 from agents.models.anthropic_ import high_temp_model
+from core.lazy import LazyAttribute
 
 
 class TaskDecompositionSummarizationNode(BaseNode):
@@ -40,6 +41,8 @@ class TaskDecompositionSummarizationNode(BaseNode):
         - invoke(state: AgentState):
             Processes the current agent state to generate and log
             a summarized decomposition of tasks.
+        - ainvoke(state: AgentState):
+            Asynchronous counterpart of `invoke`.
     """
 
     @override
@@ -60,6 +63,19 @@ class TaskDecompositionSummarizationNode(BaseNode):
         print("* TaskDecompositionSummarizationNode -> ")
         self._chain.invoke({"subtasks": state.subtasks})
 
+    @override
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously invoke the task decomposition summarization process.
+
+        Args:
+            state (AgentState): The current state of the agent,
+                including a list of subtasks to summarize.
+        """
+
+        print("* TaskDecompositionSummarizationNode -> ")
+        await self._chain.ainvoke({"subtasks": state.subtasks})
+
 
 class TaskDecompositionSummarizationNodeRegistry:
     """
@@ -75,16 +91,16 @@ class TaskDecompositionSummarizationNodeRegistry:
     """
 
     # Preconfigured node for technical mode summarization
-    TECHNICAL_MODE: TaskDecompositionSummarizationNode = (
-        TaskDecompositionSummarizationNode(
+    TECHNICAL_MODE: TaskDecompositionSummarizationNode = LazyAttribute(
+        lambda: TaskDecompositionSummarizationNode(
             model=high_temp_model,
             prompt=TaskDecompositionSummarizationPrompt.TECHNICAL_MODE,
         )
     )
 
     # Preconfigured node for quick analysis summarization
-    QUICK_ANALYSIS_MODE: TaskDecompositionSummarizationNode = (
-        TaskDecompositionSummarizationNode(
+    QUICK_ANALYSIS_MODE: TaskDecompositionSummarizationNode = LazyAttribute(
+        lambda: TaskDecompositionSummarizationNode(
             model=high_temp_model,
             prompt=TaskDecompositionSummarizationPrompt.QUICK_ANALYSIS_MODE,
         )
@@ -2,7 +2,8 @@
 This module defines the `TaskRoutingNode` and `TaskRoutingNodeRegistry` classes, which
 are responsible for routing user questions to the appropriate task flow within an AI
 agent system. It integrates memory retrieval for context-aware responses and leverages
-an Anthropic language model with a predefined task routing prompt.
+an Anthropic language model with a predefined task routing prompt, skipped for
+questions the local heuristics route confidently.
 
 Classes:
     TaskRoutingNode: Executes task routing based on user input, analysis summaries,
@@ -17,7 +18,11 @@ from agents.nodes.base import BaseNode
 from agents.state import AgentState
 from agents.prompts.task.routing import TaskRoutingPrompt
 from agents.models.anthropic_ import low_temp_model
+from agents.models.budgeting import PromptBudgetRegistry
+from agents.models.heuristic import task_routing_classifier
+from cache.response import response_cache_manager
 from agents.nodes.memory.retrieval import MemoryRetrievalNode
+from core.lazy import LazyAttribute
 
 
 class TaskRoutingNode(BaseNode):
@@ -32,6 +37,46 @@ class TaskRoutingNode(BaseNode):
     It uses a language model and a task routing prompt to determine the best task flow.
     """
 
+    @staticmethod
+    def _input(state: AgentState) -> dict:
+        """
+        Build the input of the routing chain from the retrieved summaries.
+
+        Args:
+            state (AgentState): The current agent state.
+
+        Returns:
+            dict: The user question and prior summaries.
+        """
+        print("PENDING CONTEXT:", state.pending_context)
+
+        return {
+            "question": state.question,
+            "analysis_summary": state.analysis_summary,
+            "visualization_summary": state.visualization_summary,
+            "user_preferences_summary": state.user_preferences_summary,
+            "pending_context": state.pending_context,
+        }
+
+    @staticmethod
+    def _apply(state: AgentState, task_flow: str) -> AgentState:
+        """
+        Store the resolved task flow and record the question in memory.
+
+        Args:
+            state (AgentState): The current agent state.
+            task_flow (str): The resolved task flow.
+
+        Returns:
+            AgentState: The updated state.
+        """
+        state.task_flow = task_flow
+
+        # Record the user's question in memory for conversation history
+        MemoryRetrievalNode.add_question(state, state.question)
+
+        return state
+
     @override
     def invoke(self, state: AgentState) -> AgentState:
         """
@@ -40,7 +85,8 @@ class TaskRoutingNode(BaseNode):
         Steps:
             1. Retrieve the latest analysis, visualization, and user preference summaries
                from memory.
-            2. Invoke the language model with the question and context to determine
+            2. Route obvious questions with the local heuristics, or else invoke
+               the language model with the question and context to determine
                the next task flow.
             3. Store the user's question in memory for conversation history.
             4. Update and return the agent state with the resolved task flow.
@@ -61,24 +107,56 @@ class TaskRoutingNode(BaseNode):
         MemoryRetrievalNode.get_user_preferences_summary(state)
         MemoryRetrievalNode.get_pending_context(state)
 
-        print("PENDING CONTEXT:", state.pending_context)
+        inputs = self._input(state)
+
+        # Route obvious questions locally, without a model call
+        task_flow = task_routing_classifier.predict(inputs)
 
         # Invoke the task routing chain to determine the appropriate task flow
-        state.task_flow = self._chain.invoke(
-            {
-                "question": state.question,
-                "analysis_summary": state.analysis_summary,
-                "visualization_summary": state.visualization_summary,
-                "user_preferences_summary": state.user_preferences_summary,
-                "pending_context": state.pending_context,
-            },
-            config={"metadata": {"stream": False}},
-        ).content
+        if task_flow is None:
+            task_flow = self._chain.invoke(
+                inputs, config={"metadata": {"stream": False}}
+            ).content
+            task_routing_classifier.record(inputs, task_flow)
 
-        # Record the user's question in memory for conversation history
-        MemoryRetrievalNode.add_question(state, state.question)
+        return self._apply(state, task_flow)
 
-        return state
+    @override
+    async def ainvoke(self, state: AgentState) -> AgentState:
+        """
+        Asynchronously process the user's question and update the agent's task flow.
+
+        Args:
+            state (AgentState): Current state of the agent including question,
+                                summaries, and other relevant context.
+
+        Returns:
+            AgentState: Updated agent state with the resolved task flow.
+        """
+
+        print("* TaskRoutingNode -> ")
+
+        # Retrieve latest summaries from memory for context
+        await MemoryRetrievalNode.aget_analysis_summary(state)
+        await MemoryRetrievalNode.aget_visualization_summary(state)
+        await MemoryRetrievalNode.aget_user_preferences_summary(state)
+        await MemoryRetrievalNode.aget_pending_context(state)
+
+        inputs = self._input(state)
+
+        # Route obvious questions locally, without a model call
+        task_flow = task_routing_classifier.predict(inputs)
+
+        # Invoke the task routing chain to determine the appropriate task flow
+        if task_flow is None:
+            task_flow = (
+                await self._chain.ainvoke(
+                    inputs, config={"metadata": {"stream": False}}
+                )
+            ).content
+            task_routing_classifier.record(inputs, task_flow)
+
+        return self._apply(state, task_flow)
 
 
 class TaskRoutingNodeRegistry:
@@ -91,6 +169,12 @@ class TaskRoutingNodeRegistry:
                    and the unified task routing prompt.
     """
 
-    UNIFIED: TaskRoutingNode = TaskRoutingNode(
-        model=low_temp_model, prompt=TaskRoutingPrompt.UNIFIED
+    UNIFIED: TaskRoutingNode = LazyAttribute(
+        lambda: TaskRoutingNode(
+            model=low_temp_model,
+            prompt=TaskRoutingPrompt.UNIFIED,
+            valid_outputs=("ADVISORY", "EXPLORATORY"),
+            response_cache=response_cache_manager,
+            prompt_budget=PromptBudgetRegistry.ROUTING,
+        )
     )
@@ -0,0 +1,447 @@
+"""
+This module defines the `SubtaskSchedulingNode` class, which runs the subtasks
+of a decomposed task, concurrently where they do not depend on each other,
+and the `SubtaskStreamBuffer` class, which keeps their streamed answers in
+subtask order.
+
+Core responsibilities:
+    - Group the subtasks into waves by their dependencies: a subtask runs in
+      the wave after the last subtask it depends on.
+    - Run every subtask through the compiled subtask graph (classification,
+      planning, code generation, execution, debugging, and reporting), the
+      subtasks of a wave concurrently, each on its own copy of the state and
+      in a kernel namespace of its own.
+    - Merge the subtasks of a wave back into the state in subtask order: their
+      variables, their answers, and the summaries they submitted.
+    - Tag the graph events of every subtask with its index, and publish the
+      completion of every subtask, so the stream is released in subtask order.
+
+Subtasks without dependency information, such as those decided by fused
+routing, depend on their predecessor and therefore run one after another, as
+in the sequential graph.
+"""
+
+import copy
+import pickle
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, ConfigDict
+from langchain_core.runnables import RunnableLambda
+
+from agents.state import AgentState
+from agents.nodes.memory.retrieval import MemoryRetrievalNode
+from services.summarization import summarization_service
+
+
+def subtask_waves(
+    count: int, dependencies: Optional[List[List[int]]]
+) -> List[List[int]]:
+    """
+    Group subtasks into waves of subtasks that do not depend on each other.
+
+    Args:
+        count: Number of subtasks.
+        dependencies: Indices of the subtasks every subtask depends on, or
+            None if unknown.
+
+    Returns:
+        List[List[int]]: Indices of the subtasks of every wave, in order.
+    """
+    # Without dependencies for every subtask, each one depends on the previous
+    if dependencies is None or len(dependencies) != count:
+        dependencies = [[index - 1] if index else [] for index in range(count)]
+
+    # A subtask runs one wave after the latest of its (earlier) dependencies
+    levels: List[int] = []
+    for index, parents in enumerate(dependencies):
+        parents = [parent for parent in parents if 0 <= parent < index]
+        levels.append(max((levels[parent] + 1 for parent in parents), default=0))
+
+    waves: List[List[int]] = [[] for _ in range(max(levels, default=-1) + 1)]
+    for index, level in enumerate(levels):
+        waves[level].append(index)
+    return waves
+
+
+class SubtaskSchedulingNode(BaseModel):
+    """
+    Runs the subtasks of a decomposed task through the subtask graph.
+
+    Attributes:
+        graph: Compiled graph running a single subtask to its answer.
+        max_concurrency: Maximum number of subtasks running at once.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    graph: Any
+    max_concurrency: int = 4
+
+    @staticmethod
+    def _isolate(state: AgentState) -> Optional[Dict[str, Any]]:
+        """
+        Copy the variables of the session for a subtask running in parallel.
+
+        Args:
+            state: The current agent state.
+
+        Returns:
+            Optional[Dict[str, Any]]: Variables no other subtask refers to,
+            restored from their pickled payloads where available.
+        """
+        if state.variables is None:
+            return None
+
+        snapshot = state.variable_snapshot or {}
+        variables = {}
+        for name, value in state.variables.items():
+            if name in snapshot:
+                variables[name] = pickle.loads(snapshot[name])
+                continue
+            # Values that cannot be copied, such as modules, are shared
+            try:
+                variables[name] = copy.deepcopy(value)
+            except Exception:
+                variables[name] = value
+        return variables
+
+    @classmethod
+    def _fork(
+        cls,
+        state: AgentState,
+        index: int,
+        subtask: str,
+        flow: Optional[str],
+        parallel: bool,
+    ) -> Dict[str, Any]:
+        """
+        Build the input of the subtask graph for a single subtask.
+
+        Args:
+            state: The current agent state.
+            index: Index of the subtask.
+            subtask: The subtask.
+            flow: Flow of the subtask, if decided upfront by fused routing.
+            parallel: Whether the subtask runs in parallel with others.
+
+        Returns:
+            Dict[str, Any]: State values of the subtask, answering into an
+            empty conversation, and with its own variables, kernel namespace,
+            and deferred summaries when running in parallel.
+        """
+        return {
+            **dict(state),
+            "variables": cls._isolate(state) if parallel else state.variables,
+            "subtasks": deque([subtask]),
+            "subtask_flows": deque([flow]) if flow is not None else None,
+            "new_conversation": [
+                {"question": state.new_conversation[0]["question"], "answer": []}
+            ],
+            "kernel_namespace": f"subtask-{index}" if parallel else None,
+            "deferred_summaries": [] if parallel else None,
+        }
+
+    @staticmethod
+    def _merge(state: AgentState, branches: List[Tuple[int, AgentState]]) -> AgentState:
+        """
+        Merge the subtasks of a wave back into the state, in subtask order.
+
+        A single subtask ran on the kernel of the session and is taken over
+        as is. For parallel subtasks, every variable they created, changed,
+        or deleted is applied in subtask order, so a later subtask wins a
+        conflict, and their summaries are submitted in the same order.
+
+        Args:
+            state: The agent state before the wave.
+            branches: Index and final state of every subtask of the wave.
+
+        Returns:
+            AgentState: The merged state.
+        """
+        if len(branches) == 1:
+            _, branch = branches[0]
+            return branch.model_copy(
+                update={
+                    "new_conversation": state.new_conversation,
+                    "kernel_namespace": None,
+                    "deferred_summaries": None,
+                }
+            )
+
+        base_variables = state.variables or {}
+        base_snapshot = state.variable_snapshot or {}
+        variables = dict(base_variables)
+        snapshot = dict(base_snapshot)
+        for _, branch in branches:
+            # Submit the summaries of the subtask, extending those before it
+            for summary_field, summarize in branch.deferred_summaries or []:
+                summary = getattr(state, summary_field)
+                summarization_service.submit(state, summary_field, summarize, summary)
+
+            # Apply the variables the subtask deleted, created, or changed
+            branch_variables = branch.variables or {}
+            branch_snapshot = branch.variable_snapshot or {}
+            for name in set(base_variables) - set(branch_variables):
+                variables.pop(name, None)
+                snapshot.pop(name, None)
+            for name, value in branch_variables.items():
+                payload = branch_snapshot.get(name)
+                if (
+                    name in base_variables
+                    and payload is not None
+                    and payload == base_snapshot.get(name)
+                ):
+                    continue
+                variables[name] = value
+                if payload is not None:
+                    snapshot[name] = payload
+                else:
+                    snapshot.pop(name, None)
+
+        # Outputs of the last subtask, and the failure of any
+        _, last = branches[-1]
+        failed = [branch for _, branch in branches if branch.subtasks]
+        return state.model_copy(
+            update={
+                "variables": variables,
+                "variable_snapshot": snapshot,
+                "kernel_generation": None,
+                "subtask_flow": last.subtask_flow,
+                "analysis_action_plan": last.analysis_action_plan,
+                "visualization_action_plan": last.visualization_action_plan,
+                "code": last.code,
+                "analysis_report": last.analysis_report,
+                "visualization": last.visualization,
+                "error_message": failed[0].error_message if failed else None,
+                "current_debugging_attempt": last.current_debugging_attempt,
+            }
+        )
+
+    @staticmethod
+    async def _acompleted(index: int) -> None:
+        """
+        Publish the completion of a subtask as a graph event.
+
+        Args:
+            index: Index of the completed subtask.
+        """
+        completed_model = RunnableLambda(lambda _: index)
+        await completed_model.ainvoke(
+            "...", config={"metadata": {"subtask_completed": index}}
+        )
+
+    @staticmethod
+    def _completed(index: int) -> None:
+        """
+        Publish the completion of a subtask as a graph event.
+
+        Args:
+            index: Index of the completed subtask.
+        """
+        completed_model = RunnableLambda(lambda _: index)
+        completed_model.invoke("...", config={"metadata": {"subtask_completed": index}})
+
+    @staticmethod
+    def _prepare(
+        state: AgentState,
+    ) -> Tuple[List[str], List[Optional[str]], List[List[int]]]:
+        """
+        Return the queued subtasks, their flows, and their waves.
+
+        Args:
+            state: The current agent state.
+
+        Returns:
+            Tuple[List[str], List[Optional[str]], List[List[int]]]: Subtasks,
+            flows decided upfront (or None), and waves of subtask indices.
+        """
+        subtasks = list(state.subtasks or [])
+        flows = list(state.subtask_flows or [])
+        flows += [None] * (len(subtasks) - len(flows))
+        waves = subtask_waves(len(subtasks), state.subtask_dependencies)
+        return subtasks, flows, waves
+
+    @staticmethod
+    def _finish(
+        state: AgentState, answers: Dict[int, List[str]], remaining: List[str]
+    ) -> AgentState:
+        """
+        Record the answers of the subtasks in subtask order.
+
+        Args:
+            state: The merged agent state.
+            answers: Answers of every subtask that ran, by index.
+            remaining: Subtasks left undone after a failed subtask.
+
+        Returns:
+            AgentState: The final state.
+        """
+        for index in sorted(answers):
+            state.new_conversation[0]["answer"].extend(answers[index])
+        state.subtasks = deque(remaining)
+        state.subtask_flows = None
+        state.subtask_dependencies = None
+        return state
+
+    def invoke(self, state: AgentState) -> AgentState:
+        """
+        Run the subtasks wave by wave, one after another.
+
+        Args:
+            state: The current agent state, with the queued subtasks and
+                their dependencies.
+
+        Returns:
+            AgentState: The state with the results of every subtask merged,
+            and the answers recorded in subtask order.
+        """
+        print("* SubtaskSchedulingNode -> ")
+
+        # Load what the subtasks read from memory once, before they fork
+        MemoryRetrievalNode.get_code_summary(state)
+        MemoryRetrievalNode.get_variables(state)
+
+        subtasks, flows, waves = self._prepare(state)
+        answers: Dict[int, List[str]] = {}
+        for number, wave in enumerate(waves):
+            parallel = len(wave) > 1
+            branches = []
+            for index in wave:
+                values = self.graph.invoke(
+                    self._fork(state, index, subtasks[index], flows[index], parallel),
+                    config={"metadata": {"subtask_index": index}},
+                )
+                branches.append((index, state.model_copy(update=values)))
+                self._completed(index)
+
+            state = self._merge(state, branches)
+            for index, branch in branches:
+                answers[index] = branch.new_conversation[0]["answer"]
+
+            # A subtask that fell back ends the task, as in the sequential graph
+            if any(branch.subtasks for _, branch in branches):
+                remaining = [
+                    subtasks[index] for later in waves[number + 1 :] for index in later
+                ]
+                return self._finish(state, answers, remaining)
+
+        return self._finish(state, answers, [])
+
+    async def ainvoke(self, state: AgentState) -> AgentState:
+        """
+        Run the subtasks wave by wave, the subtasks of a wave concurrently.
+
+        Args:
+            state: The current agent state, with the queued subtasks and
+                their dependencies.
+
+        Returns:
+            AgentState: The state with the results of every subtask merged,
+            and the answers recorded in subtask order.
+        """
+        print("* SubtaskSchedulingNode -> ")
+
+        # Load what the subtasks read from memory once, before they fork
+        await MemoryRetrievalNode.aget_code_summary(state)
+        await MemoryRetrievalNode.aget_variables(state)
+
+        subtasks, flows, waves = self._prepare(state)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        answers: Dict[int, List[str]] = {}
+
+        async def run(index: int, parallel: bool) -> Tuple[int, AgentState]:
+            async with semaphore:
+                values = await self.graph.ainvoke(
+                    self._fork(state, index, subtasks[index], flows[index], parallel),
+                    config={"metadata": {"subtask_index": index}},
+                )
+            await self._acompleted(index)
+            return index, state.model_copy(update=values)
+
+        for number, wave in enumerate(waves):
+            branches = list(
+                await asyncio.gather(*(run(index, len(wave) > 1) for index in wave))
+            )
+
+            state = await summarization_service.acall(self._merge, state, branches)
+            for index, branch in branches:
+                answers[index] = branch.new_conversation[0]["answer"]
+
+            # A subtask that fell back ends the task, as in the sequential graph
+            if any(branch.subtasks for _, branch in branches):
+                remaining = [
+                    subtasks[index] for later in waves[number + 1 :] for index in later
+                ]
+                return self._finish(state, answers, remaining)
+
+        return self._finish(state, answers, [])
+
+
+@dataclass
+class SubtaskStreamBuffer:
+    """
+    Releases the streamed events of subtasks in subtask order.
+
+    Events of the earliest unfinished subtask are released as they arrive;
+    events of later subtasks, running in parallel with it, are held back
+    until every subtask before them completed. Events outside of any
+    subtask are released right away.
+
+    Attributes:
+        _next: Index of the earliest unfinished subtask.
+        _held: Events held back, by subtask index.
+        _completed: Indices of the completed subtasks.
+    """
+
+    _next: int = 0
+    _held: Dict[int, List[str]] = field(default_factory=dict)
+    _completed: Set[int] = field(default_factory=set)
+
+    def push(self, index: Optional[int], events: List[str]) -> List[str]:
+        """
+        Add the events of a graph event.
+
+        Args:
+            index: Index of the subtask emitting them, or None.
+            events: Stream events to release.
+
+        Returns:
+            List[str]: Events to release now.
+        """
+        if index is None or index <= self._next:
+            return events
+        self._held.setdefault(index, []).extend(events)
+        return []
+
+    def complete(self, index: int) -> List[str]:
+        """
+        Mark a subtask as completed.
+
+        Args:
+            index: Index of the completed subtask.
+
+        Returns:
+            List[str]: Held events released by the completion.
+        """
+        self._completed.add(index)
+        released: List[str] = []
+        while self._next in self._completed:
+            self._next += 1
+            released.extend(self._held.pop(self._next, []))
+        return released
+
+    def flush(self) -> List[str]:
+        """
+        Release every held event, in subtask order.
+
+        Returns:
+            List[str]: The held events.
+        """
+        released = [
+            event for index in sorted(self._held) for event in self._held[index]
+        ]
+        self._held.clear()
+        return released
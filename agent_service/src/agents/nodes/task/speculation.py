@@ -0,0 +1,431 @@
+"""
+This module defines the `SubtaskStreamParser`, `SpeculationStore`, and
+`SpeculativeDecompositionNode` classes, which classify the first subtask
+and draft its action plan while the task decomposition is still streaming.
+
+Core responsibilities:
+    - Parse the structured decomposition while the model streams it, and
+      report every subtask as soon as the model finished writing it.
+    - Classify the first subtask and draft its action plan in the
+      background, while the later subtasks are generated and the
+      decomposition is summarized.
+    - Hand the drafted classification and plan to the subtask classifier and
+      the action planner, when they run on the same inputs.
+
+Speculative results are keyed by the node and the exact inputs it sends to
+its model, so a node only uses a result it would have asked the model for
+itself; a result no node claims is discarded after its retention.
+Speculative model calls run outside the callbacks of the turn, so they are
+neither streamed nor traced; a drafted plan reaches the client as a single
+text event once its planner uses it.
+"""
+
+import json
+import time
+import asyncio
+import contextvars
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Coroutine, Dict, Optional, Set, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables.config import var_child_runnable_config
+from langchain_core.utils.json import parse_partial_json
+
+from agents.state import AgentState
+from agents.tracing import detach, traced
+from agents.models.heuristic import subtask_classification_classifier
+
+
+class SubtaskStreamParser(BaseCallbackHandler):
+    """
+    Callback reporting the subtasks of a streaming task decomposition.
+
+    The decomposition arrives as the arguments of a structured output tool
+    call. A subtask is complete once the next one starts, once another field
+    of the output starts, or once the call ends.
+
+    Attributes:
+        on_subtask: Called with the index and text of every completed subtask.
+        run_inline: Parse in the event loop during async runs, so subtasks
+            are reported while the decomposition still streams.
+        _arguments: Tool call arguments streamed so far, per call.
+        _reported: Number of subtasks reported, per call.
+    """
+
+    run_inline = True
+
+    def __init__(self, on_subtask: Callable[[int, str], None]):
+        self.on_subtask = on_subtask
+        self._arguments: Dict[UUID, str] = {}
+        self._reported: Dict[UUID, int] = {}
+
+    def on_llm_new_token(
+        self, token: Any, *, chunk: Any = None, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """
+        Report the subtasks completed by a streamed chunk.
+
+        Args:
+            token: Content of the chunk.
+            chunk: Generation chunk, holding the tool call chunks.
+            run_id: Identifier of the call.
+        """
+        message = getattr(chunk, "message", None)
+        tool_call_chunks = getattr(message, "tool_call_chunks", None)
+        if not tool_call_chunks:
+            return
+
+        arguments = self._arguments.get(run_id, "") + "".join(
+            tool_call_chunk.get("args") or "" for tool_call_chunk in tool_call_chunks
+        )
+        self._arguments[run_id] = arguments
+
+        decomposition = parse_partial_json(arguments)
+        if not isinstance(decomposition, dict):
+            return
+        subtasks = decomposition.get("subtasks")
+        if not isinstance(subtasks, list):
+            return
+
+        # The last subtask may still be written, unless a later field started
+        if list(decomposition)[-1] == "subtasks":
+            subtasks = subtasks[:-1]
+        self._report(run_id, subtasks)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        """
+        Report the subtasks not reported yet when a call ends.
+
+        Args:
+            response: Result of the call.
+            run_id: Identifier of the call.
+        """
+        self._arguments.pop(run_id, None)
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                for tool_call in getattr(message, "tool_calls", None) or []:
+                    subtasks = tool_call.get("args", {}).get("subtasks")
+                    if isinstance(subtasks, list):
+                        self._report(run_id, subtasks)
+        self._reported.pop(run_id, None)
+
+    def _report(self, run_id: UUID, subtasks: list) -> None:
+        """
+        Report the completed subtasks of a call not reported yet.
+
+        Args:
+            run_id: Identifier of the call.
+            subtasks: Completed subtasks of the call so far.
+        """
+        reported = self._reported.get(run_id, 0)
+        for index in range(reported, len(subtasks)):
+            if isinstance(subtasks[index], str):
+                self.on_subtask(index, subtasks[index])
+        self._reported[run_id] = max(reported, len(subtasks))
+
+
+@dataclass
+class SpeculationStore:
+    """
+    Results of model calls started ahead of the nodes making them.
+
+    Attributes:
+        retention (float): Seconds a result is kept for its node to claim it.
+        _results (Dict[Tuple[int, str, str], Tuple[float, asyncio.Task]]):
+            Start time and task of every unclaimed result, by node, session,
+            and inputs.
+        _background (Set[asyncio.Task]): Speculations still running.
+
+    Methods:
+        start: Run a speculation in the background.
+        submit: Start a model call ahead of the node making it.
+        aclaim: Return the result of a call started for a node and its inputs.
+        metrics: Return speculation counters.
+    """
+
+    retention: float = 300.0
+    _results: Dict[Tuple[int, str, str], Tuple[float, asyncio.Task]] = field(
+        default_factory=dict, init=False
+    )
+    _background: Set[asyncio.Task] = field(default_factory=set, init=False)
+    _started: int = field(default=0, init=False)
+    _used: int = field(default=0, init=False)
+    _discarded: int = field(default=0, init=False)
+    _failed: int = field(default=0, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def start(self, coroutine: Coroutine[Any, Any, Any]) -> None:
+        """
+        Run a speculation in the background, outside the callbacks of the turn.
+
+        Args:
+            coroutine: Speculation to run; its errors are counted, not raised.
+        """
+        task = self._detached(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._finished)
+
+    def submit(
+        self,
+        node: Any,
+        state: AgentState,
+        inputs: Dict[str, Any],
+        coroutine: Coroutine[Any, Any, Any],
+    ) -> asyncio.Task:
+        """
+        Start a model call ahead of the node making it.
+
+        Args:
+            node: Node the call is made for.
+            state: Agent state of the session the call is made for.
+            inputs: Inputs the node sends to its model.
+            coroutine: Model call returning the result of the node.
+
+        Returns:
+            asyncio.Task: Task of the call.
+        """
+        key = self._key(node, state, inputs)
+        task = self._detached(coroutine)
+        with self._lock:
+            self._prune()
+
+            # A result started again for the same inputs replaces the earlier one
+            previous = self._results.get(key)
+            if previous is not None:
+                previous[1].cancel()
+                self._discarded += 1
+            self._results[key] = (time.monotonic(), task)
+            self._started += 1
+        return task
+
+    async def aclaim(
+        self, node: Any, state: AgentState, inputs: Dict[str, Any]
+    ) -> Optional[Any]:
+        """
+        Return the result of a call started for a node and its inputs.
+
+        Args:
+            node: Node claiming the result.
+            state: The current agent state.
+            inputs: Inputs the node would send to its model.
+
+        Returns:
+            Optional[Any]: The result, waiting for it if still running, or
+            None if no call was started for these inputs or it failed.
+        """
+        with self._lock:
+            result = self._results.pop(self._key(node, state, inputs), None)
+        if result is None:
+            return None
+
+        try:
+            value = await result[1]
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            return None
+
+        with self._lock:
+            self._used += 1
+        return value
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return speculation counters.
+
+        Returns:
+            Dict[str, Any]: Speculative calls started, used by their node,
+            discarded unclaimed, failed, and waiting to be claimed.
+        """
+        with self._lock:
+            return {
+                "started": self._started,
+                "used": self._used,
+                "discarded": self._discarded,
+                "failed": self._failed,
+                "pending": len(self._results),
+            }
+
+    @staticmethod
+    def _detached(coroutine: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        """
+        Create a task that does not inherit the run config of the caller.
+
+        The callbacks of the turn may close before a speculation ends, so
+        the task runs without them, and its model calls are recorded in a
+        detached trace linked to the turn.
+
+        Args:
+            coroutine: Coroutine to run.
+
+        Returns:
+            asyncio.Task: The created task.
+        """
+        tracer = detach("speculation")
+
+        async def run() -> Any:
+            try:
+                with traced(tracer):
+                    return await coroutine
+            finally:
+                # A task cancelled before it starts never awaits the coroutine
+                coroutine.close()
+
+        context = contextvars.copy_context()
+        context.run(var_child_runnable_config.set, None)
+        return asyncio.get_running_loop().create_task(run(), context=context)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        """
+        Forget a finished speculation and count its failure, if any.
+
+        Args:
+            task: The finished speculation.
+        """
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            with self._lock:
+                self._failed += 1
+
+    @staticmethod
+    def _key(
+        node: Any, state: AgentState, inputs: Dict[str, Any]
+    ) -> Tuple[int, str, str]:
+        """
+        Build the key of a result.
+
+        Args:
+            node: Node the result is for.
+            state: Agent state of the session the result is for.
+            inputs: Inputs the node sends to its model.
+
+        Returns:
+            Tuple[int, str, str]: Node, session, and serialized inputs.
+        """
+        return (
+            id(node),
+            str(state.session_id),
+            json.dumps(inputs, sort_keys=True, default=str),
+        )
+
+    def _prune(self) -> None:
+        """
+        Cancel and forget the results unclaimed for longer than the retention.
+
+        Must be called with `_lock` held.
+        """
+        expired = time.monotonic() - self.retention
+        for key, (started, task) in list(self._results.items()):
+            if started < expired:
+                task.cancel()
+                del self._results[key]
+                self._discarded += 1
+
+
+async def astream_text(text: str) -> None:
+    """
+    Publish text produced ahead of time, such as a drafted plan, as a graph event.
+
+    Args:
+        text: Text to send to the client.
+    """
+    text_model = RunnableLambda(lambda _: text)
+    await text_model.ainvoke("...", config={"metadata": {"text": True}})
+
+
+class SpeculativeDecompositionNode(BaseModel):
+    """
+    Decomposes the task while classifying and planning its first subtask.
+
+    As soon as the first subtask is complete in the streamed decomposition,
+    it is classified and, for analysis and visualization subtasks, its action
+    plan is drafted, on a copy of the state, by the nodes that will run it.
+
+    Attributes:
+        decomposition_node: Node decomposing the task.
+        classification_node: Node classifying the subtasks.
+        planning_nodes: Action planning node of every subtask flow.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    decomposition_node: Any
+    classification_node: Any
+    planning_nodes: Dict[str, Any]
+
+    def invoke(self, state: AgentState) -> AgentState:
+        """
+        Decompose the task; speculation needs a running event loop.
+
+        Args:
+            state: The current agent state.
+
+        Returns:
+            AgentState: The state with the decomposed subtasks.
+        """
+        return self.decomposition_node.invoke(state)
+
+    async def ainvoke(self, state: AgentState) -> AgentState:
+        """
+        Decompose the task, starting on its first subtask as soon as it is written.
+
+        Args:
+            state: The current agent state.
+
+        Returns:
+            AgentState: The state with the decomposed subtasks.
+        """
+        started = False
+
+        def on_subtask(index: int, subtask: str) -> None:
+            nonlocal started
+            if index == 0 and not started:
+                started = True
+                speculation_store.start(self._speculate(state, subtask))
+
+        return await self.decomposition_node.ainvoke(state, on_subtask=on_subtask)
+
+    async def _speculate(self, state: AgentState, subtask: str) -> None:
+        """
+        Classify a first subtask and draft its action plan.
+
+        Args:
+            state: Agent state at the start of the decomposition.
+            subtask: Text of the first subtask.
+        """
+        state = state.model_copy(update={"subtasks": deque([subtask])})
+
+        # Classify the subtask, unless the heuristics will decide it locally
+        inputs = await self.classification_node.ainputs(state)
+        subtask_flow = subtask_classification_classifier.predict(inputs, count=False)
+        if subtask_flow is None:
+            classification = speculation_store.submit(
+                self.classification_node,
+                state,
+                inputs,
+                self.classification_node.aclassify(inputs),
+            )
+            # A failed classification is counted once its node claims it
+            try:
+                subtask_flow = await classification
+            except Exception:
+                return
+
+        # Draft the action plan of analysis and visualization subtasks
+        planning_node = self.planning_nodes.get(subtask_flow)
+        if planning_node is not None:
+            inputs = await planning_node.ainputs(state)
+            speculation_store.submit(
+                planning_node, state, inputs, planning_node.aplan(inputs)
+            )
+
+
+# Speculative results shared by the decomposition and the subtask nodes
+speculation_store = SpeculationStore()
@@ -10,13 +10,17 @@ Core responsibilities:
       (technical vs. quick visualization).
 """
 
-from typing import override
+from typing import Any, Dict, override
 
 from agents.nodes.base import BaseNode
 from agents.state import AgentState
 from agents.prompts.visualization.action_planing import VisualizationActionPlaningPrompt
 from agents.models.anthropic_ import medium_temp_model
+from agents.models.budgeting import PromptBudgetRegistry
 from agents.nodes.memory.retrieval import MemoryRetrievalNode
+from agents.nodes.task.speculation import astream_text, speculation_store
+from services.summarization import summarization_service
+from core.lazy import LazyAttribute
 
 
 class VisualizationActionPlaningNode(BaseNode):
@@ -31,6 +35,41 @@ class VisualizationActionPlaningNode(BaseNode):
                         prompt, and output handling logic.
     """
 
+    @staticmethod
+    def _input(state: AgentState) -> Dict[str, Any]:
+        """
+        Build the input of the planning chain.
+
+        Args:
+            state: The current agent state, with the summary resolved.
+
+        Returns:
+            Dict[str, Any]: The first subtask and prior visualization summary.
+        """
+        return {
+            "subtask": state.subtasks[0],
+            "visualization_summary": state.visualization_summary,
+        }
+
+    @staticmethod
+    def _apply(state: AgentState, plan: str) -> AgentState:
+        """
+        Store the visualization action plan and record it in memory.
+
+        Args:
+            state: The current agent state.
+            plan: The visualization action plan.
+
+        Returns:
+            AgentState: The updated state.
+        """
+        state.visualization_action_plan = plan
+
+        # Record visualization plan in memory for conversation history
+        MemoryRetrievalNode.add_answer(state, state.visualization_action_plan)
+
+        return state
+
     @override
     def invoke(self, state: AgentState):
         """
@@ -46,20 +85,73 @@ class VisualizationActionPlaningNode(BaseNode):
             attribute populated based on the generated visualization plan.
         """
         print("* VisualizationActionPlaningNode -> ")
+
+        # Wait for the summary of the previous subtasks, if still running
+        summarization_service.resolve(state, "visualization_summary")
+
         print("VISUALIZATION SUMMARY:", state.visualization_summary, "\n\n")
 
         # Use the first subtask and prior visualization summary to guide planning
-        state.visualization_action_plan = self._chain.invoke(
-            {
-                "subtask": state.subtasks[0],
-                "visualization_summary": state.visualization_summary,
-            }
-        ).content
+        plan = self._chain.invoke(self._input(state)).content
+        return self._apply(state, plan)
 
-        # Record visualization plan in memory for conversation history
-        MemoryRetrievalNode.add_answer(state, state.visualization_action_plan)
+    @override
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously run the visualization action planning process on the
+        current agent state.
 
-        return state
+        Args:
+            state: The current state of the agent, which includes:
+                - subtasks: A list of subtasks derived from decomposition.
+                - visualization_summary: A summary of prior visualization steps.
+
+        Returns:
+            AgentState: The updated state object with the `visualization_action_plan`
+            attribute populated based on the generated visualization plan.
+        """
+        print("* VisualizationActionPlaningNode -> ")
+
+        inputs = await self.ainputs(state)
+
+        print("VISUALIZATION SUMMARY:", state.visualization_summary, "\n\n")
+
+        # Use the plan drafted while the task was still being decomposed, if
+        # any; it was not streamed, so it is sent in one piece
+        plan = await speculation_store.aclaim(self, state, inputs)
+        if plan is not None:
+            await astream_text(plan)
+        else:
+            plan = await self.aplan(inputs)
+        return self._apply(state, plan)
+
+    async def ainputs(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Wait for the summary the planning reads and return its inputs.
+
+        Args:
+            state: The current agent state.
+
+        Returns:
+            Dict[str, Any]: The first subtask and prior visualization summary.
+        """
+        # Wait for the summary of the previous subtasks, if still running
+        await summarization_service.aresolve(state, "visualization_summary")
+
+        return self._input(state)
+
+    async def aplan(self, inputs: Dict[str, Any]) -> str:
+        """
+        Plan a visualization subtask with the language model.
+
+        Args:
+            inputs: The first subtask and prior visualization summary.
+
+        Returns:
+            str: The visualization action plan.
+        """
+        # Use the first subtask and prior visualization summary to guide planning
+        return (await self._chain.ainvoke(inputs)).content
 
 
 class VisualizationActionPlaningNodeRegistry:
@@ -79,14 +171,19 @@ class VisualizationActionPlaningNodeRegistry:
     """
 
     # Node for detailed technical visualization planning
-    TECHNICAL_MODE: VisualizationActionPlaningNode = VisualizationActionPlaningNode(
-        model=medium_temp_model, prompt=VisualizationActionPlaningPrompt.TECHNICAL_MODE
+    TECHNICAL_MODE: VisualizationActionPlaningNode = LazyAttribute(
+        lambda: VisualizationActionPlaningNode(
+            model=medium_temp_model,
+            prompt=VisualizationActionPlaningPrompt.TECHNICAL_MODE,
+            prompt_budget=PromptBudgetRegistry.PLANNING,
+        )
     )
 
     # Node for quick and lightweight visualization planning
-    QUICK_VISUALIZATION_MODE: VisualizationActionPlaningNode = (
-        VisualizationActionPlaningNode(
+    QUICK_VISUALIZATION_MODE: VisualizationActionPlaningNode = LazyAttribute(
+        lambda: VisualizationActionPlaningNode(
             model=medium_temp_model,
             prompt=VisualizationActionPlaningPrompt.QUICK_VISUALIZATION_MODE,
+            prompt_budget=PromptBudgetRegistry.PLANNING,
         )
     )
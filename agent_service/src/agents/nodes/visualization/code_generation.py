@@ -20,7 +20,9 @@ from agents.prompts.visualization.code_generation import (
     VisualizationCodeGenerationPrompt,
 )
 from agents.models.anthropic_ import code_generation_model
+from agents.models.budgeting import PromptBudgetRegistry
 from agents.nodes.memory.retrieval import MemoryRetrievalNode
+from core.lazy import LazyAttribute
 
 
 class VisualizationCodeGenerationNode(BaseNode):
@@ -37,6 +39,44 @@ class VisualizationCodeGenerationNode(BaseNode):
                         prompt, and output handling logic.
     """
 
+    @staticmethod
+    def _input(state: AgentState) -> dict:
+        """
+        Build the input of the code generation chain.
+
+        Args:
+            state: The current agent state, with the memory context retrieved.
+
+        Returns:
+            dict: The session context and the action plan.
+        """
+        return {
+            "dependencies": state.dependencies,
+            "dataset_summary": state.dataset_summary,
+            "code_summary": state.code_summary,
+            "variables": state.variables.keys(),
+            "visualization_action_plan": state.visualization_action_plan,
+        }
+
+    @staticmethod
+    def _apply(state: AgentState, code: str) -> AgentState:
+        """
+        Store the generated code and record it in memory.
+
+        Args:
+            state: The current agent state.
+            code: The generated code.
+
+        Returns:
+            AgentState: The updated state.
+        """
+        state.code = code
+
+        # Record the generated code in memory for tracking
+        MemoryRetrievalNode.add_answer(state, state.code)
+
+        return state
+
     @override
     def invoke(self, state: AgentState):
         """
@@ -61,20 +101,36 @@ class VisualizationCodeGenerationNode(BaseNode):
         MemoryRetrievalNode.get_variables(state)
 
         # Generate new visualization code based on dependencies, dataset, variables, and plan
-        state.code = self._chain.invoke(
-            {
-                "dependencies": state.dependencies,
-                "dataset_summary": state.dataset_summary,
-                "code_summary": state.code_summary,
-                "variables": state.variables.keys(),
-                "visualization_action_plan": state.visualization_action_plan,
-            }
-        ).content
+        code = self._chain.invoke(self._input(state)).content
+        return self._apply(state, code)
 
-        # Record the generated code in memory for tracking
-        MemoryRetrievalNode.add_answer(state, state.code)
+    @override
+    async def ainvoke(self, state: AgentState):
+        """
+        Asynchronously generate visualization code for the current subtask and
+        update memory.
 
-        return state
+        Args:
+            state: The current state of the agent, which includes:
+                - dependencies: List of required library imports or dependencies.
+                - dataset_summary: Summary of the dataset.
+                - code_summary: Summary of previously generated code.
+                - variables: Variables and their descriptions.
+                - visualization_action_plan: Planned steps for visualization.
+
+        Returns:
+            AgentState: The updated state object with the `code`
+                        attribute populated and memory updated.
+        """
+        print("* VisualizationCodeGenerationNode -> ")
+
+        # Retrieve previous code summaries and variables from memory
+        await MemoryRetrievalNode.aget_code_summary(state)
+        await MemoryRetrievalNode.aget_variables(state)
+
+        # Generate new visualization code based on dependencies, dataset, variables, and plan
+        code = (await self._chain.ainvoke(self._input(state))).content
+        return self._apply(state, code)
 
 
 class VisualizationCodeGenerationNodeRegistry:
@@ -93,15 +149,19 @@ class VisualizationCodeGenerationNodeRegistry:
     """
 
     # Node for detailed technical visualization code generation
-    TECHNICAL_MODE: VisualizationCodeGenerationNode = VisualizationCodeGenerationNode(
-        model=code_generation_model,
-        prompt=VisualizationCodeGenerationPrompt.TECHNICAL_MODE,
+    TECHNICAL_MODE: VisualizationCodeGenerationNode = LazyAttribute(
+        lambda: VisualizationCodeGenerationNode(
+            model=code_generation_model,
+            prompt=VisualizationCodeGenerationPrompt.TECHNICAL_MODE,
+            prompt_budget=PromptBudgetRegistry.CODE,
+        )
     )
 
     # Node for quick and lightweight visualization code generation
-    QUICK_VISUALIZATION_MODE: VisualizationCodeGenerationNode = (
-        VisualizationCodeGenerationNode(
+    QUICK_VISUALIZATION_MODE: VisualizationCodeGenerationNode = LazyAttribute(
+        lambda: VisualizationCodeGenerationNode(
             model=code_generation_model,
             prompt=VisualizationCodeGenerationPrompt.QUICK_VISUALIZATION_MODE,
+            prompt_budget=PromptBudgetRegistry.CODE,
         )
     )
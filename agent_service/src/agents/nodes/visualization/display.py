@@ -13,6 +13,7 @@ from langchain.schema.runnable import RunnableLambda
 
 from agents.state import AgentState
 from agents.nodes.summarization import SummarizationNode
+from services.summarization import summarization_service
 from agents.nodes.memory.retrieval import MemoryRetrievalNode
 
 
@@ -27,31 +28,34 @@ class VisualizationDisplayNode:
     """
 
     @staticmethod
-    def invoke(state: AgentState) -> AgentState:
+    def _display_model(state: AgentState) -> RunnableLambda:
         """
-        Display the current visualization and update the agent state.
+        Build the runnable emitting the current visualization.
 
         Args:
-            state: The current state of the agent, which includes:
-                - visualization: The visualization content to display.
-                - subtasks: Queue of remaining subtasks.
+            state: The current agent state.
 
         Returns:
-            AgentState: The updated state after displaying the visualization
-                        and removing the completed subtask.
+            RunnableLambda: Runnable returning the visualization as an AIMessage.
         """
-
-        print("* VisualizationDisplayMode -> ")
-
         # Wrap the visualization content in an AIMessage for rendering
-        visualization_display_model = RunnableLambda(
+        return RunnableLambda(
             lambda _: AIMessage(
                 content=state.visualization, additional_kwargs={}, response_metadata={}
             )
         )
-        # Invoke the model to display the visualization with image metadata
-        visualization_display_model.invoke("...", config={"metadata": {"image": True}})
 
+    @staticmethod
+    def _apply(state: AgentState) -> AgentState:
+        """
+        Summarize and record the displayed visualization and complete the subtask.
+
+        Args:
+            state: The current agent state.
+
+        Returns:
+            AgentState: The updated state.
+        """
         # Update agent's visualization summary
         SummarizationNode.visualization_summarization(
             state, state.visualization_action_plan, state.visualization_summary
@@ -64,3 +68,49 @@ class VisualizationDisplayNode:
         state.subtasks.popleft()
 
         return state
+
+    @classmethod
+    def invoke(cls, state: AgentState) -> AgentState:
+        """
+        Display the current visualization and update the agent state.
+
+        Args:
+            state: The current state of the agent, which includes:
+                - visualization: The visualization content to display.
+                - subtasks: Queue of remaining subtasks.
+
+        Returns:
+            AgentState: The updated state after displaying the visualization
+                        and removing the completed subtask.
+        """
+
+        print("* VisualizationDisplayMode -> ")
+
+        # Invoke the model to display the visualization with image metadata
+        visualization_display_model = cls._display_model(state)
+        visualization_display_model.invoke("...", config={"metadata": {"image": True}})
+
+        return cls._apply(state)
+
+    @classmethod
+    async def ainvoke(cls, state: AgentState) -> AgentState:
+        """
+        Asynchronously display the current visualization and update the agent state.
+
+        Args:
+            state: The current state of the agent, as for `invoke`.
+
+        Returns:
+            AgentState: The updated state after displaying the visualization
+                        and removing the completed subtask.
+        """
+
+        print("* VisualizationDisplayMode -> ")
+
+        # Invoke the model to display the visualization with image metadata
+        visualization_display_model = cls._display_model(state)
+        await visualization_display_model.ainvoke(
+            "...", config={"metadata": {"image": True}}
+        )
+
+        return await summarization_service.acall(cls._apply, state)
@@ -0,0 +1,113 @@
+"""
+
+This module defines the `FusedRoutingPrompt` class, which provides a LangChain
+`ChatPromptTemplate` for taking every routing decision about a user question
+in a single structured call:
+
+    - The **agent mode** (`TECHNICAL` or `QUICK`), as decided by
+      `AgentModeClassificationPrompt`.
+    - The **task flow** (`ADVISORY` or `EXPLORATORY`), as decided by
+      `TaskRoutingPrompt`.
+    - The **subtasks** of an exploratory question, as produced by
+      `TaskDecompositionPrompt`.
+    - The **flow of each subtask** (`ANALYSIS`, `VISUALIZATION`, or
+      `DIRECT_RESPONSE`), as decided by `SubtaskClassificationPrompt`.
+
+The rules are condensed from those prompts, so both routing pipelines make
+the same decisions for the same inputs.
+"""
+
+from langchain.prompts import (
+    ChatPromptTemplate,
+    HumanMessagePromptTemplate,
+    SystemMessagePromptTemplate,
+)
+
+
+class FusedRoutingPrompt:
+    """Prompt template for the fused routing of a user question.
+
+    Attributes:
+        UNIFIED:
+            - A LangChain prompt template producing a `FusedRoutingOutput`.
+            - Decision is made strictly using:
+                - User Message
+                - Summary of Achievements
+                - Visualization Summary
+                - User Preferences Summary
+                - Pending Context
+            - Decides the agent mode, the task flow, the subtasks, and the
+              flow of every subtask, in this order.
+    """
+
+    UNIFIED: ChatPromptTemplate = ChatPromptTemplate.from_messages(
+        [
+            SystemMessagePromptTemplate.from_template(
+                """
+You are the routing assistant of a data analysis / machine learning agent. For the CURRENT user message you take
+four decisions, in order, based ONLY on the message and the provided summaries:
+- A **Summary of Achievements**, describing everything that has already been accomplished
+- A **Visualization Summary**, describing all visualizations that have been created
+- A **User Preferences Summary**, describing the user's preferred collaboration style learned from prior interactions
+- A **Pending Context**, which represents the most recent suggested immediate action awaiting confirmation
+
+__
+
+## 1. AGENT MODE (`TECHNICAL` or `QUICK`)
+- If the message clearly asks for detailed, in-depth, or technical explanation → `TECHNICAL`.
+- If the message clearly asks for quick insights, a high-level summary, or fast/simple analysis → `QUICK`.
+- Otherwise follow the User Preferences Summary if it strongly favors one mode; do NOT change the established
+  preference unless the message clearly and explicitly indicates a shift.
+- If the message is ambiguous and preferences are unclear → `QUICK`.
+
+## 2. TASK FLOW (`ADVISORY` or `EXPLORATORY`)
+- **Key override:** if the summaries and Pending Context contain enough information to fully answer the message → `ADVISORY`.
+- If the message confirms, agrees with, or accepts a prior suggestion, or clearly relates to the Pending Context → `EXPLORATORY`.
+- If the message relates to a task or visualization already completed, asks to summarize, asks a question, expresses
+  uncertainty, or seeks guidance → `ADVISORY`.
+- If the User Preferences Summary prefers one style (an `Immediate` action style counts as EXPLORATORY), default to it
+  unless the message explicitly requests the other.
+- A new question or topic not addressed in the summaries → `ADVISORY`. When in doubt → `ADVISORY`.
+
+## 3. SUBTASKS (only for `EXPLORATORY`; empty for `ADVISORY`)
+- If the message is a confirmation of a prior suggestion, decompose the **Pending Context** instead of the literal message.
+- If one atomic step answers the message, output a single direct action. Otherwise output **at most 2** ordered subtasks:
+  up to 2 analysis subtasks, up to 2 visualization subtasks, or exactly 1 analysis + 1 visualization when both are demanded.
+- Each subtask performs exactly one conceptual action, builds on the prior summaries without redoing completed work,
+  and never includes code or mentions data ingestion (data is already available).
+- Write subtasks at the depth of the chosen agent mode: senior-engineer precision for `TECHNICAL`, simple and
+  approachable for `QUICK`.
+
+## 4. SUBTASK FLOW (`ANALYSIS`, `VISUALIZATION`, or `DIRECT_RESPONSE`, one per subtask)
+- Calculations, data processing, or algorithms → `ANALYSIS` (no visualizations).
+- Plots, charts, or other visuals → `VISUALIZATION` (no additional analysis).
+- Fully answerable from the summaries → `DIRECT_RESPONSE`, except when the subtask follows the Pending Context:
+  then always use its action type (`ANALYSIS` or `VISUALIZATION`).
+- Never mix flows within one subtask.
+
+__
+
+## OUTPUT FORMAT
+- Return only the structured decision; no explanations or extra text.
+"""
+            ),
+            HumanMessagePromptTemplate.from_template(
+                """
+User Message:
+{question}
+
+Summary of Achievements:
+{analysis_summary}
+
+Visualization Summary:
+{visualization_summary}
+
+User Preferences Summary:
+{user_preferences_summary}
+
+Pending Context:
+{pending_context}
+"""
+            ),
+        ]
+    )
@@ -15,7 +15,7 @@ management across ML, data analysis, visualization, and advisory workflows.
 """
 
 from uuid import UUID
-from typing import Optional, List, Dict, Literal, Deque
+from typing import Any, Optional, List, Dict, Literal, Deque, Tuple
 
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy.orm import Session
@@ -69,6 +69,10 @@ class AgentState(BaseModel):
         code_summary (Optional[str]): Summary of code generated.
         user_preferences_summary (Optional[str]): Summary of user preferences.
         variables (Optional[Dict]): Dictionary of variables in the current session.
+        variable_snapshot (Optional[Dict[str, bytes]]): Pickled payloads of
+            `variables`, reused when saving memory.
+        summary_jobs (Dict[str, str]): Background summarization jobs started
+            this turn, by the name of the summary field they update.
 
         new_conversation (List[Dict]): Log of the current conversation turn
             (question and answer pairs).
@@ -78,12 +82,24 @@ class AgentState(BaseModel):
         subtasks (Optional[Deque[str]]): Queue of subtasks to be executed.
         subtask_flow (Optional[Literal["ANALYSIS", "VISUALIZATION", "DIRECT_RESPONSE"]]):
             Current subtask flow category.
+        subtask_flows (Optional[Deque[str]]): Flows of the queued subtasks, when
+            decided upfront by fused routing.
+        subtask_dependencies (Optional[List[List[int]]]): Indices of the
+            subtasks every queued subtask depends on, when decided by task
+            decomposition.
+        deferred_summaries (Optional[List[Tuple[str, Any]]]): Summary fields
+            and summarizers of a subtask running in parallel with others,
+            submitted in subtask order once the subtasks are merged.
 
         analysis_action_plan (Optional[str]): Planned steps for analysis execution.
         visualization_action_plan (Optional[str]): Planned steps for visualization execution.
 
         code (Optional[str]): Generated code snippet.
         error_message (Optional[str]): Error message if code execution fails.
+        kernel_generation (Optional[str]): Generation of the execution kernel
+            that `variables` correspond to.
+        kernel_namespace (Optional[str]): Namespace of the execution kernel
+            of a subtask running in parallel with others.
 
         max_debugging_attempts (int): Maximum retries allowed for debugging.
         current_debugging_attempt (int): Number of debugging attempts made so far.
@@ -111,6 +127,8 @@ class AgentState(BaseModel):
     user_preferences_summary: Optional[str] = Field(default=None)
     pending_context: Optional[str] = Field(default=None)
     variables: Optional[Dict] = Field(default=None)
+    variable_snapshot: Optional[Dict[str, bytes]] = Field(default=None)
+    summary_jobs: Dict[str, str] = Field(default_factory=dict)
 
     # --------------------
     new_conversation: List[Dict] = Field(
@@ -129,6 +147,9 @@ class AgentState(BaseModel):
     subtask_flow: Optional[Literal["ANALYSIS", "VISUALIZATION", "DIRECT_RESPONSE"]] = (
         Field(default=None)
     )
+    subtask_flows: Optional[Deque[str]] = Field(default=None)
+    subtask_dependencies: Optional[List[List[int]]] = Field(default=None)
+    deferred_summaries: Optional[List[Tuple[str, Any]]] = Field(default=None)
 
     # --------------------
     analysis_action_plan: Optional[str] = Field(default=None)
@@ -137,6 +158,8 @@ class AgentState(BaseModel):
     # --------------------
     code: Optional[str] = Field(default=None)
     error_message: Optional[str] = Field(default=None)
+    kernel_generation: Optional[str] = Field(default=None)
+    kernel_namespace: Optional[str] = Field(default=None)
 
     # --------------------
     max_debugging_attempts: int = Field(default=5)
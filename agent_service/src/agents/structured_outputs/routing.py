@@ -0,0 +1,58 @@
+"""
+
+This module defines the `FusedRoutingOutput` model, which represents the
+structured output of the fused routing step. A single model call decides
+the agent mode, the task flow, the decomposition into subtasks, and the flow
+of every subtask, which otherwise takes four sequential calls (mode
+classification, task routing, task decomposition, and subtask
+classification).
+
+The design enforces strict rules:
+- Advisory questions have no subtasks.
+- Exploratory questions have one or two ordered subtasks.
+- Every subtask carries the flow it is executed with.
+"""
+
+from typing import List, Literal
+from pydantic import BaseModel, Field
+
+
+class RoutedSubtask(BaseModel):
+    """
+    A single subtask together with the flow it is executed with.
+    """
+
+    subtask: str = Field(
+        description=(
+            "Action instruction of the subtask. It must be atomic, concise, and "
+            "expert-focused, build on the prior summaries without redoing work, and "
+            "never include code or mention data ingestion."
+        ),
+    )
+    subtask_flow: Literal["ANALYSIS", "VISUALIZATION", "DIRECT_RESPONSE"] = Field(
+        description=(
+            "ANALYSIS for calculations, data processing, or algorithms; "
+            "VISUALIZATION for plots and charts; DIRECT_RESPONSE if the summaries "
+            "already answer the subtask."
+        ),
+    )
+
+
+class FusedRoutingOutput(BaseModel):
+    """
+    Structured container for the routing decisions of a user question.
+    """
+
+    agent_mode: Literal["TECHNICAL", "QUICK"] = Field(
+        description="Agent answering the question: TECHNICAL or QUICK.",
+    )
+    task_flow: Literal["ADVISORY", "EXPLORATORY"] = Field(
+        description="ADVISORY to respond with guidance, EXPLORATORY to act on the data.",
+    )
+    subtasks: List[RoutedSubtask] = Field(
+        default_factory=list,
+        description=(
+            "Ordered subtasks of an EXPLORATORY question (at most 2), each building "
+            "on the previous one. Empty for an ADVISORY question."
+        ),
+    )
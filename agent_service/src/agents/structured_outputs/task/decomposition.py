@@ -6,14 +6,16 @@ that generated subtasks are explicitly ordered, logically connected, and
 designed to progressively deepen problem understanding.
 
 The design enforces strict rules:
-- Each subtask must build upon the previous one.
+- Each subtask must build upon the subtasks it depends on.
+- Dependencies between subtasks are explicit, so independent subtasks can
+  run concurrently.
 - Subtasks must be expert-level, precise, and concise.
 - Redundant replanning or redoing already completed work is prohibited.
 - Subtasks are textual action instructions only (no code, no data ingestion).
 """
 
 from collections import deque
-from typing import Deque
+from typing import Deque, List
 from pydantic import BaseModel, Field
 
 
@@ -32,7 +34,7 @@ class TaskDecompositionOutput(BaseModel):
         description=(
             "Ordered list of sequentialsubtasks (action instructions) generated by the agent. "
             "Each subtask must:\n"
-            "1. Build explicitly on the insights/results of the previous subtask.\n"
+            "1. Build explicitly on the insights/results of the subtasks it depends on.\n"
             "2. Progressively deepen understanding of the problem.\n"
             "3. Be concise, precise, and expert-focused.\n"
             "4. Leverage the full internal conversation history "
@@ -40,3 +42,12 @@ class TaskDecompositionOutput(BaseModel):
             "5. Never include code or mention data ingestion, as data is already available.\n"
         ),
     )
+    dependencies: List[List[int]] = Field(
+        default_factory=list,
+        description=(
+            "For every subtask, in the same order, the zero-based indices of the "
+            "earlier subtasks whose results it needs. An empty list marks a subtask "
+            "that only builds on the prior summaries, such as a separate plot of "
+            "another column, and can run alongside the others."
+        ),
+    )
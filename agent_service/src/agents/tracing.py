@@ -0,0 +1,766 @@
+"""
+Turn tracing module.
+
+This module records the span tree of every agent turn and exports it. A
+`TurnTracer` is passed to the run of a turn as a callback, so it sees every
+node of every graph (the orchestrator, the agent graph it routes to, and
+the subtask graphs running in parallel) and every model call they make,
+without wrapping any of them:
+
+    turn        the whole turn, with the session, the turn id, and the time
+                to the first token streamed to the client
+      node      a graph node, as registered in `_add_nodes`, with the wall
+                and CPU time of the code it executed
+        llm     a model call, with its model, tier, node, time to the first
+                token, and token usage
+
+Token counts, model calls, and execution times of a span include those of
+the spans below it, so a node of the orchestrator holds the totals of the
+agent graph it ran, and the turn those of the whole turn.
+
+Work a turn starts outside of its callbacks, the summaries computed in the
+background and the speculative model calls, may outlive the turn. Its model
+calls are recorded in a detached trace of their own, rooted in a `detached`
+span linked to the span of the turn, and exported when the work ends.
+
+Finished traces are written by a background thread to a JSON lines file
+(`TRACING_PATH`), one turn per line, and, if `TRACING_OTLP_ENDPOINT` is set,
+posted as OTLP/HTTP JSON to an OpenTelemetry collector.
+
+Classes:
+    Span: Timed operation of a turn.
+    TurnTracer: Callback recording the span tree of one turn.
+    TraceExporter: Writes finished traces to a file and an OTLP collector.
+
+Functions:
+    current_tracer: Return the tracer of the turn running in the current context.
+    detach: Open a detached trace for work of the current turn.
+    traced: Record the model calls of a block in a detached trace.
+    otlp_payload: Convert a trace into an OTLP/HTTP JSON export request.
+
+Instances:
+    trace_exporter: Exporter configured from application settings.
+"""
+
+import json
+import asyncio
+import time
+import secrets
+import threading
+import urllib.request
+from uuid import UUID, uuid4
+from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from langchain_core.callbacks import BaseCallbackHandler, BaseCallbackManager
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables.config import var_child_runnable_config
+
+from core.config import settings
+from agents.models.caching import message_usage
+
+
+# Attributes of a span summed into the spans above it
+ROLLUP_ATTRIBUTES = (
+    "model_calls",
+    "input_tokens",
+    "output_tokens",
+    "cache_read_tokens",
+    "cache_creation_tokens",
+    "executor_wall_time",
+    "executor_cpu_time",
+)
+
+
+@dataclass
+class Span:
+    """
+    Timed operation of a turn.
+
+    Attributes:
+        span_id: Identifier of the span, 16 hex digits.
+        parent_id: Identifier of the enclosing span, None for the turn.
+        name: Node name, model name, "turn", or the name of detached work.
+        kind: "turn", "node", "llm", or "detached".
+        start_time: Start, in nanoseconds since the epoch.
+        end_time: End, in nanoseconds since the epoch, None while open.
+        status: "ok", "error", or "cancelled".
+        attributes: Timing, token, and context attributes.
+    """
+
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    kind: str
+    start_time: int
+    end_time: Optional[int] = None
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """
+        Duration of the span.
+
+        Returns:
+            Optional[float]: Milliseconds between start and end, None while open.
+        """
+        if self.end_time is None:
+            return None
+        return (self.end_time - self.start_time) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the span as a JSON-serializable dict.
+
+        Returns:
+            Dict[str, Any]: Fields of the span and its duration.
+        """
+        return {**asdict(self), "duration_ms": self.duration_ms}
+
+
+class TurnTracer(BaseCallbackHandler):
+    """
+    Callback recording the span tree of one turn.
+
+    A chain run is a node when LangGraph runs it as the node it names; any
+    other run, such as a chain inside a node, belongs to the span of the
+    nearest node above it.
+
+    Attributes:
+        trace_id: Identifier of the trace, 32 hex digits.
+        turn: Root span of the turn.
+        run_inline: Record spans in the event loop during async runs, so
+            their timing is not skewed by an executor thread.
+        _spans: Every span of the turn, in start order.
+        _scopes: Span every run in flight belongs to.
+        _runs: Span of every node run and model call in flight.
+        _profiles: Runs emitting the resource usage of a code execution.
+        _first_token: Time of the first token streamed to the client.
+    """
+
+    run_inline = True
+
+    def __init__(
+        self,
+        session_id: UUID,
+        turn_id: Optional[str] = None,
+        resumed: bool = False,
+    ):
+        """
+        Open the span of a turn.
+
+        Args:
+            session_id: Session the turn belongs to.
+            turn_id: Identifier of the turn, when turns are checkpointed.
+            resumed: Whether the turn resumes from a checkpoint.
+        """
+        # Monotonic clock anchored to the epoch, so durations survive clock changes
+        self._epoch = time.time_ns() - time.perf_counter_ns()
+        self._spans: List[Span] = []
+        self._scopes: Dict[UUID, Span] = {}
+        self._runs: Dict[UUID, Span] = {}
+        self._profiles: Set[UUID] = set()
+        self._first_token: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.trace_id = uuid4().hex
+        self.turn = self._start(
+            None,
+            "turn",
+            "turn",
+            {"session_id": str(session_id), "turn_id": turn_id, "resumed": resumed},
+        )
+
+    def detach(self, name: str) -> "TurnTracer":
+        """
+        Open the trace of work the turn starts outside of its callbacks.
+
+        Args:
+            name: Name of the work, such as "summarization".
+
+        Returns:
+            TurnTracer: Tracer rooted in a `detached` span, linked to the
+            span of the turn the work was started from.
+        """
+        attributes = self.turn.attributes
+        tracer = TurnTracer(
+            attributes["session_id"], attributes["turn_id"], attributes["resumed"]
+        )
+        tracer.turn.name = name
+        tracer.turn.kind = "detached"
+
+        # Work started by detached work is still linked to the turn
+        tracer.turn.attributes["linked_trace_id"] = attributes.get(
+            "linked_trace_id", self.trace_id
+        )
+        tracer.turn.attributes["linked_span_id"] = attributes.get(
+            "linked_span_id", self.turn.span_id
+        )
+        return tracer
+
+    def on_chain_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Open the span of a starting node.
+
+        Args:
+            serialized: Serialized chain.
+            inputs: Inputs of the chain.
+            run_id: Identifier of the run.
+            parent_run_id: Identifier of the enclosing run.
+            metadata: Metadata of the run, naming the graph node running it.
+            **kwargs: Remaining arguments, holding the run name.
+        """
+        metadata = metadata or {}
+        with self._lock:
+            scope = self._scope(parent_run_id)
+            if metadata.get("profile", False):
+                self._profiles.add(run_id)
+
+            name = kwargs.get("name")
+            if name is not None and metadata.get("langgraph_node") == name:
+                attributes = {"step": metadata.get("langgraph_step")}
+                if metadata.get("subtask_index") is not None:
+                    attributes["subtask_index"] = metadata["subtask_index"]
+                scope = self._start(scope, name, "node", attributes)
+                self._runs[run_id] = scope
+            self._scopes[run_id] = scope
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """
+        Close the span of a completed node, and record execution profiles.
+
+        Args:
+            outputs: Outputs of the chain.
+            run_id: Identifier of the run.
+        """
+        with self._lock:
+            scope = self._scopes.pop(run_id, None)
+
+            # Resource usage of a code execution, charged to its node
+            if run_id in self._profiles:
+                self._profiles.discard(run_id)
+                if scope is not None and isinstance(outputs, dict):
+                    self._add(scope, "executor_wall_time", outputs.get("wall_time"))
+                    self._add(scope, "executor_cpu_time", outputs.get("cpu_time"))
+
+            span = self._runs.pop(run_id, None)
+            if span is not None:
+                self._end(span, "ok")
+
+    def on_chain_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """
+        Close the span of a failed node.
+
+        Args:
+            error: Error raised by the chain.
+            run_id: Identifier of the run.
+        """
+        with self._lock:
+            self._scopes.pop(run_id, None)
+            self._profiles.discard(run_id)
+            span = self._runs.pop(run_id, None)
+            if span is not None:
+                span.attributes["error"] = type(error).__name__
+                self._end(span, "error")
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[BaseMessage]],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Open the span of a starting model call.
+
+        Args:
+            serialized: Serialized model.
+            messages: Messages sent to the model.
+            run_id: Identifier of the call.
+            parent_run_id: Identifier of the enclosing run.
+            metadata: Metadata of the call, holding the model, node, and tier.
+            **kwargs: Remaining arguments, holding the run name.
+        """
+        metadata = metadata or {}
+        with self._lock:
+            self._runs[run_id] = self._start(
+                self._scope(parent_run_id),
+                metadata.get("ls_model_name")
+                or (serialized or {}).get("name", "model"),
+                "llm",
+                {
+                    "node": metadata.get("node"),
+                    "tier": metadata.get("tier"),
+                    "streamed": metadata.get("stream", True),
+                },
+            )
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        """
+        Record the time to the first chunk of a call, and of the turn.
+
+        Args:
+            token: Text of the chunk.
+            run_id: Identifier of the call.
+        """
+        now = self._now()
+        with self._lock:
+            span = self._runs.get(run_id)
+            if span is None:
+                return
+            if "ttft_ms" not in span.attributes:
+                span.attributes["ttft_ms"] = (now - span.start_time) / 1e6
+
+            # The first text the client sees, tool call chunks carry none
+            if token and span.attributes["streamed"] and self._first_token is None:
+                self._first_token = now
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        """
+        Close the span of a completed call with its token usage.
+
+        Args:
+            response: Result of the call.
+            run_id: Identifier of the call.
+        """
+        with self._lock:
+            span = self._runs.pop(run_id, None)
+            if span is None:
+                return
+
+            span.attributes["model_calls"] = 1
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    if message is None:
+                        continue
+                    usage = message_usage(message)
+                    self._add(span, "input_tokens", usage[0])
+                    self._add(span, "output_tokens", usage[1])
+                    self._add(span, "cache_read_tokens", usage[2])
+                    self._add(span, "cache_creation_tokens", usage[3])
+            self._end(span, "ok")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """
+        Close the span of a failed call.
+
+        Args:
+            error: Error raised by the call.
+            run_id: Identifier of the call.
+        """
+        with self._lock:
+            span = self._runs.pop(run_id, None)
+            if span is not None:
+                span.attributes["model_calls"] = 1
+                span.attributes["error"] = type(error).__name__
+                self._end(span, "error")
+
+    def finish(self, status: str = "ok") -> Dict[str, Any]:
+        """
+        Close the turn and return its trace.
+
+        Spans still open, such as those of a cancelled turn, are closed as
+        cancelled, and the rolled up attributes are summed into every span
+        above the one recording them.
+
+        Args:
+            status: Status of the turn: "ok", "error", or "cancelled".
+
+        Returns:
+            Dict[str, Any]: Trace of the turn: its identifiers, status,
+            duration, time to the first token, totals, and every span.
+        """
+        now = self._now()
+        with self._lock:
+            for span in self._spans:
+                if span.end_time is None and span is not self.turn:
+                    self._end(span, "cancelled", now)
+            self._end(self.turn, status, now)
+
+            # Sum the attributes recorded by every span into its ancestors
+            spans = {span.span_id: span for span in self._spans}
+            recorded = [
+                (span, [(key, span.attributes.get(key)) for key in ROLLUP_ATTRIBUTES])
+                for span in self._spans
+            ]
+            for span, values in recorded:
+                parent = spans.get(span.parent_id)
+                while parent is not None:
+                    for key, value in values:
+                        self._add(parent, key, value)
+                    parent = spans.get(parent.parent_id)
+
+            if self._first_token is not None:
+                self.turn.attributes["ttft_ms"] = (
+                    self._first_token - self.turn.start_time
+                ) / 1e6
+
+            return {
+                "trace_id": self.trace_id,
+                "status": status,
+                "start_time": self.turn.start_time,
+                "duration_ms": self.turn.duration_ms,
+                **self.turn.attributes,
+                "spans": [span.to_dict() for span in self._spans],
+            }
+
+    def _now(self) -> int:
+        """
+        Return the current time.
+
+        Returns:
+            int: Nanoseconds since the epoch, from a monotonic clock.
+        """
+        return self._epoch + time.perf_counter_ns()
+
+    def _scope(self, parent_run_id: Optional[UUID]) -> Span:
+        """
+        Return the span a run belongs to.
+
+        Must be called with `_lock` held.
+
+        Args:
+            parent_run_id: Identifier of the enclosing run.
+
+        Returns:
+            Span: Span of the enclosing run, or the turn.
+        """
+        return self._scopes.get(parent_run_id, self.turn)
+
+    def _start(
+        self,
+        parent: Optional[Span],
+        name: str,
+        kind: str,
+        attributes: Dict[str, Any],
+    ) -> Span:
+        """
+        Open a span.
+
+        Args:
+            parent: Enclosing span, None for the turn.
+            name: Name of the span.
+            kind: Kind of the span.
+            attributes: Initial attributes of the span.
+
+        Returns:
+            Span: The opened span.
+        """
+        span = Span(
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent is not None else None,
+            name=name,
+            kind=kind,
+            start_time=self._now(),
+            attributes=attributes,
+        )
+        self._spans.append(span)
+        return span
+
+    def _end(self, span: Span, status: str, end_time: Optional[int] = None) -> None:
+        """
+        Close a span.
+
+        Args:
+            span: Span to close.
+            status: Status of the span.
+            end_time: End of the span, now if not given.
+        """
+        span.end_time = end_time or self._now()
+        span.status = status
+
+    @staticmethod
+    def _add(span: Span, key: str, value: Optional[float]) -> None:
+        """
+        Add a value to a summed attribute of a span.
+
+        Args:
+            span: Span holding the attribute.
+            key: Name of the attribute.
+            value: Value to add, ignored if None or zero.
+        """
+        if value:
+            span.attributes[key] = span.attributes.get(key, 0) + value
+
+
+def current_tracer() -> Optional[TurnTracer]:
+    """
+    Return the tracer of the turn running in the current context.
+
+    Returns:
+        Optional[TurnTracer]: Tracer among the callbacks of the current run,
+        or None outside of a traced run.
+    """
+    config = var_child_runnable_config.get() or {}
+    callbacks = config.get("callbacks") or []
+    if isinstance(callbacks, BaseCallbackManager):
+        callbacks = callbacks.handlers
+    return next(
+        (callback for callback in callbacks if isinstance(callback, TurnTracer)),
+        None,
+    )
+
+
+def detach(name: str) -> Optional[TurnTracer]:
+    """
+    Open a detached trace for work of the current turn.
+
+    Must be called where the work is started, within the run of the turn.
+
+    Args:
+        name: Name of the work, such as "summarization".
+
+    Returns:
+        Optional[TurnTracer]: Tracer of the work, or None if the turn is not
+        traced.
+    """
+    tracer = current_tracer()
+    return tracer.detach(name) if tracer is not None else None
+
+
+@contextmanager
+def traced(tracer: Optional[TurnTracer]) -> Iterator[None]:
+    """
+    Record the model calls made within a block in a detached trace.
+
+    The block runs with the tracer as its only callback, and the trace is
+    exported when the block exits.
+
+    Args:
+        tracer: Tracer returned by `detach`, or None to run the block as is.
+    """
+    if tracer is None:
+        yield
+        return
+
+    status = "ok"
+    token = var_child_runnable_config.set({"callbacks": [tracer]})
+    try:
+        yield
+    except (asyncio.CancelledError, GeneratorExit):
+        status = "cancelled"
+        raise
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        var_child_runnable_config.reset(token)
+        trace_exporter.export(tracer.finish(status))
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """
+    Convert an attribute value into an OTLP `AnyValue`.
+
+    Args:
+        value: Attribute value.
+
+    Returns:
+        Dict[str, Any]: Typed OTLP value.
+    """
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(trace: Dict[str, Any], service_name: str) -> Dict[str, Any]:
+    """
+    Convert a trace into an OTLP/HTTP JSON export request.
+
+    Model calls are exported as client spans, nodes and turns as internal
+    spans; a cancelled span keeps an unset status, and the root of a detached
+    trace is linked to the span of its turn.
+
+    Args:
+        trace: Trace returned by `TurnTracer.finish`.
+        service_name: Service name of the exported resource.
+
+    Returns:
+        Dict[str, Any]: Body of a `POST /v1/traces` request.
+    """
+    spans = []
+    for span in trace["spans"]:
+        attributes = {"agent.kind": span["kind"], **span["attributes"]}
+        otlp_span = {
+            "traceId": trace["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            # SPAN_KIND_CLIENT for model calls, SPAN_KIND_INTERNAL otherwise
+            "kind": 3 if span["kind"] == "llm" else 1,
+            "startTimeUnixNano": str(span["start_time"]),
+            "endTimeUnixNano": str(span["end_time"]),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in attributes.items()
+                if value is not None
+            ],
+            # STATUS_CODE_OK, STATUS_CODE_ERROR, or STATUS_CODE_UNSET
+            "status": {
+                "code": {"ok": 1, "error": 2}.get(span["status"], 0),
+                "message": span["status"],
+            },
+        }
+        if span["parent_id"] is not None:
+            otlp_span["parentSpanId"] = span["parent_id"]
+        if span["attributes"].get("linked_trace_id"):
+            otlp_span["links"] = [
+                {
+                    "traceId": span["attributes"]["linked_trace_id"],
+                    "spanId": span["attributes"]["linked_span_id"],
+                }
+            ]
+        spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": _otlp_value(service_name)}
+                    ]
+                },
+                "scopeSpans": [
+                    {"scope": {"name": "agent_service.tracing"}, "spans": spans}
+                ],
+            }
+        ]
+    }
+
+
+@dataclass
+class TraceExporter:
+    """
+    Writes finished traces to a JSON lines file and an OTLP collector.
+
+    Attributes:
+        path: JSON lines file the traces are appended to, one turn per line.
+        otlp_endpoint: Base URL of an OTLP/HTTP collector, such as
+            `http://localhost:4318`, or None to export to the file only.
+        service_name: Service name of the traces exported to the collector.
+        timeout: Seconds an export to the collector may take.
+        _executor: Thread exporting the traces, None before `start`, when
+            traces are exported in the calling thread.
+    """
+
+    path: Path
+    otlp_endpoint: Optional[str] = None
+    service_name: str = "agent_service"
+    timeout: float = 5.0
+    _executor: Optional[ThreadPoolExecutor] = field(default=None, init=False)
+    _written: int = field(default=0, init=False)
+    _posted: int = field(default=0, init=False)
+    _failed: int = field(default=0, init=False)
+    _last_error: Optional[str] = field(default=None, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def start(self) -> None:
+        """
+        Start the export thread.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="tracing"
+            )
+
+    def shutdown(self) -> None:
+        """
+        Wait for the pending exports and stop the export thread.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        """
+        Export a trace, in the export thread once started.
+
+        Args:
+            trace: Trace returned by `TurnTracer.finish`.
+        """
+        if self._executor is None:
+            self._export(trace)
+        else:
+            self._executor.submit(self._export, trace)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return export counters.
+
+        Returns:
+            Dict[str, Any]: Traces written to the file and posted to the
+            collector, failed exports, and the last export error.
+        """
+        with self._lock:
+            return {
+                "written": self._written,
+                "posted": self._posted,
+                "failed": self._failed,
+                "last_error": self._last_error,
+            }
+
+    def _export(self, trace: Dict[str, Any]) -> None:
+        """
+        Write a trace to the file and post it to the collector.
+
+        Export errors are counted, never raised, so tracing cannot fail a turn.
+
+        Args:
+            trace: Trace returned by `TurnTracer.finish`.
+        """
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("a") as file:
+                    file.write(json.dumps(trace, default=str) + "\n")
+                self._written += 1
+
+            if self.otlp_endpoint:
+                request = urllib.request.Request(
+                    self.otlp_endpoint.rstrip("/") + "/v1/traces",
+                    data=json.dumps(
+                        otlp_payload(trace, self.service_name), default=str
+                    ).encode(),
+                    headers={"Content-Type": "application/json"},
+                    method="POST",
+                )
+                with urllib.request.urlopen(request, timeout=self.timeout):
+                    pass
+                with self._lock:
+                    self._posted += 1
+
+        except (OSError, ValueError) as error:
+            with self._lock:
+                self._failed += 1
+                self._last_error = f"{type(error).__name__}: {error}"
+
+
+# Exporter of the turn traces, started with the application
+trace_exporter = TraceExporter(
+    path=Path(settings.tracing.TRACING_PATH),
+    otlp_endpoint=settings.tracing.TRACING_OTLP_ENDPOINT,
+    service_name=settings.tracing.TRACING_SERVICE_NAME,
+)
@@ -9,6 +9,7 @@ FastAPI application.
 from fastapi import APIRouter
 
 # from api.v1.routes.agent import router as agent_router
+from api.v1.routes.execution import router as execution_router
 from api.v1.routes.memory import router as memory_router
 from api.v1.routes.agent import router as agent_router
 
@@ -20,3 +21,6 @@ api_router.include_router(agent_router)
 
 # Include memory-related routes under /api/v1
 api_router.include_router(memory_router)
+
+# Include code execution routes under /api/v1
+api_router.include_router(execution_router)
@@ -5,15 +5,17 @@ integrating with the database session and the `AgentRequest` schema.
 
 Routes:
     POST /agent/stream : Streams the AI agent's response to a user query.
+    POST /agent/resume : Resumes the stream of an interrupted turn.
+    GET /agent/metrics : Retrieve prompt and response cache usage of the agent nodes.
 """
 
 from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 
 
 from core.db import db_manager
-from schemas.agent import AgentRequest
+from schemas.agent import AgentRequest, AgentResumeRequest
 from services.agent import agent_service
 
 router = APIRouter(prefix="/agent", tags=["Agent"])
@@ -39,6 +41,7 @@ async def stream(
             - file_name: Associated file name, if applicable.
             - storage_uri: Storage location URI for related data.
             - dataset_summary: Summary of the dataset context.
+            - profile: Whether to stream execution profile events.
         db (Session, optional): SQLAlchemy database session provided via dependency injection.
 
     Returns:
@@ -53,6 +56,69 @@ async def stream(
         session_id=agent_request.session_id,
         storage_uri=agent_request.storage_uri,
         dataset_summary=agent_request.dataset_summary,
+        profile=agent_request.profile,
     )
 
     return StreamingResponse(stream, media_type="text/event-stream")
+
+
+@router.post("/resume")
+async def resume(
+    agent_resume_request: AgentResumeRequest,
+    db: Session = Depends(db_manager.get_db),
+):
+    """
+    Resumes the stream of a turn interrupted by a dropped connection or a
+    worker restart, using Server-Sent Events (SSE).
+
+    With turn checkpoints enabled, every stream starts with a "turn" event
+    carrying the id of its turn. Resuming the turn continues after the last
+    node it completed, without repeating the model calls and code executions
+    of the nodes before it; only the events of the remaining nodes are streamed.
+
+    Args:
+        agent_resume_request: The resume request containing:
+            - turn_id: Identifier of the interrupted turn.
+            - user_id: Unique ID of the user who started the turn.
+            - session_id: Session ID of the turn.
+            - profile: Whether to stream execution profile events.
+        db (Session, optional): SQLAlchemy database session provided via dependency injection.
+
+    Raises:
+        HTTPException: 404 if checkpoints are disabled or the turn is unknown.
+
+    Returns:
+        StreamingResponse: A streaming HTTP response that sends text/event-stream
+        data as the AI agent completes the turn.
+    """
+    try:
+        stream = await agent_service.resume(
+            turn_id=agent_resume_request.turn_id,
+            db=db,
+            user_id=agent_resume_request.user_id,
+            session_id=agent_resume_request.session_id,
+            profile=agent_resume_request.profile,
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return StreamingResponse(stream, media_type="text/event-stream")
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    Retrieve prompt and response cache usage of the agent nodes.
+
+    Static system prompts are sent as cacheable prefixes; for every node this
+    reports the model calls that hit or missed the prompt cache and the input
+    tokens read from and written to it. Responses of the classification nodes
+    served from the response cache are reported separately, as are the
+    estimated tokens every prompt input contributed before and after the
+    prompt budget of its node, and the calls every model tier served.
+
+    Returns:
+        Dict[str, Any]: Prompt cache metrics, overall and per node, prompt
+        budget metrics, response cache metrics, and model tier metrics.
+    """
+    return agent_service.metrics()
@@ -0,0 +1,33 @@
+"""
+FastAPI routes for inspecting generated code execution.
+
+This module exposes HTTP endpoints reporting the runtime state of the code
+execution backend, such as worker health and queue depth, using the
+`ExecutionService`.
+
+Routes:
+    GET /execution/metrics: Retrieve runtime metrics of the execution backend.
+"""
+
+from fastapi import APIRouter
+
+from services.execution import execution_service
+
+router = APIRouter(prefix="/execution", tags=["Execution"])
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    Retrieve runtime metrics of the code execution backend.
+
+    For the worker pool backend this includes the pool-wide and per-worker
+    queue depth, submitted and completed execution counters, worker restarts,
+    and the resident memory of every worker. Execution profiles (wall time,
+    CPU time, peak memory, variable sizes) are aggregated overall, per
+    subtask flow, and for the most expensive recent sessions.
+
+    Returns:
+        Dict[str, Any]: Metrics snapshot of the execution backend.
+    """
+    return execution_service.metrics()
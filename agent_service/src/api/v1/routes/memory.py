@@ -21,6 +21,7 @@ from fastapi import APIRouter, Depends
 
 from core.db import db_manager
 from services.memory import memory_service
+from services.summarization import summarization_service
 from schemas.memory import MemorySave, MemoryDelete
 
 router = APIRouter(prefix="/memory", tags=["AgentMemory"])
@@ -70,13 +71,17 @@ def save_memory(
 
     This endpoint retrieves the cached memory for a given user,
     session, and file, and saves it to the database via
-    `MemoryService`.
+    `MemoryService`, once the summaries still being computed for it in
+    the background were written back.
 
     Args:
         memory_save: Minimal memory metadata containing
             user_id, session_id, and file_name.
         db: SQLAlchemy session injected by FastAPI.
     """
+    summarization_service.wait(
+        session_id=memory_save.session_id, file_name=memory_save.file_name
+    )
     memory_service.save_memory(
         db=db,
         user_id=memory_save.user_id,
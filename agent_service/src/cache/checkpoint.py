@@ -0,0 +1,595 @@
+"""
+Agent graph checkpoint saver.
+
+This module provides a Redis-backed LangGraph checkpoint saver. With
+checkpointing enabled, the orchestrator saves the agent state after every
+node, keyed by the turn it belongs to, so a turn interrupted by a dropped
+stream or a worker restart resumes after the last completed node instead of
+repeating the model calls and code executions done before it.
+
+Checkpoints follow the layout of the LangGraph savers: the checkpoint itself
+without its channel values, one blob per channel version, so a state field
+is only written when a node changed it, and the pending writes of the
+tasks of a step. Values are pickled, as agent memory is. The database
+session of the state is never pickled; it is saved as a reference and bound
+to the session of the request that loads the checkpoint.
+
+All keys of a turn expire after a TTL, refreshed on every write.
+
+Classes:
+    CheckpointSerializer: Pickle serializer keeping database sessions out of
+        checkpoints.
+    RedisCheckpointSaver: LangGraph checkpoint saver storing checkpoints in Redis.
+
+Instances:
+    checkpoint_saver: Default `RedisCheckpointSaver` configured from
+        application settings.
+"""
+
+import io
+import random
+import pickle
+import asyncio
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from redis import Redis, RedisError
+from sqlalchemy.orm import Session
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from core.config import settings
+
+
+# Reference a database session is saved as
+DB_REFERENCE = "db"
+
+
+class _Pickler(pickle.Pickler):
+    """
+    Pickler saving database sessions as a reference.
+    """
+
+    def persistent_id(self, obj: Any) -> Optional[str]:
+        if isinstance(obj, Session):
+            return DB_REFERENCE
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """
+    Unpickler binding database session references to a session.
+    """
+
+    def __init__(self, data: bytes, db: Optional[Session]) -> None:
+        super().__init__(io.BytesIO(data))
+        self.db = db
+
+    def persistent_load(self, pid: Any) -> Any:
+        if pid == DB_REFERENCE:
+            return self.db
+        raise pickle.UnpicklingError(f"Unknown reference: {pid!r}")
+
+
+class CheckpointSerializer:
+    """
+    Pickle serializer keeping database sessions out of checkpoints.
+
+    Every `Session` is saved as a reference, loaded as the given session.
+    """
+
+    def dumps(self, obj: Any) -> bytes:
+        """
+        Pickle an object, saving database sessions as a reference.
+
+        Args:
+            obj: Object to pickle.
+
+        Returns:
+            bytes: Pickled object.
+        """
+        buffer = io.BytesIO()
+        _Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+        return buffer.getvalue()
+
+    def loads(self, data: bytes, db: Optional[Session] = None) -> Any:
+        """
+        Unpickle an object.
+
+        Args:
+            data: Pickled object.
+            db: Session the references to a database session are bound to.
+
+        Returns:
+            Any: The object.
+        """
+        return _Unpickler(data, db).load()
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        return "pickle", self.dumps(obj)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        return self.loads(data[1])
+
+
+class RedisCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    LangGraph checkpoint saver storing checkpoints in Redis.
+
+    The database session bound to loaded checkpoints is read from the `db`
+    key of the configurable of the run.
+
+    Attributes:
+        host: Redis server host address, or None to disable the saver.
+        port: Redis server port number.
+        db: Redis database index to use.
+        ttl: Seconds the checkpoints of a turn are kept after its last write.
+        client: Active Redis client instance. Defaults to None.
+    """
+
+    serde: CheckpointSerializer
+
+    def __init__(
+        self,
+        host: Optional[str],
+        port: int,
+        db: int,
+        ttl: int,
+    ) -> None:
+        """
+        Initialize the saver.
+
+        Args:
+            host: Redis server host address, or None to disable the saver.
+            port: Redis server port number.
+            db: Redis database index to use.
+            ttl: Seconds the checkpoints of a turn are kept after its last write.
+        """
+        super().__init__(serde=CheckpointSerializer())
+        self.host = host
+        self.port = port
+        self.db = db
+        self.ttl = ttl
+        self.client: Optional[Redis] = None
+
+    def connect_client(self) -> None:
+        """
+        Establish a connection to the Redis server, if checkpointing is enabled.
+        """
+        if self.client is None and self.host is not None:
+            self.client = Redis(
+                host=self.host,
+                port=self.port,
+                db=self.db,
+                decode_responses=False,
+                socket_keepalive=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+            )
+
+    def close_client(self) -> None:
+        """
+        Close the Redis client connection.
+
+        Any Redis-related errors during closure are silently ignored.
+        """
+        if self.client:
+            try:
+                self.client.close()
+            except RedisError:
+                ...
+            finally:
+                self.client = None
+
+    def _redis(self) -> Redis:
+        """
+        Return the connected Redis client.
+
+        Raises:
+            ConnectionError: If the client has not been initialized.
+
+        Returns:
+            Redis: The client.
+        """
+        if self.client is None:
+            raise ConnectionError(
+                "Redis client is not initialized. Call 'connect_client()' first"
+            )
+        return self.client
+
+    @staticmethod
+    def _key(thread_id: str, checkpoint_ns: str = "", *parts: str) -> str:
+        """
+        Format a Redis key of a turn.
+
+        Args:
+            thread_id: Identifier of the turn.
+            checkpoint_ns: Namespace of the graph, empty for the orchestrator.
+            *parts: Trailing parts of the key.
+
+        Returns:
+            str: Redis key in the format
+                 'agent_checkpoint:turn:<thread_id>:ns:<checkpoint_ns>:<parts>'.
+        """
+        return ":".join(
+            ["agent_checkpoint:turn", thread_id, "ns", checkpoint_ns, *parts]
+        )
+
+    def _tuple(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint_id: str,
+        record: bytes,
+        db: Optional[Session],
+    ) -> CheckpointTuple:
+        """
+        Load a checkpoint with its channel values and pending writes.
+
+        Args:
+            thread_id: Identifier of the turn.
+            checkpoint_ns: Namespace of the graph.
+            checkpoint_id: Identifier of the checkpoint.
+            record: Pickled checkpoint, metadata, and parent checkpoint.
+            db: Session bound to the database session of the state.
+
+        Returns:
+            CheckpointTuple: The loaded checkpoint.
+        """
+        client = self._redis()
+        checkpoint, metadata, parent_checkpoint_id = self.serde.loads(record, db)
+
+        # Load the blob of every channel at its version of this checkpoint
+        versions = list(checkpoint["channel_versions"].items())
+        blobs = (
+            client.hmget(
+                self._key(thread_id, checkpoint_ns, "blobs"),
+                [f"{channel}:{version}" for channel, version in versions],
+            )
+            if versions
+            else []
+        )
+        values = {
+            channel: self.serde.loads(blob, db)
+            for (channel, _), blob in zip(versions, blobs)
+            if blob is not None
+        }
+
+        writes = [
+            self.serde.loads(write, db)
+            for write in client.hvals(
+                self._key(thread_id, checkpoint_ns, "writes", checkpoint_id)
+            )
+        ]
+        writes.sort(key=lambda write: (write[3], write[0], write[4]))
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "channel_values": values},
+            metadata=metadata,
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, value) for task_id, channel, value, *_ in writes
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        Load a checkpoint, or the latest checkpoint of a turn.
+
+        Args:
+            config: Config with the turn, namespace, and optional checkpoint.
+
+        Returns:
+            Optional[CheckpointTuple]: The checkpoint, or None if not found.
+        """
+        client = self._redis()
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id is None:
+            latest = client.zrevrangebylex(
+                self._key(thread_id, checkpoint_ns, "checkpoints"), "+", "-", 0, 1
+            )
+            if not latest:
+                return None
+            checkpoint_id = latest[0].decode()
+
+        record = client.get(
+            self._key(thread_id, checkpoint_ns, "checkpoint", checkpoint_id)
+        )
+        if record is None:
+            return None
+        return self._tuple(
+            thread_id, checkpoint_ns, checkpoint_id, record, configurable.get("db")
+        )
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """
+        List the checkpoints of a turn, latest first.
+
+        Args:
+            config: Config with the turn and optional namespace and checkpoint.
+            filter: Metadata the checkpoints must match.
+            before: Config of the checkpoint to list the earlier ones of.
+            limit: Maximum number of checkpoints to return.
+
+        Yields:
+            CheckpointTuple: The matching checkpoints.
+        """
+        if config is None:
+            # Turns are only ever looked up by their identifier
+            return
+
+        client = self._redis()
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_id = get_checkpoint_id(config)
+        before_id = get_checkpoint_id(before) if before else None
+
+        if configurable.get("checkpoint_ns") is not None:
+            namespaces = [configurable["checkpoint_ns"]]
+        else:
+            namespaces = sorted(
+                namespace.decode()
+                for namespace in client.smembers(
+                    self._key(thread_id, "", "namespaces")
+                )
+            )
+
+        for checkpoint_ns in namespaces:
+            ids = client.zrevrangebylex(
+                self._key(thread_id, checkpoint_ns, "checkpoints"),
+                f"({before_id}" if before_id else "+",
+                "-",
+            )
+            for id_ in ids:
+                id_ = id_.decode()
+                if checkpoint_id and id_ != checkpoint_id:
+                    continue
+                if limit is not None and limit <= 0:
+                    return
+
+                record = client.get(
+                    self._key(thread_id, checkpoint_ns, "checkpoint", id_)
+                )
+                if record is None:
+                    continue
+                checkpoint = self._tuple(
+                    thread_id, checkpoint_ns, id_, record, configurable.get("db")
+                )
+                if filter and any(
+                    checkpoint.metadata.get(key) != value
+                    for key, value in filter.items()
+                ):
+                    continue
+
+                if limit is not None:
+                    limit -= 1
+                yield checkpoint
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """
+        Save a checkpoint and the channel values that changed since its parent.
+
+        Args:
+            config: Config of the parent checkpoint.
+            checkpoint: The checkpoint to save.
+            metadata: Metadata of the checkpoint.
+            new_versions: Channel versions written by this checkpoint.
+
+        Returns:
+            RunnableConfig: Config of the saved checkpoint.
+        """
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+
+        checkpoint = checkpoint.copy()
+        values = checkpoint.pop("channel_values")
+        record = (
+            checkpoint,
+            get_checkpoint_metadata(config, metadata),
+            configurable.get("checkpoint_id"),
+        )
+
+        keys = {
+            "namespaces": self._key(thread_id, "", "namespaces"),
+            "checkpoints": self._key(thread_id, checkpoint_ns, "checkpoints"),
+            "checkpoint": self._key(
+                thread_id, checkpoint_ns, "checkpoint", checkpoint["id"]
+            ),
+            "blobs": self._key(thread_id, checkpoint_ns, "blobs"),
+        }
+        blobs = {
+            f"{channel}:{version}": self.serde.dumps(values[channel])
+            for channel, version in new_versions.items()
+            if channel in values
+        }
+
+        # Save the checkpoint atomically, so a crash never leaves it without blobs
+        with self._redis().pipeline(transaction=True) as pipeline:
+            if blobs:
+                pipeline.hset(keys["blobs"], mapping=blobs)
+            pipeline.set(keys["checkpoint"], self.serde.dumps(record))
+            pipeline.zadd(keys["checkpoints"], {checkpoint["id"]: 0})
+            pipeline.sadd(keys["namespaces"], checkpoint_ns)
+            for key in keys.values():
+                pipeline.expire(key, self.ttl)
+            pipeline.execute()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """
+        Save the writes of a task, pending until the next checkpoint.
+
+        Args:
+            config: Config of the checkpoint the task runs from.
+            writes: Channel writes of the task.
+            task_id: Identifier of the task.
+            task_path: Path of the task.
+        """
+        configurable = config["configurable"]
+        key = self._key(
+            configurable["thread_id"],
+            configurable.get("checkpoint_ns", ""),
+            "writes",
+            configurable["checkpoint_id"],
+        )
+
+        with self._redis().pipeline(transaction=True) as pipeline:
+            for idx, (channel, value) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(channel, idx)
+                field = f"{task_id}:{idx}"
+                write = self.serde.dumps((task_id, channel, value, task_path, idx))
+                # Regular writes are saved once; special writes replace earlier ones
+                if idx >= 0:
+                    pipeline.hsetnx(key, field, write)
+                else:
+                    pipeline.hset(key, field, write)
+            pipeline.expire(key, self.ttl)
+            pipeline.execute()
+
+    def delete_thread(self, thread_id: str) -> None:
+        """
+        Delete every checkpoint and write of a turn.
+
+        Args:
+            thread_id: Identifier of the turn.
+        """
+        client = self._redis()
+        keys = list(client.scan_iter(match=f"agent_checkpoint:turn:{thread_id}:*"))
+        if keys:
+            client.delete(*keys)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoints: List[CheckpointTuple] = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint in checkpoints:
+            yield checkpoint
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """
+        Return the next version of a channel.
+
+        Versions carry a random suffix, so a step repeated after a crash never
+        overwrites the blob another run saved for the same version.
+
+        Args:
+            current: The current version, if any.
+            channel: Unused, kept for compatibility.
+
+        Returns:
+            str: The next version, ordered after the current one.
+        """
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+# Configured checkpoint saver of the agent graphs across the app
+checkpoint_saver = RedisCheckpointSaver(
+    host=settings.redis.HOST if settings.checkpoint.CHECKPOINT_ENABLED else None,
+    port=settings.redis.PORT,
+    db=settings.redis.DB,
+    ttl=settings.checkpoint.CHECKPOINT_TTL,
+)
@@ -0,0 +1,290 @@
+"""
+Model response cache manager.
+
+This module provides a two-tier cache for the responses of deterministic
+nodes, such as the temperature-zero classification nodes that return a
+single label. Responses live in an in-process LRU and, optionally, in Redis,
+so they are shared across service processes and survive restarts.
+
+Entries are keyed by the node name, the model configuration, and a hash of
+the fully rendered prompt. Because the rendered prompt contains the prompt
+template, editing a prompt invalidates its entries automatically; bumping
+`CACHE_VERSION` invalidates every entry at once. Entries expire after a TTL
+in both tiers.
+
+Classes:
+    ResponseCacheManager: Two-tier cache of model responses.
+
+Instances:
+    response_cache_manager: Default `ResponseCacheManager` configured from
+        application settings.
+"""
+
+import time
+import json
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from redis import Redis, RedisError
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+from core.config import settings
+
+
+# Bump to invalidate every cached response, e.g. after changing response parsing
+CACHE_VERSION = 1
+
+
+@dataclass
+class ResponseCacheManager:
+    """
+    Two-tier cache of model responses.
+
+    Attributes:
+        max_entries: Maximum number of responses kept in process. Zero
+            disables the cache.
+        ttl: Seconds a cached response stays valid.
+        host: Redis server host address, or None to keep responses in process only.
+        port: Redis server port number.
+        db: Redis database index to use.
+        client: Active Redis client instance. Defaults to None.
+    """
+
+    max_entries: int
+    ttl: int
+    host: Optional[str] = None
+    port: Optional[int] = None
+    db: Optional[int] = None
+    client: Optional[Redis] = None
+    _entries: "OrderedDict[str, Tuple[float, str]]" = field(default_factory=OrderedDict)
+    _hits: int = 0
+    _redis_hits: int = 0
+    _misses: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def connect_client(self) -> None:
+        """
+        Establish a connection to the Redis tier, if one is configured.
+        """
+        if self.client is None and self.host is not None and self.max_entries > 0:
+            self.client = Redis(
+                host=self.host,
+                port=self.port,
+                db=self.db,
+                decode_responses=True,
+                socket_keepalive=True,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+            )
+
+    def close_client(self) -> None:
+        """
+        Close the Redis client connection.
+
+        Any Redis-related errors during closure are silently ignored.
+        """
+        if self.client:
+            try:
+                self.client.close()
+            except RedisError:
+                ...
+            finally:
+                self.client = None
+
+    @staticmethod
+    def key(node: str, model: Any, prompt: Any, inputs: Dict[str, Any]) -> str:
+        """
+        Build the cache key of a node call.
+
+        Args:
+            node: Name of the node.
+            model: Model the node invokes.
+            prompt: Prompt template of the node.
+            inputs: Inputs the prompt is rendered with.
+
+        Returns:
+            str: Redis-compatible cache key.
+        """
+        messages = [
+            [message.type, message.content] for message in prompt.format_messages(**inputs)
+        ]
+        parameters = {
+            name: getattr(model, name, None)
+            for name in ("model", "temperature", "top_k", "top_p", "max_tokens")
+        }
+        digest = hashlib.sha256(
+            json.dumps(
+                [CACHE_VERSION, node, parameters, messages], sort_keys=True, default=str
+            ).encode()
+        ).hexdigest()
+        return f"agent_response:node:{node}:{digest}"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response, promoting Redis hits into the process tier.
+
+        Args:
+            key: Cache key of the node call.
+
+        Returns:
+            Optional[str]: The cached response, or None on a miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+
+        response = None
+        if self.client is not None:
+            try:
+                response = self.client.get(key)
+            except RedisError:
+                ...
+
+        with self._lock:
+            if response is None:
+                self._misses += 1
+                return None
+            self._redis_hits += 1
+            self._store(key, response, now)
+            return response
+
+    def set(self, key: str, response: str) -> None:
+        """
+        Cache a response in both tiers.
+
+        Args:
+            key: Cache key of the node call.
+            response: Response content to cache.
+        """
+        with self._lock:
+            self._store(key, response, time.monotonic())
+
+        if self.client is not None:
+            try:
+                self.client.set(key, response, ex=self.ttl)
+            except RedisError:
+                ...
+
+    def clear(self, node: Optional[str] = None) -> None:
+        """
+        Invalidate cached responses.
+
+        Args:
+            node: Name of the node whose responses are dropped, or None to
+                drop every cached response.
+        """
+        prefix = f"agent_response:node:{node}:" if node else "agent_response:node:"
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+        if self.client is not None:
+            try:
+                for key in self.client.scan_iter(match=f"{prefix}*"):
+                    self.client.delete(key)
+            except RedisError:
+                ...
+
+    def wrap(self, chain: Runnable, node: str, model: Any, prompt: Any) -> Runnable:
+        """
+        Wrap a node chain so its text responses are served from the cache.
+
+        Args:
+            chain: prompt → model chain of the node.
+            node: Name of the node.
+            model: Model the node invokes.
+            prompt: Prompt template of the node.
+
+        Returns:
+            Runnable: Chain returning an `AIMessage` with the cached content on
+            hits, and invoking and caching the wrapped chain on misses. Async
+            runs await the wrapped chain and look up Redis in a thread.
+        """
+
+        def invoke(inputs: Dict[str, Any], config: RunnableConfig) -> Any:
+            if self.max_entries <= 0:
+                return chain.invoke(inputs, config)
+
+            key = self.key(node, model, prompt, inputs)
+            response = self.get(key)
+            if response is not None:
+                return AIMessage(content=response)
+
+            result = chain.invoke(inputs, config)
+            if isinstance(result, AIMessage) and isinstance(result.content, str):
+                self.set(key, result.content)
+            return result
+
+        async def ainvoke(inputs: Dict[str, Any], config: RunnableConfig) -> Any:
+            if self.max_entries <= 0:
+                return await chain.ainvoke(inputs, config)
+
+            key = self.key(node, model, prompt, inputs)
+            response = await asyncio.to_thread(self.get, key)
+            if response is not None:
+                return AIMessage(content=response)
+
+            result = await chain.ainvoke(inputs, config)
+            if isinstance(result, AIMessage) and isinstance(result.content, str):
+                await asyncio.to_thread(self.set, key, result.content)
+            return result
+
+        return RunnableLambda(invoke, afunc=ainvoke, name=node)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return occupancy and hit counters of the cache.
+
+        Returns:
+            Dict[str, Any]: Entries, process and Redis hits, misses, and hit rate.
+        """
+        with self._lock:
+            hits = self._hits + self._redis_hits
+            lookups = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "redis_hits": self._redis_hits,
+                "misses": self._misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+    def _store(self, key: str, response: str, now: float) -> None:
+        """
+        Insert a response into the process tier, evicting the least recently
+        used entries beyond the bound.
+
+        Must be called with `_lock` held.
+
+        Args:
+            key: Cache key of the node call.
+            response: Response content.
+            now: Current monotonic time.
+        """
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (now + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Configured response cache for deterministic nodes across the app
+response_cache_manager = ResponseCacheManager(
+    max_entries=settings.response_cache.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=settings.response_cache.RESPONSE_CACHE_TTL,
+    host=settings.redis.HOST if settings.response_cache.RESPONSE_CACHE_REDIS else None,
+    port=settings.redis.PORT,
+    db=settings.redis.DB,
+)
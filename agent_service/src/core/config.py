@@ -2,12 +2,13 @@
 Configuration module for managing application settings.
 
 This module centralizes configuration for the application, including database
-(Postgres), caching (Redis), and third-party integration (Anthropic model API)
-settings. It leverages `pydantic_settings.BaseSettings` for type-safe
-environment variable parsing and validation.
+(Postgres), caching (Redis), third-party integration (Anthropic model API), and
+generated code execution settings. It leverages `pydantic_settings.BaseSettings`
+for type-safe environment variable parsing and validation.
 """
 
 from pathlib import Path
+from typing import Dict, List, Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -87,23 +88,278 @@ class AnthropicModelConfig(BaseConfig):
     ANTHROPIC_API_KEY: str
 
 
+class ExecutionConfig(BaseConfig):
+    """
+    Configuration class for generated code execution settings.
+
+    Attributes:
+        KERNEL_IDLE_TTL: Seconds a session kernel may stay unused before
+            it is evicted.
+        KERNEL_MAX_COUNT: Maximum number of warm kernels kept per process.
+        KERNEL_MAX_RSS_MB: Resident memory threshold (in MiB) above which the
+            least recently used kernels are evicted.
+        EXECUTION_POOL_SIZE: Number of worker processes executing generated
+            code. Zero executes code inside the service process.
+        EXECUTION_CPU_TIME_LIMIT: CPU seconds a single execution may consume
+            inside a worker process.
+        EXECUTION_WORKER_MAX_RSS_MB: Resident memory limit (in MiB) of a worker
+            process; workers exceeding it are killed and replaced.
+        EXECUTION_PRELOAD_MODULES: Dependency modules imported at startup;
+            any other dependency is imported on first use.
+        EXECUTION_CACHE_MAX_MB: Size (in MiB) of the per-process execution
+            result cache. Zero disables the cache.
+        EXECUTION_CHECKPOINT_MAX_MB: Memory budget (in MiB) for statement checkpoints
+            of a kernel, used to resume corrected code after a failure.
+        EXECUTION_CHECKPOINT_MIN_SECONDS: Minimum duration of a statement for a
+            checkpoint to be taken after it.
+        EXECUTION_TIME_LIMIT_TECHNICAL: Wall-clock seconds a single execution
+            may run in TECHNICAL mode. Zero disables the limit.
+        EXECUTION_TIME_LIMIT_QUICK: Wall-clock seconds a single execution may
+            run in QUICK mode. Zero disables the limit.
+        EXECUTION_MEMORY_LIMIT_MB_TECHNICAL: Resident memory (in MiB) a single
+            execution may add in TECHNICAL mode. Zero disables the limit.
+        EXECUTION_MEMORY_LIMIT_MB_QUICK: Resident memory (in MiB) a single
+            execution may add in QUICK mode. Zero disables the limit.
+        EXECUTION_TERMINATION_GRACE_SECONDS: Seconds a pool execution may
+            overrun its wall-clock limit before its worker is killed.
+    """
+
+    KERNEL_IDLE_TTL: int = 1800
+    KERNEL_MAX_COUNT: int = 32
+    KERNEL_MAX_RSS_MB: int = 8192
+    EXECUTION_POOL_SIZE: int = 0
+    EXECUTION_CPU_TIME_LIMIT: int = 600
+    EXECUTION_WORKER_MAX_RSS_MB: int = 12288
+    EXECUTION_PRELOAD_MODULES: List[str] = ["numpy", "pandas", "matplotlib.pyplot"]
+    EXECUTION_CACHE_MAX_MB: int = 512
+    EXECUTION_CHECKPOINT_MAX_MB: int = 1024
+    EXECUTION_CHECKPOINT_MIN_SECONDS: float = 1.0
+    EXECUTION_TIME_LIMIT_TECHNICAL: float = 1800
+    EXECUTION_TIME_LIMIT_QUICK: float = 300
+    EXECUTION_MEMORY_LIMIT_MB_TECHNICAL: int = 8192
+    EXECUTION_MEMORY_LIMIT_MB_QUICK: int = 2048
+    EXECUTION_TERMINATION_GRACE_SECONDS: float = 10.0
+
+
+class ResponseCacheConfig(BaseConfig):
+    """
+    Configuration class for the model response cache of deterministic nodes.
+
+    Attributes:
+        RESPONSE_CACHE_MAX_ENTRIES: Maximum number of responses kept in
+            process. Zero disables the cache.
+        RESPONSE_CACHE_TTL: Seconds a cached response stays valid.
+        RESPONSE_CACHE_REDIS: Whether responses are also cached in Redis and
+            shared across service processes.
+    """
+
+    RESPONSE_CACHE_MAX_ENTRIES: int = 4096
+    RESPONSE_CACHE_TTL: int = 86400
+    RESPONSE_CACHE_REDIS: bool = False
+
+
+class AgentConfig(BaseConfig):
+    """
+    Configuration class for the agent graphs.
+
+    Attributes:
+        AGENT_FUSED_ROUTING: Whether the agent mode, task flow, subtasks, and
+            subtask flows are decided by a single fused routing call instead
+            of four sequential classification calls.
+        AGENT_PARALLEL_SUBTASKS: Whether subtasks that do not depend on each
+            other run concurrently, each in a kernel namespace of its own.
+        AGENT_MAX_PARALLEL_SUBTASKS: Maximum number of subtasks running at once.
+        AGENT_WARMUP: When the graphs, built on first use otherwise, are built
+            at startup: "background" builds them while the service already
+            accepts requests, "blocking" before it does, "off" not at all.
+        AGENT_SPECULATIVE_PLANNING: Whether the first subtask is classified
+            and its action plan drafted while the task decomposition is still
+            streaming, instead of after it.
+    """
+
+    AGENT_FUSED_ROUTING: bool = False
+    AGENT_PARALLEL_SUBTASKS: bool = False
+    AGENT_MAX_PARALLEL_SUBTASKS: int = 4
+    AGENT_WARMUP: Literal["off", "background", "blocking"] = "background"
+    AGENT_SPECULATIVE_PLANNING: bool = False
+
+
+class SummarizationConfig(BaseConfig):
+    """
+    Configuration class for the background summarization pipeline.
+
+    Attributes:
+        SUMMARIZATION_BACKGROUND: Whether summaries are computed in the
+            background instead of inside the graph.
+        SUMMARIZATION_WORKERS: Number of threads computing summaries.
+        SUMMARIZATION_RETENTION: Seconds the result of a finished summary is
+            kept in process after it was written back to memory.
+    """
+
+    SUMMARIZATION_BACKGROUND: bool = True
+    SUMMARIZATION_WORKERS: int = 4
+    SUMMARIZATION_RETENTION: float = 3600.0
+
+
+class HeuristicRoutingConfig(BaseConfig):
+    """
+    Configuration class for the heuristic fast path of the routing nodes.
+
+    Attributes:
+        HEURISTIC_ROUTING: Whether the task router and the subtask
+            classifier skip the model call when the local heuristics are
+            confident.
+        HEURISTIC_THRESHOLD: Minimum confidence of a heuristic decision.
+        HEURISTIC_MODEL_DIR: Directory of the learned pipelines
+            (`task_routing.joblib`, `subtask_classification.joblib`). Without
+            it, only the keyword rules are used.
+        HEURISTIC_LOG_PATH: JSON lines file every decision of the language
+            model is logged to, with its inputs. Logging is off without it.
+    """
+
+    HEURISTIC_ROUTING: bool = False
+    HEURISTIC_THRESHOLD: float = 0.85
+    HEURISTIC_MODEL_DIR: Optional[str] = None
+    HEURISTIC_LOG_PATH: Optional[str] = None
+
+
+class PromptBudgetConfig(BaseConfig):
+    """
+    Configuration class for the token budgets of the node prompts.
+
+    Attributes:
+        PROMPT_BUDGET_ENABLED: Whether prompt inputs are trimmed to their
+            budgets; off by default. When disabled, their tokens are still
+            reported.
+        PROMPT_BUDGET_SCALE: Factor applied to every budget.
+    """
+
+    PROMPT_BUDGET_ENABLED: bool = False
+    PROMPT_BUDGET_SCALE: float = 1.0
+
+
+class ReplayConfig(BaseConfig):
+    """
+    Configuration class for recording and replaying model responses.
+
+    Attributes:
+        REPLAY_MODE: `off` calls the Anthropic API, `record` calls it and
+            records every response, and `replay` answers from the recorded
+            responses without any network access.
+        REPLAY_PATH: JSON lines file holding the recorded responses.
+        REPLAY_TIME_SCALE: Factor applied to the recorded latency and
+            streaming cadence. Zero replays without any delay.
+        REPLAY_JITTER: Sigma of the log-normal noise applied to the recorded
+            timing of every call. Zero replays the recorded timing exactly.
+        REPLAY_SEED: Seed of the timing noise.
+    """
+
+    REPLAY_MODE: Literal["off", "record", "replay"] = "off"
+    REPLAY_PATH: str = "replay/responses.jsonl"
+    REPLAY_TIME_SCALE: float = 1.0
+    REPLAY_JITTER: float = 0.0
+    REPLAY_SEED: int = 0
+
+
+class ModelTierConfig(BaseConfig):
+    """
+    Configuration class for the model tiers of the nodes.
+
+    Attributes:
+        MODEL_TIER_MODELS: Anthropic model of every tier. The `large` tier is
+            the model of the shared model instances.
+        MODEL_TIER_NODES: Tier of every node served by another tier than
+            the default, by node name, e.g.
+            `{"TaskRoutingNode": "small", "AnalysisSummarizationNode": "small"}`.
+        MODEL_TIER_DEFAULT: Tier of the nodes missing from `MODEL_TIER_NODES`.
+        MODEL_TIER_ESCALATION: Whether a node on a smaller tier retries on
+            the `large` tier when its call fails or its output does not
+            validate. Calls streamed to the client never escalate.
+    """
+
+    MODEL_TIER_MODELS: Dict[str, str] = {
+        "large": "claude-sonnet-4-20250514",
+        "small": "claude-3-5-haiku-20241022",
+    }
+    MODEL_TIER_NODES: Dict[str, str] = {}
+    MODEL_TIER_DEFAULT: str = "large"
+    MODEL_TIER_ESCALATION: bool = True
+
+
+class CheckpointConfig(BaseConfig):
+    """
+    Configuration class for the checkpoints of agent turns.
+
+    Attributes:
+        CHECKPOINT_ENABLED: Whether the agent state is saved to Redis after
+            every node, so an interrupted turn can be resumed by its turn id.
+        CHECKPOINT_TTL: Seconds the checkpoints of a turn are kept after its
+            last node completed.
+    """
+
+    CHECKPOINT_ENABLED: bool = False
+    CHECKPOINT_TTL: int = 3600
+
+
+class TracingConfig(BaseConfig):
+    """
+    Configuration class for the traces of agent turns.
+
+    Attributes:
+        TRACING_ENABLED: Whether the nodes and model calls of every turn are
+            traced.
+        TRACING_PATH: JSON lines file the traces are appended to.
+        TRACING_OTLP_ENDPOINT: Base URL of an OTLP/HTTP collector the traces
+            are also posted to, such as `http://localhost:4318`.
+        TRACING_SERVICE_NAME: Service name of the traces posted to the
+            collector.
+    """
+
+    TRACING_ENABLED: bool = False
+    TRACING_PATH: str = "traces/traces.jsonl"
+    TRACING_OTLP_ENDPOINT: Optional[str] = None
+    TRACING_SERVICE_NAME: str = "agent_service"
+
+
 class Settings(BaseSettings):
     """
     Aggregated application settings class.
 
     This class bundles together all individual configurations
-    (Postgres, Redis, and Anthropic) into a single entry point for
+    (Postgres, Redis, Anthropic, agent graphs, code execution, response
+    caching, summarization, heuristic routing, prompt budgets, response
+    replay, model tiers, and turn checkpoints) into a single entry point for
     accessing environment-driven application settings.
 
     Attributes:
         postgres: Database-related configuration.
         redis: Redis-related configuration.
         anthropic_model: Anthropic model API configuration.
+        agent: Agent graph configuration.
+        execution: Generated code execution configuration.
+        response_cache: Model response cache configuration.
+        summarization: Background summarization configuration.
+        heuristic_routing: Heuristic routing fast path configuration.
+        prompt_budget: Prompt token budget configuration.
+        replay: Model response recording and replay configuration.
+        model_tiers: Per-node model tier configuration.
+        checkpoint: Agent turn checkpoint configuration.
+        tracing: Agent turn tracing configuration.
     """
 
     anthropic_model: AnthropicModelConfig = AnthropicModelConfig()
     postgres: PostgresConfig = PostgresConfig()
     redis: RedisConfig = RedisConfig()
+    agent: AgentConfig = AgentConfig()
+    execution: ExecutionConfig = ExecutionConfig()
+    response_cache: ResponseCacheConfig = ResponseCacheConfig()
+    summarization: SummarizationConfig = SummarizationConfig()
+    heuristic_routing: HeuristicRoutingConfig = HeuristicRoutingConfig()
+    prompt_budget: PromptBudgetConfig = PromptBudgetConfig()
+    replay: ReplayConfig = ReplayConfig()
+    model_tiers: ModelTierConfig = ModelTierConfig()
+    checkpoint: CheckpointConfig = CheckpointConfig()
+    tracing: TracingConfig = TracingConfig()
 
 
 # Global settings instance for use throughout the application
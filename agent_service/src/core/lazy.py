@@ -0,0 +1,109 @@
+"""
+Lazy attribute module.
+
+This module defines `LazyAttribute`, a class attribute built on first access.
+The node and graph registries declare their entries with it, so a process
+only builds the chains of the nodes, and compiles the graphs, it actually
+uses, and only when it first uses them, instead of paying for every entry of
+every registry at import time.
+
+The first access replaces the attribute with the built value, so later
+accesses are plain class attribute lookups. Concurrent first accesses build
+the value once; the others wait for it.
+
+Classes:
+    LazyAttribute: Class attribute built on first access.
+
+Functions:
+    resolved: Whether a lazy attribute has been built.
+    warm_up: Build every lazy attribute of some registries.
+"""
+
+import threading
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class LazyAttribute(Generic[T]):
+    """
+    Class attribute built on first access.
+
+    Attributes:
+        factory: Callable building the value.
+        name: Name of the attribute in its owner class.
+    """
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        """
+        Initialize the attribute.
+
+        Args:
+            factory: Callable building the value, called once.
+        """
+        self.factory = factory
+        self.name: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        """
+        Record the name of the attribute in its owner class.
+
+        Args:
+            owner: Class declaring the attribute.
+            name: Name of the attribute.
+        """
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type) -> T:
+        """
+        Build the value on first access and replace the attribute with it.
+
+        Args:
+            instance: Instance the attribute is accessed through, if any.
+            owner: Class declaring the attribute.
+
+        Returns:
+            T: The built value.
+        """
+        with self._lock:
+            # Another thread may have built the value while this one waited
+            value = owner.__dict__.get(self.name, self)
+            if value is self:
+                value = self.factory()
+                setattr(owner, self.name, value)
+        return value
+
+
+def resolved(owner: type, name: str) -> bool:
+    """
+    Whether an attribute of a class is built.
+
+    Args:
+        owner: Class declaring the attribute.
+        name: Name of the attribute.
+
+    Returns:
+        bool: False for a lazy attribute not accessed yet, True otherwise.
+    """
+    return not isinstance(owner.__dict__.get(name), LazyAttribute)
+
+
+def warm_up(*owners: type) -> int:
+    """
+    Build every lazy attribute of some classes.
+
+    Args:
+        *owners: Classes declaring lazy attributes, typically registries.
+
+    Returns:
+        int: Number of attributes built by this call.
+    """
+    built = 0
+    for owner in owners:
+        for name in list(vars(owner)):
+            if not resolved(owner, name):
+                getattr(owner, name)
+                built += 1
+    return built
@@ -0,0 +1,264 @@
+"""
+Execution backend base module.
+
+This module defines the data structures exchanged with code execution
+backends and the `BaseExecutionBackend` abstract class implemented by the
+concrete backends (in-process and worker pool).
+
+Classes:
+    ExecutionLimitExceeded: Raised inside executing code when a resource
+        limit is hit.
+    ExecutionInterrupted: Raised asynchronously inside executing code that
+        is stopped by its watchdog.
+    ExecutionBudget: Wall-clock and memory budget of an execution.
+    ExecutionProfile: Resource usage of a single execution.
+    OutputChunk: Output written by executing code.
+    ExecutionRequest: Code execution request for a session kernel.
+    ExecutionResult: Outcome of a code execution request.
+    BaseExecutionBackend: Abstract interface for execution backends.
+"""
+
+import asyncio
+from uuid import UUID
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class ExecutionLimitExceeded(BaseException):
+    """
+    Raised inside executing code when a resource limit is exceeded.
+
+    Derives from `BaseException` so that broad `except Exception` blocks in
+    generated code cannot swallow it.
+    """
+
+    ...
+
+
+class ExecutionInterrupted(ExecutionLimitExceeded):
+    """
+    Raised asynchronously inside executing code that is stopped by its watchdog.
+
+    The exception is injected as a type, so it carries no message; the
+    watchdog that raised it records the reason.
+    """
+
+    ...
+
+
+@dataclass
+class ExecutionBudget:
+    """
+    Wall-clock and memory budget of an execution.
+
+    Attributes:
+        time_limit: Wall-clock seconds the code may run, or None for no limit.
+        memory_limit: Bytes of resident memory the code may add, or None for
+            no limit.
+    """
+
+    time_limit: Optional[float] = None
+    memory_limit: Optional[int] = None
+
+
+@dataclass
+class ExecutionProfile:
+    """
+    Resource usage of a single execution.
+
+    Attributes:
+        wall_time: Wall-clock seconds spent executing the code.
+        cpu_time: CPU seconds consumed by the executing process meanwhile.
+        peak_rss_delta: Peak resident memory above the level at the start of
+            the execution, in bytes.
+        variable_sizes: Pickled size in bytes of every resulting variable.
+        cached: True if the result was replayed from the execution cache.
+    """
+
+    wall_time: float
+    cpu_time: float
+    peak_rss_delta: int
+    variable_sizes: Dict[str, int] = field(default_factory=dict)
+    cached: bool = False
+
+
+@dataclass
+class OutputChunk:
+    """
+    Output written by executing code.
+
+    Attributes:
+        stream: "stdout", "stderr", or "progress" for the latest state of a
+            carriage-return updated line such as a `tqdm` progress bar.
+        text: Written text, without the trailing newline.
+    """
+
+    stream: str
+    text: str
+
+
+@dataclass
+class ExecutionRequest:
+    """
+    Request to execute code in the kernel bound to a session and file.
+
+    Attributes:
+        session_id: Unique identifier of the session.
+        file_name: Name of the file the session operates on.
+        code: Python source code to execute.
+        dependencies: Dependency modules that must be available to the code.
+        variables: Session variables to synchronize into the kernel, or None
+            when the backend is expected to already hold them.
+        snapshot: Pickled payloads of the session variables, if known.
+            Used in place of `variables` when those are not given.
+        generation: Kernel generation the variables correspond to, if known.
+        delta: If True, only payloads produced anew are returned; the
+            caller already holds the remaining ones.
+        time_limit: Wall-clock seconds the code may run, or None for no limit.
+        memory_limit: Bytes of resident memory the code may add, or None for
+            no limit.
+        label: Tag the execution profile is aggregated under, e.g. the
+            subtask flow.
+        stream_output: If True, the worker running the request forwards the
+            output of the code while it runs.
+        namespace: Namespace of a separate kernel within the session and
+            file, e.g. for a subtask running in parallel with others, or None
+            for the kernel of the session and file.
+    """
+
+    session_id: UUID
+    file_name: str
+    code: Optional[str]
+    dependencies: List[str]
+    variables: Optional[Dict[str, Any]] = None
+    snapshot: Optional[Dict[str, bytes]] = None
+    generation: Optional[str] = None
+    delta: bool = False
+    time_limit: Optional[float] = None
+    memory_limit: Optional[int] = None
+    label: Optional[str] = None
+    stream_output: bool = False
+    namespace: Optional[str] = None
+
+    @property
+    def kernel_key(self) -> Tuple[UUID, str]:
+        """
+        Key of the kernel executing the request.
+
+        Returns:
+            Tuple[UUID, str]: The session and the file name, qualified by the
+            namespace, if any.
+        """
+        if self.namespace is None:
+            return self.session_id, self.file_name
+        return self.session_id, f"{self.file_name}#{self.namespace}"
+
+
+@dataclass
+class ExecutionResult:
+    """
+    Outcome of a code execution request.
+
+    Attributes:
+        error: Error message if execution failed, otherwise None.
+        variables: Pickle-serializable session variables after execution.
+        snapshot: Pickled payload of every entry in `variables`, or only of
+            the entries in `changed` for delta requests.
+        names: Names of every pickle-serializable variable.
+        changed: Names whose payload was produced by this execution.
+        generation: Kernel generation matching the returned variables.
+        cached: True if the result was replayed from the execution cache,
+            False on a cache miss, None if the execution was not cacheable.
+        stale: True if the backend did not hold the expected kernel
+            generation and the request must be resent with variables.
+        profile: Resource usage of the execution, if it was attempted.
+    """
+
+    error: Optional[str] = None
+    variables: Dict[str, Any] = field(default_factory=dict)
+    snapshot: Dict[str, bytes] = field(default_factory=dict)
+    names: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    generation: Optional[str] = None
+    cached: Optional[bool] = None
+    stale: bool = False
+    profile: Optional[ExecutionProfile] = None
+
+
+class BaseExecutionBackend(ABC):
+    """
+    Abstract base class for code execution backends.
+
+    Subclasses must implement `execute`. Lifecycle hooks, cancellation, and
+    metrics are optional and default to no-ops.
+    """
+
+    def start(self) -> None:
+        """
+        Acquire any resources required by the backend.
+        """
+        ...
+
+    def shutdown(self) -> None:
+        """
+        Release any resources held by the backend.
+        """
+        ...
+
+    @abstractmethod
+    def execute(
+        self,
+        request: ExecutionRequest,
+        output: Optional[Callable[[OutputChunk], None]] = None,
+    ) -> ExecutionResult:
+        """
+        Execute a request and block until it completes.
+
+        Args:
+            request: The execution request.
+            output: Callable receiving the output of the code while it runs,
+                or None to leave the output uncaptured.
+
+        Returns:
+            ExecutionResult: Outcome of the execution.
+        """
+        ...
+
+    async def aexecute(
+        self,
+        request: ExecutionRequest,
+        output: Optional[Callable[[OutputChunk], None]] = None,
+    ) -> ExecutionResult:
+        """
+        Execute a request without blocking the event loop.
+
+        Args:
+            request: The execution request.
+            output: Callable receiving the output of the code while it runs,
+                called from a helper thread.
+
+        Returns:
+            ExecutionResult: Outcome of the execution.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.execute, request, output)
+
+    def cancel(self, session_id: UUID, reason: str) -> None:
+        """
+        Stop the executions running for a session.
+
+        Args:
+            session_id: Unique identifier of the session.
+            reason: Error message reported for the stopped executions.
+        """
+        ...
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return backend-specific runtime metrics.
+
+        Returns:
+            Dict[str, Any]: Metrics snapshot.
+        """
+        return {}
@@ -0,0 +1,201 @@
+"""
+Execution cache module.
+
+This module defines the `ExecutionCache` class, which remembers the effect of
+successful executions so the same code run against the same inputs does not
+have to be executed again. Entries are keyed by the normalized code (its
+AST, so formatting and comments do not matter), the dependency list, and
+content fingerprints of every session variable the code refers to, read or
+written. An entry stores the resulting variable delta as pickled payloads,
+which also carries the `analysis_report` and `image` outputs.
+
+Code that reads clocks or random sources is never cached, and the cache is
+bounded by the total size of the stored payloads with least recently used
+eviction.
+
+Classes:
+    CachedExecution: Variable delta produced by a cached execution.
+    ExecutionCache: Size-bounded LRU cache of execution deltas.
+
+Instances:
+    execution_cache: Default `ExecutionCache` configured from application
+        settings.
+"""
+
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import settings
+
+
+# Modules whose use makes the outcome of an execution non-reproducible
+_NONDETERMINISTIC = {"time", "datetime", "random", "uuid", "secrets"}
+
+# Attributes reading clocks or random sources, e.g. `np.random` or `pd.Timestamp.now`
+_NONDETERMINISTIC_ATTRIBUTES = {"random", "now", "today", "utcnow"}
+
+
+@dataclass
+class CachedExecution:
+    """
+    Variable delta produced by a cached execution.
+
+    Attributes:
+        changed: Pickled payloads of the variables set or modified by the code.
+        removed: Names of the variables deleted by the code.
+    """
+
+    changed: Dict[str, bytes]
+    removed: List[str]
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of the stored payloads in bytes.
+        """
+        return sum(len(payload) for payload in self.changed.values())
+
+
+@dataclass
+class ExecutionCache:
+    """
+    Size-bounded LRU cache of execution deltas.
+
+    Attributes:
+        max_bytes: Maximum total size of the stored payloads. Zero disables
+            the cache.
+    """
+
+    max_bytes: int
+    _entries: "OrderedDict[str, CachedExecution]" = field(default_factory=OrderedDict)
+    _bytes: int = 0
+    _hits: int = 0
+    _misses: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def key(
+        self,
+        code: Optional[str],
+        dependencies: List[str],
+        fingerprint: Callable[[str], Optional[str]],
+    ) -> Optional[str]:
+        """
+        Build the cache key of an execution.
+
+        Args:
+            code: Python source code.
+            dependencies: Allowed dependency entries.
+            fingerprint: Callable returning the content fingerprint of a
+                name, "-" for names that are not session variables, or None
+                for variables that cannot be fingerprinted.
+
+        Returns:
+            Optional[str]: Cache key, or None if the execution is not cacheable.
+        """
+        if not self.max_bytes:
+            return None
+
+        try:
+            tree = ast.parse(code or "")
+        except (SyntaxError, ValueError):
+            return None
+
+        # Every name counts, whatever its context: `total += 1` reads `total`
+        names, modules = set(), set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name):
+                names.add(node.id)
+            elif (
+                isinstance(node, ast.Attribute)
+                and node.attr in _NONDETERMINISTIC_ATTRIBUTES
+            ):
+                return None
+            elif isinstance(node, ast.Import):
+                modules.update(alias.name.split(".")[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                modules.add(node.module.split(".")[0])
+
+        if (names | modules) & _NONDETERMINISTIC:
+            return None
+
+        parts = [ast.dump(tree), ",".join(sorted(dependencies))]
+        for name in sorted(names):
+            digest = fingerprint(name)
+            if digest is None:
+                return None
+            parts.append(f"{name}={digest}")
+
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedExecution]:
+        """
+        Look up an execution delta.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Optional[CachedExecution]: The cached delta, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedExecution) -> None:
+        """
+        Store an execution delta, evicting least recently used entries.
+
+        Deltas larger than the whole cache are not stored.
+
+        Args:
+            key: Cache key.
+            entry: Execution delta to store.
+        """
+        size = entry.size
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+
+            self._entries[key] = entry
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return cache occupancy and hit-rate metrics.
+
+        Returns:
+            Dict[str, Any]: Entry count, stored bytes, hits, misses, and hit rate.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+
+# Process-wide execution cache configured from application settings
+execution_cache = ExecutionCache(
+    max_bytes=settings.execution.EXECUTION_CACHE_MAX_MB * 1024 * 1024
+)
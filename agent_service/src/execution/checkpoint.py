@@ -0,0 +1,229 @@
+"""
+Statement checkpoint module.
+
+This module lets a kernel resume a corrected script from the first statement
+that changed instead of re-running it from the top. Code is executed one
+top-level statement at a time; after every statement that took noticeable
+time the namespace bindings are checkpointed. Mutable values held by a
+checkpoint are copied lazily, right before a later statement that refers to
+them runs, so checkpoints stay valid even if the statement modifies them in
+place. Copies are bounded by a memory budget; when it is exhausted all
+checkpoints of the run are dropped and execution continues without them.
+
+Classes:
+    CheckpointStore: Checkpoints of the current run of a kernel.
+"""
+
+import sys
+import copy
+from types import FunctionType, ModuleType
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+# Values that are never modified in place and need no copy
+_IMMUTABLE_TYPES = (
+    int,
+    float,
+    complex,
+    str,
+    bytes,
+    bool,
+    type(None),
+    type,
+    ModuleType,
+    FunctionType,
+)
+
+
+def _size(value: Any) -> int:
+    """
+    Estimate the memory footprint of a value in bytes.
+
+    Args:
+        value: Any object.
+
+    Returns:
+        int: Buffer size for arrays and frames, `sys.getsizeof` otherwise.
+    """
+    try:
+        if hasattr(value, "memory_usage") and callable(value.memory_usage):
+            usage = value.memory_usage(deep=False)
+            return int(usage.sum() if hasattr(usage, "sum") else usage)
+        if hasattr(value, "nbytes"):
+            return int(value.nbytes)
+    except Exception:
+        ...
+    return sys.getsizeof(value)
+
+
+def _copy(value: Any) -> Any:
+    """
+    Copy a value so later in-place modifications do not affect the copy.
+
+    Args:
+        value: Any object.
+
+    Returns:
+        Any: Deep copy of the value, using its own `copy` method for arrays
+        and frames.
+    """
+    if hasattr(value, "nbytes") or hasattr(value, "memory_usage"):
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+@dataclass
+class _Checkpoint:
+    """
+    Namespace bindings after a statement.
+
+    Attributes:
+        statements: AST dumps of the statements executed so far.
+        bindings: Namespace bindings after the last of those statements.
+    """
+
+    statements: List[str]
+    bindings: Dict[str, Any]
+
+
+@dataclass
+class CheckpointStore:
+    """
+    Checkpoints of the current run of a kernel.
+
+    Attributes:
+        max_bytes: Memory budget for copies of checkpointed values.
+        min_seconds: Minimum duration of a statement for a checkpoint to be
+            taken after it.
+        generation: Kernel generation the checkpoints were taken from.
+    """
+
+    max_bytes: int
+    min_seconds: float
+    generation: Optional[str] = None
+    _checkpoints: List[_Checkpoint] = field(default_factory=list)
+    _shared: Dict[int, Tuple[Any, List[Dict[str, Any]]]] = field(
+        default_factory=dict
+    )
+    _bytes: int = 0
+    _exhausted: bool = False
+
+    def resume(
+        self, statements: List[str], generation: Optional[str]
+    ) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        Find the checkpoint a run of the given statements can resume from.
+
+        Checkpoints taken after the returned one are dropped, since the
+        statements following it are about to be executed again.
+
+        Args:
+            statements: AST dumps of the statements about to run.
+            generation: Current kernel generation.
+
+        Returns:
+            Tuple[int, Optional[Dict[str, Any]]]: Index of the first statement
+            to execute and the bindings to restore, or (0, None) if the run
+            must start from the beginning.
+        """
+        if generation is None or generation != self.generation:
+            self.clear()
+            return 0, None
+
+        while self._checkpoints:
+            checkpoint = self._checkpoints[-1]
+            if statements[: len(checkpoint.statements)] == checkpoint.statements:
+                self._share()
+                return len(checkpoint.statements), dict(checkpoint.bindings)
+            self._checkpoints.pop()
+
+        self.clear()
+        return 0, None
+
+    def start(self, generation: Optional[str]) -> None:
+        """
+        Bind the checkpoints to the generation a run starts from.
+
+        Args:
+            generation: Kernel generation before the run.
+        """
+        self.generation = generation
+        self._exhausted = False
+
+    def protect(self, names: Set[str], namespace: Dict[str, Any]) -> None:
+        """
+        Copy checkpointed values a statement is about to refer to.
+
+        Args:
+            names: Names referenced by the statement.
+            namespace: Namespace the statement runs in.
+        """
+        for name in names:
+            value = namespace.get(name)
+            shared = self._shared.pop(id(value), None)
+            if shared is None or shared[0] is not value:
+                continue
+
+            self._bytes += _size(value)
+            if self._bytes > self.max_bytes:
+                self._exhaust()
+                return
+
+            try:
+                replica = _copy(value)
+            except Exception:
+                self._exhaust()
+                return
+
+            for bindings in shared[1]:
+                for key, bound in bindings.items():
+                    if bound is value:
+                        bindings[key] = replica
+
+    def record(
+        self, statements: List[str], namespace: Dict[str, Any], seconds: float
+    ) -> None:
+        """
+        Checkpoint the namespace after a statement if it was expensive.
+
+        Args:
+            statements: AST dumps of the statements executed so far.
+            namespace: Namespace after the last statement.
+            seconds: Duration of the last statement.
+        """
+        if seconds < self.min_seconds or self._exhausted:
+            return
+
+        self._checkpoints.append(
+            _Checkpoint(statements=list(statements), bindings=dict(namespace))
+        )
+        self._share()
+
+    def clear(self) -> None:
+        """
+        Drop every checkpoint and pending copy.
+        """
+        self._checkpoints.clear()
+        self._shared.clear()
+        self._bytes = 0
+
+    def _exhaust(self) -> None:
+        """
+        Drop every checkpoint and stop checkpointing for the rest of the run.
+        """
+        self.clear()
+        self._exhausted = True
+
+    def _share(self) -> None:
+        """
+        Register the mutable values held by checkpoints for copy-on-write.
+        """
+        self._shared.clear()
+        for checkpoint in self._checkpoints:
+            for value in checkpoint.bindings.values():
+                if isinstance(value, _IMMUTABLE_TYPES):
+                    continue
+                holders = self._shared.setdefault(id(value), (value, []))[1]
+                if not holders or holders[-1] is not checkpoint.bindings:
+                    holders.append(checkpoint.bindings)
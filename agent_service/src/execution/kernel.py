@@ -0,0 +1,581 @@
+"""
+Execution kernel module.
+
+This module defines the `ExecutionKernel` and `KernelManager` classes, which keep
+warm interpreter namespaces for generated code. A kernel is bound to a single
+(session_id, file_name) pair and is reused across subtasks, debugging retries,
+and conversation turns, so dependency imports and namespace setup are paid once
+per session instead of once per `exec`.
+
+Kernels are evicted when they stay idle for longer than the configured TTL,
+when the number of live kernels exceeds the configured maximum, or when the
+process resident memory crosses the configured threshold.
+
+Classes:
+    ExecutionKernel: Warm namespace bound to one session and file.
+    KernelManager: Process-wide registry that creates, reuses, and evicts kernels.
+
+Instances:
+    kernel_manager: Default `KernelManager` configured from application settings.
+"""
+
+import gc
+import os
+import ast
+import time
+import pickle
+import itertools
+import threading
+from uuid import UUID
+from types import ModuleType
+from contextlib import nullcontext
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from core.config import settings
+from execution.base import (
+    ExecutionInterrupted,
+    ExecutionLimitExceeded,
+    ExecutionProfile,
+    ExecutionRequest,
+    ExecutionResult,
+    OutputChunk,
+)
+from execution.cache import CachedExecution, ExecutionCache, execution_cache
+from execution.modules import ModuleRegistry, module_registry
+from execution.resources import get_rss
+from execution.checkpoint import CheckpointStore
+from execution.limits import ExecutionWatchdog
+from execution.output import capture_output
+from execution.snapshot import (
+    VariableTracker,
+    node_names,
+    reachable_names,
+    referenced_names,
+)
+
+
+# Sentinel used to tell missing namespace entries apart from `None` values
+_MISSING = object()
+
+# Process-wide counter used to build unique kernel generation tokens
+_generations = itertools.count(1)
+
+
+def _next_generation() -> str:
+    """
+    Build a kernel generation token unique across processes and kernels.
+
+    Returns:
+        str: Generation token in the form `<pid>-<counter>`.
+    """
+    return f"{os.getpid()}-{next(_generations)}"
+
+
+def _sizes(snapshot: Dict[str, bytes]) -> Dict[str, int]:
+    """
+    Return the pickled size of every variable in a snapshot.
+
+    Args:
+        snapshot: Pickled payloads by variable name.
+
+    Returns:
+        Dict[str, int]: Payload sizes in bytes by variable name.
+    """
+    return {name: len(payload) for name, payload in snapshot.items()}
+
+
+@dataclass
+class ExecutionKernel:
+    """
+    Warm interpreter namespace for a single session and file.
+
+    The namespace holds the imported dependency modules together with the
+    session variables. Between executions it is synchronized with the
+    variables stored in the agent state, rebinding only the entries whose
+    values actually changed.
+
+    Attributes:
+        modules: Mapping of names to the dependency modules injected so far.
+        namespace: Globals dictionary used for `exec`.
+        last_used: Monotonic timestamp of the last time the kernel was acquired.
+        generation: Token identifying the current namespace contents, or None
+            for a kernel that has never been synchronized.
+        tracker: Incremental snapshotter of the kernel variables.
+        checkpoints: Statement checkpoints of the last failed run.
+        lock: Lock serializing executions within the kernel.
+    """
+
+    modules: Dict[str, ModuleType] = field(default_factory=dict)
+    namespace: Dict[str, Any] = field(default_factory=dict)
+    last_used: float = field(default_factory=time.monotonic)
+    generation: Optional[str] = None
+    tracker: VariableTracker = field(default_factory=VariableTracker)
+    checkpoints: CheckpointStore = field(
+        default_factory=lambda: CheckpointStore(max_bytes=0, min_seconds=0.0)
+    )
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def sync(
+        self, variables: Dict[str, Any], snapshot: Optional[Dict[str, bytes]] = None
+    ) -> None:
+        """
+        Synchronize the namespace with the given session variables.
+
+        Names that are no longer part of the session are dropped, changed
+        values are rebound, and dependency modules are restored unless a
+        variable with the same name shadows them. The generation only
+        changes if a binding actually changed.
+
+        Args:
+            variables: Session variables that should be visible to the code.
+            snapshot: Pickled payloads of the variables, if known.
+        """
+        changed = self.generation is None
+
+        for name in list(self.namespace):
+            if (
+                name not in variables
+                and name not in self.modules
+                and name != "__builtins__"
+            ):
+                del self.namespace[name]
+                changed = True
+
+        for name, module in self.modules.items():
+            if name not in variables and self.namespace.get(name) is not module:
+                self.namespace[name] = module
+                changed = True
+
+        for name, value in variables.items():
+            if self.namespace.get(name, _MISSING) is not value:
+                self.namespace[name] = value
+                changed = True
+
+        if snapshot:
+            self.tracker.seed(variables, snapshot)
+
+        if changed:
+            self.generation = _next_generation()
+
+    def bind_modules(self, modules: Dict[str, ModuleType]) -> None:
+        """
+        Inject dependency modules into the namespace.
+
+        Names already bound to a non-module value are left untouched, so
+        session variables are never shadowed by modules.
+
+        Args:
+            modules: Mapping of names to modules.
+        """
+        for name, module in modules.items():
+            if not isinstance(self.namespace.get(name, module), ModuleType):
+                continue
+            self.namespace[name] = module
+            self.modules[name] = module
+
+    def run(self, code: str) -> None:
+        """
+        Execute code inside the kernel namespace, one top-level statement at a time.
+
+        If execution fails, name bindings are restored to their state before
+        the call, so a failed snippet never leaks partial variables into the
+        next attempt. Checkpoints taken during the failed run are kept, so a
+        corrected version of the code resumes from its first changed
+        statement instead of starting over.
+
+        Args:
+            code: Python source code to execute.
+
+        Raises:
+            Exception: Any exception raised by the executed code.
+        """
+        statements = ast.parse(code, "<string>").body
+        dumps = [ast.dump(statement) for statement in statements]
+
+        bindings = dict(self.namespace)
+        start, restored = self.checkpoints.resume(dumps, self.generation)
+        self.checkpoints.start(self.generation)
+
+        try:
+            if restored is not None:
+                # Continue from the checkpoint with this run's modules
+                restored.update(
+                    (name, module)
+                    for name, module in self.modules.items()
+                    if name not in restored
+                )
+                self.namespace.clear()
+                self.namespace.update(restored)
+
+            for index in range(start, len(statements)):
+                statement = statements[index]
+                self.checkpoints.protect(
+                    reachable_names(node_names(statement), self.namespace),
+                    self.namespace,
+                )
+
+                started = time.monotonic()
+                module = ast.Module(body=[statement], type_ignores=[])
+                exec(compile(module, "<string>", "exec"), self.namespace)
+                self.checkpoints.record(
+                    dumps[: index + 1], self.namespace, time.monotonic() - started
+                )
+        except BaseException:
+            self.namespace.clear()
+            self.namespace.update(bindings)
+            raise
+
+        self.checkpoints.clear()
+        self.generation = _next_generation()
+
+    def apply(self, changed: Dict[str, bytes], removed: List[str]) -> None:
+        """
+        Apply a cached variable delta instead of executing code.
+
+        Args:
+            changed: Pickled payloads of the variables set or modified.
+            removed: Names of the variables deleted.
+        """
+        for name in removed:
+            self.namespace.pop(name, None)
+
+        values = {name: pickle.loads(payload) for name, payload in changed.items()}
+        self.namespace.update(values)
+        self.tracker.seed(values, changed)
+
+        self.generation = _next_generation()
+
+    def fingerprint(self, name: str) -> Optional[str]:
+        """
+        Return the content fingerprint of a name read by code.
+
+        Args:
+            name: Name read by the code.
+
+        Returns:
+            Optional[str]: Fingerprint of the variable, "-" if the name is not
+            a session variable, or None if the variable cannot be pickled.
+        """
+        value = self.namespace.get(name, _MISSING)
+        if value is _MISSING or name in self.modules or isinstance(value, ModuleType):
+            return "-"
+        return self.tracker.fingerprint(name, value)
+
+    def variables(self) -> Dict[str, Any]:
+        """
+        Return the user-level variables currently held by the kernel.
+
+        Returns:
+            Dict[str, Any]: Namespace entries excluding dependency modules,
+            builtins, and any other module objects.
+        """
+        return {
+            name: value
+            for name, value in self.namespace.items()
+            if name not in self.modules
+            and name != "__builtins__"
+            and not isinstance(value, ModuleType)
+        }
+
+    def snapshot(
+        self, exclude: List[str], referenced: Set[str]
+    ) -> Tuple[Dict[str, bytes], List[str]]:
+        """
+        Pickle the user variables that may have changed since the last snapshot.
+
+        Args:
+            exclude: Variable names to leave out of the snapshot.
+            referenced: Names referenced by the code executed since then.
+
+        Returns:
+            Tuple[Dict[str, bytes], List[str]]: Payloads of every picklable
+            variable, and the names whose payload was produced anew.
+        """
+        variables = {
+            name: value
+            for name, value in self.variables().items()
+            if name not in exclude
+        }
+        return self.tracker.snapshot(variables, self.namespace, referenced)
+
+
+@dataclass
+class KernelManager:
+    """
+    Process-wide registry of warm execution kernels.
+
+    Kernels are keyed by (session_id, file_name) and kept in least recently
+    used order. Dependency modules are resolved per execution from the
+    names the code refers to and shared by every kernel through the module
+    registry.
+
+    Attributes:
+        idle_ttl: Seconds a kernel may stay unused before it is evicted.
+        max_kernels: Maximum number of kernels kept alive.
+        max_rss_bytes: Resident memory threshold that triggers eviction.
+        module_registry: Registry resolving and caching dependency modules.
+        execution_cache: Cache of execution deltas shared by every kernel.
+        checkpoint_max_bytes: Memory budget for statement checkpoints per kernel.
+        checkpoint_min_seconds: Minimum statement duration that is checkpointed.
+    """
+
+    idle_ttl: float
+    max_kernels: int
+    max_rss_bytes: int
+    module_registry: ModuleRegistry
+    execution_cache: ExecutionCache
+    checkpoint_max_bytes: int
+    checkpoint_min_seconds: float
+    _kernels: "OrderedDict[Tuple[UUID, str], ExecutionKernel]" = field(
+        default_factory=OrderedDict
+    )
+    _watchdogs: Dict[Tuple[UUID, str], ExecutionWatchdog] = field(default_factory=dict)
+    _lock: threading.RLock = field(default_factory=threading.RLock)
+
+    def get_kernel(self, session_id: UUID, file_name: str) -> ExecutionKernel:
+        """
+        Return the warm kernel for a session and file, creating it if needed.
+
+        Args:
+            session_id: Unique identifier of the session.
+            file_name: Name of the file the session operates on.
+
+        Returns:
+            ExecutionKernel: The kernel bound to the given session and file.
+        """
+        key = (session_id, file_name)
+        with self._lock:
+            kernel = self._kernels.get(key)
+            if kernel is None:
+                kernel = ExecutionKernel(
+                    checkpoints=CheckpointStore(
+                        max_bytes=self.checkpoint_max_bytes,
+                        min_seconds=self.checkpoint_min_seconds,
+                    )
+                )
+                self._kernels[key] = kernel
+
+            kernel.last_used = time.monotonic()
+            self._kernels.move_to_end(key)
+
+        self.collect()
+        return kernel
+
+    def execute(
+        self,
+        request: ExecutionRequest,
+        output: Optional[Callable[[OutputChunk], None]] = None,
+    ) -> ExecutionResult:
+        """
+        Execute a request in the kernel bound to its session and file.
+
+        Variables are taken from the request objects or, if only payloads are
+        given, unpickled from them. When the request carries neither, the
+        kernel must already hold the expected generation; otherwise a stale
+        result is returned so the caller can resend the request with variables.
+
+        Args:
+            request: The execution request.
+            output: Callable receiving what the code writes to stdout and
+                stderr while it runs, or None to leave the output uncaptured.
+
+        Returns:
+            ExecutionResult: Outcome of the execution, including the
+            pickle-serializable variables, their pickled payloads, and the
+            names of the payloads that were produced anew.
+        """
+        key = request.kernel_key
+        kernel = self.get_kernel(*key)
+        referenced = referenced_names(request.code)
+        modules = self.module_registry.resolve(request.code, request.dependencies)
+
+        # Register the watchdog first, so a cancellation is never missed
+        watchdog = ExecutionWatchdog(
+            time_limit=request.time_limit, memory_limit=request.memory_limit
+        )
+        with self._lock:
+            self._watchdogs[key] = watchdog
+
+        try:
+            with kernel.lock:
+                variables = request.variables
+                if variables is None and request.snapshot is not None:
+                    variables = {
+                        name: pickle.loads(payload)
+                        for name, payload in request.snapshot.items()
+                    }
+
+                if variables is not None:
+                    kernel.sync(variables, request.snapshot)
+                elif (
+                    request.generation is None
+                    or kernel.generation != request.generation
+                ):
+                    return ExecutionResult(stale=True)
+
+                # Inject only the dependency modules the code refers to
+                kernel.bind_modules(modules)
+
+                # Replay a cached delta when the same code ran on the same inputs
+                cache_key = self.execution_cache.key(
+                    request.code, request.dependencies, kernel.fingerprint
+                )
+                cached = self.execution_cache.get(cache_key) if cache_key else None
+                if cached is not None:
+                    started, cpu_started = time.monotonic(), time.process_time()
+                    kernel.apply(cached.changed, cached.removed)
+                    snapshot, _ = kernel.snapshot(request.dependencies, set())
+                    return ExecutionResult(
+                        variables={name: kernel.namespace[name] for name in snapshot},
+                        snapshot=snapshot,
+                        names=list(snapshot),
+                        changed=[name for name in cached.changed if name in snapshot],
+                        generation=kernel.generation,
+                        cached=True,
+                        profile=ExecutionProfile(
+                            wall_time=time.monotonic() - started,
+                            cpu_time=time.process_time() - cpu_started,
+                            peak_rss_delta=0,
+                            variable_sizes=_sizes(snapshot),
+                            cached=True,
+                        ),
+                    )
+
+                before = set(kernel.variables())
+                started, cpu_started = time.monotonic(), time.process_time()
+                # Capture outside the watchdog, which discards late interruptions
+                capture = capture_output(output) if output else nullcontext()
+                try:
+                    with capture, watchdog:
+                        kernel.run(request.code)
+                except (Exception, ExecutionLimitExceeded) as e:
+                    kernel.tracker.invalidate(referenced)
+                    error = watchdog.reason if isinstance(e, ExecutionInterrupted) else None
+                    return ExecutionResult(
+                        error=error or f"{e}",
+                        generation=kernel.generation,
+                        profile=ExecutionProfile(
+                            wall_time=time.monotonic() - started,
+                            cpu_time=time.process_time() - cpu_started,
+                            peak_rss_delta=watchdog.peak_rss_delta,
+                        ),
+                    )
+
+                profile = ExecutionProfile(
+                    wall_time=time.monotonic() - started,
+                    cpu_time=time.process_time() - cpu_started,
+                    peak_rss_delta=watchdog.peak_rss_delta,
+                )
+                snapshot, changed = kernel.snapshot(request.dependencies, referenced)
+                profile.variable_sizes = _sizes(snapshot)
+                if cache_key:
+                    self.execution_cache.put(
+                        cache_key,
+                        CachedExecution(
+                            changed={name: snapshot[name] for name in changed},
+                            removed=list(before - set(kernel.variables())),
+                        ),
+                    )
+
+                return ExecutionResult(
+                    variables={name: kernel.namespace[name] for name in snapshot},
+                    snapshot=snapshot,
+                    names=list(snapshot),
+                    changed=changed,
+                    generation=kernel.generation,
+                    cached=False if cache_key else None,
+                    profile=profile,
+                )
+        finally:
+            with self._lock:
+                if self._watchdogs.get(key) is watchdog:
+                    del self._watchdogs[key]
+            self.collect()
+
+    def cancel(self, session_id: UUID, reason: str) -> None:
+        """
+        Stop the executions running, or about to run, for a session.
+
+        Args:
+            session_id: Unique identifier of the session.
+            reason: Error message reported for the stopped executions.
+        """
+        with self._lock:
+            watchdogs = [
+                watchdog
+                for key, watchdog in self._watchdogs.items()
+                if key[0] == session_id
+            ]
+        for watchdog in watchdogs:
+            watchdog.interrupt(reason)
+
+    def discard(self, session_id: UUID, file_name: str) -> None:
+        """
+        Drop the kernel bound to a session and file, if any.
+
+        Args:
+            session_id: Unique identifier of the session.
+            file_name: Name of the file the session operates on.
+        """
+        with self._lock:
+            self._kernels.pop((session_id, file_name), None)
+
+    def count(self) -> int:
+        """
+        Return the number of live kernels.
+
+        Returns:
+            int: Number of kernels currently kept alive.
+        """
+        with self._lock:
+            return len(self._kernels)
+
+    def collect(self) -> None:
+        """
+        Evict kernels that are idle, over the count limit, or under memory pressure.
+
+        Kernels that are currently executing (their lock is held) are never
+        evicted. Memory-pressure eviction proceeds from the least recently
+        used kernel until resident memory falls under the threshold.
+        """
+        with self._lock:
+            now = time.monotonic()
+            for key, kernel in list(self._kernels.items()):
+                if now - kernel.last_used > self.idle_ttl and not kernel.lock.locked():
+                    del self._kernels[key]
+
+            while len(self._kernels) > self.max_kernels:
+                if not self._evict_least_recently_used():
+                    break
+
+            while get_rss() > self.max_rss_bytes:
+                if not self._evict_least_recently_used():
+                    break
+                gc.collect()
+
+    def _evict_least_recently_used(self) -> bool:
+        """
+        Evict the least recently used kernel that is not executing.
+
+        Returns:
+            bool: True if a kernel was evicted, False if none could be.
+        """
+        for key, kernel in self._kernels.items():
+            if not kernel.lock.locked():
+                del self._kernels[key]
+                return True
+        return False
+
+
+# Process-wide kernel manager configured from application settings
+kernel_manager = KernelManager(
+    idle_ttl=settings.execution.KERNEL_IDLE_TTL,
+    max_kernels=settings.execution.KERNEL_MAX_COUNT,
+    max_rss_bytes=settings.execution.KERNEL_MAX_RSS_MB * 1024 * 1024,
+    module_registry=module_registry,
+    execution_cache=execution_cache,
+    checkpoint_max_bytes=settings.execution.EXECUTION_CHECKPOINT_MAX_MB * 1024 * 1024,
+    checkpoint_min_seconds=settings.execution.EXECUTION_CHECKPOINT_MIN_SECONDS,
+)
@@ -0,0 +1,150 @@
+"""
+Execution limits module.
+
+This module defines the `ExecutionWatchdog` class, which bounds a single
+execution by wall-clock time and by the resident memory it adds, lets other
+threads cancel it, and samples the peak memory it reaches. The watchdog
+stops the execution cooperatively: it raises `ExecutionInterrupted`
+asynchronously in the executing thread, so the kernel restores its bindings
+exactly as it does for any other failure. Code blocked inside a long native
+call only notices the interruption once the call returns; the worker pool
+enforces a hard deadline on top of this.
+
+Classes:
+    ExecutionWatchdog: Wall-clock, memory, and cancellation guard of one execution.
+"""
+
+import time
+import ctypes
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from execution.base import ExecutionInterrupted
+from execution.resources import get_peak_rss, get_rss
+
+
+def _raise_in_thread(thread_id: int, exception: Optional[type]) -> None:
+    """
+    Schedule an exception in another thread, or clear a scheduled one.
+
+    Args:
+        thread_id: Identifier of the target thread.
+        exception: Exception type to raise, or None to clear a pending one.
+    """
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id),
+        ctypes.py_object(exception) if exception is not None else None,
+    )
+
+
+@dataclass
+class ExecutionWatchdog:
+    """
+    Wall-clock, memory, and cancellation guard of one execution.
+
+    Used as a context manager around the execution, in the thread running it.
+
+    Attributes:
+        time_limit: Wall-clock seconds the execution may run, or None.
+        memory_limit: Bytes of resident memory the execution may add, or None.
+        interval: Seconds between memory samples and limit checks.
+        reason: Error message of the interruption, or None if the execution
+            was not interrupted.
+        baseline_rss: Resident memory of the process when the execution started.
+        peak_rss: Highest resident memory observed during the execution.
+    """
+
+    time_limit: Optional[float] = None
+    memory_limit: Optional[int] = None
+    interval: float = 0.1
+    reason: Optional[str] = None
+    baseline_rss: int = field(default=0, init=False)
+    peak_rss: int = field(default=0, init=False)
+    _process_peak: int = field(default=0, init=False)
+    _thread_id: Optional[int] = field(default=None, init=False)
+    _stopped: threading.Event = field(default_factory=threading.Event, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def __enter__(self) -> "ExecutionWatchdog":
+        """
+        Start guarding the calling thread.
+
+        Raises:
+            ExecutionInterrupted: If the execution was cancelled before it started.
+        """
+        with self._lock:
+            if self.reason is not None:
+                raise ExecutionInterrupted()
+            self._thread_id = threading.get_ident()
+
+        self.baseline_rss = self.peak_rss = get_rss()
+        self._process_peak = get_peak_rss()
+        threading.Thread(
+            target=self._watch,
+            args=(time.monotonic(),),
+            name="execution-watchdog",
+            daemon=True,
+        ).start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Stop guarding, discarding an interruption that arrived too late.
+        """
+        with self._lock:
+            self._stopped.set()
+            if self.reason is not None:
+                _raise_in_thread(self._thread_id, None)
+
+        # Catch spikes shorter than the sampling interval
+        process_peak = get_peak_rss()
+        if process_peak > self._process_peak:
+            self.peak_rss = max(self.peak_rss, process_peak)
+        self.peak_rss = max(self.peak_rss, get_rss())
+
+    @property
+    def peak_rss_delta(self) -> int:
+        """
+        Peak resident memory above the level at the start, in bytes.
+        """
+        return max(0, self.peak_rss - self.baseline_rss)
+
+    def interrupt(self, reason: str) -> None:
+        """
+        Stop the execution, reporting the given reason.
+
+        Args:
+            reason: Error message reported for the execution.
+        """
+        with self._lock:
+            if self._stopped.is_set() or self.reason is not None:
+                return
+
+            self.reason = reason
+            if self._thread_id is not None:
+                _raise_in_thread(self._thread_id, ExecutionInterrupted)
+
+    def _watch(self, started: float) -> None:
+        """
+        Sample resident memory and interrupt the execution once it crosses a limit.
+
+        Args:
+            started: Monotonic time the execution started at.
+        """
+        while not self._stopped.wait(self.interval):
+            rss = get_rss()
+            self.peak_rss = max(self.peak_rss, rss)
+
+            if self.reason is not None:
+                continue
+            if self.time_limit and time.monotonic() - started > self.time_limit:
+                self.interrupt(
+                    "ExecutionTimeout: Execution exceeded the wall-clock limit "
+                    f"of {self.time_limit:g} seconds and was stopped"
+                )
+            elif self.memory_limit and rss - self.baseline_rss > self.memory_limit:
+                self.interrupt(
+                    "ExecutionMemoryExceeded: Execution exceeded the memory limit "
+                    f"of {self.memory_limit // (1024 * 1024)} MiB and was stopped"
+                )
@@ -0,0 +1,84 @@
+"""
+In-process execution backend module.
+
+This module defines the `LocalExecutionBackend` class, which executes
+generated code inside the service process using the warm kernels of a
+`KernelManager`. It is used when no worker pool is configured.
+
+Classes:
+    LocalExecutionBackend: Execution backend running code in-process.
+"""
+
+from uuid import UUID
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from execution.base import (
+    BaseExecutionBackend,
+    ExecutionRequest,
+    ExecutionResult,
+    OutputChunk,
+)
+from execution.kernel import KernelManager
+
+
+@dataclass
+class LocalExecutionBackend(BaseExecutionBackend):
+    """
+    Execution backend running generated code inside the service process.
+
+    Attributes:
+        kernel_manager: Kernel manager providing warm session kernels.
+        preload: Dependency modules imported when the backend starts.
+    """
+
+    kernel_manager: KernelManager
+    preload: List[str] = field(default_factory=list)
+
+    def start(self) -> None:
+        """
+        Import the preloaded dependency modules.
+        """
+        self.kernel_manager.module_registry.preload(self.preload)
+
+    def execute(
+        self,
+        request: ExecutionRequest,
+        output: Optional[Callable[[OutputChunk], None]] = None,
+    ) -> ExecutionResult:
+        """
+        Execute a request in the warm kernel bound to its session and file.
+
+        Args:
+            request: The execution request.
+            output: Callable receiving the output of the code while it runs,
+                or None to leave the output uncaptured.
+
+        Returns:
+            ExecutionResult: Outcome of the execution.
+        """
+        return self.kernel_manager.execute(request, output)
+
+    def cancel(self, session_id: UUID, reason: str) -> None:
+        """
+        Stop the executions running in-process for a session.
+
+        Args:
+            session_id: Unique identifier of the session.
+            reason: Error message reported for the stopped executions.
+        """
+        self.kernel_manager.cancel(session_id, reason)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return metrics of the in-process backend.
+
+        Returns:
+            Dict[str, Any]: Backend name, number of live kernels, and
+            execution cache occupancy.
+        """
+        return {
+            "backend": "local",
+            "kernels": self.kernel_manager.count(),
+            "cache": self.kernel_manager.execution_cache.metrics(),
+        }
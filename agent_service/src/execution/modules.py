@@ -0,0 +1,185 @@
+"""
+Module registry module.
+
+This module defines the `ModuleRegistry` class, which resolves the dependency
+modules a piece of generated code actually needs. The code is parsed, the
+free names it reads are matched against the allowed dependencies (directly,
+through their top-level package, or through the usual aliases such as `np`
+and `pd`), and only the matching modules are imported and injected into the
+kernel namespace. Imported modules are cached process-wide, and failed
+imports are remembered so they are not retried.
+
+Classes:
+    ModuleRegistry: Process-wide registry of importable dependency modules.
+
+Instances:
+    module_registry: Default `ModuleRegistry` with the standard aliases.
+"""
+
+import re
+import ast
+import importlib
+from types import ModuleType
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+
+# Conventional aliases used by generated code
+DEFAULT_ALIASES = {
+    "np": "numpy",
+    "pd": "pandas",
+    "plt": "matplotlib.pyplot",
+    "sns": "seaborn",
+    "px": "plotly.express",
+    "sm": "statsmodels.api",
+    "nx": "networkx",
+}
+
+
+def normalize(dependency: str) -> str:
+    """
+    Strip version specifiers from a dependency entry.
+
+    Args:
+        dependency: Dependency entry, e.g. "gensim==4.3.2".
+
+    Returns:
+        str: Importable module name, e.g. "gensim".
+    """
+    return re.split(r"[<>=!~;\[\s]", dependency, maxsplit=1)[0]
+
+
+def _free_names(code: Optional[str]) -> Set[str]:
+    """
+    Return the names read by code that it does not import itself.
+
+    Args:
+        code: Python source code.
+
+    Returns:
+        Set[str]: Names loaded by the code, excluding names bound by its own
+        import statements. Empty if the code cannot be parsed.
+    """
+    try:
+        tree = ast.parse(code or "")
+    except (SyntaxError, ValueError):
+        return set()
+
+    loaded, imported = set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            loaded.add(node.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                imported.add(alias.asname or alias.name.split(".")[0])
+    return loaded - imported
+
+
+@dataclass
+class ModuleRegistry:
+    """
+    Process-wide registry of importable dependency modules.
+
+    Attributes:
+        aliases: Mapping of conventional aliases to module names.
+    """
+
+    aliases: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_ALIASES))
+    _modules: Dict[str, Optional[ModuleType]] = field(default_factory=dict)
+
+    def get(self, module_name: str) -> Optional[ModuleType]:
+        """
+        Import a module, reusing the process-wide module cache.
+
+        Args:
+            module_name: Fully qualified module name.
+
+        Returns:
+            Optional[ModuleType]: The module, or None if it cannot be imported.
+        """
+        if module_name not in self._modules:
+            try:
+                self._modules[module_name] = importlib.import_module(module_name)
+            except Exception:
+                # Remember missing modules so the lookup is not repeated
+                self._modules[module_name] = None
+        return self._modules[module_name]
+
+    def preload(self, module_names: Iterable[str]) -> None:
+        """
+        Import modules ahead of the first execution that needs them.
+
+        Args:
+            module_names: Dependency entries to import.
+        """
+        for module_name in module_names:
+            self.get(normalize(module_name))
+
+    def names(self, dependencies: List[str]) -> Set[str]:
+        """
+        Return the names `resolve` may inject for the given dependencies.
+
+        Nothing is imported, so modules that turn out to be missing are
+        still included.
+
+        Args:
+            dependencies: Allowed dependency entries.
+
+        Returns:
+            Set[str]: Top-level package names and aliases of the dependencies.
+        """
+        allowed = {normalize(dependency) for dependency in dependencies}
+        packages = {module_name.split(".")[0] for module_name in allowed}
+
+        names = set(packages)
+        for alias, module_name in self.aliases.items():
+            if module_name in allowed or any(
+                allowed_name.startswith(f"{module_name}.") for allowed_name in allowed
+            ):
+                names.add(alias)
+        return names
+
+    def resolve(
+        self, code: Optional[str], dependencies: List[str]
+    ) -> Dict[str, ModuleType]:
+        """
+        Resolve the dependency modules referenced by code.
+
+        A free name resolves when it is an allowed dependency, the top-level
+        package of an allowed dependency (whose allowed submodules are then
+        imported as well, so attribute access works), or an alias of one.
+
+        Args:
+            code: Python source code.
+            dependencies: Allowed dependency entries.
+
+        Returns:
+            Dict[str, ModuleType]: Mapping of names to inject into the
+            namespace to their modules.
+        """
+        allowed = {normalize(dependency) for dependency in dependencies}
+
+        modules = {}
+        for name in _free_names(code):
+            module_name = self.aliases.get(name, name)
+            submodules = [
+                allowed_name
+                for allowed_name in allowed
+                if allowed_name.startswith(f"{module_name}.")
+            ]
+            if module_name not in allowed and not submodules:
+                continue
+
+            module = self.get(module_name)
+            if module is None:
+                continue
+
+            for submodule in submodules:
+                self.get(submodule)
+            modules[name] = module
+
+        return modules
+
+
+# Process-wide module registry with the standard aliases
+module_registry = ModuleRegistry()
@@ -0,0 +1,232 @@
+"""
+Execution output capture module.
+
+This module captures what executing code writes to stdout and stderr and
+forwards it in batches while the code is still running. `sys.stdout` and
+`sys.stderr` are replaced once by thread-routing proxies, so concurrent
+executions in different threads are captured separately and writes from
+other threads still reach the original streams.
+
+Carriage-return updates, as written by `tqdm` and similar progress bars, are
+forwarded as "progress" chunks holding only the latest state of the bar.
+Lines and progress updates are batched and flushed at a fixed interval, and
+the total amount of forwarded text per execution is bounded.
+
+Classes:
+    OutputCapture: Buffers and forwards the output of one execution.
+
+Functions:
+    capture_output: Capture the output of the calling thread.
+"""
+
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+from execution.base import OutputChunk
+
+
+# Upper bound of the text forwarded for a single execution
+_MAX_OUTPUT_CHARS = 1_000_000
+
+
+class _ThreadRouter:
+    """
+    Proxy of a standard stream routing writes to per-thread captures.
+
+    Attributes:
+        name: Name of the proxied stream ("stdout" or "stderr").
+        original: The stream writes fall back to.
+        captures: Captures registered by thread identifier.
+    """
+
+    def __init__(self, name: str, original: TextIO):
+        self.name = name
+        self.original = original
+        self.captures: Dict[int, "OutputCapture"] = {}
+
+    def write(self, text: str) -> int:
+        capture = self.captures.get(threading.get_ident())
+        if capture is None:
+            return self.original.write(text)
+        return capture.write(self.name, text)
+
+    def flush(self) -> None:
+        if threading.get_ident() not in self.captures:
+            self.original.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.original, name)
+
+
+def _router(name: str) -> _ThreadRouter:
+    """
+    Return the routing proxy of a standard stream, installing it if needed.
+
+    Args:
+        name: "stdout" or "stderr".
+
+    Returns:
+        _ThreadRouter: The proxy installed as `sys.<name>`.
+    """
+    stream = getattr(sys, name)
+    if not isinstance(stream, _ThreadRouter):
+        stream = _ThreadRouter(name, stream)
+        setattr(sys, name, stream)
+    return stream
+
+
+@dataclass
+class OutputCapture:
+    """
+    Buffers and forwards the output of one execution.
+
+    Attributes:
+        sink: Callable receiving the output chunks.
+        interval: Seconds between flushes of the buffered output.
+    """
+
+    sink: Callable[[OutputChunk], None]
+    interval: float = 0.25
+    _partial: Dict[str, str] = field(default_factory=dict)
+    _lines: List[OutputChunk] = field(default_factory=list)
+    _progress: Optional[str] = None
+    _forwarded: int = 0
+    _truncated: bool = False
+    _stopped: threading.Event = field(default_factory=threading.Event)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def write(self, stream: str, text: str) -> int:
+        """
+        Buffer text written to a stream.
+
+        Args:
+            stream: "stdout" or "stderr".
+            text: Written text.
+
+        Returns:
+            int: Number of characters written.
+        """
+        with self._lock:
+            buffer = self._partial.get(stream, "") + text
+            *lines, rest = buffer.split("\n")
+            for line in lines:
+                # Only the final state of a carriage-return updated line matters
+                self._append(OutputChunk(stream=stream, text=line.rsplit("\r", 1)[-1]))
+
+            if "\r" in rest:
+                progress = rest.rsplit("\r", 1)[-1]
+                if progress.strip():
+                    self._progress = progress
+                rest = "\r" + progress
+            self._partial[stream] = rest
+        return len(text)
+
+    def flush(self, final: bool = False) -> None:
+        """
+        Forward the buffered lines and the latest progress update.
+
+        Args:
+            final: If True, incomplete lines are forwarded as well.
+        """
+        with self._lock:
+            if final:
+                for stream, rest in self._partial.items():
+                    if rest and not rest.startswith("\r"):
+                        self._append(OutputChunk(stream=stream, text=rest))
+                self._partial.clear()
+
+            chunks = self._merge(self._lines)
+            if self._progress is not None:
+                chunks.append(OutputChunk(stream="progress", text=self._progress.strip()))
+            self._lines, self._progress = [], None
+
+        for chunk in chunks:
+            self.sink(chunk)
+
+    def run(self) -> None:
+        """
+        Flush the buffered output periodically until stopped.
+        """
+        while not self._stopped.wait(self.interval):
+            self.flush()
+
+    def stop(self) -> None:
+        """
+        Stop the periodic flushes.
+        """
+        self._stopped.set()
+
+    def _append(self, chunk: OutputChunk) -> None:
+        """
+        Buffer a complete line, enforcing the output limit.
+
+        Must be called with `_lock` held.
+
+        Args:
+            chunk: The line to buffer.
+        """
+        if self._truncated:
+            return
+
+        self._forwarded += len(chunk.text) + 1
+        if self._forwarded > _MAX_OUTPUT_CHARS:
+            self._truncated = True
+            chunk = OutputChunk(stream=chunk.stream, text="[output truncated]")
+        self._lines.append(chunk)
+
+    @staticmethod
+    def _merge(lines: List[OutputChunk]) -> List[OutputChunk]:
+        """
+        Join consecutive lines of the same stream into single chunks.
+
+        Args:
+            lines: Buffered lines.
+
+        Returns:
+            List[OutputChunk]: One chunk per run of lines from the same stream.
+        """
+        merged: List[OutputChunk] = []
+        for line in lines:
+            if merged and merged[-1].stream == line.stream:
+                merged[-1] = OutputChunk(
+                    stream=line.stream, text=f"{merged[-1].text}\n{line.text}"
+                )
+            else:
+                merged.append(line)
+        return merged
+
+
+@contextmanager
+def capture_output(sink: Callable[[OutputChunk], None]) -> Iterator[OutputCapture]:
+    """
+    Capture what the calling thread writes to stdout and stderr.
+
+    Args:
+        sink: Callable receiving the output chunks, called from a helper thread.
+
+    Yields:
+        OutputCapture: The active capture.
+    """
+    capture = OutputCapture(sink=sink)
+    routers = [_router("stdout"), _router("stderr")]
+    thread_id = threading.get_ident()
+    for router in routers:
+        router.captures[thread_id] = capture
+
+    flusher = threading.Thread(target=capture.run, name="execution-output", daemon=True)
+    flusher.start()
+    try:
+        yield capture
+    finally:
+        for router in routers:
+            router.captures.pop(thread_id, None)
+        # Forward the rest only once the flusher is done, keeping chunks in order
+        capture.stop()
+        flusher.join()
+        capture.flush(final=True)
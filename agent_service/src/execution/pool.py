@@ -0,0 +1,543 @@
+"""
+Worker pool execution backend module.
+
+This module defines the `PoolExecutionBackend` class, which executes
+generated code in a pool of worker processes. Workers are forked from a
+forkserver that has the dependency modules preloaded, so starting or
+replacing a worker does not pay the import cost again.
+
+Requests are routed to workers by (session_id, file_name), which keeps every
+session on the same worker and therefore on its warm kernel; subtasks running
+in parallel use kernel namespaces of their own, which may land on other workers. Session
+variables are only shipped to the worker when it does not already hold the
+generation the caller expects, preferably as their existing pickled payloads,
+and only payloads produced anew are sent back. Each execution is bounded by a CPU time
+limit enforced inside the worker, and each worker by a resident memory limit
+enforced by the parent, which kills and replaces offending workers.
+Wall-clock and memory budgets of single executions are enforced
+cooperatively inside the worker; executions that do not stop within a grace
+period after their wall-clock budget get their worker killed and replaced.
+
+Classes:
+    PoolExecutionBackend: Execution backend running code in worker processes.
+"""
+
+import time
+import zlib
+import pickle
+import asyncio
+import itertools
+import threading
+import multiprocessing
+from uuid import UUID
+from concurrent.futures import Future
+from dataclasses import dataclass, field, replace
+from multiprocessing.process import BaseProcess
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from execution.base import (
+    BaseExecutionBackend,
+    ExecutionRequest,
+    ExecutionResult,
+    OutputChunk,
+)
+from execution.modules import normalize
+from execution.resources import get_rss
+from execution.worker import run_worker
+
+
+@dataclass
+class _Worker:
+    """
+    Handle of a single worker process.
+
+    Attributes:
+        process: The worker process.
+        requests: Queue delivering requests to the worker.
+        controls: Queue delivering cancellations to the worker.
+    """
+
+    process: BaseProcess
+    requests: Any
+    controls: Any
+
+
+@dataclass
+class _Pending:
+    """
+    Request submitted to a worker and not completed yet.
+
+    Attributes:
+        index: Index of the worker the request was routed to.
+        future: Future resolved with the `ExecutionResult`.
+        time_limit: Wall-clock budget of the execution, if any.
+        started: Monotonic time the worker started executing the request.
+        output: Callable receiving the output forwarded by the worker, if any.
+    """
+
+    index: int
+    future: Future
+    time_limit: Optional[float] = None
+    started: Optional[float] = None
+    output: Optional[Callable[[OutputChunk], None]] = None
+
+
+@dataclass
+class PoolExecutionBackend(BaseExecutionBackend):
+    """
+    Execution backend running generated code in a pool of worker processes.
+
+    Attributes:
+        size: Number of worker processes.
+        preload: Modules imported by the forkserver before forking workers.
+        cpu_time_limit: CPU seconds a single execution may consume.
+        max_rss_bytes: Resident memory limit of a single worker process.
+        termination_grace: Seconds an execution may overrun its wall-clock
+            budget before its worker is killed.
+        monitor_interval: Seconds between worker health checks.
+    """
+
+    size: int
+    preload: List[str]
+    cpu_time_limit: int
+    max_rss_bytes: int
+    termination_grace: float = 10.0
+    monitor_interval: float = 0.5
+    _context: Any = field(default=None, init=False)
+    _results: Any = field(default=None, init=False)
+    _workers: List[_Worker] = field(default_factory=list, init=False)
+    _pending: Dict[int, _Pending] = field(default_factory=dict, init=False)
+    _generations: Dict[Tuple[UUID, str], Optional[str]] = field(
+        default_factory=dict, init=False
+    )
+    _request_ids: Any = field(default_factory=itertools.count, init=False)
+    _threads: List[threading.Thread] = field(default_factory=list, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+    _running: bool = field(default=False, init=False)
+    _submitted: int = field(default=0, init=False)
+    _completed: int = field(default=0, init=False)
+    _restarts: int = field(default=0, init=False)
+
+    def start(self) -> None:
+        """
+        Start the forkserver, the worker processes, and the helper threads.
+        """
+        # Preload dependency modules once in the forkserver; workers inherit them
+        self._context = multiprocessing.get_context("forkserver")
+        self._context.set_forkserver_preload(
+            ["execution.worker", *(normalize(name) for name in self.preload)]
+        )
+
+        self._results = self._context.Queue()
+        self._workers = [self._spawn(index) for index in range(self.size)]
+        self._running = True
+
+        self._threads = [
+            threading.Thread(
+                target=self._dispatch_results, name="execution-dispatcher", daemon=True
+            ),
+            threading.Thread(
+                target=self._monitor_workers, name="execution-monitor", daemon=True
+            ),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes and the helper threads.
+        """
+        self._running = False
+        for worker in self._workers:
+            worker.requests.put(None)
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.kill()
+
+        # Fail executions that never completed and stop the dispatcher
+        with self._lock:
+            for index in range(len(self._workers)):
+                self._fail_pending(index, "Execution pool was shut down")
+        self._results.put(None)
+
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def execute(
+        self,
+        request: ExecutionRequest,
+        output: Optional[Callable[[OutputChunk], None]] = None,
+    ) -> ExecutionResult:
+        """
+        Execute a request on the worker owning its session and block until done.
+
+        Args:
+            request: The execution request.
+            output: Callable receiving the output of the code while it runs,
+                called from the result dispatcher thread.
+
+        Returns:
+            ExecutionResult: Outcome of the execution.
+        """
+        key = request.kernel_key
+        delta = self._covers_variables(request)
+        if self._holds_generation(key, request.generation):
+            future = self._submit(
+                replace(request, variables=None, snapshot=None, delta=delta), output
+            )
+            result = future.result()
+            if not result.stale:
+                return self._complete(key, request, result)
+
+        result = self._submit(self._with_variables(request, delta), output).result()
+        return self._complete(key, request, result)
+
+    async def aexecute(
+        self,
+        request: ExecutionRequest,
+        output: Optional[Callable[[OutputChunk], None]] = None,
+    ) -> ExecutionResult:
+        """
+        Execute a request on the worker owning its session without blocking.
+
+        Args:
+            request: The execution request.
+            output: Callable receiving the output of the code while it runs,
+                called from the result dispatcher thread.
+
+        Returns:
+            ExecutionResult: Outcome of the execution.
+        """
+        key = request.kernel_key
+        delta = self._covers_variables(request)
+        if self._holds_generation(key, request.generation):
+            future = self._submit(
+                replace(request, variables=None, snapshot=None, delta=delta), output
+            )
+            result = await asyncio.wrap_future(future)
+            if not result.stale:
+                return self._complete(key, request, result)
+
+        future = self._submit(self._with_variables(request, delta), output)
+        result = await asyncio.wrap_future(future)
+        return self._complete(key, request, result)
+
+    def cancel(self, session_id: UUID, reason: str) -> None:
+        """
+        Stop the executions running for a session in any worker.
+
+        Args:
+            session_id: Unique identifier of the session.
+            reason: Error message reported for the stopped executions.
+        """
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.controls.put((session_id, reason))
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return queue depth and health metrics of the pool.
+
+        Returns:
+            Dict[str, Any]: Pool-wide counters and per-worker queue depths.
+        """
+        with self._lock:
+            depths = [0] * len(self._workers)
+            for pending in self._pending.values():
+                depths[pending.index] += 1
+
+            return {
+                "backend": "pool",
+                "size": self.size,
+                "queue_depth": len(self._pending),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "restarts": self._restarts,
+                "workers": [
+                    {
+                        "index": index,
+                        "pid": worker.process.pid,
+                        "alive": worker.process.is_alive(),
+                        "queue_depth": depths[index],
+                        "rss_bytes": get_rss(worker.process.pid),
+                    }
+                    for index, worker in enumerate(self._workers)
+                ],
+            }
+
+    def _spawn(self, index: int) -> _Worker:
+        """
+        Start a worker process.
+
+        Args:
+            index: Position of the worker in the pool.
+
+        Returns:
+            _Worker: Handle of the started worker.
+        """
+        requests, controls = self._context.Queue(), self._context.Queue()
+        process = self._context.Process(
+            target=run_worker,
+            args=(requests, controls, self._results, self.cpu_time_limit),
+            name=f"execution-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        return _Worker(process=process, requests=requests, controls=controls)
+
+    def _route(self, key: Tuple[UUID, str]) -> int:
+        """
+        Return the index of the worker owning a session and file.
+
+        Args:
+            key: (session_id, file_name) pair.
+
+        Returns:
+            int: Worker index.
+        """
+        return zlib.crc32(f"{key[0]}:{key[1]}".encode()) % self.size
+
+    def _holds_generation(
+        self, key: Tuple[UUID, str], generation: Optional[str]
+    ) -> bool:
+        """
+        Check whether the owning worker is known to hold a kernel generation.
+
+        Args:
+            key: (session_id, file_name) pair.
+            generation: Generation expected by the caller.
+
+        Returns:
+            bool: True if variables do not need to be shipped.
+        """
+        with self._lock:
+            return generation is not None and self._generations.get(key) == generation
+
+    @staticmethod
+    def _covers_variables(request: ExecutionRequest) -> bool:
+        """
+        Check whether the request payloads cover all of its variables.
+
+        Args:
+            request: The execution request.
+
+        Returns:
+            bool: True if unchanged variables can be taken from the request
+            instead of being sent back by the worker.
+        """
+        return (
+            request.variables is not None
+            and request.snapshot is not None
+            and request.variables.keys() <= request.snapshot.keys()
+        )
+
+    @staticmethod
+    def _with_variables(request: ExecutionRequest, delta: bool) -> ExecutionRequest:
+        """
+        Prepare a request that synchronizes the worker kernel.
+
+        Variables are shipped as their existing payloads when those cover
+        all of them, so they are not pickled again.
+
+        Args:
+            request: The execution request.
+            delta: Whether the payloads cover all variables.
+
+        Returns:
+            ExecutionRequest: Request to send to the worker.
+        """
+        if delta:
+            return replace(request, variables=None, delta=True)
+        return replace(request, delta=False)
+
+    def _submit(
+        self,
+        request: ExecutionRequest,
+        output: Optional[Callable[[OutputChunk], None]] = None,
+    ) -> Future:
+        """
+        Send a request to the worker owning its session.
+
+        Args:
+            request: The execution request.
+            output: Callable receiving the output forwarded by the worker.
+
+        Returns:
+            Future: Future resolved with the `ExecutionResult`.
+
+        Raises:
+            Exception: If the request cannot be pickled.
+        """
+        # Pickle in the calling thread so failures surface to the caller
+        request = replace(request, stream_output=output is not None)
+        payload = pickle.dumps(request, protocol=pickle.HIGHEST_PROTOCOL)
+
+        future = Future()
+        with self._lock:
+            index = self._route(request.kernel_key)
+            request_id = next(self._request_ids)
+            self._pending[request_id] = _Pending(
+                index=index,
+                future=future,
+                time_limit=request.time_limit,
+                output=output,
+            )
+            self._submitted += 1
+            worker = self._workers[index]
+
+        worker.requests.put((request_id, payload))
+        return future
+
+    def _complete(
+        self, key: Tuple[UUID, str], request: ExecutionRequest, result: ExecutionResult
+    ) -> ExecutionResult:
+        """
+        Record the worker generation and rebuild the returned variables.
+
+        Payloads produced anew are unpickled; unchanged variables and their
+        payloads are taken from the original request.
+
+        Args:
+            key: (session_id, file_name) pair.
+            request: The original execution request.
+            result: Result received from the worker.
+
+        Returns:
+            ExecutionResult: Result with `variables` and `snapshot` populated.
+        """
+        with self._lock:
+            self._generations[key] = result.generation
+
+        variables, snapshot = {}, {}
+        for name in result.names:
+            if name in result.snapshot:
+                snapshot[name] = result.snapshot[name]
+                variables[name] = pickle.loads(snapshot[name])
+            else:
+                snapshot[name] = request.snapshot[name]
+                variables[name] = request.variables[name]
+
+        result.variables, result.snapshot = variables, snapshot
+        return result
+
+    def _dispatch_results(self) -> None:
+        """
+        Resolve pending futures with results sent back by the workers.
+
+        A `None` result marks the start of an execution, from which its
+        wall-clock budget is counted, and an `OutputChunk` carries output of
+        a running execution.
+        """
+        while True:
+            message = self._results.get()
+            if message is None:
+                break
+
+            request_id, result = message
+            with self._lock:
+                if result is None:
+                    pending = self._pending.get(request_id)
+                    if pending is not None:
+                        pending.started = time.monotonic()
+                    continue
+
+                if isinstance(result, OutputChunk):
+                    pending = self._pending.get(request_id)
+                else:
+                    pending = self._pending.pop(request_id, None)
+                    self._completed += 1
+
+            if isinstance(result, OutputChunk):
+                if pending is not None and pending.output is not None:
+                    pending.output(result)
+                continue
+
+            if pending is not None:
+                pending.future.set_result(result)
+
+    def _monitor_workers(self) -> None:
+        """
+        Replace workers that died, exceeded the resident memory limit, or
+        overran the wall-clock budget of an execution.
+        """
+        while self._running:
+            time.sleep(self.monitor_interval)
+
+            for index, worker in enumerate(list(self._workers)):
+                if not self._running:
+                    break
+
+                if not worker.process.is_alive():
+                    reason = (
+                        "Execution worker exited unexpectedly "
+                        f"(exit code {worker.process.exitcode})"
+                    )
+                elif get_rss(worker.process.pid) > self.max_rss_bytes:
+                    worker.process.kill()
+                    worker.process.join()
+                    reason = (
+                        "Execution exceeded the worker memory limit of "
+                        f"{self.max_rss_bytes // (1024 * 1024)} MiB"
+                    )
+                elif (time_limit := self._overrun(index)) is not None:
+                    worker.process.kill()
+                    worker.process.join()
+                    reason = (
+                        "ExecutionTimeout: Execution exceeded the wall-clock limit "
+                        f"of {time_limit:g} seconds and was terminated"
+                    )
+                else:
+                    continue
+
+                replacement = self._spawn(index)
+                with self._lock:
+                    self._workers[index] = replacement
+                    self._restarts += 1
+                    self._fail_pending(index, reason)
+
+                    # Kernels of the replaced worker are gone
+                    self._generations = {
+                        key: generation
+                        for key, generation in self._generations.items()
+                        if self._route(key) != index
+                    }
+
+    def _overrun(self, index: int) -> Optional[float]:
+        """
+        Find an execution of a worker running past its wall-clock budget.
+
+        Args:
+            index: Worker index.
+
+        Returns:
+            Optional[float]: Wall-clock budget of the overrunning execution,
+            or None if every execution is within its budget and grace period.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for pending in self._pending.values():
+                if (
+                    pending.index == index
+                    and pending.time_limit
+                    and pending.started is not None
+                    and now - pending.started > pending.time_limit + self.termination_grace
+                ):
+                    return pending.time_limit
+        return None
+
+    def _fail_pending(self, index: int, reason: str) -> None:
+        """
+        Resolve every pending request of a worker with an error result.
+
+        Must be called with `_lock` held.
+
+        Args:
+            index: Worker index.
+            reason: Error message reported for the failed requests.
+        """
+        for request_id, pending in list(self._pending.items()):
+            if pending.index == index:
+                del self._pending[request_id]
+                pending.future.set_result(ExecutionResult(error=reason))
@@ -0,0 +1,125 @@
+"""
+Execution profiling module.
+
+This module defines the `ProfileAggregator` class, which accumulates the
+`ExecutionProfile` of every execution into totals per label (such as the
+subtask flow) and per session, so the analyses and sessions that drive
+capacity needs can be identified. Per-session totals are kept for a bounded
+number of recently active sessions.
+
+Classes:
+    ProfileTotals: Accumulated resource usage of a group of executions.
+    ProfileAggregator: Aggregates execution profiles by label and session.
+"""
+
+import threading
+from uuid import UUID
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+from execution.base import ExecutionProfile
+
+
+@dataclass
+class ProfileTotals:
+    """
+    Accumulated resource usage of a group of executions.
+
+    Attributes:
+        executions: Number of profiled executions.
+        cached: Number of executions replayed from the execution cache.
+        wall_time: Total wall-clock seconds.
+        cpu_time: Total CPU seconds.
+        max_peak_rss_delta: Largest peak resident memory delta in bytes.
+        variable_bytes: Pickled size in bytes of the variables left by the
+            latest execution.
+    """
+
+    executions: int = 0
+    cached: int = 0
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    max_peak_rss_delta: int = 0
+    variable_bytes: int = 0
+
+    def add(self, profile: ExecutionProfile) -> None:
+        """
+        Accumulate a single execution profile.
+
+        Args:
+            profile: Resource usage of the execution.
+        """
+        self.executions += 1
+        self.cached += profile.cached
+        self.wall_time += profile.wall_time
+        self.cpu_time += profile.cpu_time
+        self.max_peak_rss_delta = max(self.max_peak_rss_delta, profile.peak_rss_delta)
+        if profile.variable_sizes:
+            self.variable_bytes = sum(profile.variable_sizes.values())
+
+
+@dataclass
+class ProfileAggregator:
+    """
+    Aggregates execution profiles by label and session.
+
+    Attributes:
+        max_sessions: Number of most recently active sessions whose totals
+            are kept.
+        top_sessions: Number of sessions reported by `metrics`, ordered by
+            wall-clock time.
+    """
+
+    max_sessions: int = 1000
+    top_sessions: int = 20
+    _total: ProfileTotals = field(default_factory=ProfileTotals)
+    _labels: Dict[str, ProfileTotals] = field(default_factory=dict)
+    _sessions: "OrderedDict[UUID, ProfileTotals]" = field(default_factory=OrderedDict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(
+        self, profile: ExecutionProfile, session_id: UUID, label: Optional[str]
+    ) -> None:
+        """
+        Accumulate the profile of an execution.
+
+        Args:
+            profile: Resource usage of the execution.
+            session_id: Session the execution belongs to.
+            label: Tag of the execution, e.g. the subtask flow.
+        """
+        with self._lock:
+            self._total.add(profile)
+            self._labels.setdefault(label or "UNLABELED", ProfileTotals()).add(profile)
+
+            totals = self._sessions.pop(session_id, None) or ProfileTotals()
+            totals.add(profile)
+            self._sessions[session_id] = totals
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return the aggregated profiles.
+
+        Returns:
+            Dict[str, Any]: Overall totals, totals per label, and the most
+            expensive recently active sessions.
+        """
+        with self._lock:
+            sessions = sorted(
+                self._sessions.items(),
+                key=lambda item: item[1].wall_time,
+                reverse=True,
+            )[: self.top_sessions]
+            return {
+                "total": asdict(self._total),
+                "labels": {
+                    label: asdict(totals) for label, totals in self._labels.items()
+                },
+                "sessions": [
+                    {"session_id": str(session_id), **asdict(totals)}
+                    for session_id, totals in sessions
+                ],
+            }
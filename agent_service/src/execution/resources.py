@@ -0,0 +1,51 @@
+"""
+Process resource inspection helpers.
+
+This module provides small, dependency-free helpers for inspecting the
+resource usage of the current process (or another process on Linux). They
+are used by the execution layer to make eviction and limit decisions without
+pulling in third-party monitoring packages.
+"""
+
+import os
+import resource
+import sys
+from typing import Optional
+
+
+def get_rss(pid: Optional[int] = None) -> int:
+    """
+    Return the current resident set size of a process in bytes.
+
+    On Linux the value is read from `/proc/<pid>/statm`. On other platforms,
+    or when `/proc` is unavailable, the peak RSS of the current process
+    reported by `getrusage` is returned instead.
+
+    Args:
+        pid: Process identifier to inspect. Defaults to the current process.
+
+    Returns:
+        int: Resident memory in bytes, or 0 if it cannot be determined.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        ...
+
+    if pid is not None and pid != os.getpid():
+        return 0
+
+    return get_peak_rss()
+
+
+def get_peak_rss() -> int:
+    """
+    Return the peak resident set size of the current process in bytes.
+
+    Returns:
+        int: Highest resident memory reached by the process so far.
+    """
+    # `ru_maxrss` is reported in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
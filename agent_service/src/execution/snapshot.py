@@ -0,0 +1,382 @@
+"""
+Variable snapshot module.
+
+This module keeps pickled payloads of session variables up to date without
+re-serializing the whole namespace after every execution. A
+`VariableTracker` remembers the object and payload of every variable and
+only pickles the variables that may have changed: new or rebound names,
+names referenced by the executed code (directly, through user-defined
+functions, or through aliases and shallow containers), and names touched by
+failed executions. Types that can never be pickled are remembered
+process-wide so they are not probed again.
+
+The module also defines the storage format of variables in agent memory,
+which stores the per-variable payloads so they can be reused as-is.
+
+Classes:
+    VariableSnapshot: Mapping of variable names to pickled payloads.
+    VariableTracker: Incremental snapshotter for a kernel namespace.
+
+Functions:
+    referenced_names: Names referenced by a piece of source code.
+    node_names: Names referenced within an AST node.
+    reachable_names: Names reachable through user-defined functions.
+    dump_variables: Serialize variables for memory storage.
+    load_variables: Deserialize variables from memory storage.
+"""
+
+import ast
+import pickle
+import hashlib
+from types import FunctionType
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Types whose instances failed to pickle because of the type itself
+_unpicklable_types: Set[type] = set()
+
+# Upper bound on members inspected when looking for aliases inside containers
+_MAX_CONTAINER_SCAN = 1000
+
+# Immutable atomic types, which may be shared freely without aliasing concerns
+_ATOMIC_TYPES = (int, float, complex, str, bytes, bool, type(None))
+
+
+class VariableSnapshot(dict):
+    """
+    Mapping of variable names to individually pickled payloads.
+
+    Stored in agent memory in place of a single pickled variables dictionary,
+    so unchanged payloads can be reused without serializing again.
+    """
+
+    ...
+
+
+def referenced_names(code: Optional[str]) -> Set[str]:
+    """
+    Return the names referenced by a piece of source code.
+
+    Args:
+        code: Python source code.
+
+    Returns:
+        Set[str]: Every identifier loaded, stored, deleted, or declared
+        global by the code. Empty if the code cannot be parsed.
+    """
+    try:
+        tree = ast.parse(code or "")
+    except (SyntaxError, ValueError):
+        return set()
+
+    return node_names(tree)
+
+
+def node_names(tree: ast.AST) -> Set[str]:
+    """
+    Return the names referenced within an AST node.
+
+    Args:
+        tree: Parsed module or statement.
+
+    Returns:
+        Set[str]: Every identifier loaded, stored, deleted, or declared
+        global within the node.
+    """
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            names.update(node.names)
+    return names
+
+
+def reachable_names(names: Set[str], namespace: Dict[str, Any]) -> Set[str]:
+    """
+    Extend names with the globals used by the user-defined functions among them.
+
+    Args:
+        names: Names referenced by code.
+        namespace: Namespace the code runs in.
+
+    Returns:
+        Set[str]: The names plus, transitively, the global names used by the
+        functions they refer to.
+    """
+    pending = list(names)
+    reachable = set()
+    while pending:
+        name = pending.pop()
+        if name in reachable:
+            continue
+        reachable.add(name)
+
+        value = namespace.get(name)
+        if isinstance(value, FunctionType):
+            pending.extend(value.__code__.co_names)
+    return reachable
+
+
+def _members(value: Any) -> Iterable[Any]:
+    """
+    Return the direct members of a built-in container.
+
+    Args:
+        value: Any object.
+
+    Returns:
+        Iterable[Any]: Up to `_MAX_CONTAINER_SCAN` members, or nothing if the
+        value is not a dict, list, tuple, set, or frozenset.
+    """
+    if isinstance(value, dict):
+        members = value.values()
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        members = value
+    else:
+        return ()
+
+    return (member for _, member in zip(range(_MAX_CONTAINER_SCAN), members))
+
+
+def _serialize(value: Any) -> Optional[bytes]:
+    """
+    Pickle a value, remembering types that can never be pickled.
+
+    Args:
+        value: Value to pickle.
+
+    Returns:
+        Optional[bytes]: Pickled payload, or None if the value cannot be pickled.
+    """
+    if type(value) in _unpicklable_types:
+        return None
+
+    try:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        # Only cache failures caused by the type itself, not by its contents
+        if f"cannot pickle '{type(value).__name__}' object" in str(e):
+            _unpicklable_types.add(type(value))
+        return None
+
+
+@dataclass
+class _Entry:
+    """
+    Tracked state of a single variable.
+
+    Attributes:
+        value: Object the payload was produced from.
+        payload: Pickled payload, or None if the object cannot be pickled.
+        digest: Content fingerprint of the payload, computed on demand.
+    """
+
+    value: Any
+    payload: Optional[bytes]
+    digest: Optional[str] = None
+
+
+@dataclass
+class VariableTracker:
+    """
+    Incremental snapshotter for the variables of a kernel namespace.
+
+    Holds a reference to the object behind every payload, so identity
+    comparisons stay valid even if a rebound object is freed.
+    """
+
+    _entries: Dict[str, _Entry] = field(default_factory=dict)
+    _dirty: Set[str] = field(default_factory=set)
+
+    def seed(self, variables: Dict[str, Any], snapshot: Dict[str, bytes]) -> None:
+        """
+        Record known payloads for newly bound variables.
+
+        Entries are only seeded for names whose tracked object differs from
+        the given one, so payloads never override pending modifications.
+
+        Args:
+            variables: Variables bound in the namespace.
+            snapshot: Pickled payloads matching `variables`.
+        """
+        for name, payload in snapshot.items():
+            if name not in variables:
+                continue
+
+            entry = self._entries.get(name)
+            if entry is None or entry.value is not variables[name]:
+                self._entries[name] = _Entry(value=variables[name], payload=payload)
+                self._dirty.discard(name)
+
+    def fingerprint(self, name: str, value: Any) -> Optional[str]:
+        """
+        Return the content fingerprint of a variable.
+
+        The variable is serialized first if its payload is missing or may be
+        out of date; fingerprints are memoized per payload.
+
+        Args:
+            name: Variable name.
+            value: Current value of the variable.
+
+        Returns:
+            Optional[str]: Hex digest of the payload, or None if the value
+            cannot be pickled.
+        """
+        entry = self._entries.get(name)
+        if entry is None or entry.value is not value or name in self._dirty:
+            entry = _Entry(value=value, payload=_serialize(value))
+            self._entries[name] = entry
+            self._dirty.discard(name)
+
+        if entry.payload is None:
+            return None
+
+        if entry.digest is None:
+            entry.digest = hashlib.blake2b(entry.payload, digest_size=16).hexdigest()
+        return entry.digest
+
+    def invalidate(self, names: Iterable[str]) -> None:
+        """
+        Mark variables as possibly modified.
+
+        Used after failed executions, which restore name bindings but cannot
+        undo in-place modifications.
+
+        Args:
+            names: Names referenced by the failed code.
+        """
+        self._dirty.update(names)
+
+    def snapshot(
+        self,
+        variables: Dict[str, Any],
+        namespace: Dict[str, Any],
+        referenced: Set[str],
+    ) -> Tuple[Dict[str, bytes], List[str]]:
+        """
+        Bring the payloads up to date with the current variables.
+
+        Args:
+            variables: Variables to snapshot.
+            namespace: Namespace the executed code ran in, used to follow
+                references through user-defined functions.
+            referenced: Names referenced by the executed code.
+
+        Returns:
+            Tuple[Dict[str, bytes], List[str]]: Payloads of every picklable
+            variable, and the names whose payload was produced anew.
+        """
+        dirty = self._dirty_names(variables, namespace, referenced)
+
+        entries, changed = {}, []
+        for name, value in variables.items():
+            entry = self._entries.get(name)
+            if name in dirty:
+                entry = _Entry(value=value, payload=_serialize(value))
+                if entry.payload is not None:
+                    changed.append(name)
+            entries[name] = entry
+
+        self._entries = entries
+        self._dirty.clear()
+
+        snapshot = {
+            name: entry.payload
+            for name, entry in entries.items()
+            if entry.payload is not None
+        }
+        return snapshot, changed
+
+    def _dirty_names(
+        self,
+        variables: Dict[str, Any],
+        namespace: Dict[str, Any],
+        referenced: Set[str],
+    ) -> Set[str]:
+        """
+        Compute the names whose values may have changed.
+
+        Args:
+            variables: Variables to snapshot.
+            namespace: Namespace the executed code ran in.
+            referenced: Names referenced by the executed code.
+
+        Returns:
+            Set[str]: Names that must be serialized again.
+        """
+        # Follow globals used by user-defined functions the code may call
+        touched = reachable_names(referenced | self._dirty, namespace)
+
+        dirty = {
+            name
+            for name, value in variables.items()
+            if name in touched
+            or name not in self._entries
+            or self._entries[name].value is not value
+        }
+
+        # Mutable objects reachable from dirty variables may be shared by other names
+        identities = set()
+        for name in dirty:
+            for value in (variables[name], *_members(variables[name])):
+                if not isinstance(value, _ATOMIC_TYPES):
+                    identities.add(id(value))
+
+        for name, value in variables.items():
+            if name not in dirty and any(
+                id(member) in identities for member in (value, *_members(value))
+            ):
+                dirty.add(name)
+
+        return dirty
+
+
+def dump_variables(
+    variables: Dict[str, Any], snapshot: Optional[Dict[str, bytes]] = None
+) -> bytes:
+    """
+    Serialize variables for memory storage, reusing known payloads.
+
+    Args:
+        variables: Variables to serialize.
+        snapshot: Pickled payloads of (some of) the variables.
+
+    Returns:
+        bytes: Serialized `VariableSnapshot`.
+    """
+    snapshot = snapshot or {}
+    return pickle.dumps(
+        VariableSnapshot(
+            {
+                name: snapshot.get(name)
+                or pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                for name, value in variables.items()
+            }
+        ),
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+
+
+def load_variables(data: bytes) -> Tuple[Dict[str, Any], Optional[Dict[str, bytes]]]:
+    """
+    Deserialize variables from memory storage.
+
+    Supports both the `VariableSnapshot` format and plain pickled
+    dictionaries written by earlier versions.
+
+    Args:
+        data: Serialized variables.
+
+    Returns:
+        Tuple[Dict[str, Any], Optional[Dict[str, bytes]]]: Variables and their
+        pickled payloads, or None payloads for the plain format.
+    """
+    stored = pickle.loads(data)
+    if isinstance(stored, VariableSnapshot):
+        return {
+            name: pickle.loads(payload) for name, payload in stored.items()
+        }, dict(stored)
+    return stored, None
@@ -0,0 +1,336 @@
+"""
+Static code validation module.
+
+This module defines the `CodeValidator` class, which checks generated code
+before it is executed. It reports the failures that can be detected without
+running anything: syntax errors, names that are neither bound by the code
+nor available in the session namespace, and DataFrame columns that are read
+but do not exist. Every check is conservative: when the code could bind
+names or columns dynamically, the corresponding check is skipped rather
+than risking a false positive.
+
+Classes:
+    ValidationIssue: A problem found in generated code.
+    CodeValidator: Static validator of generated code.
+
+Instances:
+    code_validator: Default `CodeValidator` using the process-wide module
+        registry.
+"""
+
+import ast
+import difflib
+import builtins
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from execution.modules import ModuleRegistry, module_registry
+
+
+# Calls that read or bind names dynamically, disabling the undefined name check
+_DYNAMIC_NAMES = {"exec", "eval", "globals", "locals", "vars", "NameError"}
+
+# DataFrame methods that add or rename columns in place
+_COLUMN_MUTATORS = {"insert", "rename", "set_index", "reset_index", "update"}
+
+# DataFrame indexers whose assignments can add columns
+_INDEXERS = {"loc", "iloc", "at", "iat"}
+
+
+@dataclass
+class ValidationIssue:
+    """
+    A problem found in generated code.
+
+    Attributes:
+        kind: Name of the exception the code would raise, e.g. "NameError".
+        message: Human-readable description of the problem.
+        line: Line number the problem was found at, if known.
+    """
+
+    kind: str
+    message: str
+    line: Optional[int] = None
+
+    def __str__(self) -> str:
+        """
+        Format the issue the way the debugging prompt expects error messages.
+        """
+        location = f"Line {self.line}: " if self.line is not None else ""
+        return f"{location}{self.kind}: {self.message}"
+
+
+def _suggestion(name: str, candidates: Set[str]) -> str:
+    """
+    Build a "Did you mean" hint for a misspelled name.
+
+    Args:
+        name: The unknown name.
+        candidates: Known names.
+
+    Returns:
+        str: The hint, or an empty string if nothing is close enough.
+    """
+    matches = difflib.get_close_matches(name, sorted(candidates), n=1)
+    return f" Did you mean: '{matches[0]}'?" if matches else ""
+
+
+def _bound_names(tree: ast.AST) -> Set[str]:
+    """
+    Collect every name the code binds anywhere, in any scope.
+
+    Args:
+        tree: Parsed code.
+
+    Returns:
+        Set[str]: Assigned names, function and class names, parameters,
+        imported names, exception aliases, and pattern captures.
+    """
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add(alias.asname or alias.name.split(".")[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            names.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            names.add(node.rest)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            names.update(node.names)
+    return names
+
+
+@dataclass
+class CodeValidator:
+    """
+    Static validator of generated code.
+
+    Attributes:
+        module_registry: Registry telling which module names the kernel
+            injects for the allowed dependencies.
+    """
+
+    module_registry: ModuleRegistry
+
+    def validate(
+        self,
+        code: Optional[str],
+        variables: Dict[str, Any],
+        dependencies: List[str],
+    ) -> List[ValidationIssue]:
+        """
+        Validate code against the session namespace.
+
+        Args:
+            code: Python source code.
+            variables: Session variables the code will run with.
+            dependencies: Allowed dependency entries.
+
+        Returns:
+            List[ValidationIssue]: Problems found, empty if the code looks
+            runnable.
+        """
+        if code is None:
+            return [ValidationIssue("SyntaxError", "no Python code block was found")]
+
+        # Compile to catch syntax errors, including those `ast.parse` accepts
+        try:
+            tree = ast.parse(code, "<string>")
+            compile(tree, "<string>", "exec")
+        except SyntaxError as error:
+            return [ValidationIssue("SyntaxError", error.msg, error.lineno)]
+        except ValueError as error:
+            return [ValidationIssue("ValueError", str(error))]
+
+        return [
+            *self._undefined_names(tree, variables, dependencies),
+            *self._missing_columns(tree, variables),
+        ]
+
+    def _undefined_names(
+        self, tree: ast.AST, variables: Dict[str, Any], dependencies: List[str]
+    ) -> List[ValidationIssue]:
+        """
+        Find names that are read but never bound.
+
+        Args:
+            tree: Parsed code.
+            variables: Session variables.
+            dependencies: Allowed dependency entries.
+
+        Returns:
+            List[ValidationIssue]: One NameError per unknown name, at its
+            first use.
+        """
+        if any(
+            isinstance(node, ast.ImportFrom)
+            and any(alias.name == "*" for alias in node.names)
+            for node in ast.walk(tree)
+        ):
+            return []
+
+        loads = [
+            node
+            for node in ast.walk(tree)
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)
+        ]
+        if any(node.id in _DYNAMIC_NAMES for node in loads):
+            return []
+
+        known = (
+            _bound_names(tree)
+            | set(variables)
+            | set(dir(builtins))
+            | self.module_registry.names(dependencies)
+        )
+
+        issues, reported = [], set()
+        for node in sorted(loads, key=lambda node: (node.lineno, node.col_offset)):
+            if node.id in known or node.id in reported:
+                continue
+            reported.add(node.id)
+            issues.append(
+                ValidationIssue(
+                    "NameError",
+                    f"name '{node.id}' is not defined."
+                    + _suggestion(node.id, known - set(dir(builtins))),
+                    node.lineno,
+                )
+            )
+        return issues
+
+    def _missing_columns(
+        self, tree: ast.AST, variables: Dict[str, Any]
+    ) -> List[ValidationIssue]:
+        """
+        Find DataFrame columns that are read but do not exist.
+
+        Only subscripts of session DataFrames with string keys are checked,
+        e.g. `df["col"]` and `df[["a", "b"]]`. Frames the code rebinds,
+        whose columns it renames in place, or any of whose attributes it
+        assigns (e.g. `df.columns = [...]`) are skipped, and columns the code
+        assigns itself, directly or through `loc`, `iloc`, `at`, or `iat`,
+        are accepted.
+
+        Args:
+            tree: Parsed code.
+            variables: Session variables.
+
+        Returns:
+            List[ValidationIssue]: One KeyError per missing column.
+        """
+        frames = {}
+        for name, value in variables.items():
+            columns = getattr(value, "columns", None)
+            if columns is None or getattr(columns, "nlevels", 1) != 1:
+                continue
+            try:
+                frames[name] = {column for column in columns if isinstance(column, str)}
+            except TypeError:
+                continue
+
+        if not frames:
+            return []
+
+        # Frames the code may reshape and the columns it assigns itself
+        skipped, assigned = set(), {name: set() for name in frames}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+                skipped.add(node.id)
+            elif (
+                isinstance(node, ast.Attribute)
+                and isinstance(node.ctx, ast.Store)
+                and isinstance(node.value, ast.Name)
+            ):
+                skipped.add(node.value.id)
+            elif (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and isinstance(node.func.value, ast.Name)
+                and (
+                    node.func.attr in _COLUMN_MUTATORS
+                    or any(keyword.arg == "inplace" for keyword in node.keywords)
+                )
+            ):
+                skipped.add(node.func.value.id)
+            elif (
+                isinstance(node, ast.Subscript)
+                and not isinstance(node.ctx, ast.Load)
+                and isinstance(node.value, ast.Name)
+                and node.value.id in assigned
+            ):
+                assigned[node.value.id].update(self._keys(node.slice))
+            elif (
+                isinstance(node, ast.Subscript)
+                and not isinstance(node.ctx, ast.Load)
+                and isinstance(node.value, ast.Attribute)
+                and node.value.attr in _INDEXERS
+                and isinstance(node.value.value, ast.Name)
+                and node.value.value.id in assigned
+            ):
+                # Row and column keys alike, e.g. `df.loc[:, "new"] = 1`
+                elements = (
+                    node.slice.elts
+                    if isinstance(node.slice, ast.Tuple)
+                    else [node.slice]
+                )
+                for element in elements:
+                    assigned[node.value.value.id].update(self._keys(element))
+
+        issues = []
+        for node in ast.walk(tree):
+            if not (
+                isinstance(node, ast.Subscript)
+                and isinstance(node.ctx, ast.Load)
+                and isinstance(node.value, ast.Name)
+                and node.value.id in frames
+                and node.value.id not in skipped
+            ):
+                continue
+
+            name = node.value.id
+            columns = frames[name] | assigned[name]
+            for key in self._keys(node.slice):
+                if key not in columns:
+                    issues.append(
+                        ValidationIssue(
+                            "KeyError",
+                            f"column '{key}' does not exist in DataFrame '{name}'."
+                            + _suggestion(key, frames[name]),
+                            node.lineno,
+                        )
+                    )
+        return sorted(issues, key=lambda issue: issue.line)
+
+    @staticmethod
+    def _keys(node: ast.AST) -> List[str]:
+        """
+        Return the string column keys of a subscript slice.
+
+        Args:
+            node: Subscript slice.
+
+        Returns:
+            List[str]: The key of `df["a"]` or the keys of `df[["a", "b"]]`,
+            empty for any other kind of slice.
+        """
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return [node.value]
+        if isinstance(node, ast.List) and all(
+            isinstance(element, ast.Constant) and isinstance(element.value, str)
+            for element in node.elts
+        ):
+            return [element.value for element in node.elts]
+        return []
+
+
+# Default code validator using the process-wide module registry
+code_validator = CodeValidator(module_registry=module_registry)
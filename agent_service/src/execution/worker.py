@@ -0,0 +1,148 @@
+"""
+Execution worker module.
+
+This module is the entry point of the worker processes started by the
+`PoolExecutionBackend`. Each worker owns a process-local `KernelManager`,
+so the sessions routed to it keep warm kernels between executions, and
+enforces a CPU time limit on every execution it runs. A control thread
+receives cancellations from the parent while an execution is running.
+
+Functions:
+    run_worker: Serve execution requests until a shutdown message arrives.
+"""
+
+import math
+import pickle
+import signal
+import functools
+import resource
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from execution.base import ExecutionLimitExceeded, ExecutionResult, OutputChunk
+from execution.kernel import kernel_manager
+
+
+def _raise_cpu_time_exceeded(seconds: int, signum: int, frame: Any) -> None:
+    """
+    Signal handler raising `ExecutionLimitExceeded` on `SIGXCPU`.
+
+    Args:
+        seconds: CPU time limit reported in the error message.
+    """
+    raise ExecutionLimitExceeded(
+        f"Execution exceeded the CPU time limit of {seconds} seconds"
+    )
+
+
+@contextmanager
+def _cpu_time_limit(seconds: int) -> Iterator[None]:
+    """
+    Limit the CPU time available to the enclosed block.
+
+    The soft `RLIMIT_CPU` limit is moved to the CPU time already consumed by
+    the process plus `seconds`, and restored on exit. Crossing it delivers
+    `SIGXCPU`, which is turned into `ExecutionLimitExceeded`.
+
+    Args:
+        seconds: CPU seconds the block may consume.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = math.ceil(usage.ru_utime + usage.ru_stime) + seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+
+def _serve_controls(controls: Any) -> None:
+    """
+    Apply cancellations sent by the parent until a shutdown message arrives.
+
+    Args:
+        controls: Queue delivering `(session_id, reason)` cancellations.
+    """
+    while True:
+        message = controls.get()
+        if message is None:
+            break
+        kernel_manager.cancel(*message)
+
+
+def _forward_output(results: Any, request_id: int, chunk: OutputChunk) -> None:
+    """
+    Send output of a running execution back to the parent.
+
+    Args:
+        results: Queue shared by all workers for sending results back.
+        request_id: Identifier of the running request.
+        chunk: Output written by the code.
+    """
+    results.put((request_id, chunk))
+
+
+def run_worker(
+    requests: Any, controls: Any, results: Any, cpu_time_limit: int
+) -> None:
+    """
+    Serve execution requests until a shutdown message arrives.
+
+    Messages are `(request_id, payload)` tuples carrying a pickled
+    `ExecutionRequest`; `None` stops the worker. The start of every execution
+    is reported as `(request_id, None)`, output of requests asking for it as
+    `(request_id, OutputChunk)` while they run, and results are sent back as
+    `(request_id, ExecutionResult)` with variables carried only as pickled
+    payloads, restricted to the payloads produced anew for delta requests.
+
+    Args:
+        requests: Queue delivering requests routed to this worker.
+        controls: Queue delivering cancellations routed to this worker.
+        results: Queue shared by all workers for sending results back.
+        cpu_time_limit: CPU seconds a single execution may consume.
+    """
+    # Leave interrupt handling to the parent process
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(
+        signal.SIGXCPU, functools.partial(_raise_cpu_time_exceeded, cpu_time_limit)
+    )
+
+    control_thread = threading.Thread(
+        target=_serve_controls, args=(controls,), name="execution-controls", daemon=True
+    )
+    control_thread.start()
+
+    while True:
+        message = requests.get()
+        if message is None:
+            controls.put(None)
+            control_thread.join()
+            break
+
+        request_id, payload = message
+        request = pickle.loads(payload)
+        results.put((request_id, None))
+        output = (
+            functools.partial(_forward_output, results, request_id)
+            if request.stream_output
+            else None
+        )
+        try:
+            with _cpu_time_limit(cpu_time_limit):
+                result = kernel_manager.execute(request, output)
+        except (Exception, ExecutionLimitExceeded) as e:
+            # Failed outside user code, e.g. the limit was hit or a result
+            # failed to build while snapshotting; the warm kernels keep serving
+            result = ExecutionResult(error=f"{e}")
+
+        # Variables travel as pickled payloads only
+        result.variables = {}
+        if request.delta:
+            result.snapshot = {name: result.snapshot[name] for name in result.changed}
+
+        results.put((request_id, result))
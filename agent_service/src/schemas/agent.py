@@ -5,6 +5,7 @@ information for processing a user's question, session, and associated dataset.
 
 Classes:
     AgentRequest: Pydantic model encapsulating user query details and metadata.
+    AgentResumeRequest: Pydantic model identifying an interrupted turn to resume.
 """
 
 from uuid import UUID
@@ -23,6 +24,8 @@ class AgentRequest(BaseModel):
         file_name: Name of the file associated with the request (if any).
         storage_uri: URI or path to the storage location of relevant data or files.
         dataset_summary: A textual summary of the dataset context for the agent.
+        profile: Whether to stream the resource usage profile of every code
+            execution as "profile" events.
     """
 
     question: str
@@ -31,3 +34,22 @@ class AgentRequest(BaseModel):
     file_name: str
     storage_uri: str
     dataset_summary: str
+    profile: bool = False
+
+
+class AgentResumeRequest(BaseModel):
+    """
+    Data model representing a request to resume an interrupted agent turn.
+
+    Attributes:
+        turn_id: Identifier of the turn, announced by the "turn" event of its stream.
+        user_id: Unique identifier of the user who started the turn.
+        session_id: Unique identifier of the session the turn belongs to.
+        profile: Whether to stream the resource usage profile of every code
+            execution as "profile" events.
+    """
+
+    turn_id: UUID
+    user_id: int
+    session_id: UUID
+    profile: bool = False
@@ -5,6 +5,18 @@ This module defines the `AgentService` class and a preconfigured instance
 Key Responsibilities:
     - Provide an asynchronous interface for invoking the agent orchestration graph.
     - Stream agent outputs (text or image) to clients in Server-Sent Events (SSE) format.
+    - Cancel running code executions when the client disconnects.
+    - Stream stdout, stderr, and progress output of code while it executes.
+    - Optionally stream the resource usage profile of every code execution.
+    - Stream the answers of subtasks running in parallel in subtask order.
+    - Checkpoint every turn, if enabled, and resume interrupted turns after
+      their last completed node.
+    - Trace the nodes and model calls of every turn, if enabled.
+    - Stream action plans drafted while the task was still being decomposed.
+    - Report prompt and response cache usage and response replay counters of the
+      agent nodes.
+    - Build the orchestration graph on first use, or ahead of it with a
+      startup warm-up, so importing the service builds no graph.
     - Integrate context such as user ID, session, dataset summaries, and storage URI
       into the agent execution workflow.
 
@@ -12,19 +24,36 @@ Classes:
     AgentService: Service layer exposing methods to invoke the agent orchestration
                   graph and stream results in real time.
     agent_service: Preconfigured global instance of `AgentService` using the
-                   default `agents_orchestrator`.
+                   default orchestrator of `AgentsOrchestratorRegistry`.
 """
 
 import json
-from typing import Any
-from uuid import UUID
+import time
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import UUID, uuid4
 
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 from sqlalchemy.orm import Session
 
 
-from agents.graphs.orchestrator import agents_orchestrator
+from core.config import settings
+from agents.models.caching import prompt_cache_stats
+from agents.models.budgeting import prompt_budget_stats
+from agents.models.heuristic import (
+    subtask_classification_classifier,
+    task_routing_classifier,
+)
+from agents.models.replay import replay_store
+from agents.models.tiering import model_tier_stats
+from agents.nodes.task.scheduling import SubtaskStreamBuffer
+from agents.nodes.task.speculation import speculation_store
+from agents.tracing import TurnTracer, trace_exporter
+from cache.response import response_cache_manager
+from services.execution import execution_service
+from services.summarization import summarization_service
 
 
 class AgentService(BaseModel):
@@ -35,9 +64,229 @@ class AgentService(BaseModel):
         - Wrap the `agents_orchestrator` graph for easy invocation.
         - Stream intermediate or final results back to clients via SSE.
         - Handle both textual and image outputs from the agents.
+        - Stop the session's code executions when the stream is abandoned.
+        - Build the default orchestrator on first use, or warm it up at startup.
+
+    Attributes:
+        agents_orchestrator: Compiled orchestrator graph; the default
+            orchestrator, built on first use, if not given.
     """
 
-    agents_orchestrator: Any
+    agents_orchestrator: Optional[Any] = None
+
+    _warm_up_time: Optional[float] = PrivateAttr(default=None)
+    _warm_up_thread: Optional[threading.Thread] = PrivateAttr(default=None)
+
+    def orchestrator(self) -> Any:
+        """
+        Return the orchestrator graph, building the default one on first use.
+
+        Returns:
+            Any: The compiled orchestrator graph.
+        """
+        if self.agents_orchestrator is None:
+            # Imported here so that importing the service loads no graph module
+            from agents.graphs.orchestrator import AgentsOrchestratorRegistry
+
+            self.agents_orchestrator = AgentsOrchestratorRegistry.DEFAULT
+        return self.agents_orchestrator
+
+    def warm_up(self) -> None:
+        """
+        Build the default orchestrator and compile the agent graphs it routes
+        to, so the first request does not pay for them.
+        """
+        from agents.graphs.orchestrator import warm_up_orchestrator
+
+        start = time.perf_counter()
+        self.agents_orchestrator = warm_up_orchestrator()
+        self._warm_up_time = time.perf_counter() - start
+
+    def start(self) -> None:
+        """
+        Warm up the graphs as configured by `AGENT_WARMUP`: not at all, in a
+        background thread while the service already accepts requests, or
+        before the service starts.
+        """
+        if self.agents_orchestrator is not None:
+            return
+
+        if settings.agent.AGENT_WARMUP == "blocking":
+            self.warm_up()
+        elif settings.agent.AGENT_WARMUP == "background":
+            self._warm_up_thread = threading.Thread(
+                target=self.warm_up, name="agent-warm-up", daemon=True
+            )
+            self._warm_up_thread.start()
+
+    @staticmethod
+    def _events(chunk: Dict[str, Any], profile: bool) -> List[str]:
+        """
+        Convert a graph event into the SSE messages streamed to the client.
+
+        Args:
+            chunk: Event of the orchestration graph.
+            profile: Whether to stream execution profile events.
+
+        Returns:
+            List[str]: SSE-formatted JSON strings, if the event carries any.
+        """
+        events: List[str] = []
+
+        # Handle image outputs when the chain ends and output exists
+        if (
+            chunk["metadata"].get("image", False)
+            and chunk["event"] == "on_chain_end"
+            and chunk["data"].get("output", False)
+        ):
+            data = chunk["data"]["output"].content
+            events.append(f"data: {json.dumps({'type': 'image', 'data': data})}\n\n")
+
+        # Handle output written by executing code
+        if (
+            chunk["metadata"].get("output", False)
+            and chunk["event"] == "on_chain_end"
+            and chunk["data"].get("output", False)
+        ):
+            data = chunk["data"]["output"]
+            if data["stream"] == "progress":
+                event = {"type": "progress", "data": {"text": data["text"]}}
+            else:
+                event = {"type": "output", "data": data}
+            events.append(f"data: {json.dumps(event)}\n\n")
+
+        # Handle execution profiles when the client asked for them
+        if (
+            profile
+            and chunk["metadata"].get("profile", False)
+            and chunk["event"] == "on_chain_end"
+            and chunk["data"].get("output", False)
+        ):
+            data = chunk["data"]["output"]
+            events.append(f"data: {json.dumps({'type': 'profile', 'data': data})}\n\n")
+
+        # Handle text produced ahead of time, such as a drafted action plan
+        if (
+            chunk["metadata"].get("text", False)
+            and chunk["event"] == "on_chain_end"
+            and chunk["data"].get("output", False)
+        ):
+            data = chunk["data"]["output"]
+            events.append(f"data: {json.dumps({'type': 'text', 'data': data})}\n\n")
+
+        # Handle text streaming from the chat model
+        if chunk["event"] == "on_chat_model_stream":
+            stream = chunk["metadata"].get("stream", True)
+            if stream:
+                data = chunk["data"]["chunk"].content
+                events.append(f"data: {json.dumps({'type': 'text', 'data': data})}\n\n")
+
+        return events
+
+    @staticmethod
+    def _turn_config(turn_id: UUID, db: Session) -> Dict[str, Any]:
+        """
+        Build the config running a turn under its checkpoints.
+
+        Args:
+            turn_id: Identifier of the turn.
+            db: Active SQLAlchemy session, bound to the state loaded from a checkpoint.
+
+        Returns:
+            Dict[str, Any]: Run config of the orchestrator.
+        """
+        return {
+            "recursion_limit": 100,
+            "configurable": {"thread_id": str(turn_id), "db": db},
+        }
+
+    @staticmethod
+    def _turn_event(turn_id: UUID, resumed: bool, completed: bool = False) -> str:
+        """
+        Build the SSE message announcing the turn id a stream can be resumed by.
+
+        Args:
+            turn_id: Identifier of the turn.
+            resumed: Whether the turn resumes from a checkpoint.
+            completed: Whether the turn already completed.
+
+        Returns:
+            str: SSE-formatted JSON string.
+        """
+        data = {"turn_id": str(turn_id), "resumed": resumed, "completed": completed}
+        return f"data: {json.dumps({'type': 'turn', 'data': data})}\n\n"
+
+    async def _stream(
+        self,
+        orchestrator: Any,
+        inputs: Optional[Dict[str, Any]],
+        config: Dict[str, Any],
+        session_id: UUID,
+        profile: bool,
+    ) -> AsyncIterator[str]:
+        """
+        Stream the events of an orchestrator run as SSE messages.
+
+        When tracing is enabled, the run is traced and its trace exported
+        once it completes, fails, or is abandoned.
+
+        Args:
+            orchestrator: Compiled orchestrator graph.
+            inputs: Input state of a new turn, or None to resume a turn from
+                its checkpoint.
+            config: Run config of the orchestrator.
+            session_id: Session whose code executions stop when the stream
+                is abandoned.
+            profile: Whether to stream execution profile events.
+
+        Yields:
+            str: SSE-formatted JSON strings.
+        """
+        # Trace every node and model call of the run
+        tracer = None
+        if settings.tracing.TRACING_ENABLED:
+            tracer = TurnTracer(
+                session_id,
+                turn_id=config.get("configurable", {}).get("thread_id"),
+                resumed=inputs is None,
+            )
+            config = {**config, "callbacks": [tracer]}
+
+        # Answers of subtasks running in parallel are released in subtask order
+        order = SubtaskStreamBuffer()
+        status = "ok"
+        try:
+            async for chunk in orchestrator.astream_events(inputs, config=config):
+                index = chunk["metadata"].get("subtask_index")
+                for event in order.push(index, self._events(chunk, profile)):
+                    yield event
+
+                # Release the answers held back until a subtask completed
+                completed = chunk["metadata"].get("subtask_completed")
+                if completed is not None and chunk["event"] == "on_chain_end":
+                    for event in order.complete(completed):
+                        yield event
+
+            for event in order.flush():
+                yield event
+
+        except (asyncio.CancelledError, GeneratorExit):
+            # The client disconnected; stop code still running for the session
+            status = "cancelled"
+            execution_service.cancel(
+                session_id,
+                "ExecutionCancelled: Execution was cancelled because the client "
+                "disconnected",
+            )
+            raise
+
+        except Exception:
+            status = "error"
+            raise
+
+        finally:
+            if tracer is not None:
+                trace_exporter.export(tracer.finish(status))
 
     async def stream(
         self,
@@ -48,6 +297,7 @@ class AgentService(BaseModel):
         session_id: UUID,
         storage_uri: str,
         dataset_summary: str,
+        profile: bool = False,
     ):
         """
         Asynchronously stream agent responses as SSE-compatible JSON messages.
@@ -56,6 +306,10 @@ class AgentService(BaseModel):
         results as they are produced. Supports two output types:
             - "text": chunks of text from the chat model.
             - "image": image content generated by visualization agents.
+            - "output": stdout or stderr lines written by executing code.
+            - "progress": latest state of a progress bar drawn by executing code.
+            - "profile": resource usage of a code execution, if requested.
+            - "turn": id of the turn, first, when turns are checkpointed.
 
         Args:
             question: User query or instruction.
@@ -65,40 +319,134 @@ class AgentService(BaseModel):
             session_id: Unique identifier for the interaction session.
             storage_uri: URI to external storage (S3, GCS, etc.).
             dataset_summary: Pre-computed summary of dataset for agent reasoning.
+            profile: Whether to stream execution profile events.
 
         Yields:
             str: SSE-formatted JSON strings:
+                {"type": "turn", "data": {"turn_id": "...", "resumed": false, ...}}
                 {"type": "text", "data": "<text chunk>"}
                 {"type": "image", "data": "<image content>"}
+                {"type": "output", "data": {"stream": "stdout", "text": "..."}}
+                {"type": "progress", "data": {"text": "..."}}
+                {"type": "profile", "data": {"wall_time": ..., "cpu_time": ...}}
         """
-        async for chunk in self.agents_orchestrator.astream_events(
-            {
-                "question": question,
-                "db": db,
-                "user_id": user_id,
-                "file_name": file_name,
-                "session_id": session_id,
-                "storage_uri": storage_uri,
-                "dataset_summary": dataset_summary,
-            },
-            config={"recursion_limit": 100},
+        # Build the orchestrator off the event loop if nothing built it yet
+        orchestrator = self.agents_orchestrator
+        if orchestrator is None:
+            orchestrator = await asyncio.to_thread(self.orchestrator)
+
+        config: Dict[str, Any] = {"recursion_limit": 100}
+
+        # Checkpoint the turn, so the client can resume it by its id
+        if settings.checkpoint.CHECKPOINT_ENABLED:
+            turn_id = uuid4()
+            config = self._turn_config(turn_id, db)
+            yield self._turn_event(turn_id, resumed=False)
+
+        inputs = {
+            "question": question,
+            "db": db,
+            "user_id": user_id,
+            "file_name": file_name,
+            "session_id": session_id,
+            "storage_uri": storage_uri,
+            "dataset_summary": dataset_summary,
+        }
+        async for event in self._stream(
+            orchestrator, inputs, config, session_id, profile
         ):
-            # Handle image outputs when the chain ends and output exists
-            if (
-                chunk["metadata"].get("image", False)
-                and chunk["event"] == "on_chain_end"
-                and chunk["data"].get("output", False)
-            ):
-                data = chunk["data"]["output"].content
-                yield f"data: {json.dumps({'type': 'image', 'data': data})}\n\n"
-
-            # Handle text streaming from the chat model
-            if chunk["event"] == "on_chat_model_stream":
-                stream = chunk["metadata"].get("stream", True)
-                if stream:
-                    data = chunk["data"]["chunk"].content
-                    yield f"data: {json.dumps({'type': 'text', 'data': data})}\n\n"
+            yield event
+
+    async def resume(
+        self,
+        turn_id: UUID,
+        db: Session,
+        user_id: int,
+        session_id: UUID,
+        profile: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        Resume an interrupted turn after the last node it completed.
+
+        The nodes that completed before the interruption are not run again;
+        only the events of the remaining nodes are streamed.
+
+        Args:
+            turn_id: Identifier of the turn, from its "turn" event.
+            db: Active SQLAlchemy session.
+            user_id: Unique identifier for the user the turn belongs to.
+            session_id: Session the turn belongs to.
+            profile: Whether to stream execution profile events.
+
+        Raises:
+            LookupError: If checkpointing is disabled, or no checkpoint of the
+                turn exists for this user and session.
+
+        Returns:
+            AsyncIterator[str]: SSE-formatted JSON strings, as for `stream`,
+            starting with the "turn" event.
+        """
+        if not settings.checkpoint.CHECKPOINT_ENABLED:
+            raise LookupError("Turn checkpoints are disabled")
+
+        orchestrator = self.agents_orchestrator
+        if orchestrator is None:
+            orchestrator = await asyncio.to_thread(self.orchestrator)
+
+        # Only the user and session that started the turn may resume it
+        config = self._turn_config(turn_id, db)
+        snapshot = await orchestrator.aget_state(config)
+        if (
+            not snapshot.values
+            or snapshot.values.get("user_id") != user_id
+            or snapshot.values.get("session_id") != session_id
+        ):
+            raise LookupError(f"Unknown turn: {turn_id}")
+
+        async def events() -> AsyncIterator[str]:
+            yield self._turn_event(turn_id, resumed=True, completed=not snapshot.next)
+            if snapshot.next:
+                async for event in self._stream(
+                    orchestrator, None, config, session_id, profile
+                ):
+                    yield event
+
+        return events()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return model usage metrics of the agent nodes.
+
+        Returns:
+            Dict[str, Any]: Prompt cache hits, misses, and cached token
+            counts, overall and per node, estimated tokens every prompt
+            input contributed and prompt budgets saved, routing decisions
+            taken by the local heuristics, response cache occupancy and hit
+            counters, background summarization counters, response
+            recording and replay counters, the calls every model tier
+            served, per node, whether the graphs are built and how long
+            the startup warm-up took, trace export counters, and the
+            speculative calls started while tasks were decomposed.
+        """
+        return {
+            "prompt_cache": prompt_cache_stats.metrics(),
+            "prompt_budget": prompt_budget_stats.metrics(),
+            "heuristic_routing": {
+                "task_routing": task_routing_classifier.metrics(),
+                "subtask_classification": subtask_classification_classifier.metrics(),
+            },
+            "response_cache": response_cache_manager.metrics(),
+            "summarization": summarization_service.metrics(),
+            "replay": replay_store.metrics(),
+            "model_tiers": model_tier_stats.metrics(),
+            "startup": {
+                "orchestrator_built": self.agents_orchestrator is not None,
+                "warm_up_time": self._warm_up_time,
+            },
+            "tracing": trace_exporter.metrics(),
+            "speculation": speculation_store.metrics(),
+        }
 
 
 # Global preconfigured service instance
-agent_service = AgentService(agents_orchestrator=agents_orchestrator)
+agent_service = AgentService()
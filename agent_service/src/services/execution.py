@@ -0,0 +1,293 @@
+"""
+Service layer for generated code execution.
+
+This module defines the `ExecutionService` class, which exposes code
+execution to the agent nodes and the API independently of where the code
+actually runs: in-process, or in a pool of worker processes. It also holds
+the execution budgets of the agent modes, cancels the executions of
+sessions whose client went away, and aggregates execution profiles.
+
+Classes:
+    ExecutionService: Provides service-level code execution operations.
+
+Instances:
+    execution_service: Default instance of `ExecutionService` backed by a
+        worker pool when `EXECUTION_POOL_SIZE` is positive, or by in-process
+        kernels otherwise.
+"""
+
+import queue
+import asyncio
+import threading
+from uuid import UUID
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Union
+
+from core.config import settings
+from execution.base import (
+    BaseExecutionBackend,
+    ExecutionBudget,
+    ExecutionRequest,
+    ExecutionResult,
+    OutputChunk,
+)
+from execution.kernel import kernel_manager
+from execution.local import LocalExecutionBackend
+from execution.pool import PoolExecutionBackend
+from execution.profiling import ProfileAggregator
+
+
+@dataclass
+class ExecutionService:
+    """
+    Service layer for executing generated code.
+
+    Attributes:
+        backend (BaseExecutionBackend): Backend the executions are delegated to.
+        budgets (Dict[str, ExecutionBudget]): Execution budgets by agent mode.
+        profiles (ProfileAggregator): Aggregated execution profiles.
+        _cache_hits (int): Executions replayed from the execution cache.
+        _cache_misses (int): Cacheable executions that had to run.
+
+    Methods:
+        start: Start the execution backend.
+        shutdown: Stop the execution backend.
+        execute: Execute a request, blocking the calling thread.
+        aexecute: Execute a request without blocking the event loop.
+        stream: Execute a request, yielding its output while it runs.
+        astream: Async variant of `stream`, not blocking the event loop.
+        budget: Return the execution budget of an agent mode.
+        cancel: Stop the executions running for a session.
+        metrics: Return runtime metrics of the execution backend.
+    """
+
+    backend: BaseExecutionBackend
+    budgets: Dict[str, ExecutionBudget] = field(default_factory=dict)
+    profiles: ProfileAggregator = field(default_factory=ProfileAggregator)
+    _cache_hits: int = field(default=0, init=False)
+    _cache_misses: int = field(default=0, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def start(self) -> None:
+        """
+        Start the execution backend.
+        """
+        self.backend.start()
+
+    def shutdown(self) -> None:
+        """
+        Stop the execution backend.
+        """
+        self.backend.shutdown()
+
+    def execute(
+        self,
+        request: ExecutionRequest,
+        output: Optional[Callable[[OutputChunk], None]] = None,
+    ) -> ExecutionResult:
+        """
+        Execute a request, blocking the calling thread until it completes.
+
+        Args:
+            request: The execution request.
+            output: Callable receiving the output of the code while it runs,
+                called from a backend thread.
+
+        Returns:
+            ExecutionResult: Outcome of the execution.
+        """
+        return self._record(request, self.backend.execute(request, output))
+
+    async def aexecute(
+        self,
+        request: ExecutionRequest,
+        output: Optional[Callable[[OutputChunk], None]] = None,
+    ) -> ExecutionResult:
+        """
+        Execute a request without blocking the event loop.
+
+        Args:
+            request: The execution request.
+            output: Callable receiving the output of the code while it runs,
+                called from a backend thread.
+
+        Returns:
+            ExecutionResult: Outcome of the execution.
+        """
+        return self._record(request, await self.backend.aexecute(request, output))
+
+    def stream(
+        self, request: ExecutionRequest
+    ) -> Iterator[Union[OutputChunk, ExecutionResult]]:
+        """
+        Execute a request, yielding its output in the calling thread while it runs.
+
+        Args:
+            request: The execution request.
+
+        Yields:
+            Union[OutputChunk, ExecutionResult]: Output chunks in the order they
+            were written, followed by the outcome of the execution.
+        """
+        messages: "queue.Queue[Any]" = queue.Queue()
+
+        def run() -> None:
+            try:
+                messages.put(self.execute(request, messages.put))
+            except BaseException as e:
+                messages.put(e)
+
+        threading.Thread(target=run, name="execution-stream", daemon=True).start()
+        while True:
+            message = messages.get()
+            if isinstance(message, BaseException):
+                raise message
+            yield message
+            if isinstance(message, ExecutionResult):
+                return
+
+    async def astream(
+        self, request: ExecutionRequest
+    ) -> AsyncIterator[Union[OutputChunk, ExecutionResult]]:
+        """
+        Execute a request without blocking the event loop, yielding its output
+        while it runs.
+
+        Args:
+            request: The execution request.
+
+        Yields:
+            Union[OutputChunk, ExecutionResult]: Output chunks in the order they
+            were written, followed by the outcome of the execution.
+        """
+        loop = asyncio.get_running_loop()
+        messages: "asyncio.Queue[OutputChunk]" = asyncio.Queue()
+
+        # Output arrives on a backend thread; hand it over to the event loop
+        execution = asyncio.ensure_future(
+            self.aexecute(
+                request,
+                lambda chunk: loop.call_soon_threadsafe(messages.put_nowait, chunk),
+            )
+        )
+        try:
+            while True:
+                message = asyncio.ensure_future(messages.get())
+                await asyncio.wait(
+                    {message, execution}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not message.done():
+                    message.cancel()
+                    break
+                yield message.result()
+
+            # Output handed over before the execution completed comes first
+            while not messages.empty():
+                yield messages.get_nowait()
+            yield execution.result()
+        finally:
+            execution.cancel()
+
+    def budget(self, agent_mode: Optional[str]) -> ExecutionBudget:
+        """
+        Return the execution budget of an agent mode.
+
+        Args:
+            agent_mode: Agent mode ("TECHNICAL" or "QUICK"), if known.
+
+        Returns:
+            ExecutionBudget: Budget of the mode, the TECHNICAL budget if the
+            mode is unknown, or no budget at all if none is configured.
+        """
+        return self.budgets.get(
+            agent_mode or "TECHNICAL", self.budgets.get("TECHNICAL", ExecutionBudget())
+        )
+
+    def cancel(self, session_id: UUID, reason: str) -> None:
+        """
+        Stop the executions running for a session.
+
+        Args:
+            session_id: Unique identifier of the session.
+            reason: Error message reported for the stopped executions.
+        """
+        self.backend.cancel(session_id, reason)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return runtime metrics of the execution backend, cache, and profiles.
+
+        Returns:
+            Dict[str, Any]: Metrics snapshot.
+        """
+        with self._lock:
+            lookups = self._cache_hits + self._cache_misses
+            cache = {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "hit_rate": self._cache_hits / lookups if lookups else 0.0,
+            }
+        return {
+            **self.backend.metrics(),
+            "execution_cache": cache,
+            "profiles": self.profiles.metrics(),
+        }
+
+    def _record(
+        self, request: ExecutionRequest, result: ExecutionResult
+    ) -> ExecutionResult:
+        """
+        Count execution cache hits and misses and aggregate the profile
+        reported by the backend.
+
+        Args:
+            request: The execution request.
+            result: Outcome of the execution.
+
+        Returns:
+            ExecutionResult: The same result.
+        """
+        if result.profile is not None:
+            self.profiles.record(result.profile, request.session_id, request.label)
+
+        if result.cached is not None:
+            with self._lock:
+                if result.cached:
+                    self._cache_hits += 1
+                else:
+                    self._cache_misses += 1
+        return result
+
+
+# Default instance of the ExecutionService for application usage
+execution_service = ExecutionService(
+    backend=(
+        PoolExecutionBackend(
+            size=settings.execution.EXECUTION_POOL_SIZE,
+            preload=settings.execution.EXECUTION_PRELOAD_MODULES,
+            cpu_time_limit=settings.execution.EXECUTION_CPU_TIME_LIMIT,
+            max_rss_bytes=settings.execution.EXECUTION_WORKER_MAX_RSS_MB * 1024 * 1024,
+            termination_grace=settings.execution.EXECUTION_TERMINATION_GRACE_SECONDS,
+        )
+        if settings.execution.EXECUTION_POOL_SIZE > 0
+        else LocalExecutionBackend(
+            kernel_manager, preload=settings.execution.EXECUTION_PRELOAD_MODULES
+        )
+    ),
+    budgets={
+        "TECHNICAL": ExecutionBudget(
+            time_limit=settings.execution.EXECUTION_TIME_LIMIT_TECHNICAL or None,
+            memory_limit=(
+                settings.execution.EXECUTION_MEMORY_LIMIT_MB_TECHNICAL * 1024 * 1024
+                or None
+            ),
+        ),
+        "QUICK": ExecutionBudget(
+            time_limit=settings.execution.EXECUTION_TIME_LIMIT_QUICK or None,
+            memory_limit=(
+                settings.execution.EXECUTION_MEMORY_LIMIT_MB_QUICK * 1024 * 1024
+                or None
+            ),
+        ),
+    },
+)
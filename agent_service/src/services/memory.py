@@ -15,10 +15,11 @@ Instances:
         the global `memory_cache_manager` and `LocalLoader`.
 """
 
-from typing import Optional, Type
+from typing import List, Optional, Type
 from uuid import UUID
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import pickle
+import threading
 
 from sqlalchemy.orm import Session
 
@@ -26,6 +27,7 @@ from loaders.base import BaseLoader
 from loaders.local import LocalLoader
 from repositories.memory import MemoryRepository
 from cache.memory import MemoryCacheManager, memory_cache_manager
+from execution.snapshot import dump_variables
 from schemas.memory import Memory
 
 
@@ -44,6 +46,8 @@ class MemoryService:
             to speed up memory retrieval and updates.
         loader (Type[BaseLoader]): Loader class used to fetch base data
             from local or remote storage.
+        _locks (List[threading.Lock]): Locks serializing the cache updates
+            of a memory, striped by session and file.
 
     Methods:
         get_memory: Retrieve memory from cache, DB, or create if missing.
@@ -56,6 +60,9 @@ class MemoryService:
 
     _memory_cache_manager: MemoryCacheManager
     loader: Type[BaseLoader]
+    _locks: List[threading.Lock] = field(
+        default_factory=lambda: [threading.Lock() for _ in range(64)]
+    )
 
     def get_memory(
         self,
@@ -183,7 +190,7 @@ class MemoryService:
             code_summary=pickle.dumps(""),
             user_preferences_summary=pickle.dumps(""),
             pending_context=pickle.dumps(""),
-            variables=pickle.dumps({"df": df}),
+            variables=dump_variables({"df": df}),
             conversation=pickle.dumps([]),
         )
 
@@ -227,46 +234,49 @@ class MemoryService:
             analysis_summary: New analysis summary.
             visualization_summary: New visualization summary.
             code_summary: New code summary.
-            user_preference_summary: New user preference summary.
+            user_preferences_summary: New user preferences summary.
+            pending_context: New pending context.
             variables: Updated variable snapshot.
             conversation: Updated conversation history.
         """
 
-        # Get current memory (create if missing)
-        memory_history = self.get_memory(
-            db=db,
-            user_id=user_id,
-            session_id=session_id,
-            file_name=file_name,
-            storage_uri=storage_uri,
-        )
+        # Updates may come from the turn and from background summaries at once
+        with self._locks[hash((session_id, file_name)) % len(self._locks)]:
+            # Get current memory (create if missing)
+            memory_history = self.get_memory(
+                db=db,
+                user_id=user_id,
+                session_id=session_id,
+                file_name=file_name,
+                storage_uri=storage_uri,
+            )
 
-        # Update memory fields if provided
-        if analysis_summary is not None:
-            memory_history.analysis_summary = analysis_summary
+            # Update memory fields if provided
+            if analysis_summary is not None:
+                memory_history.analysis_summary = analysis_summary
 
-        if visualization_summary is not None:
-            memory_history.visualization_summary = visualization_summary
+            if visualization_summary is not None:
+                memory_history.visualization_summary = visualization_summary
 
-        if code_summary is not None:
-            memory_history.code_summary = code_summary
+            if code_summary is not None:
+                memory_history.code_summary = code_summary
 
-        if user_preferences_summary is not None:
-            memory_history.user_preferences_summary = user_preferences_summary
+            if user_preferences_summary is not None:
+                memory_history.user_preferences_summary = user_preferences_summary
 
-        if pending_context is not None:
-            memory_history.pending_context = pending_context
+            if pending_context is not None:
+                memory_history.pending_context = pending_context
 
-        if variables is not None:
-            memory_history.variables = variables
+            if variables is not None:
+                memory_history.variables = variables
 
-        if conversation is not None:
-            memory_history.conversation = conversation
+            if conversation is not None:
+                memory_history.conversation = conversation
 
-        # Refresh cache with updated memory
-        self._memory_cache_manager.cache_memory(
-            session_id=session_id, file_name=file_name, memory_schema=memory_history
-        )
+            # Refresh cache with updated memory
+            self._memory_cache_manager.cache_memory(
+                session_id=session_id, file_name=file_name, memory_schema=memory_history
+            )
 
     def save_memory(
         self, db: Session, user_id: int, session_id: UUID, file_name: str
@@ -0,0 +1,419 @@
+"""
+Service layer for background summarization.
+
+This module defines the `SummarizationService` class, which moves the
+summaries of the agent memory (analysis, visualization, code, user
+preferences, and pending context) off the critical path of a turn. Nodes
+submit a summary instead of computing it: the summary is computed in a
+background thread, written back through `memory_service`, and the turn goes
+on, so the answer streams and the turn completes without waiting for it.
+
+Each summary extends the previous summary of the same field, so the jobs of
+a field are chained: a job starts from the result of the job submitted
+before it for the same session and file. A node that actually reads a
+summary resolves it first, which only blocks while a job of that field is
+still running; the next turn does the same when it loads the summary from
+memory. Async nodes resolve summaries with `aresolve`, which waits without
+blocking the event loop, and run the steps submitting summaries through
+`acall`, which moves summaries computed in the foreground off the event loop.
+
+Classes:
+    SummarizationService: Runs and tracks background summarization jobs.
+
+Instances:
+    summarization_service: Default instance of `SummarizationService`
+        configured from application settings.
+"""
+
+import time
+import pickle
+import asyncio
+import threading
+from uuid import UUID, uuid4
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from core.config import settings
+from core.db import db_manager
+from agents.state import AgentState
+from services.memory import memory_service
+from agents.tracing import TurnTracer, detach, traced
+
+
+# Result of a step submitting summaries
+T = TypeVar("T")
+
+
+@dataclass
+class SummarizationService:
+    """
+    Service layer for computing memory summaries in the background.
+
+    Attributes:
+        workers (int): Number of threads computing summaries.
+        background (bool): Whether summaries are computed in the background.
+            When False, or before `start`, they are computed in the calling
+            thread as part of the node.
+        retention (float): Seconds the result of a finished job is kept after
+            it was written back to memory.
+        _executor (Optional[ThreadPoolExecutor]): Threads computing summaries.
+        _jobs (Dict[str, Future]): Jobs by identifier.
+        _latest (Dict[Tuple[UUID, str, str], str]): Identifier of the last
+            job submitted for a session, file, and summary field.
+        _finished (Dict[str, float]): Completion time of finished jobs.
+
+    Methods:
+        start: Start the summarization threads.
+        shutdown: Wait for the pending summaries and stop the threads.
+        submit: Compute a summary in the background.
+        acall: Run a step submitting summaries from an async node.
+        resolve: Wait for the latest summary of a field and attach it to a state.
+        aresolve: Async variant of `resolve`, not blocking the event loop.
+        wait: Wait for the pending summaries of a session and file.
+        metrics: Return job and waiting counters.
+    """
+
+    workers: int
+    background: bool = True
+    retention: float = 3600.0
+    _executor: Optional[ThreadPoolExecutor] = field(default=None, init=False)
+    _jobs: Dict[str, Future] = field(default_factory=dict, init=False)
+    _latest: Dict[Tuple[UUID, str, str], str] = field(default_factory=dict, init=False)
+    _finished: Dict[str, float] = field(default_factory=dict, init=False)
+    _submitted: int = field(default=0, init=False)
+    _failed: int = field(default=0, init=False)
+    _waits: int = field(default=0, init=False)
+    _wait_seconds: float = field(default=0.0, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def start(self) -> None:
+        """
+        Start the summarization threads, if summaries run in the background.
+        """
+        if self.background and self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="summarization"
+            )
+
+    def shutdown(self) -> None:
+        """
+        Wait for the pending summaries to be written back and stop the threads.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def submit(
+        self,
+        state: AgentState,
+        summary_field: str,
+        summarize: Callable[[Optional[str]], str],
+        summary: Optional[str],
+    ) -> None:
+        """
+        Compute a summary in the background.
+
+        When summaries are not computed in the background, the summary field
+        of the state is updated in the calling thread instead. A subtask
+        running in parallel with others only records the summary in
+        `state.deferred_summaries`, so the summaries of the parallel subtasks
+        extend each other in subtask order when they are merged.
+
+        Args:
+            state: The current agent execution state.
+            summary_field: Name of the summary field of the state and memory.
+            summarize: Callable producing the new summary from the previous one.
+            summary: Previous summary, used when no job of the field is known.
+
+        Updates:
+            state.summary_jobs: Identifier of the job computing the summary.
+        """
+        # Subtasks running in parallel submit their summaries once merged
+        if state.deferred_summaries is not None:
+            state.deferred_summaries.append((summary_field, summarize))
+            return
+
+        if self._executor is None:
+            setattr(state, summary_field, summarize(summary))
+            return
+
+        key = (state.session_id, state.file_name, summary_field)
+        target = (state.user_id, state.session_id, state.file_name, state.storage_uri)
+        job_id = uuid4().hex
+
+        with self._lock:
+            self._prune()
+
+            # Chain onto the job computing the previous summary of the field
+            previous = self._jobs.get(self._latest.get(key))
+            self._jobs[job_id] = self._executor.submit(
+                self._run,
+                key,
+                job_id,
+                previous,
+                summary,
+                summarize,
+                target,
+                detach("summarization"),
+            )
+            self._latest[key] = job_id
+            self._submitted += 1
+
+        state.summary_jobs = {**state.summary_jobs, summary_field: job_id}
+
+    async def acall(self, step: Callable[..., T], *args: Any) -> T:
+        """
+        Run a step submitting summaries from an async node.
+
+        Submitting a summary to the background only queues a job, so the step
+        runs right away. A summary computed in the foreground calls the model
+        synchronously, so the step then runs in a worker thread and the event
+        loop keeps serving other streams meanwhile.
+
+        Args:
+            step: Callable submitting summaries, such as the `_apply` of a node.
+            *args: Arguments of the step.
+
+        Returns:
+            T: The result of the step.
+        """
+        if self._executor is not None:
+            return step(*args)
+        return await asyncio.to_thread(step, *args)
+
+    def resolve(self, state: AgentState, summary_field: str) -> bool:
+        """
+        Wait for the latest summary of a field and attach it to the state.
+
+        Args:
+            state: The current agent execution state.
+            summary_field: Name of the summary field of the state and memory.
+
+        Returns:
+            bool: True if the summary was attached from a job, False if the
+            caller has to load it from memory.
+        """
+        job = self._job(state, summary_field)
+        if job is None:
+            return False
+
+        try:
+            setattr(state, summary_field, self._result(job))
+        except Exception:
+            return False
+        return True
+
+    async def aresolve(self, state: AgentState, summary_field: str) -> bool:
+        """
+        Wait for the latest summary of a field without blocking the event
+        loop, and attach it to the state.
+
+        Args:
+            state: The current agent execution state.
+            summary_field: Name of the summary field of the state and memory.
+
+        Returns:
+            bool: True if the summary was attached from a job, False if the
+            caller has to load it from memory.
+        """
+        job = self._job(state, summary_field)
+        if job is None:
+            return False
+
+        try:
+            setattr(state, summary_field, await self._aresult(job))
+        except Exception:
+            return False
+        return True
+
+    def wait(self, session_id: UUID, file_name: str) -> None:
+        """
+        Wait for the pending summaries of a session and file to be written back.
+
+        Args:
+            session_id: Unique identifier of the session.
+            file_name: Associated file name.
+        """
+        with self._lock:
+            jobs = [
+                self._jobs[job_id]
+                for key, job_id in self._latest.items()
+                if key[:2] == (session_id, file_name) and job_id in self._jobs
+            ]
+
+        for job in jobs:
+            try:
+                self._result(job)
+            except Exception:
+                ...
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return job and waiting counters.
+
+        Returns:
+            Dict[str, Any]: Submitted, pending, and failed jobs, and how often
+            and how long nodes waited for a summary.
+        """
+        with self._lock:
+            return {
+                "background": self._executor is not None,
+                "submitted": self._submitted,
+                "pending": sum(not job.done() for job in self._jobs.values()),
+                "failed": self._failed,
+                "waits": self._waits,
+                "wait_seconds": self._wait_seconds,
+            }
+
+    def _run(
+        self,
+        key: Tuple[UUID, str, str],
+        job_id: str,
+        previous: Optional[Future],
+        summary: Optional[str],
+        summarize: Callable[[Optional[str]], str],
+        target: Tuple[int, UUID, str, str],
+        tracer: Optional[TurnTracer],
+    ) -> str:
+        """
+        Compute a summary and write it back to memory.
+
+        Args:
+            key: Session, file, and summary field of the job.
+            job_id: Identifier of the job.
+            previous: Job computing the previous summary of the field, if any.
+            summary: Previous summary, used when there is no previous job.
+            summarize: Callable producing the new summary from the previous one.
+            target: User, session, file, and storage URI of the memory.
+            tracer: Detached trace of the turn that submitted the job, if traced.
+
+        Returns:
+            str: The new summary, or the previous one if summarization failed.
+        """
+        try:
+            if previous is not None:
+                summary = previous.result()
+
+            try:
+                with traced(tracer):
+                    result = summarize(summary)
+            except Exception:
+                # Keep the previous summary, so later jobs still build on it
+                with self._lock:
+                    self._failed += 1
+                return summary
+
+            # A later job of the field writes back its own, newer summary
+            with self._lock:
+                latest = self._latest.get(key) == job_id
+
+            if latest:
+                user_id, session_id, file_name, storage_uri = target
+                db = db_manager.session_factory()
+                try:
+                    memory_service.update_memory_cache(
+                        db=db,
+                        user_id=user_id,
+                        session_id=session_id,
+                        file_name=file_name,
+                        storage_uri=storage_uri,
+                        **{key[2]: pickle.dumps(result)},
+                    )
+                except Exception:
+                    # The summary is still served to the nodes resolving it
+                    with self._lock:
+                        self._failed += 1
+                finally:
+                    db.close()
+            return result
+        finally:
+            with self._lock:
+                self._finished[job_id] = time.monotonic()
+
+    def _job(self, state: AgentState, summary_field: str) -> Optional[Future]:
+        """
+        Return the job computing the latest summary of a field.
+
+        Args:
+            state: The current agent execution state.
+            summary_field: Name of the summary field of the state and memory.
+
+        Returns:
+            Optional[Future]: The job started this turn, or else the last job
+            of the session and file, if still known.
+        """
+        with self._lock:
+            job_id = state.summary_jobs.get(summary_field) or self._latest.get(
+                (state.session_id, state.file_name, summary_field)
+            )
+            return self._jobs.get(job_id)
+
+    def _result(self, job: Future) -> str:
+        """
+        Return the result of a job, counting the time spent waiting for it.
+
+        Args:
+            job: The job.
+
+        Returns:
+            str: The summary computed by the job.
+        """
+        if job.done():
+            return job.result()
+
+        started = time.perf_counter()
+        try:
+            return job.result()
+        finally:
+            with self._lock:
+                self._waits += 1
+                self._wait_seconds += time.perf_counter() - started
+
+    async def _aresult(self, job: Future) -> str:
+        """
+        Await the result of a job, counting the time spent waiting for it.
+
+        Args:
+            job: The job.
+
+        Returns:
+            str: The summary computed by the job.
+        """
+        if job.done():
+            return job.result()
+
+        started = time.perf_counter()
+        try:
+            # Shielded, so a cancelled stream does not cancel a queued job
+            return await asyncio.shield(asyncio.wrap_future(job))
+        finally:
+            with self._lock:
+                self._waits += 1
+                self._wait_seconds += time.perf_counter() - started
+
+    def _prune(self) -> None:
+        """
+        Forget jobs that finished more than `retention` seconds ago.
+
+        Must be called with `_lock` held.
+        """
+        expired = time.monotonic() - self.retention
+        for job_id in [
+            job_id for job_id, finished in self._finished.items() if finished < expired
+        ]:
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+
+        for key in [
+            key for key, job_id in self._latest.items() if job_id not in self._jobs
+        ]:
+            del self._latest[key]
+
+
+# Default instance of the SummarizationService for application usage
+summarization_service = SummarizationService(
+    workers=settings.summarization.SUMMARIZATION_WORKERS,
+    background=settings.summarization.SUMMARIZATION_BACKGROUND,
+    retention=settings.summarization.SUMMARIZATION_RETENTION,
+)
@@ -0,0 +1,22 @@
+"""
+Shared test configuration.
+
+Modules read their settings at import time, so the settings without
+defaults get placeholder values; no test connects to these services.
+"""
+
+import os
+
+
+for name, value in {
+    "ANTHROPIC_API_KEY": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_USER": "test",
+    "DB_PASS": "test",
+    "DB_NAME": "test",
+    "HOST": "localhost",
+    "PORT": "6379",
+    "DB": "0",
+}.items():
+    os.environ.setdefault(name, value)
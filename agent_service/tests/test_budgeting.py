@@ -0,0 +1,113 @@
+import pytest
+
+from agents.models.budgeting import PromptBudget, estimate_tokens
+from core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def enforced(monkeypatch):
+    monkeypatch.setattr(settings.prompt_budget, "PROMPT_BUDGET_ENABLED", True)
+    monkeypatch.setattr(settings.prompt_budget, "PROMPT_BUDGET_SCALE", 1.0)
+
+
+def summary(lines, relevant=None):
+    text = [
+        f"Step {index}: filler observation number {index}" for index in range(lines)
+    ]
+    if relevant is not None:
+        text[relevant] = "Revenue grew fastest in the northern region"
+    return "\n".join(text)
+
+
+def test_keeps_inputs_within_budget():
+    inputs = {"question": "What drives revenue?", "analysis_summary": summary(3)}
+
+    trimmed, tokens = PromptBudget(fields={"analysis_summary": 1000}).apply(inputs)
+
+    assert trimmed == inputs
+    offered = estimate_tokens(inputs["analysis_summary"])
+    assert tokens["analysis_summary"] == (offered, offered)
+    assert "question" in tokens
+
+
+def test_trims_text_keeping_relevant_lines_in_order():
+    inputs = {
+        "question": "Which region has the highest revenue?",
+        "analysis_summary": summary(200, relevant=150),
+    }
+
+    trimmed, tokens = PromptBudget(fields={"analysis_summary": 100}).apply(inputs)
+
+    text = trimmed["analysis_summary"]
+    assert "Revenue grew fastest in the northern region" in text
+    assert "lines omitted" in text
+    assert text.index("Step 0:") < text.index("Revenue grew fastest")
+    offered, sent = tokens["analysis_summary"]
+    assert sent <= 100 < offered
+
+
+def test_trims_variable_names_keeping_mentioned_and_recent_ones():
+    names = [f"frame_{index}" for index in range(100)]
+    inputs = {"custom_data": "Plot frame_3", "variables": names}
+
+    trimmed, _ = PromptBudget(fields={"variables": 40}).apply(inputs)
+
+    kept = trimmed["variables"]
+    assert "frame_3" in kept
+    assert "frame_99" in kept
+    assert kept[-1].startswith("[... ") and kept[-1].endswith(" more ...]")
+    assert kept[:-1] == sorted(kept[:-1], key=names.index)
+
+
+def test_total_budget_cuts_inputs_except_system_prompt_ones():
+    inputs = {
+        "question": "Summarize",
+        "dataset_summary": summary(40),
+        "analysis_summary": summary(40),
+        "visualization_summary": summary(40),
+    }
+    budget = PromptBudget(
+        fields={
+            "dataset_summary": 10000,
+            "analysis_summary": 10000,
+            "visualization_summary": 10000,
+        },
+        total=200,
+    )
+
+    trimmed, tokens = budget.apply(inputs)
+
+    assert trimmed["dataset_summary"] == inputs["dataset_summary"]
+    assert tokens["analysis_summary"][1] + tokens["visualization_summary"][1] <= 200
+
+
+def test_only_counts_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings.prompt_budget, "PROMPT_BUDGET_ENABLED", False)
+    inputs = {"analysis_summary": summary(200)}
+
+    trimmed, tokens = PromptBudget(fields={"analysis_summary": 10}).apply(inputs)
+
+    assert trimmed == inputs
+    offered = estimate_tokens(inputs["analysis_summary"])
+    assert tokens["analysis_summary"] == (offered, offered)
+
+
+def test_never_trims_system_prompt_inputs():
+    inputs = {"question": "Plot prices", "dataset_summary": summary(200)}
+
+    trimmed, tokens = PromptBudget(fields={"dataset_summary": 10}).apply(inputs)
+
+    assert trimmed["dataset_summary"] == inputs["dataset_summary"]
+    assert tokens["dataset_summary"][0] == tokens["dataset_summary"][1]
+
+
+def test_trims_listed_results_as_text():
+    report = [f"Result {index}: mean revenue by region" for index in range(200)]
+    inputs = {"question": "Which region grew?", "analysis_report": report}
+
+    trimmed, _ = PromptBudget(fields={"analysis_report": 100}).apply(inputs)
+
+    kept = trimmed["analysis_report"]
+    assert isinstance(kept, str)
+    assert kept.startswith("Result 0: mean revenue by region")
+    assert "lines omitted" in kept
@@ -0,0 +1,68 @@
+import uuid
+
+from execution.base import ExecutionRequest
+from execution.cache import ExecutionCache
+from execution.kernel import KernelManager
+from execution.modules import module_registry
+
+
+def fingerprints(values):
+    return lambda name: values.get(name, "-")
+
+
+def manager():
+    return KernelManager(
+        idle_ttl=60,
+        max_kernels=4,
+        max_rss_bytes=1 << 40,
+        module_registry=module_registry,
+        execution_cache=ExecutionCache(max_bytes=1 << 20),
+        checkpoint_max_bytes=0,
+        checkpoint_min_seconds=60,
+    )
+
+
+def test_key_fingerprints_augmented_assignment_targets():
+    cache = ExecutionCache(max_bytes=1 << 20)
+
+    first = cache.key("total += 1", [], fingerprints({"total": "a"}))
+    second = cache.key("total += 1", [], fingerprints({"total": "b"}))
+
+    assert first is not None and second is not None
+    assert first != second
+
+
+def test_key_skips_nondeterministic_code():
+    cache = ExecutionCache(max_bytes=1 << 20)
+
+    assert cache.key("import random\nx = random.random()", [], fingerprints({})) is None
+    assert cache.key("x = pd.Timestamp.now()", [], fingerprints({})) is None
+    assert cache.key("x = 1", [], fingerprints({})) is not None
+
+
+def test_key_is_disabled_without_budget():
+    cache = ExecutionCache(max_bytes=0)
+
+    assert cache.key("x = 1", [], fingerprints({})) is None
+
+
+def test_augmented_assignment_is_not_replayed_on_changed_input():
+    kernels, session_id = manager(), uuid.uuid4()
+
+    def run(total):
+        request = ExecutionRequest(
+            session_id=session_id,
+            file_name="data.csv",
+            code="total += 1",
+            dependencies=[],
+            variables={"total": total},
+        )
+        return kernels.execute(request)
+
+    first, second, third = run(1), run(10), run(1)
+
+    assert first.variables["total"] == 2
+    assert second.variables["total"] == 11
+    assert not second.cached
+    assert third.variables["total"] == 2
+    assert third.cached
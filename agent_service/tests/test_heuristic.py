@@ -0,0 +1,128 @@
+import pytest
+
+from agents.models.heuristic import (
+    HeuristicClassifier,
+    subtask_classification_rules,
+    task_routing_rules,
+)
+from core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings.heuristic_routing, "HEURISTIC_ROUTING", True)
+    monkeypatch.setattr(settings.heuristic_routing, "HEURISTIC_THRESHOLD", 0.85)
+
+
+class FixedModel:
+    """Learned pipeline stand-in returning fixed probabilities."""
+
+    classes_ = ["ADVISORY", "EXPLORATORY"]
+
+    def __init__(self, probabilities):
+        self.probabilities = probabilities
+
+    def predict_proba(self, features):
+        return [self.probabilities for _ in features]
+
+
+def classifier(rules=task_routing_rules):
+    return HeuristicClassifier(
+        name="test", labels=("ADVISORY", "EXPLORATORY"), rules=rules
+    )
+
+
+@pytest.mark.parametrize(
+    "question, pending, expected",
+    [
+        ("Summarize what we found so far", None, ("ADVISORY", 0.95)),
+        ("How should I handle the missing values?", None, ("ADVISORY", 0.9)),
+        ("yes, go ahead", "Plot a histogram of price", ("EXPLORATORY", 0.9)),
+        ("yes, go ahead", None, None),
+        ("Compute the mean price per region", None, None),
+    ],
+)
+def test_task_routing_rules(question, pending, expected):
+    inputs = {"question": question, "pending_context": pending}
+
+    assert task_routing_rules(inputs) == expected
+
+
+def test_long_confirmations_are_not_shortcuts():
+    question = "yes, but first " + " ".join(["explain"] * 12)
+    inputs = {"question": question, "pending_context": "Plot prices"}
+
+    assert task_routing_rules(inputs) is None
+
+
+@pytest.mark.parametrize(
+    "question, pending, expected",
+    [
+        ("plot sales vs price", None, ("VISUALIZATION", 0.92)),
+        ("Compute the mean price per region", None, ("ANALYSIS", 0.9)),
+        ("Could you draw the histogram and fit a model?", None, None),
+        ("What was the mean price?", None, None),
+        ("The distribution as a box plot", None, ("VISUALIZATION", 0.88)),
+        ("sure", "Plot a histogram of price", ("VISUALIZATION", 0.9)),
+        ("sure", "Train a regression on price", ("ANALYSIS", 0.9)),
+        ("sure", "Fit a model and plot its residuals", None),
+    ],
+)
+def test_subtask_classification_rules(question, pending, expected):
+    inputs = {"question": question, "pending_context": pending}
+
+    assert subtask_classification_rules(inputs) == expected
+
+
+def test_predict_is_disabled_by_setting(monkeypatch):
+    monkeypatch.setattr(settings.heuristic_routing, "HEURISTIC_ROUTING", False)
+
+    assert classifier().predict({"question": "Summarize what we found"}) is None
+
+
+def test_predict_counts_decisions():
+    heuristic = classifier()
+
+    assert heuristic.predict({"question": "Summarize what we found"}) == "ADVISORY"
+    assert heuristic.predict({"question": "Compute the mean price"}) is None
+
+    metrics = heuristic.metrics()
+    assert metrics["rules"] == 1
+    assert metrics["abstained"] == 1
+    assert metrics["fast_path_rate"] == 0.5
+
+
+def test_predict_without_counting():
+    heuristic = classifier()
+
+    assert heuristic.predict({"question": "Recap please"}, count=False) == "ADVISORY"
+    assert heuristic.metrics()["rules"] == 0
+
+
+def test_predict_applies_threshold(monkeypatch):
+    monkeypatch.setattr(settings.heuristic_routing, "HEURISTIC_THRESHOLD", 0.99)
+
+    assert classifier().predict({"question": "Summarize what we found"}) is None
+
+
+def test_predict_ignores_labels_outside_the_decision():
+    heuristic = HeuristicClassifier(
+        name="test", labels=("EXPLORATORY",), rules=task_routing_rules
+    )
+
+    assert heuristic.predict({"question": "Summarize what we found"}) is None
+
+
+@pytest.mark.parametrize(
+    "probabilities, expected, source",
+    [
+        ([0.1, 0.9], "EXPLORATORY", "model"),
+        ([0.4, 0.6], None, "abstained"),
+    ],
+)
+def test_predict_falls_back_to_learned_pipeline(probabilities, expected, source):
+    heuristic = classifier()
+    heuristic.use_model(FixedModel(probabilities))
+
+    assert heuristic.predict({"question": "Compute the mean price"}) == expected
+    assert heuristic.metrics()[source] == 1
@@ -0,0 +1,117 @@
+import uuid
+import pickle
+
+import pytest
+from sqlalchemy.orm import Session
+
+from agents.state import AgentState
+from agents.nodes.task.scheduling import (
+    SubtaskSchedulingNode,
+    SubtaskStreamBuffer,
+    subtask_waves,
+)
+
+
+@pytest.mark.parametrize(
+    "count, dependencies, expected",
+    [
+        (0, None, []),
+        (3, None, [[0], [1], [2]]),
+        (3, [[], [], []], [[0, 1, 2]]),
+        (4, [[], [0], [0], [1, 2]], [[0], [1, 2], [3]]),
+        (3, [[], [5], [2]], [[0, 1, 2]]),
+        (3, [[], []], [[0], [1], [2]]),
+    ],
+)
+def test_subtask_waves(count, dependencies, expected):
+    assert subtask_waves(count, dependencies) == expected
+
+
+def test_stream_buffer_releases_events_in_subtask_order():
+    buffer = SubtaskStreamBuffer()
+
+    assert buffer.push(0, ["a0"]) == ["a0"]
+    assert buffer.push(1, ["b0"]) == []
+    assert buffer.push(2, ["c0"]) == []
+    assert buffer.push(None, ["x"]) == ["x"]
+    assert buffer.complete(2) == []
+    assert buffer.push(1, ["b1"]) == []
+    assert buffer.complete(0) == ["b0", "b1"]
+    assert buffer.push(1, ["b2"]) == ["b2"]
+    assert buffer.complete(1) == ["c0"]
+    assert buffer.push(3, ["d0"]) == ["d0"]
+
+
+def test_stream_buffer_flushes_held_events():
+    buffer = SubtaskStreamBuffer()
+    buffer.push(2, ["c0"])
+    buffer.push(1, ["b0"])
+
+    assert buffer.flush() == ["b0", "c0"]
+    assert buffer.flush() == []
+
+
+def agent_state(**values):
+    return AgentState(
+        question="Explore prices",
+        db=Session(),
+        user_id=1,
+        session_id=uuid.uuid4(),
+        file_name="prices.csv",
+        storage_uri="file://prices.csv",
+        dataset_summary="Prices by region",
+        new_conversation=[{"question": "Explore prices", "answer": []}],
+        **values,
+    )
+
+
+def fork(variables, snapshot, parallel):
+    state = agent_state(variables=variables, variable_snapshot=snapshot)
+    return SubtaskSchedulingNode._fork(state, 1, "Plot prices", None, parallel)
+
+
+def test_parallel_forks_own_their_variables():
+    prices, totals = [1, 2, 3], {"north": 5}
+    variables = {"prices": prices, "totals": totals}
+    snapshot = {"prices": pickle.dumps(prices)}
+
+    first = fork(variables, snapshot, parallel=True)
+    second = fork(variables, snapshot, parallel=True)
+
+    first["variables"]["prices"].append(4)
+    first["variables"]["totals"]["south"] = 2
+    assert second["variables"] == {"prices": [1, 2, 3], "totals": {"north": 5}}
+    assert variables == {"prices": [1, 2, 3], "totals": {"north": 5}}
+    assert first["kernel_namespace"] == "subtask-1"
+    assert first["deferred_summaries"] == []
+
+
+def test_sequential_fork_shares_the_variables():
+    variables = {"prices": [1, 2, 3]}
+
+    values = fork(variables, None, parallel=False)
+
+    assert values["variables"]["prices"] is variables["prices"]
+    assert values["kernel_namespace"] is None
+    assert values["new_conversation"] == [{"question": "Explore prices", "answer": []}]
+
+
+def test_merge_extends_summaries_of_parallel_subtasks_in_order():
+    state = agent_state(analysis_summary="Loaded prices")
+    branches = [
+        (
+            index,
+            state.model_copy(
+                update={
+                    "deferred_summaries": [
+                        ("analysis_summary", lambda summary, step=step: summary + step)
+                    ]
+                }
+            ),
+        )
+        for index, step in enumerate(["; mean by region", "; price outliers"])
+    ]
+
+    merged = SubtaskSchedulingNode._merge(state, branches)
+
+    assert merged.analysis_summary == "Loaded prices; mean by region; price outliers"
@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.summarization import SummarizationService
+
+
+@pytest.fixture
+def service():
+    service = SummarizationService(workers=1, background=False)
+    yield service
+    service.shutdown()
+
+
+def caller_thread(value):
+    return value, threading.get_ident()
+
+
+def test_foreground_steps_run_off_the_event_loop(service):
+    async def run():
+        return threading.get_ident(), await service.acall(caller_thread, 1)
+
+    loop_thread, (value, step_thread) = asyncio.run(run())
+
+    assert value == 1
+    assert step_thread != loop_thread
+
+
+def test_background_steps_run_inline(service):
+    service.background = True
+    service.start()
+
+    async def run():
+        return threading.get_ident(), await service.acall(caller_thread, 2)
+
+    loop_thread, (value, step_thread) = asyncio.run(run())
+
+    assert value == 2
+    assert step_thread == loop_thread
@@ -0,0 +1,79 @@
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from agents.models.tiering import model_tier_stats, tiered_chain
+from core.config import settings
+
+
+class TierModel(BaseChatModel):
+    """Chat model answering with a fixed reply per model name."""
+
+    model: str = "large"
+    replies: dict
+
+    @property
+    def _llm_type(self):
+        return "tier"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = AIMessage(content=self.replies[self.model])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@pytest.fixture(autouse=True)
+def tiers(monkeypatch):
+    monkeypatch.setattr(
+        settings.model_tiers, "MODEL_TIER_MODELS", {"large": "large", "small": "small"}
+    )
+    monkeypatch.setattr(settings.model_tiers, "MODEL_TIER_DEFAULT", "large")
+    monkeypatch.setattr(settings.model_tiers, "MODEL_TIER_ESCALATION", True)
+
+
+def chain(node, small_reply, monkeypatch):
+    monkeypatch.setattr(settings.model_tiers, "MODEL_TIER_NODES", {node: "small"})
+    prompt = ChatPromptTemplate.from_messages(
+        [("system", "Answer ADVISORY or EXPLORATORY."), ("human", "{question}")]
+    )
+    model = TierModel(replies={"small": small_reply, "large": "EXPLORATORY"})
+    return tiered_chain(
+        prompt, model, node, valid_outputs=("ADVISORY", "EXPLORATORY")
+    )
+
+
+def ask(runnable, stream):
+    return runnable.invoke(
+        {"question": "Plot prices"}, config={"metadata": {"stream": stream}}
+    ).content
+
+
+def test_labels_with_surrounding_whitespace_stay_on_the_small_tier(monkeypatch):
+    runnable = chain("WhitespaceNode", " ADVISORY\n", monkeypatch)
+
+    assert ask(runnable, stream=False) == "ADVISORY"
+    assert model_tier_stats.metrics()["nodes"]["WhitespaceNode"] == {
+        "escalations": 0,
+        "small": 1,
+    }
+
+
+def test_invalid_labels_escalate_to_the_large_tier(monkeypatch):
+    runnable = chain("EscalatingNode", "Maybe", monkeypatch)
+
+    assert ask(runnable, stream=False) == "EXPLORATORY"
+    assert model_tier_stats.metrics()["nodes"]["EscalatingNode"] == {
+        "escalations": 1,
+        "large": 1,
+    }
+
+
+def test_streamed_calls_do_not_escalate(monkeypatch):
+    runnable = chain("StreamedNode", "Maybe", monkeypatch)
+
+    assert ask(runnable, stream=True) == "Maybe"
+    assert model_tier_stats.metrics()["nodes"]["StreamedNode"] == {
+        "escalations": 0,
+        "small": 1,
+    }
@@ -0,0 +1,139 @@
+import uuid
+import asyncio
+
+import pytest
+from sqlalchemy.orm import Session
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from agents import tracing
+from agents.state import AgentState
+from agents.tracing import TurnTracer, otlp_payload
+from agents.nodes.task.speculation import SpeculationStore
+from services import summarization
+from services.summarization import SummarizationService
+
+
+class SummaryModel(BaseChatModel):
+    """Chat model answering every call with the same summary."""
+
+    @property
+    def _llm_type(self):
+        return "summary"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = AIMessage(content="Loaded prices")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    traces = []
+    monkeypatch.setattr(tracing.trace_exporter, "export", traces.append)
+    return traces
+
+
+def agent_state():
+    return AgentState(
+        question="Explore prices",
+        db=Session(),
+        user_id=1,
+        session_id=uuid.uuid4(),
+        file_name="prices.csv",
+        storage_uri="file://prices.csv",
+        dataset_summary="Prices by region",
+        new_conversation=[{"question": "Explore prices", "answer": []}],
+    )
+
+
+def llm_spans(trace):
+    return [span for span in trace["spans"] if span["kind"] == "llm"]
+
+
+def test_background_summaries_are_traced_linked_to_the_turn(exported, monkeypatch):
+    monkeypatch.setattr(
+        summarization.memory_service, "update_memory_cache", lambda **kwargs: None
+    )
+    monkeypatch.setattr(summarization.db_manager, "session_factory", Session)
+    service = SummarizationService(workers=1, background=True)
+    service.start()
+    state = agent_state()
+    model = SummaryModel()
+
+    def node(state):
+        service.submit(
+            state,
+            "conversation_summary",
+            lambda summary: model.invoke(
+                "Summarize", config={"metadata": {"stream": False}}
+            ).content,
+            None,
+        )
+        return state
+
+    tracer = TurnTracer(state.session_id)
+    RunnableLambda(node).invoke(state, config={"callbacks": [tracer]})
+    service.shutdown()
+    turn = tracer.finish()
+
+    (trace,) = exported
+    root = trace["spans"][0]
+    assert state.summary_jobs["conversation_summary"]
+    assert llm_spans(turn) == []
+    assert len(llm_spans(trace)) == 1
+    assert (root["name"], root["kind"], trace["status"]) == (
+        "summarization",
+        "detached",
+        "ok",
+    )
+    assert root["attributes"]["linked_trace_id"] == turn["trace_id"]
+    assert root["attributes"]["linked_span_id"] == turn["spans"][0]["span_id"]
+
+    (resource,) = otlp_payload(trace, "agent-service")["resourceSpans"]
+    spans = resource["scopeSpans"][0]["spans"]
+    assert spans[0]["links"] == [
+        {"traceId": turn["trace_id"], "spanId": turn["spans"][0]["span_id"]}
+    ]
+
+
+def test_speculative_calls_outlive_the_turn_in_a_detached_trace(exported):
+    store = SpeculationStore()
+    model = SummaryModel()
+    tracer = TurnTracer(uuid.uuid4())
+
+    async def speculate():
+        await asyncio.sleep(0.01)
+        return (await model.ainvoke("Plan")).content
+
+    async def node(inputs):
+        return store.submit("PlanningNode", agent_state(), inputs, speculate())
+
+    async def run():
+        task = await RunnableLambda(node).ainvoke(
+            {"subtask": "Plot prices"}, config={"callbacks": [tracer]}
+        )
+        turn = tracer.finish()
+        return turn, await task
+
+    turn, result = asyncio.run(run())
+
+    (trace,) = exported
+    assert result == "Loaded prices"
+    assert llm_spans(turn) == []
+    assert len(llm_spans(trace)) == 1
+    assert trace["spans"][0]["name"] == "speculation"
+    assert trace["spans"][0]["attributes"]["linked_trace_id"] == turn["trace_id"]
+
+
+def test_untraced_work_exports_nothing(exported):
+    store = SpeculationStore()
+
+    async def run():
+        store.start(asyncio.sleep(0))
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+    assert exported == []
@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from execution.modules import module_registry
+from execution.validation import CodeValidator
+
+
+@pytest.fixture
+def validator():
+    return CodeValidator(module_registry=module_registry)
+
+
+@pytest.fixture
+def variables():
+    return {"df": pd.DataFrame({"price": [1.0, None], "region": ["a", "b"]})}
+
+
+def test_reports_syntax_error(validator, variables):
+    issues = validator.validate("df[", variables, [])
+
+    assert [issue.kind for issue in issues] == ["SyntaxError"]
+
+
+def test_reports_missing_code(validator, variables):
+    issues = validator.validate(None, variables, [])
+
+    assert [issue.kind for issue in issues] == ["SyntaxError"]
+
+
+def test_reports_undefined_name_with_suggestion(validator, variables):
+    issues = validator.validate("total = prices.sum()", variables, [])
+
+    assert len(issues) == 1
+    assert issues[0].kind == "NameError"
+    assert issues[0].line == 1
+    assert "'prices'" in issues[0].message
+
+
+def test_accepts_names_bound_by_code_and_dependencies(validator, variables):
+    code = "import math\nsize = len(df)\nresult = np.log(math.e) + size"
+
+    assert validator.validate(code, variables, ["numpy"]) == []
+
+
+def test_skips_name_check_with_dynamic_names(validator, variables):
+    assert validator.validate("exec('x = 1')\nprint(x)", variables, []) == []
+
+
+def test_reports_missing_column_with_suggestion(validator, variables):
+    issues = validator.validate("df['prise'].mean()", variables, [])
+
+    assert len(issues) == 1
+    assert issues[0].kind == "KeyError"
+    assert "Did you mean: 'price'?" in issues[0].message
+    assert str(issues[0]).startswith("Line 1: KeyError:")
+
+
+def test_reports_missing_columns_of_column_lists(validator, variables):
+    issues = validator.validate("df[['price', 'city']]", variables, [])
+
+    assert ["'city'" in issue.message for issue in issues] == [True]
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "df['total'] = df['price'] * 2\ndf['total'].sum()",
+        "df.loc[:, 'new'] = 1\ndf['new']",
+        "df.at[0, 'flag'] = True\ndf['flag']",
+        "df.columns = ['a', 'b']\ndf['a']",
+        "df.index = df['region']\ndf['anything']",
+        "df.rename(columns={'price': 'cost'}, inplace=True)\ndf['cost']",
+        "df = df.assign(cost=1)\ndf['cost']",
+    ],
+)
+def test_accepts_columns_the_code_creates(validator, variables, code):
+    assert validator.validate(code, variables, []) == []
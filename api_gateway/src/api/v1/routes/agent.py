@@ -9,10 +9,13 @@ authentication is required for all endpoints.
 
 Endpoints:
     GET /chat/stream: Stream agent responses in real time for a given question.
+    POST /chat/resume: Resume the stream of an interrupted agent turn.
     GET /chat/history: Retrieve conversation history for the current session and file.
     POST /chat/save: Persist the conversation memory to the database.
 """
 
+from uuid import UUID
+
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.responses import StreamingResponse
@@ -27,17 +30,26 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/gateway/auth/login")
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
+# Disable proxy buffering so execution output reaches the client as it is written
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 
 @router.get("/stream")
 async def stream(
     question: str,
+    profile: bool = False,
     token: str = Depends(oauth2_scheme),
 ):
     """
     Stream agent responses in real-time for a given question.
 
+    Events of the agent service, including the "output" and "progress"
+    events of executing code, are forwarded unchanged as they arrive.
+
     Args:
         question: User's question to the agent.
+        profile: Whether to stream the resource usage profile of every code
+            execution as "profile" events.
         token: OAuth2 bearer token injected via dependency.
 
     Returns:
@@ -53,17 +65,64 @@ async def stream(
     active_file = FileClient.get_active_file(token=token, session=session_id)
 
     # Call async streaming method of your client
-    stream = AgentClient.stream(
+    stream = await AgentClient.stream(
         question=question,
         user_id=user_id,
         session_id=session_id,
         file_name=active_file["file_name"],
         storage_uri=active_file["storage_uri"],
         dataset_summary=active_file["summary"],
+        profile=profile,
     )
 
     # Return StreamingResponse with media_type text/plain for real-time streaming
-    return StreamingResponse(stream, media_type="text/event-stream")
+    return StreamingResponse(
+        stream, media_type="text/event-stream", headers=STREAM_HEADERS
+    )
+
+
+@router.post("/resume")
+async def resume(
+    turn_id: UUID,
+    profile: bool = False,
+    token: str = Depends(oauth2_scheme),
+):
+    """
+    Resume the stream of an agent turn interrupted by a dropped connection.
+
+    Every stream starts with a "turn" event carrying the id of its turn;
+    resuming the turn streams the events of the nodes it had not completed.
+
+    Args:
+        turn_id: Identifier of the interrupted turn.
+        profile: Whether to stream the resource usage profile of every code
+            execution as "profile" events.
+        token: OAuth2 bearer token injected via dependency.
+
+    Raises:
+        HTTPException: 404 if the turn is unknown to the agent service.
+
+    Returns:
+        StreamingResponse: Streaming text response of the rest of the turn.
+    """
+    # Get user ID from token
+    user_id = get_current_user_id(token)
+
+    # Get currently active session ID
+    session_id = SessionClient.get_active_session_id(token=token)
+
+    # Resume the turn, failing with the status of the agent service, e.g. 404
+    stream = await AgentClient.resume(
+        turn_id=turn_id,
+        user_id=user_id,
+        session_id=session_id,
+        profile=profile,
+    )
+
+    # Return StreamingResponse with the same headers as the original stream
+    return StreamingResponse(
+        stream, media_type="text/event-stream", headers=STREAM_HEADERS
+    )
 
 
 @router.get("/history")
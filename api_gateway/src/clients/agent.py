@@ -2,9 +2,10 @@
 AgentClient module for interacting with the agent API service.
 
 This module provides a client for performing agent-related operations,
-including streaming responses from the agent model and managing conversation
-memory. All methods use HTTP requests (synchronous or asynchronous) and
-leverage `BaseClient` for consistent response handling.
+including streaming responses from the agent model, resuming interrupted
+turns, and managing conversation memory. All methods use HTTP requests
+(synchronous or asynchronous) and leverage `BaseClient` for consistent
+response handling.
 
 Classes:
     AgentClient: Client for interacting with agent endpoints, streaming
@@ -16,6 +17,7 @@ from uuid import UUID
 from typing import AsyncGenerator
 
 import requests
+from fastapi import HTTPException
 
 from clients.base import BaseClient
 
@@ -26,6 +28,7 @@ class AgentClient(BaseClient):
 
     Provides methods to:
     - Stream agent responses asynchronously for a given question.
+    - Resume the stream of an interrupted agent turn.
     - Fetch conversation memory for a user session.
     - Persist conversation memory to the backend.
 
@@ -41,13 +44,15 @@ class AgentClient(BaseClient):
         file_name: str,
         storage_uri: str,
         dataset_summary: str,
+        profile: bool = False,
         url: str = "http://127.0.0.1:8005/api/v1/agent/stream",
     ) -> AsyncGenerator[str, None]:
         """
         Stream the agent's response to a question asynchronously.
 
         This method sends a POST request with question and session context
-        to the agent service, and yields chunks of text as they arrive.
+        to the agent service and, once it was accepted, returns a generator
+        yielding chunks of text as they arrive.
 
         Args:
             question: User's query to the agent.
@@ -56,13 +61,18 @@ class AgentClient(BaseClient):
             file_name: Name of the file associated with the session.
             storage_uri: Path or URI to the dataset or file storage.
             dataset_summary: Summary of dataset content/context.
+            profile: Whether to stream the resource usage profile of every
+                code execution.
             url: API endpoint for streaming agent responses.
 
-        Yields:
-            str: Chunks of text generated by the agent in real-time.
+        Returns:
+            AsyncGenerator[str, None]: SSE chunks generated by the agent in
+            real-time, such as text, images, and the output, progress, and
+            profile of executing code.
 
         Raises:
-            httpx.HTTPStatusError: If the request fails.
+            HTTPException: With the status of the agent service if it rejects
+                the request.
         """
 
         # Prepare payload with session and question context
@@ -73,17 +83,99 @@ class AgentClient(BaseClient):
             "file_name": file_name,
             "storage_uri": storage_uri,
             "dataset_summary": dataset_summary,
+            "profile": profile,
         }
 
+        return await AgentClient._open_stream(url=url, payload=payload)
+
+    @staticmethod
+    async def resume(
+        turn_id: UUID,
+        user_id: int,
+        session_id: UUID,
+        profile: bool = False,
+        url: str = "http://127.0.0.1:8005/api/v1/agent/resume",
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream the rest of an interrupted agent turn asynchronously.
+
+        This method sends a POST request identifying the turn to the agent
+        service and, once it was accepted, returns a generator yielding
+        chunks of text of the remaining nodes as they arrive.
+
+        Args:
+            turn_id: Identifier of the turn, announced by its "turn" event.
+            user_id: Identifier of the user who started the turn.
+            session_id: Identifier of the session the turn belongs to.
+            profile: Whether to stream the resource usage profile of every
+                code execution.
+            url: API endpoint for resuming agent turns.
+
+        Returns:
+            AsyncGenerator[str, None]: SSE chunks generated by the agent in
+            real-time.
+
+        Raises:
+            HTTPException: With the status of the agent service if it rejects
+                the request, e.g. 404 for an unknown turn.
+        """
+
+        # Prepare payload identifying the turn
+        payload = {
+            "turn_id": str(turn_id),
+            "user_id": user_id,
+            "session_id": str(session_id),
+            "profile": profile,
+        }
+
+        return await AgentClient._open_stream(url=url, payload=payload)
+
+    @staticmethod
+    async def _open_stream(url: str, payload: dict) -> AsyncGenerator[str, None]:
+        """
+        Send a POST request and return a generator over its streamed response.
+
+        The status of the response is checked before the generator is
+        returned, so a rejected request is reported with its own status
+        instead of failing a stream that already started.
+
+        Args:
+            url: API endpoint of the stream.
+            payload: JSON payload of the request.
+
+        Returns:
+            AsyncGenerator[str, None]: Chunks of text as they arrive.
+
+        Raises:
+            HTTPException: With the status and detail of a rejected request.
+        """
         # Use httpx.AsyncClient for streaming responses
-        async with httpx.AsyncClient(timeout=None) as client:
-            async with client.stream("POST", url, json=payload) as response:
-                # Raise exception for HTTP errors
-                response.raise_for_status()
+        client = httpx.AsyncClient(timeout=None)
+        request = client.build_request("POST", url, json=payload)
+        response = await client.send(request, stream=True)
+
+        # Report HTTP errors before the stream starts
+        if response.is_error:
+            await response.aread()
+            await response.aclose()
+            await client.aclose()
+            try:
+                detail = response.json().get("detail", response.text)
+            except ValueError:
+                detail = response.text
+            raise HTTPException(status_code=response.status_code, detail=detail)
+
+        async def chunks() -> AsyncGenerator[str, None]:
+            try:
                 # Yield chunks of text as they arrive from the stream
                 async for chunk in response.aiter_text():
                     if chunk:
                         yield chunk
+            finally:
+                await response.aclose()
+                await client.aclose()
+
+        return chunks()
 
     @staticmethod
     def get_conversation_memory(